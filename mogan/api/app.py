@@ -45,7 +45,8 @@ def setup_app(pecan_config=None, extra_hooks=None):
                  hooks.EngineAPIHook(),
                  hooks.ContextHook(pecan_config.app.acl_public_routes),
                  hooks.NoExceptionTracebackHook(),
-                 hooks.PublicUrlHook()]
+                 hooks.PublicUrlHook(),
+                 hooks.MetricsHook()]
     if extra_hooks:
         app_hooks.extend(extra_hooks)
 
@@ -62,6 +63,9 @@ def setup_app(pecan_config=None, extra_hooks=None):
         app, dict(cfg.CONF),
         public_api_routes=pecan_config.app.acl_public_routes)
 
+    if cfg.CONF.metrics.enable_api_endpoint:
+        app = middleware.MetricsMiddleware(app)
+
     return app
 
 
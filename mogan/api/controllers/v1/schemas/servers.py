@@ -73,3 +73,31 @@ create_server = {
     'required': ['server'],
     'additionalProperties': False,
 }
+
+set_power_states = {
+    'type': 'object',
+    'properties': {
+        'servers': {
+            'type': 'array', 'minItems': 1, 'uniqueItems': True,
+            'items': {'type': 'string', 'format': 'uuid'},
+        },
+        'target': {
+            'type': 'string',
+            'enum': ['on', 'off', 'reboot', 'soft_off', 'soft_reboot'],
+        },
+    },
+    'required': ['servers', 'target'],
+    'additionalProperties': False,
+}
+
+delete_servers = {
+    'type': 'object',
+    'properties': {
+        'servers': {
+            'type': 'array', 'minItems': 1, 'uniqueItems': True,
+            'items': {'type': 'string', 'format': 'uuid'},
+        },
+    },
+    'required': ['servers'],
+    'additionalProperties': False,
+}
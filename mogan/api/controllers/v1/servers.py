@@ -52,12 +52,18 @@ LOG = log.getLogger(__name__)
 
 
 class ServerControllerBase(rest.RestController):
-    _resource = None
 
-    # This _resource is used for authorization.
+    # NOTE: The controllers are shared by all the requests, so the server
+    # fetched for authorization is kept on the request, for its handler to
+    # reuse.
+    @property
+    def _resource(self):
+        return getattr(pecan.request, 'server', None)
+
     def _get_resource(self, uuid, *args, **kwargs):
-        self._resource = objects.Server.get(pecan.request.context, uuid)
-        return self._resource
+        pecan.request.server = objects.Server.get(pecan.request.context,
+                                                  uuid)
+        return pecan.request.server
 
 
 class ServerStatesController(ServerControllerBase):
@@ -562,7 +568,9 @@ class ServerController(ServerControllerBase):
     """Expose the console controller of servers"""
 
     _custom_actions = {
-        'detail': ['GET']
+        'detail': ['GET'],
+        'power': ['PUT'],
+        'batch_delete': ['POST'],
     }
 
     def _get_server_collection(self, name=None, status=None,
@@ -670,6 +678,95 @@ class ServerController(ServerControllerBase):
                                            image_uuid, ip,
                                            all_tenants=all_tenants)
 
+    @policy.authorize_wsgi("mogan:server", "set_power_state", False)
+    @expose.expose(types.jsontype, body=types.jsontype,
+                   status_code=http_client.ACCEPTED)
+    def power(self, power_states):
+        """Set the power state of many servers.
+
+        The power action is started on every server it is allowed on, and
+        the result for each server is returned. Servers are then updated
+        asynchronously, the client should GET the status of the servers to
+        observe the completion of the action.
+
+        :param power_states: a dict with the list of server UUIDs and the
+                             desired target to change power state to.
+        """
+        validation.check_schema(power_states,
+                                server_schemas.set_power_states)
+        context = pecan.request.context
+        server_uuids = power_states['servers']
+        target = power_states['target']
+
+        allowed, errors = self._get_allowed_servers(
+            server_uuids, 'mogan:server:set_power_state')
+        if allowed:
+            errors.update(pecan.request.engine_api.power_all(
+                context, allowed, target))
+        return self._get_bulk_results(server_uuids, errors)
+
+    @policy.authorize_wsgi("mogan:server", "delete", False)
+    @expose.expose(types.jsontype, body=types.jsontype,
+                   status_code=http_client.ACCEPTED)
+    def batch_delete(self, servers):
+        """Delete many servers.
+
+        The delete is started on every server it is allowed on, and the
+        result for each server is returned. Servers are then deleted
+        asynchronously.
+
+        :param servers: a dict with the list of server UUIDs to delete.
+        """
+        validation.check_schema(servers, server_schemas.delete_servers)
+        server_uuids = servers['servers']
+
+        allowed, errors = self._get_allowed_servers(server_uuids,
+                                                    'mogan:server:delete')
+        if allowed:
+            errors.update(pecan.request.engine_api.delete_all(
+                pecan.request.context, allowed))
+        return self._get_bulk_results(server_uuids, errors)
+
+    def _get_allowed_servers(self, server_uuids, rule):
+        """Load the servers a bulk action is allowed on.
+
+        :returns: a tuple of the list of allowed servers, and a dict of
+                  error messages keyed by server uuid for the other ones.
+        """
+        context = pecan.request.context
+        servers = {server.uuid: server for server in objects.Server.list(
+            context, filters={'uuid': server_uuids})}
+        credentials = context.to_policy_values()
+        credentials['is_admin'] = context.is_admin
+        errors = {}
+        allowed = []
+        for server_uuid in server_uuids:
+            server = servers.get(server_uuid)
+            if server is None:
+                errors[server_uuid] = six.text_type(
+                    exception.ServerNotFound(server=server_uuid))
+                continue
+            target_creds = {'project_id': server.project_id,
+                            'user_id': server.user_id}
+            if not policy.check(rule, target_creds, credentials):
+                # Don't tell others' servers apart from missing ones.
+                errors[server_uuid] = six.text_type(
+                    exception.ServerNotFound(server=server_uuid))
+                continue
+            allowed.append(server)
+        return allowed, errors
+
+    @staticmethod
+    def _get_bulk_results(server_uuids, errors):
+        results = []
+        for server_uuid in server_uuids:
+            result = {'uuid': server_uuid,
+                      'accepted': server_uuid not in errors}
+            if server_uuid in errors:
+                result['error'] = errors[server_uuid]
+            results.append(result)
+        return {'servers': results}
+
     @policy.authorize_wsgi("mogan:server", "create", False)
     @expose.expose(Server, body=types.jsontype,
                    status_code=http_client.CREATED)
@@ -14,15 +14,21 @@
 # License for the specific language governing permissions and limitations
 # under the License.
 
+import time
+
 from oslo_config import cfg
 from oslo_context import context
+from oslo_log import log
 from pecan import hooks
 from six.moves import http_client
 
+from mogan.common import metrics
 from mogan.common import policy
 from mogan.db import api as dbapi
 from mogan.engine import api as engineapi
 
+LOG = log.getLogger(__name__)
+
 
 class ConfigHook(hooks.PecanHook):
     """Attach the config object to the request so controllers can get to it."""
@@ -86,7 +92,11 @@ class ContextHook(hooks.PecanHook):
             'roles': headers.get('X-Roles', '').split(','),
         }
 
-        is_admin = policy.check('is_admin', creds, creds)
+        # NOTE: The token is not checked by the rules, leave it out so that
+        # the decision is cached for the user rather than for each token.
+        policy_creds = dict((k, v) for (k, v) in creds.items()
+                            if k != 'auth_token')
+        is_admin = policy.check('is_admin', policy_creds, policy_creds)
         state.request.context = context.RequestContext(
             is_admin=is_admin, **creds)
 
@@ -152,3 +162,56 @@ class PublicUrlHook(hooks.PecanHook):
     def before(self, state):
         state.request.public_url = (cfg.CONF.api.public_endpoint or
                                     state.request.host_url)
+
+
+class MetricsHook(hooks.PecanHook):
+    """Record the metrics of the requests, per route.
+
+    The duration of the requests is recorded, as well as the calls they
+    make to the database, the engines and the other services, to find the
+    routes making too many of them.
+
+    """
+
+    def on_route(self, state):
+        state.request.started_at = time.time()
+        state.request.external_calls = metrics.ExternalCalls()
+        metrics.set_external_calls(state.request.external_calls)
+
+    @staticmethod
+    def _get_route(controller):
+        if controller is None:
+            return 'unknown'
+        controller_self = getattr(controller, '__self__', None)
+        if controller_self is None:
+            return controller.__name__
+        return '%s.%s' % (controller_self.__class__.__name__,
+                          controller.__name__)
+
+    def after(self, state):
+        metrics.set_external_calls(None)
+        started_at = getattr(state.request, 'started_at', None)
+        if started_at is None:
+            return
+        duration = time.time() - started_at
+        calls = state.request.external_calls
+        route = self._get_route(state.controller)
+        method = state.request.method
+        registry = metrics.get_registry()
+        registry.observe('api_request_duration_seconds', duration,
+                         route=route, method=method)
+        registry.increment('api_requests', route=route, method=method,
+                           status=state.response.status_int)
+        for service, count in calls.counts.items():
+            registry.increment('api_request_external_calls', count,
+                               route=route, method=method, service=service)
+            registry.observe('api_request_external_call_duration_seconds',
+                             calls.durations[service], route=route,
+                             method=method, service=service)
+        LOG.debug('%(method)s %(route)s took %(duration).3f seconds, '
+                  'external calls: %(calls)s.',
+                  {'method': method, 'route': route, 'duration': duration,
+                   'calls': dict(calls.counts)},
+                  route=route, duration=duration,
+                  external_calls=dict(calls.counts),
+                  external_call_durations=dict(calls.durations))
@@ -12,11 +12,14 @@
 # under the License.
 
 from mogan.api.middleware import auth_token
+from mogan.api.middleware import metrics
 from mogan.api.middleware import parsable_error
 
 
 ParsableErrorMiddleware = parsable_error.ParsableErrorMiddleware
 AuthTokenMiddleware = auth_token.AuthTokenMiddleware
+MetricsMiddleware = metrics.MetricsMiddleware
 
 __all__ = ('ParsableErrorMiddleware',
-           'AuthTokenMiddleware')
+           'AuthTokenMiddleware',
+           'MetricsMiddleware')
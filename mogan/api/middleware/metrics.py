@@ -0,0 +1,32 @@
+# Copyright 2017 Huawei Technologies Co.,LTD.
+# All Rights Reserved.
+#
+#    Licensed under the Apache License, Version 2.0 (the "License"); you may
+#    not use this file except in compliance with the License. You may obtain
+#    a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#    WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#    License for the specific language governing permissions and limitations
+#    under the License.
+"""
+Middleware serving the metrics of the API service in the Prometheus format.
+"""
+
+from mogan.common import metrics
+
+
+class MetricsMiddleware(object):
+    """Serve the metrics on the /metrics path, without authentication."""
+
+    def __init__(self, app, path='/metrics'):
+        self.app = app
+        self.path = path
+
+    def __call__(self, environ, start_response):
+        if environ.get('PATH_INFO') == self.path:
+            return metrics.application(environ, start_response)
+        return self.app(environ, start_response)
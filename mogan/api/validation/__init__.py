@@ -23,17 +23,34 @@ from mogan.common import exception
 from mogan.common.i18n import _
 
 
+_FORMAT_CHECKER = jsonschema.FormatChecker()
+
+# Validators compiled for the schemas, keyed by schema id. The schema is
+# kept along with its validator, so that the id isn't reused.
+_VALIDATORS = {}
+
+
+def _get_validator(schema):
+    try:
+        return _VALIDATORS[id(schema)][1]
+    except KeyError:
+        validator = jsonschema.Draft4Validator(
+            schema, format_checker=_FORMAT_CHECKER)
+        _VALIDATORS[id(schema)] = (schema, validator)
+        return validator
+
+
 def check_schema(body, schema):
     """Ensure all necessary keys are present and correct in create body.
 
     Check that the user-specified create body is in the expected format and
-    include the required information.
+    include the required information. The validator of each schema is
+    compiled once and reused, schemas are expected not to be modified.
 
     :param body: create body
     :raises InvalidParameterValue: if validation of create body fails.
     """
-    validator = jsonschema.Draft4Validator(
-        schema, format_checker=jsonschema.FormatChecker())
+    validator = _get_validator(schema)
     try:
         validator.validate(body)
     except jsonschema.ValidationError as exc:
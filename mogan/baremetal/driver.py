@@ -60,6 +60,24 @@ class BaseEngineDriver(object):
         """
         raise NotImplementedError()
 
+    def get_power_states(self, context, server_uuids):
+        """Return the power states of many servers.
+
+        :param server_uuids: mogan server uuids to get power states.
+        :returns: a dict of power states keyed by server uuid.
+        """
+        raise NotImplementedError()
+
+    def set_power_states(self, context, servers, state):
+        """Set the power state of many servers.
+
+        :param servers: mogan server objects to change power state.
+        :param state: mogan states to change to.
+        :returns: a dict of the exceptions raised, keyed by server uuid,
+                  for the servers whose power action failed.
+        """
+        raise NotImplementedError()
+
     def get_portgroups_and_ports(self, node_uuid):
         """Get a node's portgroups and ports info.
 
@@ -99,6 +117,18 @@ class BaseEngineDriver(object):
         """
         raise NotImplementedError()
 
+    def destroy_servers(self, context, servers):
+        """Trigger the destroy process of many servers at once.
+
+        The VIFs of the servers are detached from their nodes before the
+        nodes are torn down.
+
+        :param servers: the servers to destroy.
+        :returns: a dict of the exceptions raised, keyed by server uuid,
+                  for the servers which could not be destroyed.
+        """
+        raise NotImplementedError()
+
     def rebuild(self, context, server, image_uuid):
         """Trigger node deploy process.
 
@@ -137,13 +167,21 @@ class BaseEngineDriver(object):
         """
         raise NotImplementedError()
 
-    def get_node_name(node):
+    def get_node_name(self, node):
         """Get the name of a node.
 
         :param node: the uuid of the node.
         """
         raise NotImplementedError()
 
+    def get_node_names(self, nodes):
+        """Get the names of many nodes.
+
+        :param nodes: the uuids of the nodes.
+        :returns: a dict of node names keyed by node uuid.
+        """
+        return {node: self.get_node_name(node) for node in nodes}
+
     def get_manageable_nodes(self):
         """Retrieve all manageable nodes information.
 
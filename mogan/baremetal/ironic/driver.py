@@ -21,16 +21,19 @@ Leverages nova/virt/ironic/driver.py
 
 import collections
 
+from eventlet import greenpool
 from ironicclient import exc as ironic_exc
 from ironicclient import exceptions as client_e
 from oslo_log import log as logging
 from oslo_service import loopingcall
 from oslo_utils import excutils
+from oslo_utils import timeutils
 import six
 import six.moves.urllib.parse as urlparse
 
 from mogan.baremetal import driver as base_driver
 from mogan.baremetal.ironic import ironic_states
+from mogan.baremetal.ironic import polling
 from mogan.common import exception
 from mogan.common.i18n import _
 from mogan.common import ironic
@@ -50,9 +53,13 @@ _UNPROVISION_STATES = (ironic_states.ACTIVE, ironic_states.DEPLOYFAIL,
                        ironic_states.ERROR, ironic_states.DEPLOYWAIT,
                        ironic_states.DEPLOYING)
 
+_UNPROVISIONED_STATES = (ironic_states.NOSTATE, ironic_states.CLEANING,
+                         ironic_states.CLEANWAIT, ironic_states.CLEANFAIL,
+                         ironic_states.AVAILABLE)
+
 _NODE_FIELDS = ('uuid', 'power_state', 'target_power_state', 'provision_state',
                 'target_provision_state', 'last_error', 'maintenance',
-                'properties', 'instance_uuid')
+                'properties', 'instance_uuid', 'driver', 'resource_class')
 
 TENANT_VIF_KEY = 'tenant_vif_port_id'
 
@@ -95,6 +102,11 @@ class IronicDriver(base_driver.BaseEngineDriver):
     def __init__(self):
         super(IronicDriver, self).__init__()
         self.ironicclient = ironic.IronicClientWrapper()
+        self._polling = {operation: polling.PollingPolicy(operation)
+                         for operation in ('deploy', 'rebuild', 'power',
+                                           'unprovision')}
+        # Names of the nodes, refreshed each time all the nodes are listed.
+        self._node_names = {}
 
     def _get_node(self, node_uuid):
         """Get a node by its UUID."""
@@ -320,10 +332,9 @@ class IronicDriver(base_driver.BaseEngineDriver):
                         'reason': six.text_type(e)})
                 LOG.error(msg)
 
-        timer = loopingcall.FixedIntervalLoopingCall(self._wait_for_active,
-                                                     server)
         try:
-            timer.start(interval=CONF.ironic.api_retry_interval).wait()
+            self._polling['deploy'].wait(self._wait_for_active, server,
+                                         node=node)
             LOG.info('Successfully provisioned Ironic node %s',
                      node.uuid, server=server)
         except Exception:
@@ -333,10 +344,7 @@ class IronicDriver(base_driver.BaseEngineDriver):
                           {'server': server.uuid,
                            'node': node_uuid})
 
-    def _unprovision(self, server, node):
-        """This method is called from destroy() to unprovision
-        already provisioned node after required checks.
-        """
+    def _request_unprovision(self, node):
         try:
             self.ironicclient.call("node.set_provision_state", node.uuid,
                                    "deleted")
@@ -349,8 +357,13 @@ class IronicDriver(base_driver.BaseEngineDriver):
             if getattr(e, '__name__', None) != 'ServerDeployFailure':
                 raise
 
-        # using a dict because this is modified in the local method
-        data = {'tries': 0}
+    def _unprovision(self, server, node):
+        """This method is called from destroy() to unprovision
+        already provisioned node after required checks.
+        """
+        self._request_unprovision(node)
+
+        watch = timeutils.StopWatch(duration=self._get_unprovision_timeout())
 
         def _wait_for_provision_state():
             try:
@@ -359,11 +372,7 @@ class IronicDriver(base_driver.BaseEngineDriver):
                 LOG.debug("Server already removed from Ironic",
                           server=server)
                 raise loopingcall.LoopingCallDone()
-            if node.provision_state in (ironic_states.NOSTATE,
-                                        ironic_states.CLEANING,
-                                        ironic_states.CLEANWAIT,
-                                        ironic_states.CLEANFAIL,
-                                        ironic_states.AVAILABLE):
+            if node.provision_state in _UNPROVISIONED_STATES:
                 # From a user standpoint, the node is unprovisioned. If a node
                 # gets into CLEANFAIL state, it must be fixed in Ironic, but we
                 # can consider the server unprovisioned.
@@ -373,21 +382,27 @@ class IronicDriver(base_driver.BaseEngineDriver):
                           server=server)
                 raise loopingcall.LoopingCallDone()
 
-            if data['tries'] >= CONF.ironic.api_max_retries + 1:
+            if watch.expired():
                 msg = (_("Error destroying the server on node %(node)s. "
                          "Provision state still '%(state)s'.")
                        % {'state': node.provision_state,
                           'node': node.uuid})
                 LOG.error(msg)
                 raise exception.MoganException(msg)
-            else:
-                data['tries'] += 1
 
             _log_ironic_polling('unprovision', node, server)
 
         # wait for the state transition to finish
-        timer = loopingcall.FixedIntervalLoopingCall(_wait_for_provision_state)
-        timer.start(interval=CONF.ironic.api_retry_interval).wait()
+        watch.start()
+        self._polling['unprovision'].wait(_wait_for_provision_state,
+                                          node=node)
+
+    @staticmethod
+    def _get_unprovision_timeout():
+        # NOTE: Nodes used to be polled api_max_retries times at a fixed
+        # api_retry_interval, keep waiting for the same time.
+        return ((CONF.ironic.api_max_retries + 1) *
+                CONF.ironic.api_retry_interval)
 
     def destroy(self, context, server):
         """Destroy the specified server, if it can be found.
@@ -414,6 +429,93 @@ class IronicDriver(base_driver.BaseEngineDriver):
         LOG.info('Successfully unprovisioned Ironic node %s',
                  node.uuid, server=server)
 
+    def destroy_servers(self, context, servers):
+        """Destroy many servers at once.
+
+        Each node has its VIFs detached and its unprovision requested
+        concurrently, then a single poller waits for all the nodes to be
+        torn down.
+
+        :param context: The security context.
+        :param servers: The server objects.
+        :returns: a dict of the exceptions raised, keyed by server uuid, for
+                  the servers which could not be destroyed.
+        """
+        errors = {}
+        unprovisioning = set()
+
+        def _request_destroy(server):
+            try:
+                node = self._validate_server_and_node(server)
+            except exception.ServerNotFound:
+                LOG.warning("Destroy called on non-existing server %s.",
+                            server.uuid)
+                return
+            except Exception as e:
+                LOG.warning("Failed to get the Ironic node of server "
+                            "%(server)s: %(reason)s",
+                            {'server': server.uuid,
+                             'reason': six.text_type(e)})
+                errors[server.uuid] = e
+                return
+            try:
+                for nic in server.nics or []:
+                    self._unplug_vif(node, nic.port_id)
+                if node.provision_state in _UNPROVISION_STATES:
+                    self._request_unprovision(node)
+                    unprovisioning.add(server.uuid)
+                else:
+                    self._remove_server_info_from_node(node, server)
+            except Exception as e:
+                LOG.warning("Failed to request the destroy of Ironic node "
+                            "%(node)s: %(reason)s",
+                            {'node': node.uuid, 'reason': six.text_type(e)},
+                            server=server)
+                errors[server.uuid] = e
+
+        pool = greenpool.GreenPool(
+            size=CONF.ironic.max_concurrent_destroys)
+        for server in servers:
+            pool.spawn_n(_request_destroy, server)
+        pool.waitall()
+
+        if unprovisioning:
+            watch = timeutils.StopWatch(
+                duration=self._get_unprovision_timeout()).start()
+            try:
+                self._polling['unprovision'].wait(
+                    self._wait_for_unprovision, unprovisioning, watch)
+            except exception.MoganException as e:
+                errors.update(dict.fromkeys(unprovisioning, e))
+        return errors
+
+    def _wait_for_unprovision(self, pending, watch):
+        """Wait for many nodes to be unprovisioned."""
+        params = {
+            'associated': True,
+            'fields': ('instance_uuid', 'provision_state'),
+            'limit': 0
+        }
+        node_list = self.ironicclient.call("node.list", **params)
+        in_progress = set(
+            node.instance_uuid for node in node_list
+            if node.provision_state not in _UNPROVISIONED_STATES)
+        # Nodes which are not associated with the server anymore are
+        # unprovisioned too.
+        pending.intersection_update(in_progress)
+        if not pending:
+            raise loopingcall.LoopingCallDone()
+
+        if watch.expired():
+            msg = (_("Error destroying the servers %(servers)s, their nodes "
+                     "are still being unprovisioned.")
+                   % {'servers': ', '.join(sorted(pending))})
+            LOG.error(msg)
+            raise exception.MoganException(msg)
+
+        LOG.debug('Still waiting for %d nodes to unprovision.',
+                  len(pending))
+
     def _get_manageable_nodes(self):
         """Helper function to return the list of manageable nodes.
 
@@ -460,21 +562,36 @@ class IronicDriver(base_driver.BaseEngineDriver):
                           "%(detail)s", {'detail': six.text_type(e)})
             portgroup_list = []
 
+        node_list = [node for node in node_list
+                     if node.resource_class is not None]
+        node_uuids = set(node.uuid for node in node_list)
+        # Group ports and portgroups by node in a single pass each, instead
+        # of scanning all of them for every node.
+        ports_by_node = self._group_by_node(port_list, node_uuids)
+        portgroups_by_node = self._group_by_node(portgroup_list, node_uuids)
+
         node_resources = {}
         for node in node_list:
-            if node.resource_class is None:
-                continue
-            # Add ports to the associated node
-            node.ports = [self._port_or_group_resource(port)
-                          for port in port_list
-                          if node.uuid == port.node_uuid]
-            # Add portgroups to the associated node
-            node.portgroups = [self._port_or_group_resource(portgroup)
-                               for portgroup in portgroup_list
-                               if node.uuid == portgroup.node_uuid]
+            # Add ports and portgroups to the associated node
+            node.ports = ports_by_node.get(node.uuid, [])
+            node.portgroups = portgroups_by_node.get(node.uuid, [])
             node_resources[node.uuid] = self._node_resource(node)
         return node_resources
 
+    def _group_by_node(self, ports_or_pgs, node_uuids):
+        """Helper method to group port or portgroup resources by node.
+
+        :param ports_or_pgs: a list of ports or portgroups from ironic.
+        :param node_uuids: the uuids of the nodes to keep resources for.
+        :returns: a dict of resource dict lists keyed by node uuid.
+        """
+        grouped = collections.defaultdict(list)
+        for port_or_pg in ports_or_pgs:
+            if port_or_pg.node_uuid in node_uuids:
+                grouped[port_or_pg.node_uuid].append(
+                    self._port_or_group_resource(port_or_pg))
+        return grouped
+
     def get_maintenance_node_list(self):
         """Helper function to return the list of maintenance nodes.
 
@@ -527,25 +644,117 @@ class IronicDriver(base_driver.BaseEngineDriver):
         except client_e.NotFound:
             return map_power_state(ironic_states.NOSTATE)
 
-    def set_power_state(self, context, server, state):
-        """Set power state on the specified server.
+    def get_power_states(self, context, server_uuids):
+        server_uuids = set(server_uuids)
+        params = {
+            'associated': True,
+            'fields': ('instance_uuid', 'power_state'),
+            'limit': 0
+        }
+        node_list = self.ironicclient.call("node.list", **params)
+        power_states = dict.fromkeys(
+            server_uuids, map_power_state(ironic_states.NOSTATE))
+        for node in node_list:
+            if node.instance_uuid in server_uuids:
+                power_states[node.instance_uuid] = map_power_state(
+                    node.power_state)
+        return power_states
 
-        :param context: The security context.
-        :param server: The server object.
-        """
-        node = self._validate_server_and_node(server)
+    def _set_node_power_state(self, node_uuid, state):
         if state == "soft_off":
             self.ironicclient.call("node.set_power_state",
-                                   node.uuid, "off", soft=True)
+                                   node_uuid, "off", soft=True)
         elif state == "soft_reboot":
             self.ironicclient.call("node.set_power_state",
-                                   node.uuid, "reboot", soft=True)
+                                   node_uuid, "reboot", soft=True)
         else:
             self.ironicclient.call("node.set_power_state",
-                                   node.uuid, state)
-        timer = loopingcall.FixedIntervalLoopingCall(
-            self._wait_for_power_state, server, state)
-        timer.start(interval=CONF.ironic.api_retry_interval).wait()
+                                   node_uuid, state)
+
+    def set_power_state(self, context, server, state):
+        """Set power state on the specified server.
+
+        :param context: The security context.
+        :param server: The server object.
+        """
+        node = self._validate_server_and_node(server)
+        self._set_node_power_state(node.uuid, state)
+        self._polling['power'].wait(self._wait_for_power_state, server,
+                                    state, node=node)
+
+    def set_power_states(self, context, servers, state):
+        """Set power state on many servers.
+
+        The power actions are requested concurrently, then a single poller
+        waits for all the nodes to complete their power state change.
+
+        :param context: The security context.
+        :param servers: The server objects.
+        :returns: a dict of the exceptions raised, keyed by server uuid, for
+                  the servers whose power action failed.
+        """
+        errors = {}
+
+        def _request_power_state(server):
+            try:
+                self._set_node_power_state(server.node_uuid, state)
+            except Exception as e:
+                LOG.warning("Failed to request power %(state)s: %(reason)s",
+                            {'state': state, 'reason': six.text_type(e)},
+                            server=server)
+                errors[server.uuid] = e
+
+        pool = greenpool.GreenPool(
+            size=CONF.ironic.max_concurrent_power_actions)
+        for server in servers:
+            pool.spawn_n(_request_power_state, server)
+        pool.waitall()
+
+        pending = set(server.uuid for server in servers) - set(errors)
+        if pending:
+            watch = timeutils.StopWatch(
+                duration=self._get_power_state_timeout()).start()
+            try:
+                self._polling['power'].wait(self._wait_for_power_states,
+                                            pending, state, watch)
+            except exception.MoganException as e:
+                errors.update(dict.fromkeys(pending, e))
+        return errors
+
+    @staticmethod
+    def _get_power_state_timeout():
+        # NOTE: Power state changes are waited for as long as unprovisions,
+        # a node stuck in a power transition must not hold the others.
+        return ((CONF.ironic.api_max_retries + 1) *
+                CONF.ironic.api_retry_interval)
+
+    def _wait_for_power_states(self, pending, message, watch):
+        """Wait for many nodes to complete a power state change."""
+        params = {
+            'associated': True,
+            'fields': ('instance_uuid', 'target_power_state'),
+            'limit': 0
+        }
+        node_list = self.ironicclient.call("node.list", **params)
+        in_progress = set(node.instance_uuid for node in node_list
+                          if node.target_power_state != ironic_states.NOSTATE)
+        # Nodes which are done, or not associated with the server anymore,
+        # are not waited for.
+        pending.intersection_update(in_progress)
+        if not pending:
+            raise loopingcall.LoopingCallDone()
+
+        if watch.expired():
+            msg = (_("Error setting the power state of the servers "
+                     "%(servers)s to %(state)s, their nodes are still "
+                     "changing power state.")
+                   % {'servers': ', '.join(sorted(pending)),
+                      'state': message})
+            LOG.error(msg)
+            raise exception.MoganException(msg)
+
+        LOG.debug('Still waiting for %(count)d nodes to %(message)s.',
+                  {'count': len(pending), 'message': message})
 
     def rebuild(self, context, server, preserve_ephemeral):
         """Rebuild/redeploy a server.
@@ -573,9 +782,8 @@ class IronicDriver(base_driver.BaseEngineDriver):
 
         # Although the target provision state is REBUILD, it will actually go
         # to ACTIVE once the redeploy is finished.
-        timer = loopingcall.FixedIntervalLoopingCall(self._wait_for_active,
-                                                     server)
-        timer.start(interval=CONF.ironic.api_retry_interval).wait()
+        self._polling['rebuild'].wait(self._wait_for_active, server,
+                                      node=node)
         LOG.info('Server was successfully rebuilt', server=server)
 
     def _get_node_console_with_reset(self, server):
@@ -721,6 +929,8 @@ class IronicDriver(base_driver.BaseEngineDriver):
                           "%(detail)s", {'detail': e.message})
             return []
 
+        self._node_names = {node_obj.uuid: node_obj.name
+                            for node_obj in node_list}
         bad_power_states = [ironic_states.ERROR, ironic_states.NOSTATE]
         bad_provision_states = [ironic_states.ENROLL]
         # keep NOSTATE around for compatibility
@@ -766,12 +976,30 @@ class IronicDriver(base_driver.BaseEngineDriver):
         """
         try:
             node = self.ironicclient.call(
-                'node.get', node, fields=('name',))
+                'node.get', node, fields=('uuid', 'name'))
         except Exception:
             return None
 
+        self._node_names[node.uuid] = node.name
         return node.name
 
+    def get_node_names(self, nodes):
+        """Get the names of many nodes.
+
+        The names known from the last listing of all the nodes are used,
+        only the other nodes are looked up in Ironic.
+
+        :param nodes: the uuids of the nodes.
+        :returns: a dict of node names keyed by node uuid.
+        """
+        names = {}
+        for node in nodes:
+            try:
+                names[node] = self._node_names[node]
+            except KeyError:
+                names[node] = self.get_node_name(node)
+        return names
+
     def get_manageable_nodes(self):
         nodes = self._get_manageable_nodes()
         manageable_nodes = []
@@ -804,8 +1032,9 @@ class IronicDriver(base_driver.BaseEngineDriver):
                            "resource_class": node.resource_class})
                 raise exception.NodeNotAllowedManaged(node_uuid=node_uuid)
 
-        # Retrieves ports
+        # Retrieves ports, only the ones of this node
         params = {
+            'node': node.uuid,
             'limit': 0,
             'fields': ('uuid', 'node_uuid', 'extra', 'address',
                        'internal_info')
@@ -816,12 +1045,10 @@ class IronicDriver(base_driver.BaseEngineDriver):
 
         # Add ports to the associated node
         node.ports = [self._port_or_group_resource(port)
-                      for port in port_list
-                      if node.uuid == port.node_uuid]
+                      for port in port_list]
         # Add portgroups to the associated node
         node.portgroups = [self._port_or_group_resource(portgroup)
-                           for portgroup in portgroup_list
-                           if node.uuid == portgroup.node_uuid]
+                           for portgroup in portgroup_list]
         node.power_state = map_power_state(node.power_state)
         manageable_node = self._node_resource(node)
         manageable_node['uuid'] = node_uuid
@@ -0,0 +1,124 @@
+# Copyright 2017 Huawei Technologies Co.,LTD.
+# All Rights Reserved.
+#
+#    Licensed under the Apache License, Version 2.0 (the "License"); you may
+#    not use this file except in compliance with the License. You may obtain
+#    a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#    WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#    License for the specific language governing permissions and limitations
+#    under the License.
+
+"""Adaptive polling of Ironic state transitions."""
+
+import random
+
+from oslo_log import log as logging
+from oslo_service import loopingcall
+from oslo_utils import timeutils
+
+from mogan.conf import CONF
+
+
+LOG = logging.getLogger(__name__)
+
+# Weight of the latest completion time in the learned expected duration.
+_DURATION_WEIGHT = 0.3
+
+
+class PollingPolicy(object):
+    """Polling policy of one type of Ironic operation.
+
+    The node is first polled after a short interval, which backs off
+    exponentially, without going past half of the time left until the
+    operation is expected to be complete, so the polls get closer together
+    again as the expected completion time gets closer. Past it, the
+    interval backs off exponentially from the minimum again. The expected
+    duration starts from the configured one and is learned from the
+    completion times of the operation, per node driver and resource class.
+    """
+
+    def __init__(self, operation):
+        self.operation = operation
+        self._durations = {}
+
+    def _get_key(self, node):
+        if node is None:
+            return None
+        return (getattr(node, 'driver', None),
+                getattr(node, 'resource_class', None))
+
+    def expected_duration(self, node=None):
+        default = getattr(CONF.ironic,
+                          '%s_expected_duration' % self.operation)
+        return self._durations.get(self._get_key(node), default)
+
+    def record(self, node, duration):
+        """Learn from the completion time of an operation on a node."""
+        key = self._get_key(node)
+        expected = self.expected_duration(node)
+        self._durations[key] = (_DURATION_WEIGHT * duration +
+                                (1 - _DURATION_WEIGHT) * expected)
+        LOG.debug('Ironic %(operation)s of node %(node)s took %(duration).1f '
+                  'seconds, %(operation)s of %(key)s nodes is now expected '
+                  'to take %(expected).1f seconds.',
+                  {'operation': self.operation, 'node': node.uuid,
+                   'duration': duration, 'key': key,
+                   'expected': self._durations[key]})
+
+    def next_interval(self, elapsed, expected, polls, backoffs):
+        """Return how long to wait before polling again.
+
+        :param elapsed: seconds since the operation started.
+        :param expected: seconds the operation is expected to take.
+        :param polls: number of polls before the expected completion.
+        :param backoffs: number of polls since the expected completion.
+        """
+        min_interval = CONF.ironic.polling_min_interval
+        factor = CONF.ironic.polling_backoff_factor
+        remaining = expected - elapsed
+        if remaining > min_interval:
+            interval = min(min_interval * factor ** polls, remaining / 2.0)
+        else:
+            interval = min_interval * factor ** backoffs
+        interval = min(max(interval, min_interval),
+                       CONF.ironic.polling_max_interval)
+        jitter = CONF.ironic.polling_jitter
+        return interval * random.uniform(1 - jitter, 1 + jitter)
+
+    def wait(self, func, *args, **kwargs):
+        """Poll until func raises LoopingCallDone.
+
+        :param func: the function polling the node.
+        :param node: the node the operation runs on, if any. The completion
+                     time of the operation is learned from when given.
+        """
+        node = kwargs.pop('node', None)
+        expected = self.expected_duration(node)
+        watch = timeutils.StopWatch()
+        data = {'polls': 0, 'backoffs': 0}
+
+        def _poll():
+            try:
+                func(*args, **kwargs)
+            except loopingcall.LoopingCallDone:
+                if node is not None:
+                    self.record(node, watch.elapsed())
+                raise
+            elapsed = watch.elapsed()
+            interval = self.next_interval(elapsed, expected, data['polls'],
+                                          data['backoffs'])
+            if elapsed >= expected:
+                data['backoffs'] += 1
+            else:
+                data['polls'] += 1
+            return interval
+
+        watch.start()
+        timer = loopingcall.DynamicLoopingCall(_poll)
+        return timer.start(
+            periodic_interval_max=CONF.ironic.polling_max_interval).wait()
@@ -18,12 +18,15 @@ Run storage database migration.
 """
 
 import sys
+import time
 
 from oslo_config import cfg
+from oslo_context import context
 
 from mogan.common.i18n import _
 from mogan.common import service
 from mogan.conf import CONF
+from mogan.db import api as dbapi
 from mogan.db import migration
 
 
@@ -44,6 +47,21 @@ class DBCommand(object):
     def create_schema(self):
         migration.create_schema()
 
+    def archive(self):
+        max_rows = CONF.command.max_rows or CONF.database.archive_max_rows
+        ctxt = context.get_admin_context()
+        total = 0
+        while True:
+            count = dbapi.get_instance().servers_archive_deleted(
+                ctxt, max_rows)
+            total += count
+            if not CONF.command.until_complete or count < max_rows:
+                break
+            # Give other transactions a chance to take the locks on the
+            # servers table between two batches.
+            time.sleep(CONF.command.sleep)
+        print(_("Archived %d soft deleted servers.") % total)
+
 
 def add_command_parsers(subparsers):
     command_object = DBCommand()
@@ -78,6 +96,18 @@ def add_command_parsers(subparsers):
         help=_("Create the database schema."))
     parser.set_defaults(func=command_object.create_schema)
 
+    parser = subparsers.add_parser(
+        'archive',
+        help=_("Move soft deleted servers, with their nics and faults, to "
+               "the shadow tables. Use --max-rows to set the batch size "
+               "and --until-complete to archive all of them."))
+    parser.add_argument('--max-rows', type=int, dest='max_rows')
+    parser.add_argument('--until-complete', action='store_true',
+                        dest='until_complete')
+    parser.add_argument('--sleep', type=float, default=1.0,
+                        help=_("Seconds to wait between two batches."))
+    parser.set_defaults(func=command_object.archive)
+
 
 def main():
     command_opt = cfg.SubCommandOpt('command',
@@ -26,6 +26,7 @@ from oslo_service import service
 
 from mogan.common import constants
 from mogan.common import service as mogan_service
+from mogan.engine import base_manager
 from mogan import version
 
 CONF = cfg.CONF
@@ -41,6 +42,9 @@ def main():
     mgr = mogan_service.RPCService('mogan.engine.manager',
                                    'EngineManager',
                                    constants.ENGINE_TOPIC)
+    gmr.TextGuruMeditation.register_section(
+        'Periodic Tasks',
+        base_manager.PeriodicTaskReportGenerator(mgr.manager))
 
     launcher = service.launch(CONF, mgr)
     launcher.wait()
@@ -173,6 +173,25 @@ class ServerNotFound(NotFound):
     _msg_fmt = _("Server %(server)s could not be found.")
 
 
+class ServerMetadataNotFound(NotFound):
+    _msg_fmt = _("Metadata of server %(server)s could not be found.")
+
+
+class AmbiguousServerMetadataAddress(Conflict):
+    _msg_fmt = _("Address %(address)s is used by servers on different "
+                 "networks.")
+
+
+class UnexpectedServerStatus(Conflict):
+    _msg_fmt = _("Server %(server)s is in status %(actual)s, expected "
+                 "%(expected)s.")
+
+
+class UnexpectedServerPowerState(Conflict):
+    _msg_fmt = _("Server %(server)s is in power state %(actual)s, expected "
+                 "%(expected)s.")
+
+
 class FlavorAccessExists(Conflict):
     _msg_fmt = _("Flavor access already exists for flavor %(flavor_id)s "
                  "and project %(project_id)s combination.")
@@ -213,6 +232,11 @@ class ServerDeployAborted(Invalid):
     _msg_fmt = _("Server deployment is aborted: %(reason)s")
 
 
+class ServerOperationInterrupted(MoganException):
+    _msg_fmt = _("The operation of the server in %(status)s status was "
+                 "interrupted by an engine restart.")
+
+
 class NoFreeEngineWorker(TemporaryFailure):
     _msg_fmt = _('Requested action cannot be performed due to lack of free '
                  'engine workers.')
@@ -479,6 +503,21 @@ class InventoryInUse(InvalidInventory):
                  "resource provider '%(resource_provider)s' in use.")
 
 
+class ResourceProviderNotFound(NotFound):
+    _msg_fmt = _("Resource provider %(resource_provider)s could not be "
+                 "found.")
+
+
+class ResourceProviderConcurrentUpdate(Conflict):
+    _msg_fmt = _("Resource provider %(resource_provider)s was updated "
+                 "concurrently.")
+
+
+class InsufficientResources(Conflict):
+    _msg_fmt = _("Unable to allocate %(amount)s of '%(resource_class)s' on "
+                 "resource provider '%(resource_provider)s'.")
+
+
 class CannotDisassociateAutoAssignedFloatingIP(Forbidden):
     _msg_fmt = _("Cannot disassociate auto assigned floating "
                  "IP: %(floatingip)s")
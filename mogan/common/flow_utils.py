@@ -11,13 +11,17 @@
 #    under the License.
 
 import os
+import time
 
 from oslo_log import log as logging
 # For more information please visit: https://wiki.openstack.org/wiki/TaskFlow
 from taskflow.listeners import base
 from taskflow.listeners import logging as logging_listener
+from taskflow import states
 from taskflow import task
 
+from mogan.common import metrics
+
 LOG = logging.getLogger(__name__)
 
 
@@ -77,3 +81,49 @@ class DynamicLogListener(logging_listener.DynamicLoggingListener):
             return (exc_info, exc_details)
         else:
             return super(DynamicLogListener, self)._format_failure(fail)
+
+
+class TimingListener(base.Listener):
+    """Times the execution and the revert of the tasks of a flow.
+
+    The durations are recorded in the task_duration_seconds metric, labeled
+    with the flow, the task class, the action (execute or revert) and its
+    outcome (success or failure). They are also kept in the timings list of
+    the listener, to be reported once the flow is done.
+    """
+
+    _START_STATES = (states.RUNNING, states.REVERTING)
+    _END_STATES = {
+        states.SUCCESS: ('execute', 'success'),
+        states.FAILURE: ('execute', 'failure'),
+        states.REVERTED: ('revert', 'success'),
+        states.REVERT_FAILURE: ('revert', 'failure'),
+    }
+
+    def __init__(self, engine):
+        super(TimingListener, self).__init__(
+            engine,
+            task_listen_for=self._START_STATES + tuple(self._END_STATES),
+            flow_listen_for=[],
+            retry_listen_for=[])
+        self.timings = []
+        self._started_at = {}
+
+    def _task_receiver(self, state, details):
+        task_name = details['task_name']
+        if state in self._START_STATES:
+            self._started_at[task_name] = time.time()
+            return
+        started_at = self._started_at.pop(task_name, None)
+        if started_at is None:
+            return
+        action, outcome = self._END_STATES[state]
+        # Task names are the task class, with the addons of the task.
+        task_class = task_name.split(';')[0].rsplit('.', 1)[-1]
+        timing = {'task': task_class, 'action': action, 'outcome': outcome,
+                  'duration': time.time() - started_at}
+        self.timings.append(timing)
+        metrics.get_registry().observe(
+            'task_duration_seconds', timing['duration'],
+            flow=self._engine.storage.flow_name, task=task_class,
+            action=action, outcome=outcome)
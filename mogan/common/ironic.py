@@ -21,6 +21,7 @@ from oslo_log import log as logging
 
 from mogan.common import exception
 from mogan.common.i18n import _
+from mogan.common import metrics
 
 
 LOG = logging.getLogger(__name__)
@@ -121,7 +122,9 @@ class IronicClientWrapper(object):
             client = self._get_client(retry_on_conflict=retry_on_conflict)
 
             try:
-                return self._multi_getattr(client, method)(*args, **kwargs)
+                with metrics.time_external_call('ironic'):
+                    return self._multi_getattr(client, method)(*args,
+                                                               **kwargs)
             except ironic_exc.Unauthorized:
                 # In this case, the authorization token of the cached
                 # ironic-client probably expired. So invalidate the cached
@@ -0,0 +1,289 @@
+# Copyright 2017 Huawei Technologies Co.,LTD.
+# All Rights Reserved.
+#
+#    Licensed under the Apache License, Version 2.0 (the "License"); you may
+#    not use this file except in compliance with the License. You may obtain
+#    a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#    WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#    License for the specific language governing permissions and limitations
+#    under the License.
+
+"""Metrics of the mogan services.
+
+Counters and durations are aggregated in memory, per name and labels, and
+can be rendered in the Prometheus text format. When a statsd host is
+configured, each of them is also sent to statsd as it is recorded.
+"""
+
+import bisect
+import collections
+import contextlib
+import re
+import socket
+import time
+
+import eventlet
+from eventlet import corolocal
+from eventlet import wsgi
+from oslo_log import log
+
+from mogan.conf import CONF
+
+LOG = log.getLogger(__name__)
+
+# Upper bounds, in seconds, of the buckets of the duration histograms
+BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0,
+           30.0, 60.0, 120.0, 300.0, 600.0, 1800.0, 3600.0)
+
+_INVALID_CHARS = re.compile(r'[^a-zA-Z0-9_]')
+
+_local = corolocal.local()
+
+
+class _Histogram(object):
+
+    def __init__(self):
+        self.buckets = [0] * (len(BUCKETS) + 1)
+        self.count = 0
+        self.sum = 0.0
+
+    def observe(self, value):
+        self.buckets[bisect.bisect_left(BUCKETS, value)] += 1
+        self.count += 1
+        self.sum += value
+
+
+class StatsdClient(object):
+    """Send metrics to statsd over UDP, without waiting for statsd."""
+
+    def __init__(self, host, port, prefix):
+        self.address = (host, port)
+        self.prefix = prefix
+        self._socket = None
+
+    @staticmethod
+    def _key(name, labels):
+        parts = [name] + [_INVALID_CHARS.sub('_', str(labels[label]))
+                          for label in sorted(labels)]
+        return '.'.join(parts)
+
+    def send(self, name, labels, value, metric_type):
+        if self._socket is None:
+            self._socket = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+        data = '%s.%s:%s|%s' % (self.prefix, self._key(name, labels), value,
+                                metric_type)
+        try:
+            self._socket.sendto(data.encode('utf-8'), self.address)
+        except socket.error as e:
+            LOG.debug('Failed to send metric %(data)s to statsd: %(error)s',
+                      {'data': data, 'error': e})
+
+
+class Registry(object):
+    """Metrics of a process, keyed by name and labels."""
+
+    def __init__(self, statsd=None):
+        self.statsd = statsd
+        self._counters = {}
+        self._histograms = {}
+
+    @staticmethod
+    def _key(name, labels):
+        return name, tuple(sorted(labels.items()))
+
+    def increment(self, name, value=1, **labels):
+        """Add value to a counter."""
+        key = self._key(name, labels)
+        self._counters[key] = self._counters.get(key, 0) + value
+        if self.statsd is not None:
+            self.statsd.send(name, labels, value, 'c')
+
+    def observe(self, name, duration, **labels):
+        """Record a duration, in seconds."""
+        key = self._key(name, labels)
+        histogram = self._histograms.get(key)
+        if histogram is None:
+            histogram = self._histograms[key] = _Histogram()
+        histogram.observe(duration)
+        if self.statsd is not None:
+            self.statsd.send(name, labels, '%.3f' % (duration * 1000), 'ms')
+
+    @contextlib.contextmanager
+    def timer(self, name, **labels):
+        """Record the duration of the block, whether it fails or not."""
+        start = time.time()
+        try:
+            yield
+        finally:
+            self.observe(name, time.time() - start, **labels)
+
+    def get_counter(self, name, **labels):
+        return self._counters.get(self._key(name, labels), 0)
+
+    def get_histogram(self, name, **labels):
+        """Return the count and sum of the durations recorded."""
+        histogram = self._histograms.get(self._key(name, labels))
+        if histogram is None:
+            return 0, 0.0
+        return histogram.count, histogram.sum
+
+    def reset(self):
+        self._counters.clear()
+        self._histograms.clear()
+
+    def render(self):
+        """Render the metrics in the Prometheus text format."""
+        lines = []
+        described = set()
+
+        def _describe(name, metric_type):
+            if name in described:
+                return
+            described.add(name)
+            lines.append('# TYPE mogan_%s %s' % (name, metric_type))
+
+        for (name, labels), value in sorted(self._counters.items()):
+            _describe(name, 'counter')
+            lines.append('mogan_%s%s %s' % (name, _format_labels(labels),
+                                            value))
+        for (name, labels), histogram in sorted(self._histograms.items()):
+            _describe(name, 'histogram')
+            count = 0
+            for bound, bucket in zip(BUCKETS + ('+Inf',),
+                                     histogram.buckets):
+                count += bucket
+                lines.append('mogan_%s_bucket%s %d' % (
+                    name, _format_labels(labels + (('le', bound),)), count))
+            lines.append('mogan_%s_sum%s %s' % (
+                name, _format_labels(labels), histogram.sum))
+            lines.append('mogan_%s_count%s %d' % (
+                name, _format_labels(labels), histogram.count))
+        return '\n'.join(lines) + '\n'
+
+
+def _format_labels(labels):
+    if not labels:
+        return ''
+    return '{%s}' % ','.join(
+        '%s="%s"' % (label, str(value).replace('\\', '\\\\')
+                     .replace('"', '\\"').replace('\n', '\\n'))
+        for label, value in labels)
+
+
+_REGISTRY = None
+
+
+def get_registry():
+    """Return the metrics registry of the process."""
+    global _REGISTRY
+    if _REGISTRY is None:
+        statsd = None
+        if CONF.metrics.statsd_host:
+            statsd = StatsdClient(CONF.metrics.statsd_host,
+                                  CONF.metrics.statsd_port,
+                                  CONF.metrics.statsd_prefix)
+        _REGISTRY = Registry(statsd)
+    return _REGISTRY
+
+
+class ExternalCalls(object):
+    """Number and total duration of external calls, keyed by service."""
+
+    def __init__(self):
+        self.counts = collections.Counter()
+        self.durations = collections.Counter()
+
+    def add(self, service, duration=None):
+        self.counts[service] += 1
+        if duration is not None:
+            self.durations[service] += duration
+
+
+def record_external_call(service, duration=None):
+    """Record a call to an external service, eg. ironic or the database.
+
+    :param service: the name of the service.
+    :param duration: the duration of the call in seconds, if timed.
+    """
+    registry = get_registry()
+    registry.increment('external_calls', service=service)
+    if duration is not None:
+        registry.observe('external_call_duration_seconds', duration,
+                         service=service)
+    calls = getattr(_local, 'external_calls', None)
+    if calls is not None:
+        calls.add(service, duration)
+
+
+@contextlib.contextmanager
+def time_external_call(service):
+    """Record a call to an external service made in the block."""
+    start = time.time()
+    try:
+        yield
+    finally:
+        record_external_call(service, time.time() - start)
+
+
+def get_external_calls():
+    """Return the external calls counted for the green thread, if any."""
+    return getattr(_local, 'external_calls', None)
+
+
+def set_external_calls(calls):
+    """Count the external calls of the green thread in calls.
+
+    :param calls: an ExternalCalls, or None to stop counting them.
+    """
+    _local.external_calls = calls
+
+
+@contextlib.contextmanager
+def count_external_calls(calls=None):
+    """Count the external calls made by the green thread in the block.
+
+    Green threads spawned in the block don't count their calls in it,
+    unless they count them in the same ExternalCalls, eg.::
+
+        calls = metrics.get_external_calls()
+        ...
+        with metrics.count_external_calls(calls):
+            ...
+
+    :param calls: the ExternalCalls to count the calls in, new by default.
+    :returns: the ExternalCalls.
+    """
+    if calls is None:
+        calls = ExternalCalls()
+    previous = get_external_calls()
+    set_external_calls(calls)
+    try:
+        yield calls
+    finally:
+        set_external_calls(previous)
+
+
+def application(environ, start_response):
+    """WSGI application serving the metrics in the Prometheus format."""
+    body = get_registry().render().encode('utf-8')
+    start_response('200 OK', [
+        ('Content-Type', 'text/plain; version=0.0.4; charset=utf-8'),
+        ('Content-Length', str(len(body)))])
+    return [body]
+
+
+def serve(host, port):
+    """Serve the metrics over HTTP in a green thread.
+
+    :returns: the green thread of the server.
+    """
+    sock = eventlet.listen((host, port))
+    LOG.info('Serving metrics on http://%(host)s:%(port)s/',
+             {'host': host, 'port': port})
+    return eventlet.spawn(wsgi.server, sock, application,
+                          log=LOG, log_output=False)
@@ -16,21 +16,40 @@
 """Policy Engine For Mogan."""
 
 import functools
+import time
+
 from oslo_concurrency import lockutils
 from oslo_config import cfg
 from oslo_log import log
 from oslo_policy import policy
 from oslo_versionedobjects import base as object_base
 import pecan
+import six
 import sys
 import wsme
 
 from mogan.common import exception
 
+try:
+    from collections import abc as collections_abc
+except ImportError:
+    # Python 2
+    import collections as collections_abc
+
 _ENFORCER = None
 CONF = cfg.CONF
 LOG = log.getLogger(__name__)
 
+# Maximum number of policy decisions cached by the enforcer.
+_MAX_DECISIONS = 4096
+# Minimum interval in seconds between checks of the policy files for
+# changes when the decision is cached.
+_RULES_CHECK_INTERVAL = 1
+# Credentials which are not checked by the rules but differ between the
+# requests of the same user, they are left out of the cached decisions keys.
+_NON_POLICY_CREDS = frozenset(['auth_token', 'request_id',
+                               'global_request_id', 'service_token'])
+
 default_policies = [
     # Legacy setting, don't remove. Likely to be overridden by operators who
     # forget to update their policy.json configuration file.
@@ -197,6 +216,82 @@ def list_policies():
     return policies
 
 
+def _freeze(value):
+    """Return a hashable copy of a policy target or credentials value."""
+    if isinstance(value, collections_abc.Mapping):
+        return tuple(sorted((k, _freeze(v)) for k, v in value.items()))
+    if isinstance(value, (list, tuple, set, frozenset)):
+        return tuple(_freeze(v) for v in value)
+    hash(value)
+    return value
+
+
+class CachingEnforcer(policy.Enforcer):
+    """Policy enforcer memoizing its decisions.
+
+    As long as the rules are not changed, the decision of a rule only
+    depends on the target and credentials it is checked against, so the
+    decisions are cached by rule, target and credentials. The cache is
+    dropped whenever the rules are set, which they are when the policy
+    files are reloaded.
+    """
+
+    def __init__(self, *args, **kwargs):
+        self._decisions = {}
+        self._rules_checked_at = None
+        super(CachingEnforcer, self).__init__(*args, **kwargs)
+
+    def set_rules(self, rules, overwrite=True, use_conf=False):
+        super(CachingEnforcer, self).set_rules(rules, overwrite=overwrite,
+                                               use_conf=use_conf)
+        self._decisions = {}
+
+    def _load_rules_if_stale(self):
+        now = time.time()
+        if (self._rules_checked_at is None or
+                now - self._rules_checked_at >= _RULES_CHECK_INTERVAL):
+            self.load_rules()
+            self._rules_checked_at = now
+
+    def enforce(self, rule, target, creds, do_raise=False, exc=None,
+                *args, **kwargs):
+        key = None
+        if isinstance(rule, six.string_types):
+            try:
+                if isinstance(creds, collections_abc.Mapping):
+                    policy_creds = dict(
+                        (k, v) for (k, v) in creds.items()
+                        if k not in _NON_POLICY_CREDS)
+                else:
+                    policy_creds = creds
+                key = (rule, _freeze(target), _freeze(policy_creds))
+            except TypeError:
+                pass
+        if key is None:
+            # Check trees and unhashable targets or credentials are not
+            # cached.
+            return super(CachingEnforcer, self).enforce(
+                rule, target, creds, do_raise=do_raise, exc=exc,
+                *args, **kwargs)
+
+        self._load_rules_if_stale()
+        try:
+            result = self._decisions[key]
+        except KeyError:
+            result = super(CachingEnforcer, self).enforce(rule, target, creds)
+            if len(self._decisions) >= _MAX_DECISIONS:
+                self._decisions = {}
+            self._decisions[key] = result
+
+        if do_raise and not result:
+            if exc:
+                raise exc(*args, **kwargs)
+
+            raise policy.PolicyNotAuthorized(rule, target, creds)
+
+        return result
+
+
 @lockutils.synchronized('policy_enforcer', 'mogan-')
 def init_enforcer(policy_file=None, rules=None,
                   default_rule=None, use_conf=True):
@@ -221,7 +316,7 @@ def init_enforcer(policy_file=None, rules=None,
     # loaded exactly once - when this module-global is initialized.
     # Defining these in the relevant API modules won't work
     # because API classes lack singletons and don't use globals.
-    _ENFORCER = policy.Enforcer(CONF, policy_file=policy_file,
+    _ENFORCER = CachingEnforcer(CONF, policy_file=policy_file,
                                 rules=rules,
                                 default_rule=default_rule,
                                 use_conf=use_conf)
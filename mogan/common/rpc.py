@@ -20,6 +20,7 @@ import oslo_messaging as messaging
 from oslo_messaging.rpc import dispatcher
 
 from mogan.common import exception
+from mogan.common import metrics
 
 
 CONF = cfg.CONF
@@ -91,13 +92,34 @@ def get_transport_url(url_str=None):
     return messaging.TransportURL.parse(CONF, url_str)
 
 
+class _TimedRPCClient(object):
+    """Record the RPC calls and casts of a client as external calls."""
+
+    def __init__(self, client):
+        self._client = client
+
+    def prepare(self, *args, **kwargs):
+        return _TimedRPCClient(self._client.prepare(*args, **kwargs))
+
+    def can_send_version(self, *args, **kwargs):
+        return self._client.can_send_version(*args, **kwargs)
+
+    def call(self, ctxt, method, **kwargs):
+        with metrics.time_external_call('rpc'):
+            return self._client.call(ctxt, method, **kwargs)
+
+    def cast(self, ctxt, method, **kwargs):
+        with metrics.time_external_call('rpc'):
+            return self._client.cast(ctxt, method, **kwargs)
+
+
 def get_client(target, version_cap=None, serializer=None):
     assert TRANSPORT is not None
     serializer = RequestContextSerializer(serializer)
-    return messaging.RPCClient(TRANSPORT,
-                               target,
-                               version_cap=version_cap,
-                               serializer=serializer)
+    return _TimedRPCClient(messaging.RPCClient(TRANSPORT,
+                                               target,
+                                               version_cap=version_cap,
+                                               serializer=serializer))
 
 
 def get_server(target, endpoints, serializer=None):
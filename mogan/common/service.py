@@ -100,25 +100,33 @@ def process_launcher():
 class WSGIService(service.ServiceBase):
     """Provides ability to launch mogan API from wsgi app."""
 
-    def __init__(self, name, use_ssl=False):
+    def __init__(self, name, use_ssl=False, application=None,
+                 group='api'):
         """Initialize, but do not start the WSGI server.
 
         :param name: The name of the WSGI server given to the loader.
         :param use_ssl: Wraps the socket in an SSL context if True.
+        :param application: The WSGI application to serve, the API by
+                            default.
+        :param group: The option group of the service, holding the host_ip,
+                      port and <group>_workers options.
         :returns: None
         """
         self.name = name
-        self.app = app.VersionSelectorApplication()
-        self.workers = (CONF.api.api_workers or
+        self.app = application or app.VersionSelectorApplication()
+        conf_group = getattr(CONF, group)
+        workers_opt = '%s_workers' % group
+        self.workers = (getattr(conf_group, workers_opt) or
                         processutils.get_worker_count())
         if self.workers and self.workers < 1:
             raise exception.ConfigInvalid(
-                _("api_workers value of %d is invalid, "
-                  "must be greater than 0.") % self.workers)
+                _("%(opt)s value of %(workers)d is invalid, "
+                  "must be greater than 0.") % {'opt': workers_opt,
+                                                'workers': self.workers})
 
         self.server = wsgi.Server(CONF, name, self.app,
-                                  host=CONF.api.host_ip,
-                                  port=CONF.api.port,
+                                  host=conf_group.host_ip,
+                                  port=conf_group.port,
                                   use_ssl=use_ssl)
 
     def start(self):
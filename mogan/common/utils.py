@@ -17,8 +17,10 @@
 
 import base64
 import binascii
+import collections
 import contextlib
 import eventlet
+from eventlet import tpool
 import functools
 import inspect
 import os
@@ -37,11 +39,13 @@ from oslo_context import context as common_context
 from oslo_log import log as logging
 from oslo_utils import encodeutils
 from oslo_utils import importutils
+from oslo_utils import timeutils
 import paramiko
 import six
 
 from mogan.common import exception
 from mogan.common.i18n import _
+from mogan.common import metrics
 from mogan.common import states
 from mogan.conf import CONF
 from mogan import objects
@@ -127,9 +131,46 @@ def get_state_machine(start_state=None, target_state=None):
 
 
 def process_event(fsm, server, event=None):
+    """Advance the server status for the given event.
+
+    The new status is only saved if the server is still in the status the
+    state machine started from, so concurrent transitions made by other
+    workers or hosts are not silently overwritten.
+
+    The time the server spent in its previous status is recorded in the
+    server_status_duration_seconds metric, for the statuses it is not
+    expected to stay in.
+
+    :raises: InvalidState if the event is not allowed in the current state.
+    :raises: UnexpectedServerStatus if the server status changed meanwhile.
+    """
+    current_state = fsm.current_state
     fsm.process_event(event)
+    now = timeutils.utcnow()
+    changed_at = _get_status_changed_at(server, current_state)
     server.status = fsm.current_state
-    server.save()
+    # The server objects aren't refreshed when saved, set when the status
+    # changed so that it is known wherever the next event is processed.
+    server.updated_at = now
+    server.save(expected_status=current_state)
+    if changed_at is not None:
+        duration = timeutils.delta_seconds(changed_at, now)
+        metrics.get_registry().observe('server_status_duration_seconds',
+                                       duration, status=current_state)
+        LOG.debug('Server %(uuid)s was %(status)s for %(duration).2f '
+                  'seconds.', {'uuid': server.uuid, 'status': current_state,
+                               'duration': duration},
+                  status=current_state, duration=duration)
+
+
+def _get_status_changed_at(server, status):
+    """Return when the server got in a transient status, if known."""
+    if status in states.STABLE_STATES:
+        return None
+    field = 'created_at' if status == states.BUILDING else 'updated_at'
+    if not server.obj_attr_is_set(field) or getattr(server, field) is None:
+        return None
+    return timeutils.normalize_time(getattr(server, field))
 
 
 def get_wrapped_function(function):
@@ -415,6 +456,55 @@ def generate_key_pair(bits=2048):
     return (private_key, public_key, fingerprint)
 
 
+class KeyPairPool(object):
+    """Pool of SSH key pairs generated ahead of time.
+
+    The key pairs are generated in native threads, so that generating them
+    doesn't block the other green threads, and the pool is refilled in the
+    background as key pairs are taken from it. The pool is started on first
+    use in each process, so that forked processes never share the same
+    pre-generated key pairs.
+    """
+
+    def __init__(self, size, bits=2048):
+        self.size = size
+        self.bits = bits
+        self._pid = None
+        self._key_pairs = collections.deque()
+        self._refilling = False
+
+    def _generate(self):
+        return tpool.execute(generate_key_pair, self.bits)
+
+    def _refill(self, pid, key_pairs):
+        try:
+            while os.getpid() == pid and len(key_pairs) < self.size:
+                key_pairs.append(self._generate())
+        except Exception:
+            LOG.exception('Failed to refill the key pair pool.')
+        finally:
+            if os.getpid() == pid:
+                self._refilling = False
+
+    def get(self):
+        """Return a (private_key, public_key, fingerprint) tuple."""
+        pid = os.getpid()
+        if self._pid != pid:
+            self._pid = pid
+            self._key_pairs = collections.deque()
+            self._refilling = False
+
+        try:
+            key_pair = self._key_pairs.popleft()
+        except IndexError:
+            key_pair = self._generate()
+
+        if self.size and not self._refilling:
+            self._refilling = True
+            spawn_n(self._refill, pid, self._key_pairs)
+        return key_pair
+
+
 def _serialize_profile_info():
     if not profiler:
         return None
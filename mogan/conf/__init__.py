@@ -18,11 +18,14 @@ from oslo_config import cfg
 from mogan.conf import api
 from mogan.conf import cache
 from mogan.conf import configdrive
+from mogan.conf import database
 from mogan.conf import default
 from mogan.conf import engine
 from mogan.conf import glance
 from mogan.conf import ironic
 from mogan.conf import keystone
+from mogan.conf import metadata
+from mogan.conf import metrics
 from mogan.conf import neutron
 from mogan.conf import placement
 from mogan.conf import quota
@@ -33,11 +36,14 @@ CONF = cfg.CONF
 
 api.register_opts(CONF)
 configdrive.register_opts(CONF)
+database.register_opts(CONF)
 default.register_opts(CONF)
 engine.register_opts(CONF)
 glance.register_opts(CONF)
 ironic.register_opts(CONF)
 keystone.register_opts(CONF)
+metadata.register_opts(CONF)
+metrics.register_opts(CONF)
 neutron.register_opts(CONF)
 quota.register_opts(CONF)
 scheduler.register_opts(CONF)
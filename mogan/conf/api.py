@@ -48,6 +48,14 @@ opts = [
                        "the service, this option should be False; note, you "
                        "will want to change public API endpoint to represent "
                        "SSL termination URL with 'public_endpoint' option.")),
+    cfg.IntOpt('key_pair_pool_size',
+               default=0,
+               min=0,
+               help=_('Number of SSH key pairs each mogan-api worker '
+                      'generates ahead of time, so that creating a key pair '
+                      'does not wait for one to be generated. The pool is '
+                      'refilled in the background. Set to 0 to generate the '
+                      'key pairs on demand.')),
     cfg.StrOpt('multi_server_name_template',
                default='%(name)s-%(count)d',
                help='When creating multiple servers with a single request '
@@ -18,6 +18,13 @@ from oslo_config import cfg
 from mogan.common.i18n import _
 
 opts = [
+    cfg.BoolOpt('enabled',
+                default=True,
+                help=_('Build a configuration drive for the servers when '
+                       'they are deployed. It can be disabled if the '
+                       'servers fetch their metadata from mogan-metadata, '
+                       'see the store_documents option of the metadata '
+                       'group.')),
     cfg.StrOpt('config_drive_format',
                default='iso9660',
                choices=('iso9660', 'vfat'),
@@ -0,0 +1,49 @@
+# Licensed under the Apache License, Version 2.0 (the "License"); you may
+# not use this file except in compliance with the License. You may obtain
+# a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+# WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+# License for the specific language governing permissions and limitations
+# under the License.
+
+from oslo_config import cfg
+
+from mogan.common.i18n import _
+
+opts = [
+    cfg.BoolOpt('soft_delete_servers',
+                default=False,
+                help=_('Mark deleted servers as deleted instead of removing '
+                       'them from the database. Soft deleted servers and '
+                       'their faults are moved to the shadow tables by the '
+                       'archiver, either periodically by the engine or with '
+                       '"mogan-dbsync archive".')),
+    cfg.IntOpt('archive_interval',
+               default=600,
+               help=_('Interval between archiving batches of soft deleted '
+                      'servers in the engine, in seconds. Set to a negative '
+                      'value to disable the periodic archiving.')),
+    cfg.IntOpt('archive_max_rows',
+               default=500,
+               min=1,
+               help=_('Maximum number of soft deleted servers moved to the '
+                      'shadow tables in one transaction. Smaller batches '
+                      'hold locks on the servers table for a shorter '
+                      'time.')),
+    cfg.IntOpt('flavor_cache_expiration',
+               default=30,
+               min=0,
+               help=_('Time in seconds to cache the flavors looked up by '
+                      'each process. Changing a flavor or its access drops '
+                      'the cache of the process making the change, other '
+                      'processes see the change once their cache expires. '
+                      'Set to 0 to disable the cache.')),
+]
+
+
+def register_opts(conf):
+    conf.register_opts(opts, group='database')
@@ -52,6 +52,28 @@ Possible values:
                help=_("Number of greenthreads available for use to sync "
                       "power states. Any positive integer representing "
                       "greenthreads count.")),
+    cfg.IntOpt('power_action_workers',
+               default=64,
+               min=1,
+               help=_("Number of power actions on servers run at the same "
+                      "time. The other power actions are queued in memory, "
+                      "the queued and running ones are lost when the engine "
+                      "is restarted and their servers are set to error on "
+                      "start.")),
+    cfg.IntOpt('rebuild_workers',
+               default=16,
+               min=1,
+               help=_("Number of server rebuilds run at the same time. The "
+                      "other rebuilds are queued in memory, the queued and "
+                      "running ones are lost when the engine is restarted "
+                      "and their servers are set to error on start.")),
+    cfg.IntOpt('delete_workers',
+               default=64,
+               min=1,
+               help=_("Number of server deletes run at the same time. The "
+                      "other deletes are queued in memory, the queued and "
+                      "running ones are lost when the engine is restarted "
+                      "and their servers are set to error on start.")),
     cfg.IntOpt('sync_power_state_interval',
                default=600,
                help=_("Interval to sync power states between the database "
@@ -60,6 +82,22 @@ Possible values:
                default=600,
                help=_("Interval to sync maintenance states between the "
                       "database and Ironic, in seconds.")),
+    cfg.IntOpt('prune_server_faults_interval',
+               default=3600,
+               help=_("Interval to prune the faults of servers, in seconds. "
+                      "Set to a negative value to disable pruning.")),
+    cfg.IntOpt('max_faults_per_server',
+               default=10,
+               min=1,
+               help=_("Number of latest faults kept for each server when "
+                      "pruning server faults.")),
+    cfg.IntOpt('prune_server_faults_max_rows',
+               default=500,
+               min=1,
+               help=_("Maximum number of server faults deleted in one "
+                      "transaction when pruning server faults. Smaller "
+                      "batches hold locks on the server faults table for "
+                      "a shorter time.")),
     cfg.StrOpt('engine_driver',
                default='ironic.IronicDriver',
                choices=['ironic.IronicDriver'],
@@ -59,6 +59,102 @@ The number of seconds to wait before retrying the request.
 Related options:
 
 * api_max_retries
+"""),
+    cfg.FloatOpt(
+        'polling_min_interval',
+        default=1.0,
+        min=0.1,
+        help="""
+The minimum number of seconds between two polls of a node waiting for an
+Ironic state transition to complete. The node is first polled after this
+interval, and this often around the time the transition is expected to
+complete.
+
+Related options:
+
+* polling_max_interval
+"""),
+    cfg.FloatOpt(
+        'polling_max_interval',
+        default=30.0,
+        min=0.1,
+        help="""
+The maximum number of seconds between two polls of a node waiting for an
+Ironic state transition to complete.
+
+Related options:
+
+* polling_min_interval
+"""),
+    cfg.FloatOpt(
+        'polling_backoff_factor',
+        default=2.0,
+        min=1.0,
+        help="""
+The factor the polling interval is multiplied by after each poll, from
+the start of a state transition and again once it takes longer than
+expected.
+"""),
+    cfg.FloatOpt(
+        'polling_jitter',
+        default=0.1,
+        min=0.0,
+        max=0.9,
+        help="""
+The fraction of the polling interval randomly added or removed, so that
+nodes started together are not polled at the same time.
+"""),
+    cfg.IntOpt(
+        'deploy_expected_duration',
+        default=600,
+        min=0,
+        help="""
+The number of seconds a deploy is expected to take before it is learned
+from the completion times of deploys of nodes with the same driver and
+resource class.
+"""),
+    cfg.IntOpt(
+        'rebuild_expected_duration',
+        default=600,
+        min=0,
+        help="""
+The number of seconds a rebuild is expected to take before it is learned
+from the completion times of rebuilds of nodes with the same driver and
+resource class.
+"""),
+    cfg.IntOpt(
+        'power_expected_duration',
+        default=10,
+        min=0,
+        help="""
+The number of seconds a power state change is expected to take before it
+is learned from the completion times of power state changes of nodes with
+the same driver and resource class.
+"""),
+    cfg.IntOpt(
+        'unprovision_expected_duration',
+        default=30,
+        min=0,
+        help="""
+The number of seconds an unprovision is expected to take before it is
+learned from the completion times of unprovisions of nodes with the same
+driver and resource class.
+"""),
+    cfg.IntOpt(
+        'max_concurrent_power_actions',
+        default=20,
+        min=1,
+        help="""
+The maximum number of power actions requested to Ironic at the same time
+when setting the power state of many servers at once.
+"""),
+    cfg.IntOpt(
+        'max_concurrent_destroys',
+        default=20,
+        min=1,
+        help="""
+The maximum number of nodes whose tear down is requested to Ironic at the
+same time when deleting many servers at once.
 """),
 ]
 
@@ -0,0 +1,71 @@
+# Copyright 2017 Huawei Technologies Co.,LTD.
+# All Rights Reserved.
+#
+#    Licensed under the Apache License, Version 2.0 (the "License"); you may
+#    not use this file except in compliance with the License. You may obtain
+#    a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#    WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#    License for the specific language governing permissions and limitations
+#    under the License.
+
+from oslo_config import cfg
+
+from mogan.common.i18n import _
+
+opts = [
+    cfg.BoolOpt('store_documents',
+                default=False,
+                help=_('Store the metadata documents of the servers when '
+                       'they are deployed, so that they can be served by '
+                       'mogan-metadata.')),
+    cfg.HostAddressOpt('host_ip',
+                       default='0.0.0.0',
+                       help=_('The IP address on which mogan-metadata '
+                              'listens.')),
+    cfg.PortOpt('port',
+                default=8775,
+                help=_('The TCP port on which mogan-metadata listens.')),
+    cfg.IntOpt('metadata_workers',
+               help=_('Number of workers for the mogan-metadata service. '
+                      'The default is equal to the number of CPUs available '
+                      'if that can be determined, else a default worker '
+                      'count of 1 is returned.')),
+    cfg.BoolOpt('service_metadata_proxy',
+                default=False,
+                help=_('Whether mogan-metadata is behind the Neutron '
+                       'metadata proxy. The proxy identifies the servers '
+                       'with the signed X-Instance-ID header, which lets '
+                       'servers on different networks use the same '
+                       'addresses. Otherwise the servers are identified by '
+                       'their address, and an address used on several '
+                       'networks is not served.')),
+    cfg.StrOpt('metadata_proxy_shared_secret',
+               default='',
+               secret=True,
+               help=_('The secret shared with the Neutron metadata proxy to '
+                      'sign the X-Instance-ID header.')),
+    cfg.BoolOpt('use_forwarded_for',
+                default=False,
+                help=_('Treat X-Forwarded-For as the canonical remote '
+                       'address. Only enable this if mogan-metadata is '
+                       'behind a proxy which sets it.')),
+    cfg.IntOpt('cache_expiration',
+               default=15,
+               min=0,
+               help=_('Time in seconds to cache the metadata documents of a '
+                      'server and the server an address belongs to. Set to '
+                      '0 to disable caching.')),
+]
+
+opt_group = cfg.OptGroup(name='metadata',
+                         title='Options for the mogan-metadata service')
+
+
+def register_opts(conf):
+    conf.register_group(opt_group)
+    conf.register_opts(opts, group=opt_group)
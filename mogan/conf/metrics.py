@@ -0,0 +1,53 @@
+# Copyright 2017 Huawei Technologies Co.,LTD.
+# All Rights Reserved.
+#
+#    Licensed under the Apache License, Version 2.0 (the "License"); you may
+#    not use this file except in compliance with the License. You may obtain
+#    a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#    WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#    License for the specific language governing permissions and limitations
+#    under the License.
+
+from oslo_config import cfg
+
+from mogan.common.i18n import _
+
+opts = [
+    cfg.HostAddressOpt('statsd_host',
+                       help=_('The statsd host the metrics are sent to. '
+                              'They are not sent to statsd when unset.')),
+    cfg.PortOpt('statsd_port',
+                default=8125,
+                help=_('The UDP port of statsd.')),
+    cfg.StrOpt('statsd_prefix',
+               default='mogan',
+               help=_('The prefix of the names of the metrics sent to '
+                      'statsd.')),
+    cfg.HostAddressOpt('prometheus_host',
+                       default='0.0.0.0',
+                       help=_('The IP address on which mogan-engine serves '
+                              'its metrics in the Prometheus format.')),
+    cfg.PortOpt('prometheus_port',
+                help=_('The TCP port on which mogan-engine serves its '
+                       'metrics in the Prometheus format. They are not '
+                       'served when unset.')),
+    cfg.BoolOpt('enable_api_endpoint',
+                default=False,
+                help=_('Serve the metrics of mogan-api in the Prometheus '
+                       'format on its /metrics path. The path is not '
+                       'authenticated, restrict its access in front of '
+                       'the API when enabled.')),
+]
+
+opt_group = cfg.OptGroup(name='metrics',
+                         title='Options for the metrics of the services')
+
+
+def register_opts(conf):
+    conf.register_group(opt_group)
+    conf.register_opts(opts, group=opt_group)
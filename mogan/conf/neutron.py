@@ -25,6 +25,11 @@ opts = [
     cfg.IntOpt('retries',
                default=3,
                help=_('Client retries in the case of a failed request.')),
+    cfg.IntOpt('max_concurrent_port_deletes',
+               default=20,
+               min=1,
+               help=_('The maximum number of ports deleted at the same '
+                      'time when deleting many servers at once.')),
 ]
 
 opt_group = cfg.OptGroup(name='neutron',
@@ -14,11 +14,14 @@ import itertools
 
 import mogan.conf.api
 import mogan.conf.configdrive
+import mogan.conf.database
 import mogan.conf.default
 import mogan.conf.engine
 import mogan.conf.glance
 import mogan.conf.ironic
 import mogan.conf.keystone
+import mogan.conf.metadata
+import mogan.conf.metrics
 import mogan.conf.neutron
 import mogan.conf.placement
 import mogan.conf.quota
@@ -37,10 +40,13 @@ _opts = [
     ('DEFAULT', itertools.chain(*_default_opt_lists)),
     ('api', mogan.conf.api.opts),
     ('configdrive', mogan.conf.configdrive.opts),
+    ('database', mogan.conf.database.opts),
     ('engine', mogan.conf.engine.opts),
     ('glance', mogan.conf.glance.opts),
     ('ironic', mogan.conf.ironic.ironic_opts),
     ('keystone', mogan.conf.keystone.opts),
+    ('metadata', mogan.conf.metadata.opts),
+    ('metrics', mogan.conf.metrics.opts),
     ('neutron', mogan.conf.neutron.list_opts()),
     ('placement', mogan.conf.placement.list_opts()),
     ('quota', mogan.conf.quota.quota_opts),
@@ -20,6 +20,20 @@ placement_group = cfg.OptGroup(
     help="Configuration options for connecting to the placement API service")
 
 placement_opts = [
+    cfg.StrOpt('backend',
+               default='http',
+               choices=['http', 'database'],
+               help="""
+Where the resource providers, inventories and allocations used by the
+scheduler are kept.
+
+Possible values:
+
+* http: use the placement API service.
+* database: keep them in the mogan database. This saves an HTTP round trip
+  on each scheduling decision and inventory update in deployments without a
+  shared placement service. All the mogan services must use the same backend.
+"""),
     cfg.StrOpt('os_region_name',
                help="""
 Region name of this node. This is used when picking the URL in the service
@@ -33,6 +47,14 @@ Possible values:
                help="""
 Endpoint interface for this node. This is used when picking the URL in the
 service catalog.
+"""),
+    cfg.IntOpt('max_concurrent_requests',
+               default=10,
+               min=1,
+               help="""
+The maximum number of requests sent to the placement API at the same time
+when updating many resource providers or allocations at once. This is also
+the number of HTTP connections kept open to the placement API.
 """)
 ]
 
@@ -79,10 +79,50 @@ class Connection(object):
     def server_destroy(self, context, server_id):
         """Delete a server."""
 
+    @abc.abstractmethod
+    def servers_destroy(self, context, server_ids):
+        """Delete many servers and their nics, faults and group members."""
+
+    @abc.abstractmethod
+    def servers_archive_deleted(self, context, max_rows):
+        """Move soft deleted servers and their faults to shadow tables."""
+
     @abc.abstractmethod
     def server_update(self, context, server_id, values):
         """Update a server."""
 
+    @abc.abstractmethod
+    def server_update_values(self, context, server_id, values,
+                             expected_status=None, expected_power_state=None):
+        """Update the columns of a server without loading it.
+
+        :param expected_status: A status, or a list of statuses, the server
+                                must be in for the update to be applied.
+        :param expected_power_state: A power state, or a list of power
+                                     states, the server must be in for the
+                                     update to be applied.
+        :raises: UnexpectedServerStatus if the server is in another status.
+        :raises: UnexpectedServerPowerState if the server is in another
+                 power state.
+        """
+
+    @abc.abstractmethod
+    def servers_update_values(self, context, values):
+        """Update the columns of many servers at once.
+
+        :param values: A dict of the column values of each server, keyed by
+                       server uuid.
+        :raises: ServerNotFound if a server doesn't exist.
+        """
+
+    @abc.abstractmethod
+    def servers_set_engine_host(self, context, server_uuids, host):
+        """Record the engine running the operations of many servers.
+
+        :param server_uuids: The uuids of the servers.
+        :param host: The host of the engine.
+        """
+
     # Flavor access
     @abc.abstractmethod
     def flavor_access_add(self, context, flavor_uuid, project_id):
@@ -133,6 +173,57 @@ class Connection(object):
     def server_fault_get_by_server_uuids(self, context, server_uuids):
         """Get all server faults for the provided server_uuids."""
 
+    @abc.abstractmethod
+    def server_fault_prune(self, context, max_faults, max_rows):
+        """Delete all but the latest max_faults faults of each server.
+
+        :param max_rows: the maximum number of faults deleted at once.
+        :returns: the number of faults deleted.
+        """
+
+    # Servers Metadata Documents
+    @abc.abstractmethod
+    def server_metadata_documents_set(self, context, server_uuid, documents,
+                                      addresses):
+        """Set the metadata documents of a server.
+
+        This replaces the documents of the server and the addresses they
+        are served to.
+
+        :param addresses: the addresses of the server, as dicts with the
+                          network_id and address keys.
+        """
+
+    @abc.abstractmethod
+    def server_metadata_addresses_add(self, context, server_uuid, addresses):
+        """Serve the metadata documents of a server to more addresses.
+
+        The addresses stop being served the documents of any other server
+        on the same network.
+
+        :param addresses: dicts with the network_id and address keys.
+        """
+
+    @abc.abstractmethod
+    def server_metadata_addresses_remove(self, context, server_uuid,
+                                         addresses):
+        """Stop serving the metadata documents of a server to addresses.
+
+        :param addresses: dicts with the network_id and address keys.
+        """
+
+    @abc.abstractmethod
+    def server_metadata_documents_get(self, context, server_uuid):
+        """Get the metadata documents of a server."""
+
+    @abc.abstractmethod
+    def server_metadata_documents_get_by_address(self, context, address):
+        """Get the metadata documents served to an address.
+
+        :raises: AmbiguousServerMetadataAddress if the address is used by
+                 servers on different networks.
+        """
+
     @abc.abstractmethod
     def quota_get(self, context, project_id, resource_name):
         """Get quota value of a resource"""
@@ -289,3 +380,91 @@ class Connection(object):
     def server_group_members_add(self, context, group_uuid, members):
         """Add a list of members to a server group"""
         return IMPL.server_group_members_add(context, group_uuid, members)
+
+    @abc.abstractmethod
+    def resource_provider_get_all(self, context, resources=None,
+                                  member_of=None, name=None):
+        """Get resource providers.
+
+        :param resources: Dict, keyed by resource class, of amounts the
+                          providers must have available.
+        :param member_of: List of aggregate UUIDs the providers must be
+                          associated with any of.
+        :param name: Name of the providers.
+        """
+        return IMPL.resource_provider_get_all(context, resources, member_of,
+                                              name)
+
+    @abc.abstractmethod
+    def resource_provider_get(self, context, rp_uuid):
+        """Get a resource provider by uuid."""
+        return IMPL.resource_provider_get(context, rp_uuid)
+
+    @abc.abstractmethod
+    def resource_provider_set_inventory(self, context, rp_uuid, name,
+                                        inventories):
+        """Set the inventories of a resource provider, creating it if needed.
+
+        :param inventories: Dict, keyed by resource class, of inventory
+                            records.
+        :raises: InventoryInUse if removed inventories are allocated.
+        """
+        return IMPL.resource_provider_set_inventory(context, rp_uuid, name,
+                                                    inventories)
+
+    @abc.abstractmethod
+    def resource_provider_destroy(self, context, rp_uuid):
+        """Delete a resource provider and its allocations."""
+        return IMPL.resource_provider_destroy(context, rp_uuid)
+
+    @abc.abstractmethod
+    def resource_provider_aggregates_get(self, context, rp_uuid):
+        """Get the aggregate UUIDs of a resource provider."""
+        return IMPL.resource_provider_aggregates_get(context, rp_uuid)
+
+    @abc.abstractmethod
+    def resource_provider_aggregates_set(self, context, rp_uuid,
+                                         aggregate_uuids):
+        """Set the aggregate UUIDs of a resource provider."""
+        return IMPL.resource_provider_aggregates_set(context, rp_uuid,
+                                                     aggregate_uuids)
+
+    @abc.abstractmethod
+    def resource_provider_aggregates_update(self, context, rp_uuid,
+                                            added=None, removed=None):
+        """Add and remove aggregate UUIDs of a resource provider at once.
+
+        Unlike getting then setting the aggregates, concurrent updates of
+        the aggregates of a provider are not lost.
+        """
+        return IMPL.resource_provider_aggregates_update(
+            context, rp_uuid, added=added, removed=removed)
+
+    @abc.abstractmethod
+    def resource_provider_aggregate_remove(self, context, aggregate_uuid):
+        """Remove an aggregate from all resource providers."""
+        return IMPL.resource_provider_aggregate_remove(context,
+                                                       aggregate_uuid)
+
+    @abc.abstractmethod
+    def allocations_put(self, context, rp_uuid, consumer_id, resources,
+                        project_id=None, user_id=None):
+        """Replace the allocations of a consumer.
+
+        :param resources: Dict, keyed by resource class, of amounts to
+                          consume on the resource provider.
+        :raises: InsufficientResources if the provider does not have the
+                 resources available.
+        """
+        return IMPL.allocations_put(context, rp_uuid, consumer_id, resources,
+                                    project_id, user_id)
+
+    @abc.abstractmethod
+    def allocations_delete(self, context, consumer_id):
+        """Delete the allocations of a consumer."""
+        return IMPL.allocations_delete(context, consumer_id)
+
+    @abc.abstractmethod
+    def allocations_get_by_resource_provider(self, context, rp_uuid):
+        """Get the allocations against a resource provider."""
+        return IMPL.allocations_get_by_resource_provider(context, rp_uuid)
@@ -0,0 +1,99 @@
+#
+#    Licensed under the Apache License, Version 2.0 (the "License"); you may
+#    not use this file except in compliance with the License. You may obtain
+#    a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#    WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#    License for the specific language governing permissions and limitations
+#    under the License.
+
+"""add placement tables
+
+Revision ID: 2d8f4b6a0c13
+Revises: 7c3e5a1d9b26
+Create Date: 2017-11-09 15:36:20.518347
+
+"""
+
+# revision identifiers, used by Alembic.
+revision = '2d8f4b6a0c13'
+down_revision = '7c3e5a1d9b26'
+
+from alembic import op
+import sqlalchemy as sa
+
+
+def upgrade():
+    op.create_table(
+        'resource_providers',
+        sa.Column('created_at', sa.DateTime(), nullable=True),
+        sa.Column('updated_at', sa.DateTime(), nullable=True),
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('uuid', sa.String(length=36), nullable=False),
+        sa.Column('name', sa.String(length=255), nullable=True),
+        sa.Column('generation', sa.Integer(), nullable=False),
+        sa.PrimaryKeyConstraint('id'),
+        sa.UniqueConstraint('uuid', name='uniq_resource_providers0uuid'),
+        mysql_ENGINE='InnoDB',
+        mysql_DEFAULT_CHARSET='UTF8'
+    )
+    op.create_table(
+        'inventories',
+        sa.Column('created_at', sa.DateTime(), nullable=True),
+        sa.Column('updated_at', sa.DateTime(), nullable=True),
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('resource_provider_id', sa.Integer(), nullable=False),
+        sa.Column('resource_class', sa.String(length=255), nullable=False),
+        sa.Column('total', sa.Integer(), nullable=False),
+        sa.Column('reserved', sa.Integer(), nullable=False),
+        sa.Column('min_unit', sa.Integer(), nullable=False),
+        sa.Column('max_unit', sa.Integer(), nullable=False),
+        sa.Column('step_size', sa.Integer(), nullable=False),
+        sa.Column('allocation_ratio', sa.Float(), nullable=False),
+        sa.ForeignKeyConstraint(['resource_provider_id'],
+                                ['resource_providers.id'], ),
+        sa.PrimaryKeyConstraint('id'),
+        sa.UniqueConstraint(
+            'resource_provider_id', 'resource_class',
+            name='uniq_inventories0resource_provider_id0resource_class'),
+        mysql_ENGINE='InnoDB',
+        mysql_DEFAULT_CHARSET='UTF8'
+    )
+    op.create_table(
+        'allocations',
+        sa.Column('created_at', sa.DateTime(), nullable=True),
+        sa.Column('updated_at', sa.DateTime(), nullable=True),
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('resource_provider_id', sa.Integer(), nullable=False),
+        sa.Column('consumer_id', sa.String(length=36), nullable=False),
+        sa.Column('resource_class', sa.String(length=255), nullable=False),
+        sa.Column('used', sa.Integer(), nullable=False),
+        sa.Column('project_id', sa.String(length=255), nullable=True),
+        sa.Column('user_id', sa.String(length=255), nullable=True),
+        sa.ForeignKeyConstraint(['resource_provider_id'],
+                                ['resource_providers.id'], ),
+        sa.PrimaryKeyConstraint('id'),
+        sa.Index('allocations_resource_provider_class_used_idx',
+                 'resource_provider_id', 'resource_class', 'used'),
+        sa.Index('allocations_consumer_id_idx', 'consumer_id'),
+        mysql_ENGINE='InnoDB',
+        mysql_DEFAULT_CHARSET='UTF8'
+    )
+    op.create_table(
+        'resource_provider_aggregates',
+        sa.Column('created_at', sa.DateTime(), nullable=True),
+        sa.Column('updated_at', sa.DateTime(), nullable=True),
+        sa.Column('resource_provider_id', sa.Integer(), nullable=False),
+        sa.Column('aggregate_uuid', sa.String(length=36), nullable=False),
+        sa.ForeignKeyConstraint(['resource_provider_id'],
+                                ['resource_providers.id'], ),
+        sa.PrimaryKeyConstraint('resource_provider_id', 'aggregate_uuid'),
+        sa.Index('resource_provider_aggregates_aggregate_uuid_idx',
+                 'aggregate_uuid'),
+        mysql_ENGINE='InnoDB',
+        mysql_DEFAULT_CHARSET='UTF8'
+    )
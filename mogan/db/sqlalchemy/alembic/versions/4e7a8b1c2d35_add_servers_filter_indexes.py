@@ -0,0 +1,40 @@
+#
+#    Licensed under the Apache License, Version 2.0 (the "License"); you may
+#    not use this file except in compliance with the License. You may obtain
+#    a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#    WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#    License for the specific language governing permissions and limitations
+#    under the License.
+
+"""add indexes for servers list and sync filters
+
+Revision ID: 4e7a8b1c2d35
+Revises: 91941bf1ebc9
+Create Date: 2017-10-18 10:12:31.482916
+
+"""
+
+# revision identifiers, used by Alembic.
+revision = '4e7a8b1c2d35'
+down_revision = '91941bf1ebc9'
+
+from alembic import op
+
+
+def upgrade():
+    # NOTE: servers_project_id_status_idx has project_id as its leading
+    # column, so it also serves the plain project_id lookups the old
+    # single column index was used for.
+    op.create_index('servers_project_id_status_idx', 'servers',
+                    ['project_id', 'status'])
+    op.drop_index('servers_project_id_idx', table_name='servers')
+    op.create_index('servers_flavor_uuid_project_id_idx', 'servers',
+                    ['flavor_uuid', 'project_id'])
+    op.create_index('servers_node_uuid_idx', 'servers', ['node_uuid'])
+    op.create_index('servers_status_idx', 'servers', ['status'])
+    op.create_index('servers_name_idx', 'servers', ['name'])
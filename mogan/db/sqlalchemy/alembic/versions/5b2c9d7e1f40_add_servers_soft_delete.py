@@ -0,0 +1,98 @@
+#
+#    Licensed under the Apache License, Version 2.0 (the "License"); you may
+#    not use this file except in compliance with the License. You may obtain
+#    a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#    WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#    License for the specific language governing permissions and limitations
+#    under the License.
+
+"""add servers soft delete and shadow tables
+
+Revision ID: 5b2c9d7e1f40
+Revises: 4e7a8b1c2d35
+Create Date: 2017-10-24 15:40:07.219364
+
+"""
+
+# revision identifiers, used by Alembic.
+revision = '5b2c9d7e1f40'
+down_revision = '4e7a8b1c2d35'
+
+from alembic import op
+import sqlalchemy as sa
+
+
+def upgrade():
+    op.add_column('servers', sa.Column('deleted_at', sa.DateTime(),
+                                       nullable=True))
+    op.add_column('servers', sa.Column('deleted', sa.Integer(),
+                                       nullable=True))
+    op.execute("UPDATE servers SET deleted = 0")
+    op.create_index('servers_deleted_idx', 'servers', ['deleted'])
+
+    op.create_table(
+        'shadow_servers',
+        sa.Column('created_at', sa.DateTime(), nullable=True),
+        sa.Column('updated_at', sa.DateTime(), nullable=True),
+        sa.Column('deleted_at', sa.DateTime(), nullable=True),
+        sa.Column('deleted', sa.Integer(), nullable=True),
+        sa.Column('uuid', sa.String(length=36), nullable=False),
+        sa.Column('id', sa.Integer(), autoincrement=False, nullable=False),
+        sa.Column('user_id', sa.String(length=36), nullable=True),
+        sa.Column('project_id', sa.String(length=36), nullable=True),
+        sa.Column('name', sa.String(length=255), nullable=False),
+        sa.Column('description', sa.String(length=255), nullable=True),
+        sa.Column('status', sa.String(length=255), nullable=True),
+        sa.Column('power_state', sa.String(length=15), nullable=True),
+        sa.Column('flavor_uuid', sa.String(length=36), nullable=True),
+        sa.Column('image_uuid', sa.String(length=36), nullable=True),
+        sa.Column('launched_at', sa.DateTime(), nullable=True),
+        sa.Column('availability_zone', sa.String(length=255), nullable=True),
+        sa.Column('node', sa.String(length=255), nullable=True),
+        sa.Column('node_uuid', sa.String(length=36), nullable=True),
+        sa.Column('extra', sa.Text(), nullable=True),
+        sa.Column('partitions', sa.Text(), nullable=True),
+        sa.Column('locked', sa.Boolean(), nullable=True),
+        sa.Column('affinity_zone', sa.String(length=255), nullable=True),
+        sa.Column('locked_by', sa.Enum('admin', 'owner'), nullable=True),
+        sa.Column('key_name', sa.String(length=255), nullable=True),
+        sa.PrimaryKeyConstraint('id'),
+        sa.Index('shadow_servers_uuid_idx', 'uuid'),
+        mysql_ENGINE='InnoDB',
+        mysql_DEFAULT_CHARSET='UTF8'
+    )
+    op.create_table(
+        'shadow_server_nics',
+        sa.Column('created_at', sa.DateTime(), nullable=True),
+        sa.Column('updated_at', sa.DateTime(), nullable=True),
+        sa.Column('server_uuid', sa.String(length=36), nullable=False),
+        sa.Column('port_id', sa.String(length=36), nullable=False),
+        sa.Column('mac_address', sa.String(length=32), nullable=False),
+        sa.Column('network_id', sa.String(length=36), nullable=True),
+        sa.Column('floating_ip', sa.String(length=64), nullable=True),
+        sa.Column('fixed_ips', sa.Text(), nullable=True),
+        sa.Column('preserve_on_delete', sa.Boolean(), nullable=True),
+        sa.PrimaryKeyConstraint('server_uuid', 'port_id'),
+        sa.Index('shadow_server_nics_server_uuid_idx', 'server_uuid'),
+        mysql_ENGINE='InnoDB',
+        mysql_DEFAULT_CHARSET='UTF8'
+    )
+    op.create_table(
+        'shadow_server_faults',
+        sa.Column('id', sa.Integer(), autoincrement=False, nullable=False),
+        sa.Column('server_uuid', sa.String(length=36), nullable=True),
+        sa.Column('code', sa.Integer(), nullable=False),
+        sa.Column('created_at', sa.DateTime(), nullable=True),
+        sa.Column('updated_at', sa.DateTime(), nullable=True),
+        sa.Column('message', sa.String(length=255), nullable=True),
+        sa.Column('detail', sa.Text(), nullable=True),
+        sa.PrimaryKeyConstraint('id'),
+        sa.Index('shadow_server_faults_server_uuid_idx', 'server_uuid'),
+        mysql_ENGINE='InnoDB',
+        mysql_DEFAULT_CHARSET='UTF8'
+    )
@@ -0,0 +1,56 @@
+#
+#    Licensed under the Apache License, Version 2.0 (the "License"); you may
+#    not use this file except in compliance with the License. You may obtain
+#    a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#    WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#    License for the specific language governing permissions and limitations
+#    under the License.
+
+"""add server metadata documents
+
+Revision ID: 7c3e5a1d9b26
+Revises: 5b2c9d7e1f40
+Create Date: 2017-11-02 10:12:45.183920
+
+"""
+
+# revision identifiers, used by Alembic.
+revision = '7c3e5a1d9b26'
+down_revision = '5b2c9d7e1f40'
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import mysql
+
+
+def upgrade():
+    op.create_table(
+        'server_metadata_documents',
+        sa.Column('created_at', sa.DateTime(), nullable=True),
+        sa.Column('updated_at', sa.DateTime(), nullable=True),
+        sa.Column('server_uuid', sa.String(length=36), nullable=False),
+        sa.Column('documents',
+                  sa.Text().with_variant(mysql.LONGTEXT(), 'mysql'),
+                  nullable=True),
+        sa.PrimaryKeyConstraint('server_uuid'),
+        mysql_ENGINE='InnoDB',
+        mysql_DEFAULT_CHARSET='UTF8'
+    )
+    op.create_table(
+        'server_metadata_addresses',
+        sa.Column('created_at', sa.DateTime(), nullable=True),
+        sa.Column('updated_at', sa.DateTime(), nullable=True),
+        sa.Column('network_id', sa.String(length=36), nullable=False),
+        sa.Column('address', sa.String(length=64), nullable=False),
+        sa.Column('server_uuid', sa.String(length=36), nullable=False),
+        sa.PrimaryKeyConstraint('network_id', 'address'),
+        sa.Index('server_metadata_addresses_address_idx', 'address'),
+        sa.Index('server_metadata_addresses_server_uuid_idx', 'server_uuid'),
+        mysql_ENGINE='InnoDB',
+        mysql_DEFAULT_CHARSET='UTF8'
+    )
@@ -0,0 +1,37 @@
+#
+#    Licensed under the Apache License, Version 2.0 (the "License"); you may
+#    not use this file except in compliance with the License. You may obtain
+#    a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#    WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#    License for the specific language governing permissions and limitations
+#    under the License.
+
+"""add the engine host of servers and shadow servers
+
+Revision ID: 8a4f2c6e0b17
+Revises: 2d8f4b6a0c13
+Create Date: 2017-11-02 09:26:41.317502
+
+"""
+
+# revision identifiers, used by Alembic.
+revision = '8a4f2c6e0b17'
+down_revision = '2d8f4b6a0c13'
+
+from alembic import op
+import sqlalchemy as sa
+
+
+def upgrade():
+    op.add_column('servers', sa.Column('engine_host', sa.String(length=255),
+                                       nullable=True))
+    op.create_index('servers_engine_host_status_idx', 'servers',
+                    ['engine_host', 'status'])
+    op.add_column('shadow_servers',
+                  sa.Column('engine_host', sa.String(length=255),
+                            nullable=True))
@@ -15,7 +15,9 @@
 
 """SQLAlchemy storage backend."""
 
+import collections
 import threading
+import time
 
 from oslo_db import api as oslo_db_api
 from oslo_db import exception as db_exc
@@ -26,16 +28,24 @@ from oslo_utils import strutils
 from oslo_utils import timeutils
 from oslo_utils import uuidutils
 from sqlalchemy import and_
+from sqlalchemy import bindparam
+from sqlalchemy import event as sa_event
+from sqlalchemy import func
+from sqlalchemy import literal
 from sqlalchemy import or_
 from sqlalchemy import orm
 from sqlalchemy.orm import contains_eager
 from sqlalchemy.orm.exc import NoResultFound
 from sqlalchemy.orm import joinedload
+from sqlalchemy import select
 from sqlalchemy.sql.expression import desc
+from sqlalchemy.sql import false
 from sqlalchemy.sql import true
 
 from mogan.common import exception
 from mogan.common.i18n import _
+from mogan.common import metrics
+from mogan.conf import CONF
 from mogan.db import api
 from mogan.db.sqlalchemy import models
 
@@ -44,6 +54,69 @@ _CONTEXT = threading.local()
 LOG = logging.getLogger(__name__)
 
 
+# Every query is recorded as a call to the database, see
+# mogan.common.metrics.record_external_call. The start time of the query is
+# kept in the info of its connection, the execution context of the
+# statement isn't always available. The queries of a connection don't
+# overlap, and the start time of a failed query is replaced by the next one.
+_QUERY_STARTED_AT_KEY = 'mogan_query_started_at'
+
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context,
+                           executemany):
+    conn.info[_QUERY_STARTED_AT_KEY] = time.time()
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context,
+                          executemany):
+    started_at = conn.info.pop(_QUERY_STARTED_AT_KEY, None)
+    if started_at is not None:
+        metrics.record_external_call('db', time.time() - started_at)
+
+
+def _add_query_listeners(engine):
+    sa_event.listen(engine, 'before_cursor_execute', _before_cursor_execute)
+    sa_event.listen(engine, 'after_cursor_execute', _after_cursor_execute)
+
+
+enginefacade.writer.append_on_engine_create(_add_query_listeners)
+
+
+# Flavor lookups, keyed by the lookup and what the context can see. The
+# cache is dropped whenever a flavor or its access is changed, other
+# processes see the change once the entries expire.
+_FLAVOR_CACHE = {}
+_FLAVOR_CACHE_MAX_SIZE = 4096
+
+
+def _flavor_cache_get(key, load):
+    expiration = CONF.database.flavor_cache_expiration
+    if not expiration:
+        return load()
+
+    now = time.time()
+    cached = _FLAVOR_CACHE.get(key)
+    if cached is not None and cached[0] > now:
+        return cached[1]
+
+    value = load()
+    if len(_FLAVOR_CACHE) >= _FLAVOR_CACHE_MAX_SIZE:
+        _FLAVOR_CACHE.clear()
+    _FLAVOR_CACHE[key] = (now + expiration, value)
+    return value
+
+
+def _flavor_cache_clear():
+    _FLAVOR_CACHE.clear()
+
+
+def _get_flavor_visibility(context):
+    """Return what decides the flavors a context can see."""
+    if context.is_admin:
+        return None
+    return context.project_id
+
+
 def get_backend():
     """The backend is this module itself."""
     return Connection()
@@ -102,6 +175,50 @@ def add_identity_filter(query, value):
         raise exception.InvalidParameterValue(identity=value)
 
 
+def _add_in_or_equal_filter(query, column, value):
+    """Adds an equality or IN filter to a query.
+
+    :param query: Initial query to add filter to.
+    :param column: Model column to filter on.
+    :param value: A single value, or a list/tuple/set of values to match.
+    :return: Modified query.
+    """
+    if isinstance(value, (list, tuple, set, frozenset)):
+        return query.filter(column.in_(value))
+    return query.filter(column == value)
+
+
+def _value_matches(value, expected):
+    """Checks a value against the expected value(s) of a filter.
+
+    :param value: The actual value.
+    :param expected: None, a single value, or a list/tuple/set of values.
+    :return: True if no value was expected or if the value is expected.
+    """
+    if expected is None:
+        return True
+    if isinstance(expected, (list, tuple, set, frozenset)):
+        return value in expected
+    return value == expected
+
+
+def _archive_rows(session, model, shadow_model, condition):
+    """Move the rows of model matching condition to its shadow table.
+
+    :param session: The write session of the current transaction.
+    :param model: Model whose rows are moved.
+    :param shadow_model: Shadow model with the same columns as model.
+    :param condition: Where clause selecting the rows to move.
+    :return: Number of rows moved.
+    """
+    table = model.__table__
+    columns = [c.name for c in shadow_model.__table__.columns]
+    session.execute(shadow_model.__table__.insert().from_select(
+        columns, select([table.c[name] for name in columns]).where(
+            condition)))
+    return session.execute(table.delete().where(condition)).rowcount
+
+
 class Connection(api.Connection):
     """SqlAlchemy connection."""
 
@@ -113,22 +230,34 @@ class Connection(api.Connection):
     def _add_servers_filters(self, context, query, filters):
         if filters is None:
             filters = []
+        if 'uuid' in filters:
+            query = _add_in_or_equal_filter(query, models.Server.uuid,
+                                            filters['uuid'])
         if 'name' in filters:
-            name_start_with = filters['name']
+            # NOTE: Only match by prefix here, a leading wildcard would
+            # prevent the database from using servers_name_idx.
+            name_start_with = filters['name'].replace(
+                '\\', '\\\\').replace('%', '\\%').replace('_', '\\_')
             query = query.filter(models.Server.name.like(
-                "%" + name_start_with + "%"))
+                name_start_with + "%", escape='\\'))
         if 'status' in filters:
-            query = query.filter_by(status=filters['status'])
+            query = _add_in_or_equal_filter(query, models.Server.status,
+                                            filters['status'])
         if 'flavor_uuid' in filters or 'flavor_name' in filters:
             if 'flavor_name' in filters:
-                flavor_query = model_query(context, models.Flavors).filter_by(
-                    name=filters['flavor_name'])
-                filters['flavor_uuid'] = flavor_query.first().uuid
+                flavor_uuid = self._get_flavor_uuid_by_name(
+                    context, filters['flavor_name'])
+                if flavor_uuid is None:
+                    return query.filter(false())
+                filters['flavor_uuid'] = flavor_uuid
             query = query.filter_by(flavor_uuid=filters['flavor_uuid'])
         if 'image_uuid' in filters:
             query = query.filter_by(image_uuid=filters['image_uuid'])
         if 'node_uuid' in filters:
-            query = query.filter_by(node_uuid=filters['node_uuid'])
+            query = _add_in_or_equal_filter(query, models.Server.node_uuid,
+                                            filters['node_uuid'])
+        if 'engine_host' in filters:
+            query = query.filter_by(engine_host=filters['engine_host'])
         return query
 
     @oslo_db_api.retry_on_deadlock
@@ -150,7 +279,27 @@ class Connection(api.Connection):
                 raise exception.FlavorAlreadyExists(name=values['name'])
             return flavor
 
+    def _get_flavor_uuid_by_name(self, context, name):
+        key = ('uuid_by_name', name)
+        try:
+            return _flavor_cache_get(
+                key, lambda: self._flavor_get_uuid_by_name(context, name))
+        except exception.FlavorNotFound:
+            return None
+
+    def _flavor_get_uuid_by_name(self, context, name):
+        flavor = model_query(context, models.Flavors,
+                             models.Flavors.uuid).filter_by(name=name).first()
+        if not flavor:
+            raise exception.FlavorNotFound(flavor_id=name)
+        return flavor.uuid
+
     def flavor_get(self, context, flavor_uuid):
+        key = ('flavor', flavor_uuid, _get_flavor_visibility(context))
+        return _flavor_cache_get(
+            key, lambda: self._flavor_get(context, flavor_uuid))
+
+    def _flavor_get(self, context, flavor_uuid):
         query = model_query(context, models.Flavors).filter_by(
             uuid=flavor_uuid)
 
@@ -180,7 +329,8 @@ class Connection(api.Connection):
                     flavor_id=flavor_id)
 
             ref.update(values)
-            return ref
+        _flavor_cache_clear()
+        return ref
 
     def flavor_get_all(self, context):
         query = model_query(context, models.Flavors)
@@ -198,7 +348,8 @@ class Connection(api.Connection):
     def flavor_destroy(self, context, flavor_uuid):
         # check if the flavor is in use
         query = model_query(
-            context, models.Server).filter_by(flavor_uuid=flavor_uuid)
+            context, models.Server,
+            deleted=False).filter_by(flavor_uuid=flavor_uuid)
         if query.first():
             raise exception.FlavorInUse(flavor_id=flavor_uuid)
 
@@ -220,6 +371,7 @@ class Connection(api.Connection):
             if count != 1:
                 raise exception.FlavorNotFound(
                     flavor_id=flavor_uuid)
+        _flavor_cache_clear()
 
     @oslo_db_api.retry_on_deadlock
     def server_create(self, context, values):
@@ -247,39 +399,86 @@ class Connection(api.Connection):
     def server_get(self, context, server_id):
         query = model_query(
             context,
-            models.Server).filter_by(uuid=server_id)
+            models.Server, deleted=False).filter_by(uuid=server_id)
         try:
             return query.one()
         except NoResultFound:
             raise exception.ServerNotFound(server=server_id)
 
     def server_get_all(self, context, project_only, filters=None):
-        query = model_query(context, models.Server,
+        query = model_query(context, models.Server, deleted=False,
                             project_only=project_only)
         query = self._add_servers_filters(context, query, filters)
         return query.all()
 
-    @oslo_db_api.retry_on_deadlock
     def server_destroy(self, context, server_id):
-        with _session_for_write():
-            query = model_query(context, models.Server)
-            query = add_identity_filter(query, server_id)
+        self.servers_destroy(context, [server_id])
 
-            nics_query = model_query(context, models.ServerNic).filter_by(
-                server_uuid=server_id)
-            nics_query.delete()
+    @oslo_db_api.retry_on_deadlock
+    def servers_destroy(self, context, server_ids):
+        server_ids = set(server_ids)
+        if not server_ids:
+            return
 
-            faults_query = model_query(
-                context,
-                models.ServerFault).filter_by(server_uuid=server_id)
-            faults_query.delete()
-            group_member_query = model_query(
-                context, models.ServerGroupMember).filter_by(
-                server_uuid=server_id)
-            group_member_query.delete()
-            count = query.delete()
-            if count != 1:
-                raise exception.ServerNotFound(server=server_id)
+        soft_delete = CONF.database.soft_delete_servers
+        with _session_for_write() as session:
+            if soft_delete:
+                # NOTE: Ports may be attached to another server once this
+                # one is gone, so the nics can't stay in the hot table
+                # until the server is archived.
+                _archive_rows(session, models.ServerNic,
+                              models.ShadowServerNic,
+                              models.ServerNic.server_uuid.in_(server_ids))
+                dependents = (models.ServerGroupMember,
+                              models.ServerMetadataDocuments,
+                              models.ServerMetadataAddress)
+            else:
+                dependents = (models.ServerNic, models.ServerFault,
+                              models.ServerGroupMember,
+                              models.ServerMetadataDocuments,
+                              models.ServerMetadataAddress)
+            # Delete all the dependent rows of every server first, each
+            # with a single IN statement, then the servers themselves.
+            for model in dependents:
+                model_query(context, model).filter(
+                    model.server_uuid.in_(server_ids)).delete(
+                    synchronize_session=False)
+
+            query = model_query(context, models.Server, deleted=False).filter(
+                models.Server.uuid.in_(server_ids))
+            if soft_delete:
+                count = query.update(
+                    {'deleted': models.Server.id,
+                     'deleted_at': timeutils.utcnow()},
+                    synchronize_session=False)
+            else:
+                count = query.delete(synchronize_session=False)
+            if count != len(server_ids):
+                found = set(r.uuid for r in model_query(
+                    context, models.Server, models.Server.uuid,
+                    deleted=False).filter(
+                    models.Server.uuid.in_(server_ids)))
+                missing = server_ids - found
+                raise exception.ServerNotFound(
+                    server=', '.join(sorted(missing)))
+
+    @oslo_db_api.retry_on_deadlock
+    def servers_archive_deleted(self, context, max_rows):
+        with _session_for_write() as session:
+            rows = model_query(
+                context, models.Server, models.Server.id,
+                models.Server.uuid, deleted=True).order_by(
+                models.Server.id).limit(max_rows).with_for_update().all()
+            if not rows:
+                return 0
+
+            server_uuids = [r.uuid for r in rows]
+            _archive_rows(session, models.ServerFault,
+                          models.ShadowServerFault,
+                          models.ServerFault.server_uuid.in_(server_uuids))
+            return _archive_rows(
+                session, models.Server, models.ShadowServer,
+                models.Server.id.in_([r.id for r in rows]))
 
     def server_update(self, context, server_id, values):
         if 'uuid' in values:
@@ -292,10 +491,102 @@ class Connection(api.Connection):
             if 'name' in e.columns:
                 raise exception.DuplicateName(name=values['name'])
 
+    @oslo_db_api.retry_on_deadlock
+    def servers_set_engine_host(self, context, server_uuids, host):
+        if not server_uuids:
+            return
+        with _session_for_write():
+            model_query(context, models.Server).filter(
+                models.Server.uuid.in_(server_uuids),
+                models.Server.deleted == 0).update(
+                {'engine_host': host}, synchronize_session=False)
+
+    def server_update_values(self, context, server_id, values,
+                             expected_status=None, expected_power_state=None):
+        if 'uuid' in values:
+            msg = _("Cannot overwrite UUID for an existing Server.")
+            raise exception.InvalidParameterValue(err=msg)
+
+        try:
+            self._do_update_server_values(context, server_id, values,
+                                          expected_status,
+                                          expected_power_state)
+        except db_exc.DBDuplicateEntry as e:
+            if 'name' in e.columns:
+                raise exception.DuplicateName(name=values['name'])
+            raise
+
+    @oslo_db_api.retry_on_deadlock
+    def servers_update_values(self, context, values):
+        if not values:
+            return
+        if any('uuid' in server_values for server_values in values.values()):
+            msg = _("Cannot overwrite UUID for an existing Server.")
+            raise exception.InvalidParameterValue(err=msg)
+
+        # Servers updating the same columns are updated with a single
+        # executemany UPDATE statement.
+        params_by_columns = collections.defaultdict(list)
+        for server_uuid, server_values in values.items():
+            params = {'b_' + column: value
+                      for column, value in server_values.items()}
+            params['b_uuid'] = server_uuid
+            params_by_columns[tuple(sorted(server_values))].append(params)
+
+        table = models.Server.__table__
+        count = 0
+        with _session_for_write() as session:
+            for columns, params in params_by_columns.items():
+                query = table.update().where(and_(
+                    table.c.uuid == bindparam('b_uuid'),
+                    table.c.deleted == 0)).values(
+                    {column: bindparam('b_' + column) for column in columns})
+                count += session.execute(query, params).rowcount
+            if count != len(values):
+                found = set(r.uuid for r in model_query(
+                    context, models.Server, models.Server.uuid,
+                    deleted=False).filter(
+                    models.Server.uuid.in_(list(values))))
+                missing = set(values) - found
+                raise exception.ServerNotFound(
+                    server=', '.join(sorted(missing)))
+
+    @oslo_db_api.retry_on_deadlock
+    def _do_update_server_values(self, context, server_id, values,
+                                 expected_status, expected_power_state):
+        with _session_for_write():
+            query = model_query(context, models.Server, deleted=False)
+            query = add_identity_filter(query, server_id)
+            if expected_status is not None:
+                query = _add_in_or_equal_filter(
+                    query, models.Server.status, expected_status)
+            if expected_power_state is not None:
+                query = _add_in_or_equal_filter(
+                    query, models.Server.power_state, expected_power_state)
+            count = query.update(values, synchronize_session=False)
+            if count:
+                return
+
+            # Find out why nothing was updated.
+            query = model_query(context, models.Server, models.Server.status,
+                                models.Server.power_state, deleted=False)
+            query = add_identity_filter(query, server_id)
+            try:
+                actual = query.one()
+            except NoResultFound:
+                raise exception.ServerNotFound(server=server_id)
+            if not _value_matches(actual.status, expected_status):
+                raise exception.UnexpectedServerStatus(
+                    server=server_id, actual=actual.status,
+                    expected=expected_status)
+            raise exception.UnexpectedServerPowerState(
+                server=server_id, actual=actual.power_state,
+                expected=expected_power_state)
+
     @oslo_db_api.retry_on_deadlock
     def _do_update_server(self, context, server_id, values):
         with _session_for_write():
-            query = model_query(context, models.Server)
+            query = model_query(context, models.Server, deleted=False)
             query = add_identity_filter(query, server_id)
             try:
                 ref = query.with_lockmode('update').one()
@@ -306,8 +597,10 @@ class Connection(api.Connection):
         return ref
 
     def flavor_access_get(self, context, flavor_uuid):
-        flavor_id = _get_id_from_flavor(context, flavor_uuid)
-        return _flavor_access_query(context, flavor_id)
+        def _load():
+            flavor_id = _get_id_from_flavor(context, flavor_uuid)
+            return _flavor_access_query(context, flavor_id).all()
+        return _flavor_cache_get(('access', flavor_uuid), _load)
 
     @oslo_db_api.retry_on_deadlock
     def flavor_access_add(self, context, flavor_uuid, project_id):
@@ -322,6 +615,7 @@ class Connection(api.Connection):
             except db_exc.DBDuplicateEntry:
                 raise exception.FlavorAccessExists(flavor_id=flavor_uuid,
                                                    project_id=project_id)
+        _flavor_cache_clear()
         return access_ref
 
     @oslo_db_api.retry_on_deadlock
@@ -330,6 +624,7 @@ class Connection(api.Connection):
             count = _flavor_access_query(context, flavor_id). \
                 filter_by(project_id=project_id). \
                 delete(synchronize_session=False)
+        _flavor_cache_clear()
 
         if count == 0:
             raise exception.FlavorAccessNotFound(flavor_id=flavor_id,
@@ -401,6 +696,114 @@ class Connection(api.Connection):
 
         return output
 
+    @oslo_db_api.retry_on_deadlock
+    def server_fault_prune(self, context, max_faults, max_rows):
+        """Delete all but the latest max_faults faults of every server."""
+        fault = models.ServerFault
+        with _session_for_write():
+            server_uuids = [r.server_uuid for r in model_query(
+                context, fault, fault.server_uuid).group_by(
+                fault.server_uuid).having(func.count(fault.id) > max_faults)]
+
+            # The faults past the latest ones of each server are stale, up
+            # to max_rows of them are deleted in this transaction.
+            stale_ids = []
+            for server_uuid in server_uuids:
+                stale_ids.extend(r.id for r in model_query(
+                    context, fault, fault.id).filter_by(
+                    server_uuid=server_uuid).order_by(
+                    desc(fault.created_at), desc(fault.id)).offset(
+                    max_faults).limit(max_rows - len(stale_ids)))
+                if len(stale_ids) >= max_rows:
+                    break
+
+            if not stale_ids:
+                return 0
+            return model_query(context, fault).\
+                filter(fault.id.in_(stale_ids)).\
+                delete(synchronize_session=False)
+
+    @oslo_db_api.retry_on_deadlock
+    def server_metadata_documents_set(self, context, server_uuid, documents,
+                                      addresses):
+        address_model = models.ServerMetadataAddress
+        with _session_for_write() as session:
+            for model in (models.ServerMetadataDocuments, address_model):
+                model_query(context, model).filter_by(
+                    server_uuid=server_uuid).delete(synchronize_session=False)
+            server_documents = models.ServerMetadataDocuments()
+            server_documents.update({'server_uuid': server_uuid,
+                                     'documents': documents})
+            session.add(server_documents)
+            self._add_metadata_addresses(context, session, server_uuid,
+                                         addresses)
+            session.flush()
+        return server_documents
+
+    @staticmethod
+    def _filter_metadata_addresses(query, addresses):
+        address_model = models.ServerMetadataAddress
+        return query.filter(or_(*[
+            and_(address_model.network_id == address['network_id'],
+                 address_model.address == address['address'])
+            for address in addresses]))
+
+    def _add_metadata_addresses(self, context, session, server_uuid,
+                                addresses):
+        address_model = models.ServerMetadataAddress
+        keys = set((address['network_id'], address['address'])
+                   for address in addresses)
+        if not keys:
+            return
+        # NOTE: The addresses may have been reused from servers which are
+        # gone, the documents are served to the latest owner.
+        self._filter_metadata_addresses(
+            model_query(context, address_model), addresses).delete(
+            synchronize_session=False)
+        for network_id, address in keys:
+            session.add(address_model(network_id=network_id, address=address,
+                                      server_uuid=server_uuid))
+
+    @oslo_db_api.retry_on_deadlock
+    def server_metadata_addresses_add(self, context, server_uuid, addresses):
+        with _session_for_write() as session:
+            self._add_metadata_addresses(context, session, server_uuid,
+                                         addresses)
+            session.flush()
+
+    @oslo_db_api.retry_on_deadlock
+    def server_metadata_addresses_remove(self, context, server_uuid,
+                                         addresses):
+        address_model = models.ServerMetadataAddress
+        with _session_for_write():
+            self._filter_metadata_addresses(
+                model_query(context, address_model).filter(
+                    address_model.server_uuid == server_uuid),
+                addresses).delete(synchronize_session=False)
+
+    def server_metadata_documents_get(self, context, server_uuid):
+        query = model_query(context, models.ServerMetadataDocuments).\
+            filter_by(server_uuid=server_uuid)
+        try:
+            return query.one()
+        except NoResultFound:
+            raise exception.ServerMetadataNotFound(server=server_uuid)
+
+    def server_metadata_documents_get_by_address(self, context, address):
+        address_model = models.ServerMetadataAddress
+        query = model_query(context, models.ServerMetadataDocuments).join(
+            address_model, address_model.server_uuid ==
+            models.ServerMetadataDocuments.server_uuid).filter(
+            address_model.address == address)
+        # NOTE: Without the network the request comes from, an address used
+        # on several networks can't be told apart, serve none of them.
+        result = query.limit(2).all()
+        if not result:
+            raise exception.ServerMetadataNotFound(server=address)
+        if len(result) > 1:
+            raise exception.AmbiguousServerMetadataAddress(address=address)
+        return result[0]
+
     def quota_get(self, context, project_id, resource_name):
         query = model_query(
             context,
@@ -536,7 +939,7 @@ class Connection(api.Connection):
         return reservation_ref
 
     def _sync_servers(self, context, project_id):
-        query = model_query(context, models.Server).\
+        query = model_query(context, models.Server, deleted=False).\
             filter_by(project_id=project_id).all()
         return {'servers': len(query) or 0}
 
@@ -1075,6 +1478,246 @@ class Connection(api.Connection):
             raise exception.ServerGroupNotFound(group_uuid=group_uuid)
         self._server_group_members_add(context, group.id, members)
 
+    def resource_provider_get_all(self, context, resources=None,
+                                  member_of=None, name=None):
+        query = model_query(context, models.ResourceProvider)
+        if name is not None:
+            query = query.filter_by(name=name)
+        if member_of:
+            query = query.filter(models.ResourceProvider.id.in_(
+                select([models.ResourceProviderAggregate.resource_provider_id])
+                .where(models.ResourceProviderAggregate.aggregate_uuid.in_(
+                    member_of))))
+        for resource_class, amount in (resources or {}).items():
+            query = query.filter(models.ResourceProvider.id.in_(
+                _resource_provider_capacity_query(resource_class, amount)))
+        return query.all()
+
+    def resource_provider_get(self, context, rp_uuid):
+        return _resource_provider_get(context, rp_uuid)
+
+    @oslo_db_api.retry_on_deadlock
+    def resource_provider_set_inventory(self, context, rp_uuid, name,
+                                        inventories):
+        with _session_for_write() as session:
+            try:
+                rp = _resource_provider_get(context, rp_uuid)
+            except exception.ResourceProviderNotFound:
+                rp = models.ResourceProvider(
+                    uuid=rp_uuid, name=name or rp_uuid, generation=0)
+                session.add(rp)
+                session.flush()
+
+            current = {inv.resource_class: inv for inv in model_query(
+                context, models.Inventory).filter_by(
+                resource_provider_id=rp.id)}
+            removed = set(current) - set(inventories)
+            if removed:
+                in_use = model_query(
+                    context, models.Allocation,
+                    models.Allocation.resource_class).filter(
+                    models.Allocation.resource_provider_id == rp.id,
+                    models.Allocation.resource_class.in_(removed)).distinct()
+                in_use = sorted(r.resource_class for r in in_use)
+                if in_use:
+                    raise exception.InventoryInUse(
+                        resource_classes=', '.join(in_use),
+                        resource_provider=rp_uuid)
+                model_query(context, models.Inventory).filter(
+                    models.Inventory.resource_provider_id == rp.id,
+                    models.Inventory.resource_class.in_(removed)).delete(
+                    synchronize_session=False)
+
+            changed = bool(removed)
+            for resource_class, values in inventories.items():
+                inv = current.get(resource_class)
+                if inv is None:
+                    inv = models.Inventory(resource_provider_id=rp.id,
+                                           resource_class=resource_class)
+                    session.add(inv)
+                elif all(inv[k] == v for k, v in values.items()):
+                    continue
+                inv.update(values)
+                changed = True
+            if changed:
+                _resource_provider_increment_generation(context, rp)
+            session.flush()
+            return rp
+
+    @oslo_db_api.retry_on_deadlock
+    def resource_provider_destroy(self, context, rp_uuid):
+        with _session_for_write():
+            rp = _resource_provider_get(context, rp_uuid)
+            for model in (models.Allocation, models.Inventory,
+                          models.ResourceProviderAggregate):
+                model_query(context, model).filter_by(
+                    resource_provider_id=rp.id).delete(
+                    synchronize_session=False)
+            model_query(context, models.ResourceProvider).filter_by(
+                id=rp.id).delete(synchronize_session=False)
+
+    def resource_provider_aggregates_get(self, context, rp_uuid):
+        rp = _resource_provider_get(context, rp_uuid)
+        query = model_query(
+            context, models.ResourceProviderAggregate,
+            models.ResourceProviderAggregate.aggregate_uuid).filter_by(
+            resource_provider_id=rp.id)
+        return [r.aggregate_uuid for r in query]
+
+    @oslo_db_api.retry_on_deadlock
+    def resource_provider_aggregates_set(self, context, rp_uuid,
+                                         aggregate_uuids):
+        with _session_for_write() as session:
+            rp = _resource_provider_get(context, rp_uuid)
+            model_query(context, models.ResourceProviderAggregate).filter_by(
+                resource_provider_id=rp.id).delete(synchronize_session=False)
+            for aggregate_uuid in set(aggregate_uuids):
+                session.add(models.ResourceProviderAggregate(
+                    resource_provider_id=rp.id,
+                    aggregate_uuid=aggregate_uuid))
+            _resource_provider_increment_generation(context, rp)
+            session.flush()
+
+    @oslo_db_api.wrap_db_retry(
+        retry_interval=0.1, max_retries=10, max_retry_interval=1,
+        retry_on_deadlock=True,
+        exception_checker=lambda e: isinstance(
+            e, exception.ResourceProviderConcurrentUpdate))
+    def resource_provider_aggregates_update(self, context, rp_uuid,
+                                            added=None, removed=None):
+        aggregate_model = models.ResourceProviderAggregate
+        with _session_for_write() as session:
+            rp = _resource_provider_get(context, rp_uuid)
+            aggregate_uuids = set(r.aggregate_uuid for r in model_query(
+                context, aggregate_model,
+                aggregate_model.aggregate_uuid).filter_by(
+                resource_provider_id=rp.id))
+            added = set(added or []) - aggregate_uuids
+            removed = set(removed or []) & aggregate_uuids
+            if not added and not removed:
+                return
+            if removed:
+                model_query(context, aggregate_model).filter(
+                    aggregate_model.resource_provider_id == rp.id,
+                    aggregate_model.aggregate_uuid.in_(removed)).delete(
+                    synchronize_session=False)
+            for aggregate_uuid in added:
+                session.add(aggregate_model(resource_provider_id=rp.id,
+                                            aggregate_uuid=aggregate_uuid))
+            # NOTE: The generation bump makes concurrent updates of the
+            # provider conflict, the loser is retried against the new
+            # aggregates.
+            _resource_provider_increment_generation(context, rp)
+            session.flush()
+
+    @oslo_db_api.retry_on_deadlock
+    def resource_provider_aggregate_remove(self, context, aggregate_uuid):
+        with _session_for_write():
+            model_query(context, models.ResourceProviderAggregate).filter_by(
+                aggregate_uuid=aggregate_uuid).delete(
+                synchronize_session=False)
+
+    # NOTE: Claims are made with a compare-and-swap of the provider
+    # generation, a concurrent claim on the same provider fails and is
+    # retried against the usages it committed.
+    @oslo_db_api.wrap_db_retry(
+        retry_interval=0.1, max_retries=10, max_retry_interval=1,
+        retry_on_deadlock=True,
+        exception_checker=lambda e: isinstance(
+            e, exception.ResourceProviderConcurrentUpdate))
+    def allocations_put(self, context, rp_uuid, consumer_id, resources,
+                        project_id=None, user_id=None):
+        with _session_for_write() as session:
+            rp = _resource_provider_get(context, rp_uuid)
+            # Replace the allocations of the consumer, its current usage
+            # must not count against the new claim.
+            model_query(context, models.Allocation).filter_by(
+                consumer_id=consumer_id).delete(synchronize_session=False)
+
+            inventories = {inv.resource_class: inv for inv in model_query(
+                context, models.Inventory).filter(
+                models.Inventory.resource_provider_id == rp.id,
+                models.Inventory.resource_class.in_(list(resources)))}
+            usages = dict(model_query(
+                context, models.Allocation, models.Allocation.resource_class,
+                func.sum(models.Allocation.used)).filter(
+                models.Allocation.resource_provider_id == rp.id,
+                models.Allocation.resource_class.in_(list(resources))
+            ).group_by(models.Allocation.resource_class))
+
+            for resource_class, amount in resources.items():
+                inv = inventories.get(resource_class)
+                if (inv is None or
+                        not _inventory_fits(inv, usages.get(resource_class, 0),
+                                            amount)):
+                    raise exception.InsufficientResources(
+                        amount=amount, resource_class=resource_class,
+                        resource_provider=rp_uuid)
+                session.add(models.Allocation(
+                    resource_provider_id=rp.id, consumer_id=consumer_id,
+                    resource_class=resource_class, used=amount,
+                    project_id=project_id, user_id=user_id))
+            _resource_provider_increment_generation(context, rp)
+            session.flush()
+
+    @oslo_db_api.retry_on_deadlock
+    def allocations_delete(self, context, consumer_id):
+        with _session_for_write():
+            count = model_query(context, models.Allocation).filter_by(
+                consumer_id=consumer_id).delete(synchronize_session=False)
+        return count
+
+    def allocations_get_by_resource_provider(self, context, rp_uuid):
+        rp = _resource_provider_get(context, rp_uuid)
+        return model_query(context, models.Allocation).filter_by(
+            resource_provider_id=rp.id).all()
+
+
+def _resource_provider_get(context, rp_uuid):
+    query = model_query(context, models.ResourceProvider).filter_by(
+        uuid=rp_uuid)
+    try:
+        return query.one()
+    except NoResultFound:
+        raise exception.ResourceProviderNotFound(resource_provider=rp_uuid)
+
+
+def _resource_provider_increment_generation(context, rp):
+    count = model_query(context, models.ResourceProvider).filter_by(
+        id=rp.id, generation=rp.generation).update(
+        {'generation': rp.generation + 1}, synchronize_session=False)
+    if not count:
+        raise exception.ResourceProviderConcurrentUpdate(
+            resource_provider=rp.uuid)
+    rp.generation += 1
+
+
+def _inventory_fits(inv, used, amount):
+    capacity = (inv.total - inv.reserved) * inv.allocation_ratio
+    return (inv.min_unit <= amount <= inv.max_unit and
+            amount % inv.step_size == 0 and
+            used + amount <= capacity)
+
+
+def _resource_provider_capacity_query(resource_class, amount):
+    """Select the ids of the providers with amount of resource_class free."""
+    inv = models.Inventory
+    alloc = models.Allocation
+    usages = select([alloc.resource_provider_id,
+                     func.sum(alloc.used).label('used')]).where(
+        alloc.resource_class == resource_class).group_by(
+        alloc.resource_provider_id).alias('usages')
+    return select([inv.resource_provider_id]).select_from(
+        inv.__table__.outerjoin(
+            usages, usages.c.resource_provider_id ==
+            inv.resource_provider_id)).where(and_(
+                inv.resource_class == resource_class,
+                inv.min_unit <= amount,
+                inv.max_unit >= amount,
+                literal(amount) % inv.step_size == 0,
+                (inv.total - inv.reserved) * inv.allocation_ratio -
+                func.coalesce(usages.c.used, 0) >= amount))
+
 
 def _get_id_from_flavor_query(context, type_id):
     return model_query(context, models.Flavors). \
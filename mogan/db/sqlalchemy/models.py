@@ -22,7 +22,7 @@ from oslo_db import options as db_options
 from oslo_db.sqlalchemy import models
 from oslo_db.sqlalchemy import types as db_types
 import six.moves.urllib.parse as urlparse
-from sqlalchemy import (Boolean, Column, DateTime, Enum, ForeignKey,
+from sqlalchemy import (Boolean, Column, DateTime, Enum, Float, ForeignKey,
                         Index, Text)
 from sqlalchemy import orm
 from sqlalchemy import schema, String, Integer
@@ -65,12 +65,19 @@ class MoganBase(models.TimestampMixin,
 Base = declarative_base(cls=MoganBase)
 
 
-class Server(Base):
+class Server(models.SoftDeleteMixin, Base):
     """Represents possible types for servers."""
 
     __tablename__ = 'servers'
     __table_args__ = (
-        Index('servers_project_id_idx', 'project_id'),
+        Index('servers_deleted_idx', 'deleted'),
+        Index('servers_project_id_status_idx', 'project_id', 'status'),
+        Index('servers_flavor_uuid_project_id_idx', 'flavor_uuid',
+              'project_id'),
+        Index('servers_node_uuid_idx', 'node_uuid'),
+        Index('servers_status_idx', 'status'),
+        Index('servers_name_idx', 'name'),
+        Index('servers_engine_host_status_idx', 'engine_host', 'status'),
         schema.UniqueConstraint('uuid', name='uniq_servers0uuid'),
         table_args()
     )
@@ -94,6 +101,8 @@ class Server(Base):
     locked_by = Column(Enum('owner', 'admin'))
     affinity_zone = Column(String(255), nullable=True)
     key_name = Column(String(255), nullable=True)
+    # The engine running the last operation queued for the server
+    engine_host = Column(String(255), nullable=True)
 
 
 class ServerNic(Base):
@@ -140,6 +149,100 @@ class ServerFault(Base):
         primaryjoin='Server.uuid == ServerFault.server_uuid')
 
 
+class ServerMetadataDocuments(Base):
+    """Represents the metadata documents served to a server."""
+
+    __tablename__ = 'server_metadata_documents'
+    __table_args__ = table_args()
+    server_uuid = Column(String(36), primary_key=True)
+    documents = Column(db_types.JsonEncodedDict(mysql_as_long=True))
+
+
+class ServerMetadataAddress(Base):
+    """Represents an address the metadata of a server is served to.
+
+    The same address may be used on several networks, by different servers.
+    """
+
+    __tablename__ = 'server_metadata_addresses'
+    __table_args__ = (
+        Index('server_metadata_addresses_address_idx', 'address'),
+        Index('server_metadata_addresses_server_uuid_idx', 'server_uuid'),
+        table_args()
+    )
+    network_id = Column(String(36), primary_key=True)
+    address = Column(String(64), primary_key=True)
+    server_uuid = Column(String(36), nullable=False)
+
+
+class ShadowServer(Base):
+    """Represents archived, soft deleted servers."""
+
+    __tablename__ = 'shadow_servers'
+    __table_args__ = (
+        Index('shadow_servers_uuid_idx', 'uuid'),
+        table_args()
+    )
+    id = Column(Integer, primary_key=True, autoincrement=False)
+    uuid = Column(String(36), nullable=False)
+    name = Column(String(255), nullable=False)
+    description = Column(String(255), nullable=True)
+    project_id = Column(String(36), nullable=True)
+    user_id = Column(String(36), nullable=True)
+    status = Column(String(255), nullable=True)
+    power_state = Column(String(15), nullable=True)
+    flavor_uuid = Column(String(36), nullable=True)
+    availability_zone = Column(String(255), nullable=True)
+    image_uuid = Column(String(36), nullable=True)
+    node = Column(String(255), nullable=True)
+    node_uuid = Column(String(36), nullable=True)
+    launched_at = Column(DateTime, nullable=True)
+    extra = Column(db_types.JsonEncodedDict)
+    partitions = Column(db_types.JsonEncodedDict)
+    locked = Column(Boolean)
+    locked_by = Column(Enum('admin', 'owner'))
+    affinity_zone = Column(String(255), nullable=True)
+    key_name = Column(String(255), nullable=True)
+    engine_host = Column(String(255), nullable=True)
+    deleted_at = Column(DateTime, nullable=True)
+    deleted = Column(Integer, default=0)
+
+
+class ShadowServerNic(Base):
+    """Represents the NIC info of soft deleted servers."""
+
+    __tablename__ = 'shadow_server_nics'
+    __table_args__ = (
+        Index('shadow_server_nics_server_uuid_idx', 'server_uuid'),
+        table_args()
+    )
+    # NOTE: Ports may be reused by later servers, so the port id alone
+    # is not unique in the shadow table.
+    server_uuid = Column(String(36), primary_key=True)
+    port_id = Column(String(36), primary_key=True)
+    mac_address = Column(String(32), nullable=False)
+    network_id = Column(String(36), nullable=True)
+    fixed_ips = Column(db_types.JsonEncodedList)
+    floating_ip = Column(String(64), nullable=True)
+    preserve_on_delete = Column(Boolean)
+
+
+class ShadowServerFault(Base):
+    """Represents archived fault info of soft deleted servers."""
+
+    __tablename__ = 'shadow_server_faults'
+    __table_args__ = (
+        Index('shadow_server_faults_server_uuid_idx', 'server_uuid'),
+        table_args()
+    )
+
+    id = Column(Integer, primary_key=True, autoincrement=False)
+    server_uuid = Column(String(36))
+    code = Column(Integer(), nullable=False)
+    message = Column(String(255))
+    detail = Column(MediumText())
+
+
 class Flavors(Base):
     """Represents possible types for servers."""
 
@@ -373,3 +476,76 @@ class ServerGroup(Base):
     @property
     def members(self):
         return [m.server_uuid for m in self._members]
+
+
+class ResourceProvider(Base):
+    """Represents a resource provider of the database placement backend."""
+
+    __tablename__ = 'resource_providers'
+    __table_args__ = (
+        schema.UniqueConstraint('uuid',
+                                name='uniq_resource_providers0uuid'),
+        table_args()
+    )
+    id = Column(Integer, primary_key=True)
+    uuid = Column(String(36), nullable=False)
+    name = Column(String(255), nullable=True)
+    generation = Column(Integer, nullable=False, default=0)
+
+
+class Inventory(Base):
+    """Represents an inventory of the database placement backend."""
+
+    __tablename__ = 'inventories'
+    __table_args__ = (
+        schema.UniqueConstraint(
+            'resource_provider_id', 'resource_class',
+            name='uniq_inventories0resource_provider_id0resource_class'),
+        table_args()
+    )
+    id = Column(Integer, primary_key=True)
+    resource_provider_id = Column(Integer, ForeignKey('resource_providers.id'),
+                                  nullable=False)
+    resource_class = Column(String(255), nullable=False)
+    total = Column(Integer, nullable=False)
+    reserved = Column(Integer, nullable=False)
+    min_unit = Column(Integer, nullable=False)
+    max_unit = Column(Integer, nullable=False)
+    step_size = Column(Integer, nullable=False)
+    allocation_ratio = Column(Float, nullable=False)
+
+
+class Allocation(Base):
+    """Represents an allocation of the database placement backend."""
+
+    __tablename__ = 'allocations'
+    __table_args__ = (
+        Index('allocations_resource_provider_class_used_idx',
+              'resource_provider_id', 'resource_class', 'used'),
+        Index('allocations_consumer_id_idx', 'consumer_id'),
+        table_args()
+    )
+    id = Column(Integer, primary_key=True)
+    resource_provider_id = Column(Integer, ForeignKey('resource_providers.id'),
+                                  nullable=False)
+    consumer_id = Column(String(36), nullable=False)
+    resource_class = Column(String(255), nullable=False)
+    used = Column(Integer, nullable=False)
+    project_id = Column(String(255), nullable=True)
+    user_id = Column(String(255), nullable=True)
+
+
+class ResourceProviderAggregate(Base):
+    """Represents an aggregate of a resource provider of the database
+    placement backend.
+    """
+
+    __tablename__ = 'resource_provider_aggregates'
+    __table_args__ = (
+        Index('resource_provider_aggregates_aggregate_uuid_idx',
+              'aggregate_uuid'),
+        table_args()
+    )
+    resource_provider_id = Column(Integer, ForeignKey('resource_providers.id'),
+                                  primary_key=True)
+    aggregate_uuid = Column(String(36), primary_key=True)
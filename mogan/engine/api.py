@@ -73,6 +73,7 @@ class API(object):
         self.quota.register_resource(objects.quota.ServerResource())
         self.quota.register_resource(objects.quota.KeyPairResource())
         self.consoleauth_rpcapi = consoleauth_rpcapi.ConsoleAuthAPI()
+        self.key_pair_pool = utils.KeyPairPool(CONF.api.key_pair_pool_size)
 
     def _get_image(self, context, image_uuid):
         return self.image_api.get(context, image_uuid)
@@ -422,16 +423,52 @@ class API(object):
         LOG.debug("Going to try to delete server %s", server.uuid)
         self._delete_server(context, server)
 
+    @check_server_lock
+    def _start_delete(self, context, server):
+        fsm = utils.get_state_machine(start_state=server.status)
+        utils.process_event(fsm, server, event='delete')
+
+    def delete_all(self, context, servers):
+        """Delete many servers.
+
+        The servers the delete could be started on are handed to the engine
+        in a single request.
+
+        :returns: a dict of error messages keyed by server uuid, for the
+                  servers the delete could not be started on.
+        """
+        LOG.debug("Going to try to delete %d servers", len(servers))
+        accepted = []
+        errors = {}
+        for server in servers:
+            try:
+                self._start_delete(context, server)
+            except exception.MoganException as e:
+                errors[server.uuid] = six.text_type(e)
+            else:
+                accepted.append(server)
+
+        if accepted:
+            reserve_opts = {'servers': -len(accepted)}
+            reservations = self.quota.reserve(context, **reserve_opts)
+            if reservations:
+                self.quota.commit(context, reservations)
+            self.engine_rpcapi.delete_servers(context, accepted)
+        return errors
+
     @check_server_lock
     @check_server_maintenance
+    def _start_power_action(self, context, server, target):
+        fsm = utils.get_state_machine(start_state=server.status)
+        utils.process_event(fsm, server,
+                            event=states.POWER_ACTION_MAP[target])
+
     def power(self, context, server, target):
         """Set power state of a server."""
         LOG.debug("Going to try to set server power state to %s",
                   target, server=server)
-        fsm = utils.get_state_machine(start_state=server.status)
         try:
-            utils.process_event(fsm, server,
-                                event=states.POWER_ACTION_MAP[target])
+            self._start_power_action(context, server, target)
         except exception.ServerNotFound:
             LOG.debug("Server is not found while setting power state",
                       server=server)
@@ -439,6 +476,31 @@ class API(object):
 
         self.engine_rpcapi.set_power_state(context, server, target)
 
+    def power_all(self, context, servers, target):
+        """Set power state of many servers.
+
+        The servers the power action could be started on are handed to the
+        engine in a single request.
+
+        :returns: a dict of error messages keyed by server uuid, for the
+                  servers the power action could not be started on.
+        """
+        LOG.debug("Going to try to set power state of %(count)d servers "
+                  "to %(target)s", {'count': len(servers), 'target': target})
+        accepted = []
+        errors = {}
+        for server in servers:
+            try:
+                self._start_power_action(context, server, target)
+            except exception.MoganException as e:
+                errors[server.uuid] = six.text_type(e)
+            else:
+                accepted.append(server)
+
+        if accepted:
+            self.engine_rpcapi.set_power_states(context, accepted, target)
+        return errors
+
     @check_server_lock
     @check_server_maintenance
     def rebuild(self, context, server, image_uuid=None,
@@ -599,7 +661,7 @@ class API(object):
 
     def _generate_key_pair(self, user_id, key_type):
         if key_type == keypair_obj.KEYPAIR_TYPE_SSH:
-            return utils.generate_key_pair()
+            return self.key_pair_pool.get()
         elif key_type == keypair_obj.KEYPAIR_TYPE_X509:
             return utils.generate_winrm_x509_cert(user_id)
 
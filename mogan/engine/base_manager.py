@@ -15,16 +15,65 @@
 
 """Base engine manager functionality."""
 
+import functools
+import time
+
 from eventlet import greenpool
+from eventlet import queue
+from oslo_log import log
+from oslo_reports.models import with_default_views as mwdv
 from oslo_service import periodic_task
 
 from mogan.baremetal import driver
 from mogan.common.i18n import _
+from mogan.common import metrics
 from mogan.conf import CONF
 from mogan.db import api as dbapi
 from mogan.engine import rpcapi
 from mogan import network
 
+LOG = log.getLogger(__name__)
+
+
+class PeriodicTaskStats(object):
+    """Statistics of the runs of a periodic task."""
+
+    def __init__(self, spacing):
+        self.spacing = spacing
+        self.runs = 0
+        self.failures = 0
+        self.overruns = 0
+        self.skipped_runs = 0
+        self.max_duration = 0.0
+        self.last_started_at = None
+        self.last_duration = None
+        self.last_items = None
+        self.last_external_calls = None
+
+    def as_dict(self):
+        return {'spacing': self.spacing,
+                'runs': self.runs,
+                'failures': self.failures,
+                'overruns': self.overruns,
+                'skipped_runs': self.skipped_runs,
+                'max_duration': self.max_duration,
+                'last_started_at': self.last_started_at,
+                'last_duration': self.last_duration,
+                'last_items': self.last_items,
+                'last_external_calls': self.last_external_calls}
+
+
+class PeriodicTaskReportGenerator(object):
+    """Generate the periodic tasks section of guru meditation reports."""
+
+    def __init__(self, manager):
+        self.manager = manager
+
+    def __call__(self):
+        return mwdv.ModelWithDefaultViews(
+            {name: stats.as_dict() for name, stats
+             in self.manager.periodic_task_stats.items()})
+
 
 class BaseEngineManager(periodic_task.PeriodicTasks):
 
@@ -40,8 +89,14 @@ class BaseEngineManager(periodic_task.PeriodicTasks):
         self._sync_power_pool = greenpool.GreenPool(
             size=CONF.engine.sync_power_state_pool_size)
         self._syncs_in_progress = {}
+        self._metrics_server = None
         self._started = False
 
+        self.periodic_task_stats = {}
+        self._periodic_tasks = [
+            (name, self._instrument_periodic_task(name, task))
+            for name, task in self._periodic_tasks]
+
     def init_host(self):
         """Initialize the engine host.
 
@@ -57,11 +112,150 @@ class BaseEngineManager(periodic_task.PeriodicTasks):
         self._worker_pool = greenpool.GreenPool(
             size=CONF.engine.workers_pool_size)
 
+        # Each type of long running operation has its own queue, consumed
+        # by a fixed number of workers, so a burst of slow operations of
+        # one type doesn't starve the others nor the RPC executor.
+        self._operation_queues = {}
+        self._operation_workers = greenpool.GreenPool(
+            size=sum(self._get_operation_workers().values()))
+        for operation, workers in self._get_operation_workers().items():
+            operation_queue = queue.LightQueue()
+            self._operation_queues[operation] = operation_queue
+            for i in range(workers):
+                self._operation_workers.spawn_n(self._run_operations,
+                                                operation_queue)
+
+        if CONF.metrics.prometheus_port:
+            self._metrics_server = metrics.serve(
+                CONF.metrics.prometheus_host, CONF.metrics.prometheus_port)
+
         self._started = True
 
     def del_host(self):
         self._worker_pool.waitall()
+        if self._started:
+            # Let the workers finish the queued operations, then stop.
+            for operation, workers in self._get_operation_workers().items():
+                for i in range(workers):
+                    self._operation_queues[operation].put(None)
+            self._operation_workers.waitall()
+        if self._metrics_server is not None:
+            self._metrics_server.kill()
+            self._metrics_server = None
         self._started = False
 
+    @staticmethod
+    def _get_operation_workers():
+        return {'power': CONF.engine.power_action_workers,
+                'rebuild': CONF.engine.rebuild_workers,
+                'delete': CONF.engine.delete_workers}
+
+    def _queue_operation(self, operation, function, context, *args,
+                         **kwargs):
+        """Queue an operation to run in the background."""
+        operation_queue = self._operation_queues[operation]
+        LOG.debug("Queueing %(operation)s operation, %(queued)d already "
+                  "queued.", {'operation': operation,
+                              'queued': operation_queue.qsize()})
+        operation_queue.put((function, context, args, kwargs))
+
+    @staticmethod
+    def _run_operations(operation_queue):
+        while True:
+            item = operation_queue.get()
+            if item is None:
+                return
+            function, context, args, kwargs = item
+            # NOTE: Make the context of the operation available for the
+            # logger to pull from threadlocal storage.
+            context.update_store()
+            try:
+                function(context, *args, **kwargs)
+            except Exception:
+                LOG.exception("Error running queued operation %s.",
+                              function.__name__)
+
+    def _instrument_periodic_task(self, name, task):
+        """Record the statistics and metrics of the runs of a periodic task.
+
+        Periodic tasks may return the number of items they processed, eg.
+        the number of nodes or servers they synchronized.
+        """
+        spacing = self._periodic_spacing[name]
+        stats = self.periodic_task_stats[name] = PeriodicTaskStats(spacing)
+        registry = metrics.get_registry()
+
+        @functools.wraps(task)
+        def _task(manager, context):
+            started_at = time.time()
+            if stats.last_started_at is not None:
+                # Runs are due every spacing seconds, the ones a run started
+                # too late for are skipped.
+                skipped = int((started_at - stats.last_started_at) //
+                              spacing) - 1
+                if skipped > 0:
+                    stats.skipped_runs += skipped
+                    registry.increment('periodic_task_skipped_runs', skipped,
+                                       task=name)
+                    LOG.warning('Periodic task %(task)s skipped %(skipped)d '
+                                'runs, it started %(late).1f seconds after '
+                                'it was due.',
+                                {'task': name, 'skipped': skipped,
+                                 'late': (started_at - stats.last_started_at -
+                                          spacing)},
+                                task=name, skipped_runs=skipped)
+            stats.last_started_at = started_at
+            stats.runs += 1
+            items = None
+            with metrics.count_external_calls() as calls:
+                try:
+                    items = task(manager, context)
+                except BaseException:
+                    stats.failures += 1
+                    registry.increment('periodic_task_failures', task=name)
+                    raise
+                finally:
+                    self._record_periodic_task_run(
+                        name, stats, time.time() - started_at, items, calls)
+            return items
+
+        return _task
+
+    @staticmethod
+    def _record_periodic_task_run(name, stats, duration, items, calls):
+        registry = metrics.get_registry()
+        stats.last_duration = duration
+        stats.max_duration = max(stats.max_duration, duration)
+        stats.last_items = items
+        stats.last_external_calls = dict(calls.counts)
+        registry.observe('periodic_task_duration_seconds', duration,
+                         task=name)
+        if items is not None:
+            registry.increment('periodic_task_items', items, task=name)
+        for service, count in calls.counts.items():
+            registry.increment('periodic_task_external_calls', count,
+                               task=name, service=service)
+        if duration > stats.spacing:
+            stats.overruns += 1
+            registry.increment('periodic_task_overruns', task=name)
+            LOG.warning('Periodic task %(task)s took %(duration).1f seconds, '
+                        'longer than its %(spacing)d seconds interval.',
+                        {'task': name, 'duration': duration,
+                         'spacing': stats.spacing},
+                        task=name, duration=duration, items=items,
+                        external_calls=stats.last_external_calls)
+        else:
+            LOG.debug('Periodic task %(task)s took %(duration).2f seconds.',
+                      {'task': name, 'duration': duration},
+                      task=name, duration=duration, items=items,
+                      external_calls=stats.last_external_calls)
+
     def periodic_tasks(self, context, raise_on_error=False):
+        """Run the periodic tasks which are due.
+
+        The duration, the items processed and the external calls of each
+        run are recorded in periodic_task_stats and in the metrics, as well
+        as the runs which took longer than the task interval, and the ones
+        skipped as a result.
+        """
         return self.run_periodic_tasks(context, raise_on_error=raise_on_error)
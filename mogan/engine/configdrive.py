@@ -57,15 +57,27 @@ class ConfigDriveBuilder(object):
             return False
         self.cleanup()
 
-    def _add_file(self, basedir, path, data):
+    def _add_file(self, basedir, path, data, written=None):
+        """Write a file of the config drive.
+
+        :param written: a dict of the paths of the files already written,
+                        keyed by their data. A file with the same data as
+                        one of them is hard linked to it, so mkisofs stores
+                        its content only once.
+        """
         filepath = os.path.join(basedir, path)
         dirname = os.path.dirname(filepath)
         fileutils.ensure_tree(dirname)
+        # the given data can be either text or bytes. we can only write
+        # bytes into files.
+        if isinstance(data, six.text_type):
+            data = data.encode('utf-8')
+        if written is not None:
+            if data in written:
+                os.link(written[data], filepath)
+                return
+            written[data] = filepath
         with open(filepath, 'wb') as f:
-            # the given data can be either text or bytes. we can only write
-            # bytes into files.
-            if isinstance(data, six.text_type):
-                data = data.encode('utf-8')
             f.write(data)
 
     def add_server_metadata(self, server_md):
@@ -73,8 +85,9 @@ class ConfigDriveBuilder(object):
             self.mdfiles.append((path, data))
 
     def _write_md_files(self, basedir):
+        written = {}
         for data in self.mdfiles:
-            self._add_file(basedir, data[0], data[1])
+            self._add_file(basedir, data[0], data[1], written)
 
     def _make_iso9660(self, path, tmpdir):
         publisher = "%(product)s %(version)s" % {
@@ -90,6 +103,7 @@ class ConfigDriveBuilder(object):
                       '-publisher',
                       publisher,
                       '-quiet',
+                      '-cache-inodes',
                       '-J',
                       '-r',
                       '-V', 'config-2',
@@ -243,9 +243,34 @@ class GenerateConfigDriveTask(flow_utils.MoganTask):
                 compressed.seek(0)
                 return base64.b64encode(compressed.read())
 
+    def _store_metadata_documents(self, context, server, user_data=None,
+                                  files=None, key_pair=None):
+        """Store the metadata documents served by mogan-metadata."""
+
+        i_meta = server_metadata.ServerMetadata(
+            server, content=files, user_data=user_data, key_pair=key_pair)
+        addresses = [{'network_id': nic.network_id,
+                      'address': ip['ip_address']}
+                     for nic in server.nics or []
+                     for ip in nic.fixed_ips or []]
+        documents = objects.ServerMetadataDocuments(
+            context, server_uuid=server.uuid,
+            documents=i_meta.metadata_documents(), addresses=addresses)
+        documents.save()
+
     def execute(self, context, server, user_data, injected_files, key_pair,
                 configdrive):
 
+        if CONF.metadata.store_documents:
+            self._store_metadata_documents(
+                context, server, user_data=user_data, files=injected_files,
+                key_pair=key_pair)
+            LOG.info("Metadata documents for server %(server)s stored.",
+                     {'server': server.uuid})
+
+        if not CONF.configdrive.enabled:
+            return
+
         try:
             configdrive['value'] = self._generate_configdrive(
                 context, server, user_data=user_data, files=injected_files,
@@ -16,6 +16,7 @@
 import functools
 import sys
 
+from oslo_context import context as common_context
 from oslo_log import log
 import oslo_messaging as messaging
 from oslo_service import periodic_task
@@ -27,6 +28,7 @@ import six
 from mogan.common import exception
 from mogan.common import flow_utils
 from mogan.common.i18n import _
+from mogan.common import metrics
 from mogan.common import states
 from mogan.common import utils
 from mogan.conf import CONF
@@ -49,6 +51,12 @@ POWER_NOTIFICATION_MAP = {
     'soft_reboot': fields.NotificationAction.SOFT_REBOOT
 }
 
+# The statuses of the servers with a queued operation, see queued_operation.
+QUEUED_OPERATION_STATES = frozenset([
+    states.DELETING, states.POWERING_ON, states.POWERING_OFF,
+    states.SOFT_POWERING_OFF, states.REBOOTING, states.SOFT_REBOOTING,
+    states.REBUILDING])
+
 
 @utils.expects_func_args('server')
 def wrap_server_fault(function):
@@ -75,6 +83,48 @@ def wrap_server_fault(function):
     return decorated_function
 
 
+def queued_operation(operation):
+    """Queue the decorated RPC handler to run in the background.
+
+    The handler returns as soon as the call is queued, so RPC executor
+    threads are not held while the operation waits on Ironic. Progress is
+    reported through the server status and notifications.
+
+    The queue is kept in memory, so the servers are marked with the engine
+    host once the call is received, until the operation is done, which
+    lets the engine find the servers of the operations it lost when it is
+    restarted. The casts not received yet stay in the message queue and
+    are not lost.
+    """
+
+    def decorator(function):
+        @functools.wraps(function)
+        def decorated_function(self, context, *args, **kwargs):
+            if 'servers' in kwargs:
+                servers = kwargs['servers']
+            elif 'server' in kwargs:
+                servers = [kwargs['server']]
+            else:
+                servers = args[0]
+                if isinstance(servers, objects.Server):
+                    servers = [servers]
+            objects.Server.set_engine_host(context, servers, self.host)
+
+            @functools.wraps(function)
+            def run_operation(context, *args, **kwargs):
+                try:
+                    return function(self, context, *args, **kwargs)
+                finally:
+                    objects.Server.set_engine_host(context, servers, None)
+
+            self._queue_operation(operation, run_operation,
+                                  context, *args, **kwargs)
+
+        return decorated_function
+
+    return decorator
+
+
 class EngineManager(base_manager.BaseEngineManager):
     """Mogan Engine manager main class."""
 
@@ -88,6 +138,31 @@ class EngineManager(base_manager.BaseEngineManager):
         self.quota.register_resource(objects.quota.ServerResource())
         self.scheduler_client = client.SchedulerClient()
 
+    def init_host(self):
+        super(EngineManager, self).init_host()
+        self._fail_lost_operations(common_context.get_admin_context())
+
+    def _fail_lost_operations(self, context):
+        """Set the servers of the operations lost on restart to error.
+
+        The queued operations are only kept in memory, so the ones which
+        were queued or running when the engine stopped are lost, and their
+        servers would stay in a transitional status forever.
+        """
+        servers = objects.Server.list(
+            context, filters={'status': list(QUEUED_OPERATION_STATES),
+                              'engine_host': self.host})
+        for server in servers:
+            LOG.warning('The %(status)s operation of server %(server)s was '
+                        'interrupted by an engine restart, setting it to '
+                        'error.', {'status': server.status,
+                                   'server': server.uuid})
+            exc = exception.ServerOperationInterrupted(status=server.status)
+            utils.add_server_fault_from_exc(context, server, exc)
+            fsm = utils.get_state_machine(start_state=server.status)
+            utils.process_event(fsm, server, event='error')
+        return len(servers)
+
     @periodic_task.periodic_task(
         spacing=CONF.engine.update_resources_interval,
         run_immediately=True)
@@ -106,26 +181,34 @@ class EngineManager(base_manager.BaseEngineManager):
         node_uuids = [node.uuid for node in all_nodes]
 
         # Clean orphan resource providers in placement
-        for rp in all_rps:
-            if rp['uuid'] not in node_uuids:
-                server_by_node = objects.Server.list(
-                    context, filters={'node_uuid': rp['uuid']})
-                if server_by_node:
-                    continue
-                self.scheduler_client.reportclient.delete_resource_provider(
-                    rp['uuid'])
-
+        orphan_rp_uuids = [rp['uuid'] for rp in all_rps
+                           if rp['uuid'] not in node_uuids]
+        if orphan_rp_uuids:
+            # Look up the servers of all orphan providers with a single
+            # indexed query instead of one query per provider.
+            servers_by_node = objects.Server.list(
+                context, filters={'node_uuid': orphan_rp_uuids})
+            used_rp_uuids = set(s.node_uuid for s in servers_by_node)
+            self.scheduler_client.reportclient.delete_resource_providers(
+                [rp_uuid for rp_uuid in orphan_rp_uuids
+                 if rp_uuid not in used_rp_uuids])
+
+        # Placement requests for all the nodes are sent concurrently
+        consumable_uuids = []
+        providers = []
         for node in all_nodes:
             if self.driver.is_node_consumable(node):
-                self.scheduler_client.reportclient \
-                    .delete_allocations_for_resource_provider(node.uuid)
+                consumable_uuids.append(node.uuid)
             resource_class = sched_utils.ensure_resource_class_name(
                 node.resource_class)
             inventory = self.driver.get_node_inventory(node)
             inventory_data = {resource_class: inventory}
-            self.scheduler_client.set_inventory_for_provider(
-                node.uuid, node.name or node.uuid, inventory_data,
-                resource_class)
+            providers.append((node.uuid, node.name or node.uuid,
+                              inventory_data, resource_class))
+        self.scheduler_client.reportclient \
+            .delete_allocations_for_resource_providers(consumable_uuids)
+        self.scheduler_client.set_inventory_for_providers(providers)
+        return len(all_nodes)
 
     @periodic_task.periodic_task(spacing=CONF.engine.sync_power_state_interval,
                                  run_immediately=True)
@@ -154,16 +237,9 @@ class EngineManager(base_manager.BaseEngineManager):
             return
 
         def _sync(db_server, node_power_state):
-            # This must be synchronized as we query state from two separate
-            # sources, the driver (ironic) and the database. They are set
-            # (in stop_server) and read, in sync.
-            @utils.synchronized(db_server.uuid)
-            def sync_server_power_state():
+            try:
                 self._sync_server_power_state(context, db_server,
                                               node_power_state)
-
-            try:
-                sync_server_power_state()
             except Exception:
                 LOG.exception("Periodic sync_power_state task had an "
                               "error while processing a server.",
@@ -171,7 +247,10 @@ class EngineManager(base_manager.BaseEngineManager):
 
             self._syncs_in_progress.pop(db_server.uuid)
 
-        db_servers = objects.Server.list(context)
+        # Only servers in a stable state are synchronized, so let the
+        # database filter out the rest.
+        db_servers = objects.Server.list(
+            context, filters={'status': [states.ACTIVE, states.STOPPED]})
         for db_server in db_servers:
             # process syncs asynchronously - don't want server locking to
             # block entire periodic task thread
@@ -180,14 +259,6 @@ class EngineManager(base_manager.BaseEngineManager):
                 LOG.debug('Sync power state already in progress for %s', uuid)
                 continue
 
-            if db_server.status not in (states.ACTIVE, states.STOPPED):
-                if db_server.status in states.UNSTABLE_STATES:
-                    LOG.info("During sync_power_state the server has a "
-                             "pending task (%(task)s). Skip.",
-                             {'task': db_server.status},
-                             server=db_server)
-                continue
-
             if uuid not in node_dict:
                 continue
 
@@ -197,6 +268,7 @@ class EngineManager(base_manager.BaseEngineManager):
                 self._syncs_in_progress[uuid] = True
                 self._sync_power_pool.spawn_n(_sync, db_server,
                                               node_power_state)
+        return len(db_servers)
 
     def _sync_server_power_state(self, context, db_server,
                                  node_power_state):
@@ -206,9 +278,6 @@ class EngineManager(base_manager.BaseEngineManager):
         then a stop() API will be called on the server.
         """
 
-        # We re-query the DB to get the latest server info to minimize
-        # (not eliminate) race condition.
-        db_server.refresh()
         db_power_state = db_server.power_state
 
         if db_server.status not in (states.ACTIVE, states.STOPPED):
@@ -219,7 +288,7 @@ class EngineManager(base_manager.BaseEngineManager):
             # and run the state sync in a later round
             LOG.info("During sync_power_state the server has a "
                      "pending task (%(task)s). Skip.",
-                     {'task': db_server.task_state},
+                     {'task': db_server.status},
                      server=db_server)
             return
 
@@ -232,9 +301,19 @@ class EngineManager(base_manager.BaseEngineManager):
                      {'db_power_state': db_power_state,
                       'node_power_state': node_power_state},
                      server=db_server)
-            # power_state is always updated from hypervisor to db
+            # power_state is always updated from hypervisor to db, unless
+            # a power action or another sync changed the server since it
+            # was listed. The compare-and-swap below replaces the per
+            # server lock, which only worked inside this engine process.
             db_server.power_state = node_power_state
-            db_server.save()
+            try:
+                db_server.save(expected_status=[states.ACTIVE,
+                                                states.STOPPED],
+                               expected_power_state=db_power_state)
+            except (exception.UnexpectedServerStatus,
+                    exception.UnexpectedServerPowerState) as e:
+                LOG.info("Skip syncing power state as the server changed "
+                         "meanwhile: %s", e, server=db_server)
 
     @periodic_task.periodic_task(spacing=CONF.engine.sync_maintenance_interval,
                                  run_immediately=True)
@@ -282,11 +361,49 @@ class EngineManager(base_manager.BaseEngineManager):
                 # transition here, and currently we just move to ACTIVE state
                 # regardless of it's real power state which may need sync power
                 # state periodic task to correct it.
-                server.status = states.ACTIVE
-                server.save()
+                self._set_maintenance_status(server, states.ACTIVE)
             elif node_maintenance and server.status != states.MAINTENANCE:
-                server.status = states.MAINTENANCE
-                server.save()
+                self._set_maintenance_status(server, states.MAINTENANCE)
+        return len(db_servers)
+
+    @staticmethod
+    def _set_maintenance_status(server, status):
+        current_status = server.status
+        server.status = status
+        try:
+            server.save(expected_status=current_status)
+        except exception.UnexpectedServerStatus as e:
+            LOG.info("Skip syncing maintenance state as the server changed "
+                     "meanwhile: %s", e, server=server)
+
+    @periodic_task.periodic_task(
+        spacing=CONF.engine.prune_server_faults_interval)
+    def _prune_server_faults(self, context):
+        """Only keep the latest faults of each server in the database."""
+        max_rows = CONF.engine.prune_server_faults_max_rows
+        count = 0
+        while True:
+            # Each batch is deleted in its own transaction, so the locks
+            # on the faults table are only held for a short time.
+            pruned = objects.ServerFault.prune(
+                context, CONF.engine.max_faults_per_server, max_rows)
+            count += pruned
+            if pruned < max_rows:
+                break
+        if count:
+            LOG.info("Pruned %(count)s stale server faults.",
+                     {'count': count})
+        return count
+
+    @periodic_task.periodic_task(spacing=CONF.database.archive_interval)
+    def _archive_deleted_servers(self, context):
+        """Move one batch of soft deleted servers to the shadow tables."""
+        count = objects.Server.archive_deleted(
+            context, CONF.database.archive_max_rows)
+        if count:
+            LOG.info("Archived %(count)s soft deleted servers.",
+                     {'count': count})
+        return count
 
     def destroy_networks(self, context, server):
         for nic in server.nics:
@@ -299,6 +416,32 @@ class EngineManager(base_manager.BaseEngineManager):
         if reservations:
             self.quota.commit(context, reservations)
 
+    def _report_flow_timings(self, context, server, flow, duration,
+                             timings):
+        """Log and notify the durations of a server flow and its tasks.
+
+        The reporting never fails the flow.
+        """
+        try:
+            metrics.get_registry().observe('flow_duration_seconds', duration,
+                                           flow=flow)
+            LOG.info("The %(flow)s flow of server %(uuid)s took "
+                     "%(duration).2f seconds: %(tasks)s",
+                     {'flow': flow, 'uuid': server.uuid,
+                      'duration': duration,
+                      'tasks': ', '.join('%s %s %.2fs' % (t['task'],
+                                                          t['action'],
+                                                          t['duration'])
+                                         for t in timings)},
+                     flow=flow, server_uuid=server.uuid, duration=duration,
+                     timings=timings)
+            notifications.notify_about_server_timing(
+                context, server, self.host, flow, duration, timings)
+        except Exception:
+            LOG.exception("Failed to report the timings of the %(flow)s "
+                          "flow of server %(uuid)s.",
+                          {'flow': flow, 'uuid': server.uuid})
+
     def schedule_and_create_servers(self, context, servers,
                                     requested_networks,
                                     user_data,
@@ -343,13 +486,14 @@ class EngineManager(base_manager.BaseEngineManager):
         LOG.info("The selected nodes %(nodes)s for servers",
                  {"nodes": nodes})
 
+        node_names = self.driver.get_node_names(nodes)
         for (server, node) in six.moves.zip(servers, nodes):
             server.node_uuid = node
-            server.node = self.driver.get_node_name(node)
-            server.save()
+            server.node = node_names[node]
             # Add a retry entry for the selected node
             retry_nodes = retry['nodes']
             retry_nodes.append(node)
+        objects.Server.save_all(context, servers)
 
         for server in servers:
             utils.spawn_n(self._create_server,
@@ -400,12 +544,17 @@ class EngineManager(base_manager.BaseEngineManager):
                 msg = _("Create manager server flow failed.")
                 LOG.exception(msg)
 
+        watch = timeutils.StopWatch()
+        timer = flow_utils.TimingListener(flow_engine)
+
         def _run_flow():
             # This code executes create server flow. If something goes wrong,
             # flow reverts all job that was done and reraises an exception.
             # Otherwise, all data that was generated by flow becomes available
             # in flow engine's storage.
-            with flow_utils.DynamicLogListener(flow_engine, logger=LOG):
+            with flow_utils.DynamicLogListener(flow_engine, logger=LOG), \
+                    timer:
+                watch.start()
                 flow_engine.run()
 
         try:
@@ -423,6 +572,9 @@ class EngineManager(base_manager.BaseEngineManager):
                           "Exception: %(exception)s",
                           {"uuid": server.uuid,
                            "exception": e})
+        finally:
+            self._report_flow_timings(context, server, 'create',
+                                      watch.elapsed(), timer.timings)
         # Advance the state model for the given event. Note that this
         # doesn't alter the server in any way. This may raise
         # InvalidState, if this event is not allowed in the current state.
@@ -451,6 +603,7 @@ class EngineManager(base_manager.BaseEngineManager):
                           {"uuid": server.uuid, "exception": e})
         self.driver.destroy(context, server)
 
+    @queued_operation('delete')
     @wrap_server_fault
     def delete_server(self, context, server):
         """Delete a server."""
@@ -462,7 +615,6 @@ class EngineManager(base_manager.BaseEngineManager):
         fsm = utils.get_state_machine(start_state=server.status,
                                       target_state=states.DELETED)
 
-        @utils.synchronized(server.uuid)
         def do_delete_server(server):
             try:
                 self._delete_server(context, server)
@@ -493,21 +645,129 @@ class EngineManager(base_manager.BaseEngineManager):
             phase=fields.NotificationPhase.END)
         LOG.info("Deleted server successfully.")
 
+    def _delete_servers_ports(self, context, servers):
+        """Delete or unbind the ports of many servers.
+
+        :returns: a dict of the exceptions raised, keyed by server uuid, for
+                  the servers whose ports could not be released.
+        """
+        port_servers = {}
+        errors = {}
+        for server in servers:
+            for nic in server.nics or []:
+                if not nic.preserve_on_delete:
+                    port_servers[nic.port_id] = server.uuid
+                    continue
+                try:
+                    vif_port = self.network_api.show_port(context,
+                                                          nic.port_id)
+                    self.network_api.unbind_port(context, vif_port)
+                except Exception:
+                    errors[server.uuid] = exception.InterfaceDetachFailed(
+                        server_uuid=server.uuid)
+
+        failed_ports = self.network_api.delete_ports(context,
+                                                     list(port_servers))
+        for port_id in failed_ports:
+            server_uuid = port_servers[port_id]
+            errors[server_uuid] = exception.InterfaceDetachFailed(
+                server_uuid=server_uuid)
+        return errors
+
+    def _destroy_servers_records(self, context, servers):
+        try:
+            objects.Server.destroy_all(context,
+                                       [server.uuid for server in servers])
+        except exception.ServerNotFound:
+            # Some servers were deleted concurrently, which rolled back the
+            # whole transaction, so delete the remaining ones one by one.
+            for server in servers:
+                try:
+                    server.destroy()
+                except exception.ServerNotFound:
+                    pass
+
+    @queued_operation('delete')
+    def delete_servers(self, context, servers):
+        """Delete many servers at once.
+
+        The driver tears down the nodes of all the servers concurrently and
+        waits for them with a single poller, then the ports are released
+        and the servers are removed from the DB in one transaction.
+        """
+        LOG.debug("Deleting %d servers.", len(servers))
+        for server in servers:
+            notifications.notify_about_server_action(
+                context, server, self.host,
+                action=fields.NotificationAction.DELETE,
+                phase=fields.NotificationPhase.START)
+
+        # Issue delete requests to driver only for servers associated with
+        # a underlying node.
+        associated = [server for server in servers if server.node_uuid]
+        try:
+            errors = self.driver.destroy_servers(context, associated)
+        except Exception as e:
+            LOG.exception("Destroy of %(count)d servers failed, the "
+                          "reason: %(reason)s",
+                          {"count": len(associated),
+                           "reason": six.text_type(e)})
+            errors = dict.fromkeys(
+                [server.uuid for server in associated], e)
+        destroyed = [server for server in servers
+                     if server.uuid not in errors]
+        errors.update(self._delete_servers_ports(context, destroyed))
+
+        deleted = [server for server in destroyed
+                   if server.uuid not in errors]
+        if deleted:
+            self._destroy_servers_records(context, deleted)
+        for server in deleted:
+            server.power_state = states.NOSTATE
+            server.status = states.DELETED
+            notifications.notify_about_server_action(
+                context, server, self.host,
+                action=fields.NotificationAction.DELETE,
+                phase=fields.NotificationPhase.END)
+        LOG.info("Deleted %d servers successfully.", len(deleted))
+
+        failed = [server for server in servers if server.uuid in errors]
+        for server in failed:
+            error = errors[server.uuid]
+            # As we're trying to delete always go to Error if something
+            # goes wrong.
+            try:
+                # NOTE: Re-raise the error so the fault records where it
+                # was raised.
+                try:
+                    raise error
+                except Exception:
+                    LOG.exception('Setting server status to ERROR',
+                                  server=server)
+                    utils.add_server_fault_from_exc(
+                        context, server, error, sys.exc_info())
+                fsm = utils.get_state_machine(start_state=server.status,
+                                              target_state=states.DELETED)
+                server.power_state = states.NOSTATE
+                utils.process_event(fsm, server, event='error')
+            except Exception:
+                LOG.exception("Failed to set server status to ERROR.",
+                              server=server)
+        if failed:
+            self._rollback_servers_quota(context, len(failed))
+
+    @queued_operation('power')
     @wrap_server_fault
     def set_power_state(self, context, server, state):
         """Set power state for the specified server."""
 
         fsm = utils.get_state_machine(start_state=server.status)
 
-        @utils.synchronized(server.uuid)
-        def do_set_power_state():
+        try:
             LOG.debug('Power %(state)s called for server %(server)s',
                       {'state': state,
                        'server': server})
             self.driver.set_power_state(context, server, state)
-
-        try:
-            do_set_power_state()
             server.power_state = self.driver.get_power_state(context,
                                                              server.uuid)
         except Exception as e:
@@ -517,23 +777,79 @@ class EngineManager(base_manager.BaseEngineManager):
                               {"state": state, "reason": six.text_type(e)})
                 server.power_state = self.driver.get_power_state(context,
                                                                  server.uuid)
-                if state in ['reboot', 'soft_reboot'] \
-                        and server.power_state != states.POWER_ON:
-                    utils.process_event(fsm, server, event='error')
-                else:
-                    utils.process_event(fsm, server, event='fail')
-
-                action = POWER_NOTIFICATION_MAP[state]
-                notifications.notify_about_server_action(
-                    context, server, self.host,
-                    action=action,
-                    phase=fields.NotificationPhase.ERROR,
-                    exception=e)
+                self._set_power_state_failed(context, server, fsm, state, e)
 
         utils.process_event(fsm, server, event='done')
         LOG.info('Successfully set node power state: %s',
                  state, server=server)
 
+    def _set_power_state_failed(self, context, server, fsm, state, exc):
+        if state in ['reboot', 'soft_reboot'] \
+                and server.power_state != states.POWER_ON:
+            utils.process_event(fsm, server, event='error')
+        else:
+            utils.process_event(fsm, server, event='fail')
+
+        action = POWER_NOTIFICATION_MAP[state]
+        notifications.notify_about_server_action(
+            context, server, self.host,
+            action=action,
+            phase=fields.NotificationPhase.ERROR,
+            exception=exc)
+
+    @queued_operation('power')
+    def set_power_states(self, context, servers, state):
+        """Set power state for many servers at once.
+
+        The driver requests all the power actions concurrently and waits
+        for them with a single poller. The result of each server is then
+        recorded in its status, and in a fault if its action failed.
+        """
+        LOG.debug('Power %(state)s called for %(count)d servers',
+                  {'state': state, 'count': len(servers)})
+        server_uuids = [server.uuid for server in servers]
+        try:
+            errors = self.driver.set_power_states(context, servers, state)
+        except Exception as e:
+            LOG.exception("Set servers power state to %(state)s failed, "
+                          "the reason: %(reason)s",
+                          {"state": state, "reason": six.text_type(e)})
+            errors = dict.fromkeys(server_uuids, e)
+        try:
+            power_states = self.driver.get_power_states(context,
+                                                        server_uuids)
+        except Exception as e:
+            # NOTE: The servers still leave their transitional status, the
+            # power state sync corrects their power state later on.
+            LOG.exception("Failed to get the power states of the servers "
+                          "after power %(state)s: %(reason)s",
+                          {"state": state, "reason": six.text_type(e)})
+            power_states = {}
+
+        for server in servers:
+            fsm = utils.get_state_machine(start_state=server.status)
+            server.power_state = power_states.get(server.uuid,
+                                                  states.NOSTATE)
+            error = errors.get(server.uuid)
+            try:
+                if error is None:
+                    utils.process_event(fsm, server, event='done')
+                    LOG.info('Successfully set node power state: %s',
+                             state, server=server)
+                else:
+                    # NOTE: Re-raise the error so the notification and the
+                    # fault record where it was raised.
+                    try:
+                        raise error
+                    except Exception:
+                        self._set_power_state_failed(context, server, fsm,
+                                                     state, error)
+                        utils.add_server_fault_from_exc(
+                            context, server, error, sys.exc_info())
+            except Exception:
+                LOG.exception("Failed to record the result of power "
+                              "%(state)s.", {'state': state}, server=server)
+
     def _rebuild_server(self, context, server, preserve_ephemeral):
         """Perform rebuild action on the specified server."""
 
@@ -541,6 +857,7 @@ class EngineManager(base_manager.BaseEngineManager):
 
         self.driver.rebuild(context, server, preserve_ephemeral)
 
+    @queued_operation('rebuild')
     @wrap_server_fault
     def rebuild_server(self, context, server, preserve_ephemeral):
         """Destroy and re-make this server.
@@ -632,6 +949,13 @@ class EngineManager(base_manager.BaseEngineManager):
                 self.network_api.delete_port(context, vif_port['id'],
                                              server.uuid)
             raise exception.InterfaceAttachFailed(message=six.text_type(e))
+
+        if CONF.metadata.store_documents:
+            objects.ServerMetadataDocuments.add_addresses(
+                context, server.uuid,
+                [{'network_id': vif_port['network_id'],
+                  'address': ip['ip_address']}
+                 for ip in vif_port['fixed_ips'] or []])
         LOG.info('Attaching interface successfully')
 
     def _detach_interface(self, context, server, port_id, preserve=False):
@@ -643,6 +967,16 @@ class EngineManager(base_manager.BaseEngineManager):
                         {'port_id': port_id, 'msg': six.text_type(e)})
             raise exception.InterfaceDetachFailed(server_uuid=server.uuid)
         else:
+            # NOTE: Stop serving the metadata of the server to the addresses
+            # of the port before they can be allocated to another server.
+            if CONF.metadata.store_documents:
+                addresses = [{'network_id': nic.network_id,
+                              'address': ip['ip_address']}
+                             for nic in server.nics or []
+                             if nic.port_id == port_id
+                             for ip in nic.fixed_ips or []]
+                objects.ServerMetadataDocuments.remove_addresses(
+                    context, server.uuid, addresses)
             try:
                 if preserve:
                     vif_port = self.network_api.show_port(context, port_id)
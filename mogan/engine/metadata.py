@@ -93,6 +93,7 @@ class ServerMetadata(object):
             self.content[key] = contents
 
         self.route_configuration = None
+        self._metadata_json = None
 
     def _route_configuration(self):
         if self.route_configuration:
@@ -111,6 +112,14 @@ class ServerMetadata(object):
         return self._route_configuration().handle_path(path_tokens)
 
     def _metadata_as_json(self, version, path):
+        # NOTE: The document is the same for all the versions, serialize it
+        # once and share the bytes.
+        if self._metadata_json is None:
+            self._metadata_json = jsonutils.dump_as_bytes(
+                self._build_metadata())
+        return self._metadata_json
+
+    def _build_metadata(self):
         metadata = {'uuid': self.uuid}
         if self.files:
             metadata['files'] = self.files
@@ -132,7 +141,7 @@ class ServerMetadata(object):
         metadata['name'] = self.server.name
         metadata['availability_zone'] = self.availability_zone
 
-        return jsonutils.dump_as_bytes(metadata)
+        return metadata
 
     def _handle_content(self, path_tokens):
         if len(path_tokens) == 1:
@@ -147,59 +156,83 @@ class ServerMetadata(object):
         return self.userdata_raw
 
     def lookup(self, path):
-        if path == "" or path[0] != "/":
-            path = posixpath.normpath("/" + path)
-        else:
-            path = posixpath.normpath(path)
-
-        # fix up requests, prepending /openstack to anything that does
-        # not match
-        path_tokens = path.split('/')[1:]
-        if path_tokens[0] not in ("openstack"):
-            if path_tokens[0] == "":
-                # request for /
-                path_tokens = ["openstack"]
-            else:
-                path_tokens = ["openstack"] + path_tokens
-            path = "/" + "/".join(path_tokens)
-
-        # all values of 'path' input starts with '/' and have no trailing /
+        path_tokens = split_path(path)
 
         # specifically handle the top level request
         if len(path_tokens) == 1:
             if path_tokens[0] == "openstack":
-                # NOTE(vish): don't show versions that are in the future
-                today = timeutils.utcnow().strftime("%Y-%m-%d")
-                versions = [v for v in OPENSTACK_VERSIONS if v <= today]
-                if OPENSTACK_VERSIONS != versions:
-                    LOG.debug("future versions %s hidden in version list",
-                              [v for v in OPENSTACK_VERSIONS
-                               if v not in versions], server=self.server)
-                versions += ["latest"]
+                versions = get_versions()
             return versions
 
         try:
             if path_tokens[0] == "openstack":
                 data = self.get_openstack_item(path_tokens[1:])
         except (InvalidMetadataVersion, KeyError):
-            raise InvalidMetadataPath(path)
+            raise InvalidMetadataPath("/" + "/".join(path_tokens))
 
         return data
 
     def metadata_for_config_drive(self):
-        """Yields (path, value) tuples for metadata elements."""
+        """Yields (path, value) tuples for metadata elements.
+
+        The same value object is yielded for the documents which are
+        identical across versions.
+        """
         ALL_OPENSTACK_VERSIONS = OPENSTACK_VERSIONS + ["latest"]
         for version in ALL_OPENSTACK_VERSIONS:
+            # The paths are known to be valid, so call the handlers directly
+            # rather than routing each path through lookup().
             path = 'openstack/%s/%s' % (version, MD_JSON_NAME)
-            yield (path, self.lookup(path))
+            yield (path, self._metadata_as_json(version, MD_JSON_NAME))
 
             path = 'openstack/%s/%s' % (version, UD_NAME)
             if self.userdata_raw is not None:
-                yield (path, self.lookup(path))
+                yield (path, self.userdata_raw)
 
         for (cid, content) in self.content.items():
             yield ('%s/%s/%s' % ("openstack", CONTENT_DIR, cid), content)
 
+    def metadata_documents(self):
+        """Returns the metadata elements keyed by path, base64 encoded."""
+        return dict((path, base64.encode_as_text(value))
+                    for (path, value) in self.metadata_for_config_drive())
+
+
+def split_path(path):
+    """Returns the tokens of a metadata path.
+
+    The path is normalized and anything which is not under /openstack is
+    moved under it.
+    """
+    if path == "" or path[0] != "/":
+        path = posixpath.normpath("/" + path)
+    else:
+        path = posixpath.normpath(path)
+
+    # fix up requests, prepending /openstack to anything that does
+    # not match
+    path_tokens = path.split('/')[1:]
+    if path_tokens[0] not in ("openstack"):
+        if path_tokens[0] == "":
+            # request for /
+            path_tokens = ["openstack"]
+        else:
+            path_tokens = ["openstack"] + path_tokens
+
+    # all values of 'path' input starts with '/' and have no trailing /
+    return path_tokens
+
+
+def get_versions():
+    """Returns the metadata versions to list under /openstack."""
+    # NOTE(vish): don't show versions that are in the future
+    today = timeutils.utcnow().strftime("%Y-%m-%d")
+    versions = [v for v in OPENSTACK_VERSIONS if v <= today]
+    if OPENSTACK_VERSIONS != versions:
+        LOG.debug("future versions %s hidden in version list",
+                  [v for v in OPENSTACK_VERSIONS if v not in versions])
+    return versions + ["latest"]
+
 
 class RouteConfiguration(object):
     """Routes metadata paths to request handlers."""
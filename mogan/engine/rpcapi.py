@@ -69,12 +69,23 @@ class EngineAPI(object):
         cctxt = self.client.prepare(topic=self.topic, server=CONF.host)
         cctxt.cast(context, 'delete_server', server=server)
 
+    def delete_servers(self, context, servers):
+        """Signal to engine service to delete many servers."""
+        cctxt = self.client.prepare(topic=self.topic, server=CONF.host)
+        cctxt.cast(context, 'delete_servers', servers=servers)
+
     def set_power_state(self, context, server, state):
         """Signal to engine service to perform power action on server."""
         cctxt = self.client.prepare(topic=self.topic, server=CONF.host)
         return cctxt.cast(context, 'set_power_state',
                           server=server, state=state)
 
+    def set_power_states(self, context, servers, state):
+        """Signal to engine service to perform power action on servers."""
+        cctxt = self.client.prepare(topic=self.topic, server=CONF.host)
+        return cctxt.cast(context, 'set_power_states',
+                          servers=servers, state=state)
+
     def rebuild_server(self, context, server, preserve_ephemeral):
         """Signal to engine service to rebuild a server."""
         cctxt = self.client.prepare(topic=self.topic, server=CONF.host)
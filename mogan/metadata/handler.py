@@ -0,0 +1,169 @@
+# Copyright 2017 Huawei Technologies Co.,LTD.
+# All Rights Reserved.
+#
+#    Licensed under the Apache License, Version 2.0 (the "License"); you may
+#    not use this file except in compliance with the License. You may obtain
+#    a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#    WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#    License for the specific language governing permissions and limitations
+#    under the License.
+
+"""Metadata request handler."""
+
+import hashlib
+import hmac
+import time
+
+from oslo_context import context
+from oslo_log import log as logging
+from oslo_serialization import base64
+from oslo_utils import encodeutils
+import webob.dec
+import webob.exc
+
+from mogan.common import exception
+from mogan.common.i18n import _
+from mogan.conf import CONF
+from mogan.engine import metadata
+from mogan import objects
+
+LOG = logging.getLogger(__name__)
+
+
+class MetadataRequestHandler(object):
+    """Serve the metadata documents of servers to their addresses.
+
+    The documents are stored by the engine when the servers are deployed,
+    see the store_documents option of the metadata group. The server an
+    address belongs to and the documents of the servers are cached for
+    cache_expiration seconds.
+
+    Behind the Neutron metadata proxy, the server is the one of the signed
+    X-Instance-ID header rather than the one of the remote address, so
+    servers on different networks may use the same addresses.
+    """
+
+    def __init__(self):
+        self._cache = {}
+        self._next_purge = 0
+
+    def _cache_get(self, key, load):
+        now = time.time()
+        cached = self._cache.get(key)
+        if cached is not None and cached[0] > now:
+            return cached[1]
+
+        value = load()
+        self._cache_set(key, value)
+        return value
+
+    def _cache_set(self, key, value):
+        expiration = CONF.metadata.cache_expiration
+        if not expiration:
+            return
+
+        now = time.time()
+        if now >= self._next_purge:
+            self._cache = dict((k, v) for (k, v) in self._cache.items()
+                               if v[0] > now)
+            self._next_purge = now + expiration
+        self._cache[key] = (now + expiration, value)
+
+    def _get_server_documents(self, server_uuid):
+        ctxt = context.get_admin_context()
+
+        def _load_by_server_uuid():
+            return objects.ServerMetadataDocuments.get_by_server_uuid(
+                ctxt, server_uuid).documents
+
+        return self._cache_get(('server', server_uuid), _load_by_server_uuid)
+
+    def _get_documents(self, address):
+        ctxt = context.get_admin_context()
+
+        def _load_by_address():
+            server_documents = objects.ServerMetadataDocuments.get_by_address(
+                ctxt, address)
+            self._cache_set(('server', server_documents.server_uuid),
+                            server_documents.documents)
+            return server_documents.server_uuid
+
+        server_uuid = self._cache_get(('address', address), _load_by_address)
+        return self._get_server_documents(server_uuid)
+
+    def _get_proxied_server_uuid(self, req):
+        server_uuid = req.headers.get('X-Instance-ID')
+        signature = req.headers.get('X-Instance-ID-Signature')
+        if not server_uuid or not signature:
+            raise webob.exc.HTTPBadRequest(
+                explanation=_('X-Instance-ID and X-Instance-ID-Signature '
+                              'headers are required.'))
+
+        expected_signature = hmac.new(
+            encodeutils.to_utf8(CONF.metadata.metadata_proxy_shared_secret),
+            encodeutils.to_utf8(server_uuid),
+            hashlib.sha256).hexdigest()
+        if not hmac.compare_digest(encodeutils.to_utf8(expected_signature),
+                                   encodeutils.to_utf8(signature)):
+            LOG.warning('X-Instance-ID-Signature %(signature)s does not '
+                        'match the expected value for server %(server)s, '
+                        'requested from %(address)s.',
+                        {'signature': signature, 'server': server_uuid,
+                         'address': req.headers.get('X-Forwarded-For')})
+            raise webob.exc.HTTPForbidden()
+        return server_uuid
+
+    def _get_remote_address(self, req):
+        if CONF.metadata.use_forwarded_for:
+            forwarded_for = req.headers.get('X-Forwarded-For')
+            if forwarded_for:
+                return forwarded_for.split(',')[0].strip()
+        return req.remote_addr
+
+    @webob.dec.wsgify(RequestClass=webob.Request)
+    def __call__(self, req):
+        if CONF.metadata.service_metadata_proxy:
+            source = self._get_proxied_server_uuid(req)
+            get_documents = self._get_server_documents
+        else:
+            remote_address = self._get_remote_address(req)
+            if not remote_address:
+                raise webob.exc.HTTPBadRequest(
+                    explanation=_('The remote address is unknown.'))
+            source = remote_address
+            get_documents = self._get_documents
+
+        try:
+            documents = get_documents(source)
+        except exception.ServerMetadataNotFound:
+            LOG.debug('No metadata found for %s.', source)
+            raise webob.exc.HTTPNotFound()
+        except exception.AmbiguousServerMetadataAddress as e:
+            LOG.warning('Not serving metadata: %s', e)
+            raise webob.exc.HTTPNotFound()
+        except Exception:
+            LOG.exception('Failed to get metadata for %s.', source)
+            raise webob.exc.HTTPInternalServerError(
+                explanation=_('An unknown error has occurred. Please try '
+                              'your request again.'))
+
+        path_tokens = metadata.split_path(req.path_info)
+        if len(path_tokens) == 1:
+            return webob.Response(text=u'\n'.join(metadata.get_versions()),
+                                  content_type='text/plain', charset='UTF-8')
+
+        path = '/'.join(path_tokens)
+        if path not in documents:
+            raise webob.exc.HTTPNotFound()
+
+        if path.endswith('.json'):
+            content_type = 'application/json'
+        else:
+            content_type = 'text/plain'
+        return webob.Response(body=base64.decode_as_bytes(documents[path]),
+                              content_type=content_type)
@@ -18,6 +18,7 @@
 Leverages nova/network/neutronv2/api.py
 '''
 
+from eventlet import greenpool
 from neutronclient.common import exceptions as neutron_exceptions
 from neutronclient.v2_0 import client as clientv20
 from oslo_log import log as logging
@@ -129,6 +130,41 @@ class API(object):
                     port_id, exc_info=True)
                 raise e
 
+    def delete_ports(self, context, port_ids):
+        """Delete many neutron ports.
+
+        Neutron has no bulk delete for ports, so the ports are deleted
+        concurrently with a single client.
+
+        :returns: a dict of the exceptions raised, keyed by port id, for the
+                  ports which could not be deleted.
+        """
+        client = get_client(context.auth_token)
+        errors = {}
+
+        def _delete_port(port_id):
+            try:
+                client.delete_port(port_id)
+            except neutron_exceptions.NeutronClientException as e:
+                if e.status_code == 404:
+                    LOG.warning("Port %s does not exist", port_id)
+                else:
+                    LOG.warning(
+                        "Failed to delete port %s for server.",
+                        port_id, exc_info=True)
+                    errors[port_id] = e
+            except Exception as e:
+                LOG.warning("Failed to delete port %s for server.",
+                            port_id, exc_info=True)
+                errors[port_id] = e
+
+        pool = greenpool.GreenPool(
+            size=CONF.neutron.max_concurrent_port_deletes)
+        for port_id in port_ids:
+            pool.spawn_n(_delete_port, port_id)
+        pool.waitall()
+        return errors
+
     def _safe_get_floating_ips(self, client, **kwargs):
         """Get floating IP gracefully handling 404 from Neutron."""
         try:
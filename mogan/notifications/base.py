@@ -61,3 +61,32 @@ def notify_about_server_action(context, server, host, action, phase=None,
             phase=phase),
         payload=payload)
     notification.emit(context)
+
+
+def notify_about_server_timing(context, server, host, flow, duration,
+                               timings, binary='mogan-engine'):
+    """Send versioned notification about the durations of a server flow
+    :param server: the server the flow ran for
+    :param host: the host emitting the notification
+    :param flow: the name of the flow
+    :param duration: the duration of the flow, in seconds
+    :param timings: the list of timings of the tasks of the flow, see
+                    mogan.common.flow_utils.TimingListener
+    :param binary: the binary emitting the notification
+    """
+
+    payload = server_notification.ServerTimingPayload(
+        server=server,
+        flow=flow,
+        duration=duration,
+        timings=timings)
+    notification = server_notification.ServerTimingNotification(
+        context=context,
+        priority=fields.NotificationPriority.INFO,
+        publisher=notification_base.NotificationPublisher(
+            context=context, host=host, binary=binary),
+        event_type=notification_base.EventType(
+            object='server',
+            action=fields.NotificationAction.TIMING),
+        payload=payload)
+    notification.emit(context)
@@ -35,7 +35,8 @@ class NotificationObject(base.MoganObject):
 @base.MoganObjectRegistry.register_notification
 class EventType(NotificationObject):
     # Version 1.0: Initial version
-    VERSION = '1.0'
+    # Version 1.1: New timing action
+    VERSION = '1.1'
 
     fields = {
         'object': fields.StringField(nullable=False),
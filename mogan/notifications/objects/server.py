@@ -133,3 +133,44 @@ class ServerActionNotification(base.NotificationBase):
     fields = {
         'payload': fields.ObjectField('ServerActionPayload')
     }
+
+
+@mogan_base.MoganObjectRegistry.register_notification
+class TaskTimingPayload(base.NotificationPayloadBase):
+    # Version 1.0: Initial version
+    VERSION = '1.0'
+    fields = {
+        'task': fields.StringField(nullable=False),
+        'action': fields.StringField(nullable=False),
+        'outcome': fields.StringField(nullable=False),
+        'duration': fields.FloatField(nullable=False),
+    }
+
+
+@mogan_base.MoganObjectRegistry.register_notification
+class ServerTimingPayload(ServerPayload):
+    # No SCHEMA as all the additional fields are calculated
+
+    # Version 1.0: Initial version
+    VERSION = '1.0'
+    fields = {
+        'flow': fields.StringField(nullable=False),
+        'duration': fields.FloatField(nullable=False),
+        'tasks': fields.ListOfObjectsField('TaskTimingPayload'),
+    }
+
+    def __init__(self, server, flow, duration, timings):
+        super(ServerTimingPayload, self).__init__(server=server)
+        self.flow = flow
+        self.duration = duration
+        self.tasks = [TaskTimingPayload(**timing) for timing in timings]
+
+
+@mogan_base.MoganObjectRegistry.register_notification
+class ServerTimingNotification(base.NotificationBase):
+    # Version 1.0: Initial version
+    VERSION = '1.0'
+
+    fields = {
+        'payload': fields.ObjectField('ServerTimingPayload')
+    }
@@ -30,6 +30,7 @@ def register_all():
     __import__('mogan.objects.server_nic')
     __import__('mogan.objects.quota')
     __import__('mogan.objects.server_fault')
+    __import__('mogan.objects.server_metadata_documents')
     __import__('mogan.objects.keypair')
     __import__('mogan.objects.aggregate')
     __import__('mogan.objects.server_group')
@@ -33,6 +33,10 @@ class IntegerField(object_fields.IntegerField):
     pass
 
 
+class FloatField(object_fields.FloatField):
+    pass
+
+
 class UUIDField(object_fields.UUIDField):
     pass
 
@@ -150,8 +154,9 @@ class NotificationAction(BaseMoganEnum):
     SOFT_REBOOT = 'soft_reboot'
     SHUTDOWN = 'shutdown'
     CREATE = 'create'
+    TIMING = 'timing'
 
-    ALL = (UPDATE, EXCEPTION, DELETE, CREATE, POWER_OFF)
+    ALL = (UPDATE, EXCEPTION, DELETE, CREATE, POWER_OFF, TIMING)
 
 
 class NotificationPhaseField(object_fields.BaseEnumField):
@@ -15,6 +15,7 @@
 
 from oslo_db import exception as db_exc
 from oslo_log import log as logging
+from oslo_utils import timeutils
 from oslo_versionedobjects import base as object_base
 
 from mogan.db import api as dbapi
@@ -169,27 +170,92 @@ class Server(base.MoganObject, object_base.VersionedObjectDictCompat):
         self.dbapi.server_destroy(context, self.uuid)
         self.obj_reset_changes()
 
-    def save(self, context=None):
-        """Save updates to this Server."""
+    @classmethod
+    def destroy_all(cls, context, server_uuids):
+        """Delete many Servers from the DB in a single transaction."""
+        cls.dbapi.servers_destroy(context, server_uuids)
+
+    @classmethod
+    def save_all(cls, context, servers):
+        """Save the updates of many Servers with one statement.
+
+        Only the column fields of the servers are saved, the changes of their
+        nics and metadata are not.
+        """
+        values = {}
+        for server in servers:
+            updates = server.obj_get_changes()
+            for field in OPTIONAL_ATTRS + ['metadata']:
+                updates.pop(field, None)
+            if updates:
+                values[server.uuid] = updates
+        cls.dbapi.servers_update_values(context, values)
+        for server in servers:
+            if server.uuid in values:
+                server.obj_reset_changes(fields=values[server.uuid])
+
+    @classmethod
+    def set_engine_host(cls, context, servers, host):
+        """Record the engine running the operations of many Servers."""
+        cls.dbapi.servers_set_engine_host(
+            context, [server.uuid for server in servers], host)
+
+    @classmethod
+    def archive_deleted(cls, context, max_rows):
+        """Archive up to max_rows soft deleted Servers.
+
+        :returns: the number of servers moved to the shadow tables.
+        """
+        return cls.dbapi.servers_archive_deleted(context, max_rows)
+
+    def save(self, context=None, expected_status=None,
+             expected_power_state=None):
+        """Save updates to this Server.
+
+        :param context: Security context.
+        :param expected_status: A status, or a list of statuses, the server
+                                must currently be in for the updates to be
+                                saved.
+        :param expected_power_state: A power state, or a list of power
+                                     states, the server must currently be
+                                     in for the updates to be saved.
+        :raises: UnexpectedServerStatus if the server is in another status.
+        :raises: UnexpectedServerPowerState if the server is in another
+                 power state.
+        """
         updates = self.obj_get_changes()
-        for field in list(updates):
+        object_updates = [
+            field for field in updates
             if (self.obj_attr_is_set(field) and
-                    isinstance(self.fields[field], object_fields.ObjectField)
-                    and getattr(self, field, None) is not None):
-                try:
-                    getattr(self, '_save_%s' % field)(context)
-                except AttributeError:
-                    LOG.exception('No save handler for %s', field,
-                                  server=self)
-                except db_exc.DBReferenceError as exp:
-                    if exp.key != 'server_uuid':
-                        raise
-                updates.pop(field)
+                isinstance(self.fields[field], object_fields.ObjectField) and
+                getattr(self, field, None) is not None)]
+        for field in object_updates:
+            updates.pop(field)
 
         metadata = updates.pop('metadata', None)
         if metadata is not None:
             updates['extra'] = metadata
-        self.dbapi.server_update(context, self.uuid, updates)
+        if object_updates and not updates and (
+                expected_status is not None or
+                expected_power_state is not None):
+            # NOTE: The expected status is still checked when only the
+            # nested objects change.
+            updates['updated_at'] = timeutils.utcnow()
+        # NOTE: Update the server first, so that nothing is saved when it is
+        # not in the expected status.
+        if updates:
+            self.dbapi.server_update_values(
+                context, self.uuid, updates, expected_status=expected_status,
+                expected_power_state=expected_power_state)
+
+        for field in object_updates:
+            try:
+                getattr(self, '_save_%s' % field)(context)
+            except AttributeError:
+                LOG.exception('No save handler for %s', field, server=self)
+            except db_exc.DBReferenceError as exp:
+                if exp.key != 'server_uuid':
+                    raise
         self.obj_reset_changes()
 
     def refresh(self, context=None):
@@ -64,6 +64,15 @@ class ServerFault(base.MoganObject, object_base.VersionedObjectDictCompat):
             return cls._from_db_object(context, cls(),
                                        db_faults[server_uuid][0])
 
+    @classmethod
+    def prune(cls, context, max_faults, max_rows):
+        """Only keep the latest max_faults faults of each server.
+
+        :param max_rows: the maximum number of faults deleted at once.
+        :returns: the number of faults deleted.
+        """
+        return cls.dbapi.server_fault_prune(context, max_faults, max_rows)
+
     def create(self):
         if self.obj_attr_is_set('id'):
             raise exception.ObjectActionError(action='create',
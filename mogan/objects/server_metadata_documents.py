@@ -0,0 +1,83 @@
+# Copyright 2017 Huawei Technologies Co.,LTD.
+# All Rights Reserved.
+#
+#    Licensed under the Apache License, Version 2.0 (the "License"); you may
+#    not use this file except in compliance with the License. You may obtain
+#    a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#    WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#    License for the specific language governing permissions and limitations
+#    under the License.
+
+from oslo_versionedobjects import base as object_base
+
+from mogan.db import api as dbapi
+from mogan.objects import base
+from mogan.objects import fields as object_fields
+
+
+@base.MoganObjectRegistry.register
+class ServerMetadataDocuments(base.MoganObject,
+                              object_base.VersionedObjectDictCompat):
+    """The metadata documents of a server, keyed by path.
+
+    The documents are base64 encoded, they are served by mogan-metadata
+    to the addresses of the server, dicts with the network_id and address
+    keys.
+    """
+    # Version 1.0: Initial version
+    VERSION = '1.0'
+
+    dbapi = dbapi.get_instance()
+
+    fields = {
+        'server_uuid': object_fields.UUIDField(),
+        'documents': object_fields.FlexibleDictField(),
+        'addresses': object_fields.ListOfDictOfNullableStringsField(
+            nullable=True),
+    }
+
+    @staticmethod
+    def _from_db_object(context, obj, db_obj):
+        obj.server_uuid = db_obj['server_uuid']
+        obj.documents = db_obj['documents']
+        obj._context = context
+        obj.obj_reset_changes()
+        return obj
+
+    @classmethod
+    def get_by_server_uuid(cls, context, server_uuid):
+        db_obj = cls.dbapi.server_metadata_documents_get(context,
+                                                         server_uuid)
+        return cls._from_db_object(context, cls(context), db_obj)
+
+    @classmethod
+    def get_by_address(cls, context, address):
+        db_obj = cls.dbapi.server_metadata_documents_get_by_address(context,
+                                                                    address)
+        return cls._from_db_object(context, cls(context), db_obj)
+
+    @classmethod
+    def add_addresses(cls, context, server_uuid, addresses):
+        """Serve the documents of a server to more addresses."""
+        if addresses:
+            cls.dbapi.server_metadata_addresses_add(context, server_uuid,
+                                                    addresses)
+
+    @classmethod
+    def remove_addresses(cls, context, server_uuid, addresses):
+        """Stop serving the documents of a server to addresses."""
+        if addresses:
+            cls.dbapi.server_metadata_addresses_remove(context, server_uuid,
+                                                       addresses)
+
+    def save(self, context=None):
+        """Store the documents, replacing the previous ones of the server."""
+        addresses = self.obj_attr_is_set('addresses') and self.addresses
+        self.dbapi.server_metadata_documents_set(
+            self._context, self.server_uuid, self.documents, addresses or [])
+        self.obj_reset_changes()
@@ -17,8 +17,14 @@ import functools
 
 from oslo_utils import importutils
 
+from mogan.conf import CONF
 from mogan.scheduler import utils
 
+_REPORT_CLIENTS = {
+    'http': 'mogan.scheduler.client.report.SchedulerReportClient',
+    'database': 'mogan.scheduler.client.db_report.DBReportClient',
+}
+
 
 class LazyLoader(object):
 
@@ -44,7 +50,7 @@ class SchedulerClient(object):
         self.queryclient = LazyLoader(importutils.import_class(
             'mogan.scheduler.client.query.SchedulerQueryClient'))
         self.reportclient = LazyLoader(importutils.import_class(
-            'mogan.scheduler.client.report.SchedulerReportClient'))
+            _REPORT_CLIENTS[CONF.placement.backend]))
 
     @utils.retry_select_destinations
     def select_destinations(self, context, spec_obj, filter_properties):
@@ -59,3 +65,6 @@ class SchedulerClient(object):
             inv_data,
             res_class
         )
+
+    def set_inventory_for_providers(self, providers):
+        self.reportclient.set_inventory_for_providers(providers)
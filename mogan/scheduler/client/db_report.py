@@ -0,0 +1,178 @@
+# Copyright 2017 Huawei Technologies Co.,LTD.
+# All Rights Reserved.
+#
+#    Licensed under the Apache License, Version 2.0 (the "License"); you may
+#    not use this file except in compliance with the License. You may obtain
+#    a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#    WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#    License for the specific language governing permissions and limitations
+#    under the License.
+
+"""Placement backed by the mogan database."""
+
+from oslo_context import context
+from oslo_log import log as logging
+
+from mogan.common import exception
+from mogan.db import api as dbapi
+
+LOG = logging.getLogger(__name__)
+
+
+def _provider_dict(rp):
+    return {'uuid': rp.uuid, 'name': rp.name, 'generation': rp.generation}
+
+
+class DBReportClient(object):
+    """Report client keeping the placement records in the mogan database.
+
+    It has the interface of SchedulerReportClient, without the HTTP round
+    trips to a placement service. Resources are claimed atomically by the
+    database, so it can be shared by all the schedulers and engines of a
+    deployment.
+    """
+
+    def __init__(self):
+        self.dbapi = dbapi.get_instance()
+
+    @staticmethod
+    def _context():
+        return context.get_admin_context()
+
+    def get_filtered_resource_providers(self, filters):
+        """Returns a list of resource providers matching the filters.
+
+        eg. filters = {'resources': {'CUSTOM_BAREMETAL_GOLD': 1}}
+            filters = {'member_of': 'in:<aggregate uuid>,<aggregate uuid>'}
+        """
+        member_of = filters.get('member_of')
+        if member_of:
+            if member_of.startswith('in:'):
+                member_of = member_of[3:]
+            member_of = member_of.split(',')
+        rps = self.dbapi.resource_provider_get_all(
+            self._context(), resources=filters.get('resources'),
+            member_of=member_of)
+        return [_provider_dict(rp) for rp in rps]
+
+    def set_inventory_for_provider(self, rp_uuid, rp_name, inv_data,
+                                   resource_class):
+        """Given the UUID of a provider, set the inventory records for the
+        provider to the supplied dict of resources.
+
+        :param rp_uuid: UUID of the resource provider to set inventory for
+        :param rp_name: Name of the resource provider in case we need to create
+                        a record for it
+        :param inv_data: Dict, keyed by resource class name, of inventory data
+                         to set against the provider
+        :raises: InventoryInUse if a resource class removed from the inventory
+                 is allocated.
+        """
+        self.dbapi.resource_provider_set_inventory(
+            self._context(), rp_uuid, rp_name, inv_data)
+
+    def set_inventory_for_providers(self, providers):
+        for rp_uuid, rp_name, inv_data, resource_class in providers:
+            self.set_inventory_for_provider(rp_uuid, rp_name, inv_data,
+                                            resource_class)
+
+    def put_allocations(self, rp_uuid, consumer_uuid, alloc_data, project_id,
+                        user_id):
+        """Creates allocation records for the supplied server UUID against
+        the supplied resource provider.
+
+        :returns: True if the allocations were created, False otherwise.
+        """
+        try:
+            self.dbapi.allocations_put(self._context(), rp_uuid,
+                                       consumer_uuid, alloc_data,
+                                       project_id, user_id)
+        except (exception.ResourceProviderNotFound,
+                exception.InsufficientResources) as e:
+            LOG.warning('Unable to submit allocation for server %(uuid)s: '
+                        '%(reason)s', {'uuid': consumer_uuid, 'reason': e})
+            return False
+        return True
+
+    def delete_allocation_for_server(self, uuid):
+        if self.dbapi.allocations_delete(self._context(), uuid):
+            LOG.info('Deleted allocation for server %s', uuid)
+
+    def get_allocations_for_resource_provider(self, rp_uuid):
+        try:
+            allocations = self.dbapi.allocations_get_by_resource_provider(
+                self._context(), rp_uuid)
+        except exception.ResourceProviderNotFound:
+            return {}
+        result = {}
+        for allocation in allocations:
+            resources = result.setdefault(
+                allocation.consumer_id, {'resources': {}})['resources']
+            resources[allocation.resource_class] = allocation.used
+        return result
+
+    def delete_allocations_for_resource_provider(self, rp_uuid):
+        allocations = self.get_allocations_for_resource_provider(rp_uuid)
+        if not allocations:
+            return
+        LOG.info('Deleted allocation for resource provider %s', rp_uuid)
+        for consumer_id in allocations:
+            self.delete_allocation_for_server(consumer_id)
+
+    def delete_allocations_for_resource_providers(self, rp_uuids):
+        for rp_uuid in rp_uuids:
+            self.delete_allocations_for_resource_provider(rp_uuid)
+
+    def delete_resource_provider(self, rp_uuid):
+        try:
+            self.dbapi.resource_provider_destroy(self._context(), rp_uuid)
+        except exception.ResourceProviderNotFound:
+            return
+        LOG.info("Deleted resource provider %s", rp_uuid)
+
+    def delete_resource_providers(self, rp_uuids):
+        for rp_uuid in rp_uuids:
+            self.delete_resource_provider(rp_uuid)
+
+    def get_nodes_from_resource_providers(self):
+        rps = self.dbapi.resource_provider_get_all(self._context())
+        return {'nodes': [rp.name for rp in rps]}
+
+    def get_nodes_from_aggregate(self, aggregate_uuid):
+        rps = self.dbapi.resource_provider_get_all(
+            self._context(), member_of=[aggregate_uuid])
+        return {'nodes': [rp.name for rp in rps]}
+
+    def _get_provider_by_name(self, ctxt, node):
+        rps = self.dbapi.resource_provider_get_all(ctxt, name=node)
+        if not rps:
+            raise exception.NodeNotFound(node=node)
+        return rps[0]
+
+    def update_aggregate_node(self, aggregate_uuid, node, action):
+        ctxt = self._context()
+        rp = self._get_provider_by_name(ctxt, node)
+        if action == 'add':
+            self.dbapi.resource_provider_aggregates_update(
+                ctxt, rp.uuid, added=[aggregate_uuid])
+        elif action == 'remove':
+            self.dbapi.resource_provider_aggregates_update(
+                ctxt, rp.uuid, removed=[aggregate_uuid])
+        else:
+            LOG.info('Bad action parameter for update_aggregate_node() %s',
+                     action)
+
+    def remove_aggregate(self, aggregate_uuid):
+        self.dbapi.resource_provider_aggregate_remove(self._context(),
+                                                      aggregate_uuid)
+
+    def get_aggregates_from_node(self, node):
+        ctxt = self._context()
+        rp = self._get_provider_by_name(ctxt, node)
+        aggs = self.dbapi.resource_provider_aggregates_get(ctxt, rp.uuid)
+        return {'aggregates': aggs}
@@ -19,15 +19,21 @@ Leverages nova/scheduler/client/report.py
 
 import functools
 import re
+import sys
 import time
 
+from eventlet import greenpool
+from eventlet import semaphore
 from keystoneauth1 import exceptions as ks_exc
 from keystoneauth1 import loading as keystone
+from keystoneauth1 import session as ks_session
 from oslo_config import cfg
 from oslo_log import log as logging
+import six
 from six.moves.urllib import parse
 
 from mogan.common import exception
+from mogan.common import metrics
 
 CONF = cfg.CONF
 LOG = logging.getLogger(__name__)
@@ -35,6 +41,8 @@ LOG = logging.getLogger(__name__)
 _RE_INV_IN_USE = re.compile("Inventory for (.+) on resource provider "
                             "(.+) in use")
 WARN_EVERY = 10
+# Seconds to wait before retrying a failed placement version discovery
+_DISCOVERY_RETRY_INTERVAL = 60
 
 
 def warn_limit(self, msg):
@@ -89,6 +97,10 @@ def _extract_inventory_in_use(body):
     return None
 
 
+def _parse_version(version):
+    return tuple(int(part) for part in version.split('.'))
+
+
 def get_placement_request_id(response):
     if response is not None:
         return response.headers.get(
@@ -111,41 +123,101 @@ class SchedulerReportClient(object):
             CONF, 'placement')
         self._client = keystone.load_session_from_conf_options(
             CONF, 'placement', auth=auth_plugin)
+        # NOTE: requests keeps up to 10 connections per host, size the pool
+        # to the number of requests we may send to placement at once.
+        pool_size = CONF.placement.max_concurrent_requests
+        self._request_semaphore = semaphore.Semaphore(pool_size)
+        for prefix in ('https://', 'http://'):
+            self._client.session.mount(prefix, ks_session.TCPKeepAliveAdapter(
+                pool_connections=pool_size, pool_maxsize=pool_size))
         # NOTE(danms): Keep track of how naggy we've been
         self._warn_count = 0
         self.ks_filter = {'service_type': 'placement',
                           'region_name': CONF.placement.os_region_name,
                           'interface': CONF.placement.os_interface}
+        # OpenStack-API-Version header values, keyed by microversion
+        self._version_headers = {}
+        # Microversions placement answered with a 406
+        self._unsupported_versions = set()
+        # A dict, keyed by URL, of (ETag, body) tuples of the last provider,
+        # inventory and aggregate GETs
+        self._get_cache = {}
+        self._next_discovery = 0
+        self._max_version = self._discover_max_version()
 
-    def get(self, url, version=None):
-        kwargs = {}
+    @safe_connect
+    def _discover_max_version(self):
+        """Queries the placement API root for the maximum microversion it
+        supports.
+
+        Returns the version as a tuple of ints, or None if it could not be
+        determined.
+        """
+        self._next_discovery = time.time() + _DISCOVERY_RETRY_INTERVAL
+        resp = self.get('/')
+        if resp.status_code != 200:
+            LOG.warning('Unable to discover the placement API version: '
+                        '%(code)i %(text)s',
+                        {'code': resp.status_code, 'text': resp.text})
+            return None
+        versions = resp.json().get('versions') or [{}]
+        max_version = versions[0].get('max_version')
+        if not max_version:
+            # NOTE: Placement servers older than microversion support only
+            # ever served 1.0.
+            return (1, 0)
+        LOG.debug('Placement API supports microversions up to %s',
+                  max_version)
+        return _parse_version(max_version)
+
+    def _version_supported(self, version):
+        """Returns whether the placement API supports a microversion.
+
+        The maximum version is discovered once. Until that succeeds, which is
+        retried at most every _DISCOVERY_RETRY_INTERVAL seconds, every
+        version is assumed to be supported and the callers fall back on a
+        406 response, which is remembered with _version_unsupported().
+        """
+        if version in self._unsupported_versions:
+            return False
+        if (self._max_version is None and
+                time.time() >= self._next_discovery):
+            self._max_version = self._discover_max_version()
+        if self._max_version is None:
+            return True
+        return _parse_version(version) <= self._max_version
+
+    def _version_unsupported(self, version):
+        self._unsupported_versions.add(version)
+
+    def _headers(self, version):
+        # NOTE: keystoneauth updates the headers it is given, so each
+        # request gets its own dict.
+        value = self._version_headers.get(version)
+        if value is None:
+            value = 'placement %s' % version
+            self._version_headers[version] = value
+        return {'OpenStack-API-Version': value}
+
+    def _request(self, method, url, version=None, headers=None, **kwargs):
         if version is not None:
-            # TODO(mriedem): Perform some version discovery at some point.
-            kwargs = {
-                'headers': {
-                    'OpenStack-API-Version': 'placement %s' % version
-                },
-            }
-        return self._client.get(
-            url,
-            endpoint_filter=self.ks_filter, raise_exc=False, **kwargs)
+            headers = dict(self._headers(version), **(headers or {}))
+        if headers:
+            kwargs['headers'] = headers
+        with self._request_semaphore, metrics.time_external_call('placement'):
+            return self._client.request(
+                url, method,
+                endpoint_filter=self.ks_filter, raise_exc=False, **kwargs)
+
+    def get(self, url, version=None, headers=None):
+        return self._request('GET', url, version=version, headers=headers)
 
     def post(self, url, data, version=None):
         # NOTE(sdague): using json= instead of data= sets the
         # media type to application/json for us. Placement API is
         # more sensitive to this than other APIs in the OpenStack
         # ecosystem.
-        kwargs = {}
-        if version is not None:
-            # TODO(mriedem): Perform some version discovery at some point.
-            kwargs = {
-                'headers': {
-                    'OpenStack-API-Version': 'placement %s' % version
-                },
-            }
-        return self._client.post(
-            url, json=data,
-            endpoint_filter=self.ks_filter, raise_exc=False, **kwargs)
+        return self._request('POST', url, version=version, json=data)
 
     def put(self, url, data, version=None):
         # NOTE(sdague): using json= instead of data= sets the
@@ -153,23 +225,71 @@ class SchedulerReportClient(object):
         # more sensitive to this than other APIs in the OpenStack
         # ecosystem.
         kwargs = {}
-        if version is not None:
-            # TODO(mriedem): Perform some version discovery at some point.
-            kwargs = {
-                'headers': {
-                    'OpenStack-API-Version': 'placement %s' % version
-                },
-            }
         if data is not None:
             kwargs['json'] = data
-        return self._client.put(
-            url, endpoint_filter=self.ks_filter, raise_exc=False,
-            **kwargs)
+        return self._request('PUT', url, version=version, **kwargs)
 
     def delete(self, url):
-        return self._client.delete(
-            url,
-            endpoint_filter=self.ks_filter, raise_exc=False)
+        return self._request('DELETE', url)
+
+    def _map(self, func, *iterables):
+        """Call func for each item of iterables, concurrently.
+
+        At most [placement]max_concurrent_requests calls run at the same
+        time, and as many requests are sent to placement at once by all of
+        them. Returns the list of results, in the order of the items.
+
+        A call raising doesn't stop the others: all the calls are done,
+        then the exception of the first failed item is raised.
+        """
+        pool = greenpool.GreenPool(
+            size=CONF.placement.max_concurrent_requests)
+        calls = metrics.get_external_calls()
+
+        def _func(*args):
+            # Count the requests as made by the calling green thread
+            with metrics.count_external_calls(calls):
+                try:
+                    return func(*args), None
+                except Exception:
+                    return None, sys.exc_info()
+
+        results = list(pool.imap(_func, *iterables))
+        failures = [exc_info for (result, exc_info) in results
+                    if exc_info is not None]
+        for exc_info in failures[1:]:
+            LOG.error('Placement request failed.', exc_info=exc_info)
+        if failures:
+            six.reraise(*failures[0])
+        return [result for (result, exc_info) in results]
+
+    def _cached_get(self, url, version=None):
+        """GET a resource provider sub-resource, reusing the cached body.
+
+        When placement returned an ETag for the cached body, the request is
+        made conditional so an unchanged resource is answered with a 304
+        and no body. Returns a tuple of the response and its decoded body,
+        the body being None if the request failed.
+        """
+        cached = self._get_cache.get(url)
+        headers = None
+        if cached is not None and cached[0]:
+            headers = {'If-None-Match': cached[0]}
+        resp = self.get(url, version=version, headers=headers)
+        if resp.status_code == 304 and cached is not None:
+            return resp, cached[1]
+        if resp.status_code != 200:
+            self._get_cache.pop(url, None)
+            return resp, None
+        data = resp.json()
+        self._get_cache[url] = (resp.headers.get('ETag'), data)
+        return resp, data
+
+    def _invalidate_provider_cache(self, rp_uuid):
+        prefix = '/resource_providers/%s' % rp_uuid
+        for url in list(self._get_cache):
+            if url == prefix or url.startswith(prefix + '/'):
+                del self._get_cache[url]
 
     @safe_connect
     def get_filtered_resource_providers(self, filters):
@@ -209,10 +329,9 @@ class SchedulerReportClient(object):
 
         :param rp_uuid: UUID of the resource provider to grab aggregates for.
         """
-        resp = self.get("/resource_providers/%s/aggregates" % rp_uuid,
-                        version='1.1')
-        if resp.status_code == 200:
-            data = resp.json()
+        resp, data = self._cached_get(
+            "/resource_providers/%s/aggregates" % rp_uuid, version='1.1')
+        if data is not None:
             return set(data['aggregates'])
 
         placement_req_id = get_placement_request_id(resp)
@@ -250,6 +369,7 @@ class SchedulerReportClient(object):
         if resp.status_code == 200:
             self._provider_aggregate_map[rp_uuid] = set(aggs)
             data = resp.json()
+            self._get_cache[url] = (None, data)
             return set(data['aggregates'])
 
         placement_req_id = get_placement_request_id(resp)
@@ -284,9 +404,8 @@ class SchedulerReportClient(object):
 
         :param uuid: UUID identifier for the resource provider to look up
         """
-        resp = self.get("/resource_providers/%s" % uuid)
-        if resp.status_code == 200:
-            data = resp.json()
+        resp, data = self._cached_get("/resource_providers/%s" % uuid)
+        if data is not None:
             return data
         elif resp.status_code == 404:
             return None
@@ -405,10 +524,10 @@ class SchedulerReportClient(object):
 
     def _get_inventory(self, rp_uuid):
         url = '/resource_providers/%s/inventories' % rp_uuid
-        result = self.get(url)
-        if not result:
+        result, data = self._cached_get(url)
+        if data is None:
             return {'inventories': {}}
-        return result.json()
+        return data
 
     def _get_inventory_and_update_provider_generation(self, rp_uuid):
         """Helper method that retrieves the current inventory for the supplied
@@ -471,6 +590,7 @@ class SchedulerReportClient(object):
             # Invalidate our cache and re-fetch the resource provider
             # to be sure to get the latest generation.
             del self._resource_providers[rp_uuid]
+            self._invalidate_provider_cache(rp_uuid)
             # NOTE(jaypipes): We don't need to pass a name parameter to
             # _ensure_resource_provider() because we know the resource provider
             # record already exists. We're just reloading the record here.
@@ -509,6 +629,9 @@ class SchedulerReportClient(object):
         updated_inventories_result = result.json()
         new_gen = updated_inventories_result['resource_provider_generation']
         self._resource_providers[rp_uuid]['generation'] = new_gen
+        # The PUT response is the new inventory, there is no need to GET it
+        # on the next update, though without an ETag it is not conditional.
+        self._get_cache[url] = (None, updated_inventories_result)
         LOG.debug('Updated inventory for %s at generation %i',
                   rp_uuid, new_gen)
         return True
@@ -528,6 +651,27 @@ class SchedulerReportClient(object):
             time.sleep(1)
         return False
 
+    def set_inventory_for_providers(self, providers):
+        """Set the inventory records of many providers concurrently.
+
+        :param providers: List of (rp_uuid, rp_name, inv_data,
+                          resource_class) tuples, see
+                          set_inventory_for_provider().
+
+        :raises: exc.InvalidResourceClass if a supplied custom resource class
+                 name does not meet the placement API's format requirements.
+        """
+        # Auto-create custom resource classes coming from a virt driver, once
+        # for all the providers sharing them
+        for resource_class in set(p[3] for p in providers):
+            self._ensure_resource_class(resource_class)
+
+        def _set_inventory(rp_uuid, rp_name, inv_data, resource_class):
+            self._ensure_resource_provider(rp_uuid, rp_name)
+            self._update_inventory(rp_uuid, inv_data)
+
+        self._map(lambda p: _set_inventory(*p), providers)
+
     def set_inventory_for_provider(self, rp_uuid, rp_name, inv_data,
                                    resource_class):
         """Given the UUID of a provider, set the inventory records for the
@@ -553,8 +697,9 @@ class SchedulerReportClient(object):
     def _ensure_resource_class(self, name):
         """Make sure a custom resource class exists.
 
-        First attempt to PUT the resource class using microversion 1.7. If
-        this results in a 406, fail over to a GET and POST with version 1.2.
+        PUT the resource class using microversion 1.7 if placement supports
+        it. Otherwise, or if this results in a 406, fail over to a GET and
+        POST with version 1.2.
 
         Returns the name of the resource class if it was successfully
         created or already exists. Otherwise None.
@@ -562,6 +707,8 @@ class SchedulerReportClient(object):
         :param name: String name of the resource class to check/create.
         :raises: `exception.InvalidResourceClass` upon error.
         """
+        if not self._version_supported('1.7'):
+            return self._get_or_create_resource_class(name)
         # no payload on the put request
         response = self.put("/resource_classes/%s" % name, None, version="1.7")
         if 200 <= response.status_code < 300:
@@ -573,6 +720,7 @@ class SchedulerReportClient(object):
             # call and the associated code.
             LOG.debug('Falling back to placement API microversion 1.2 '
                       'for resource class management.')
+            self._version_unsupported('1.7')
             return self._get_or_create_resource_class(name)
         else:
             msg = ("Failed to ensure resource class record with "
@@ -690,17 +838,22 @@ class SchedulerReportClient(object):
                     'resources': alloc_data,
                 },
             ],
-            'project_id': project_id,
-            'user_id': user_id,
         }
         url = '/allocations/%s' % consumer_uuid
-        r = self.put(url, payload, version='1.8')
-        if r.status_code == 406:
-            # microversion 1.8 not available so try the earlier way
-            # TODO(melwitt): Remove this when we can be sure all placement
-            # servers support version 1.8.
-            payload.pop('project_id')
-            payload.pop('user_id')
+        r = None
+        if self._version_supported('1.8'):
+            payload['project_id'] = project_id
+            payload['user_id'] = user_id
+            r = self.put(url, payload, version='1.8')
+            if r.status_code == 406:
+                # microversion 1.8 not available so try the earlier way
+                # TODO(melwitt): Remove this when we can be sure all placement
+                # servers support version 1.8.
+                self._version_unsupported('1.8')
+                payload.pop('project_id')
+                payload.pop('user_id')
+                r = None
+        if r is None:
             r = self.put(url, payload)
         if r.status_code != 204:
             LOG.warning(
@@ -725,6 +878,7 @@ class SchedulerReportClient(object):
             # clean the caches
             self._resource_providers.pop(rp_uuid, None)
             self._provider_aggregate_map.pop(rp_uuid, None)
+            self._invalidate_provider_cache(rp_uuid)
         else:
             # Check for 404 since we don't need to log a warning if we tried to
             # delete something which doesn"t actually exist.
@@ -751,8 +905,15 @@ class SchedulerReportClient(object):
             LOG.info('Deleted allocation for resource provider %s', rp_uuid)
         else:
             return
-        for consumer_id in allocations:
-            self.delete_allocation_for_server(consumer_id)
+        self._map(self.delete_allocation_for_server, allocations)
+
+    def delete_allocations_for_resource_providers(self, rp_uuids):
+        """Delete the allocations against many providers concurrently."""
+        self._map(self.delete_allocations_for_resource_provider, rp_uuids)
+
+    def delete_resource_providers(self, rp_uuids):
+        """Delete many resource providers concurrently."""
+        self._map(self.delete_resource_provider, rp_uuids)
 
     def get_nodes_from_resource_providers(self):
         # Use the rps we cached
@@ -24,6 +24,7 @@ Weighing Functions.
 """
 import itertools
 
+from oslo_concurrency import lockutils
 from oslo_config import cfg
 from oslo_log import log as logging
 
@@ -45,6 +46,10 @@ class FilterScheduler(driver.Scheduler):
         super(FilterScheduler, self).__init__(*args, **kwargs)
         self.max_attempts = self._max_attempts()
         self.reportclient = client.SchedulerClient().reportclient
+        # NOTE: The schedule lock serializes the requests of this scheduler
+        # only, like the schedulers of separate processes the ones sharing a
+        # process race for the same nodes.
+        self._semaphores = lockutils.Semaphores()
 
     def _max_attempts(self):
         max_attempts = CONF.scheduler.scheduler_max_attempts
@@ -105,7 +110,7 @@ class FilterScheduler(driver.Scheduler):
     def _get_res_aggregates_filters(context, request_spec):
         flavor_dict = request_spec['flavor']
         resource_aggregates = flavor_dict.get('resource_aggregates', {})
-        resource_aggregates_items = resource_aggregates.items()
+        resource_aggregates_items = list(resource_aggregates.items())
         # Add availability_zone aggregate
         if request_spec['availability_zone']:
             resource_aggregates_items.append(
@@ -251,26 +256,20 @@ class FilterScheduler(driver.Scheduler):
         if aggs_filters is None:
             return []
 
-        if aggs_filters:
-            filtered_nodes = set()
-            for agg_filter in aggs_filters:
-                filtered_rps = set(self._get_nodes_of_aggregates(agg_filter))
-                if not filtered_rps:
-                    # if got empty, just break here.
-                    return []
-                if not filtered_nodes:
-                    # initialize the filtered_nodes
-                    filtered_nodes = filtered_rps
-                else:
-                    filtered_nodes &= filtered_rps
-                if not filtered_nodes:
-                    # if got empty, just break here.
-                    return []
-        else:
-            query_filters = {'resources': resources_filter}
-            filtered_nodes = self.reportclient.\
-                get_filtered_resource_providers(query_filters)
-            return [node['uuid'] for node in filtered_nodes]
+        query_filters = {'resources': resources_filter}
+        filtered_nodes = self.reportclient.\
+            get_filtered_resource_providers(query_filters)
+        filtered_nodes = [node['uuid'] for node in filtered_nodes]
+        if not aggs_filters:
+            return filtered_nodes
+
+        # Nodes of the aggregates must have the resources available too
+        filtered_nodes = set(filtered_nodes)
+        for agg_filter in aggs_filters:
+            if not filtered_nodes:
+                # if got empty, just break here.
+                return []
+            filtered_nodes &= set(self._get_nodes_of_aggregates(agg_filter))
 
         return list(filtered_nodes)
 
@@ -281,7 +280,7 @@ class FilterScheduler(driver.Scheduler):
         # So we add a syncronized here to make sure the shared node states
         # consistent, but lock the whole schedule process is not a good choice,
         # we need to improve this.
-        @utils.synchronized('schedule')
+        @utils.synchronized('schedule', semaphores=self._semaphores)
         def _schedule(self, context, request_spec, filter_properties):
             self._populate_retry(filter_properties, request_spec)
             filtered_nodes = self._get_filtered_nodes(context, request_spec)
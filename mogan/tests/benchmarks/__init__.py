@@ -0,0 +1,33 @@
+# Copyright 2017 Huawei Technologies Co.,LTD.
+# All Rights Reserved.
+#
+#    Licensed under the Apache License, Version 2.0 (the "License"); you may
+#    not use this file except in compliance with the License. You may obtain
+#    a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#    WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#    License for the specific language governing permissions and limitations
+#    under the License.
+
+"""
+:mod:`mogan.tests.benchmarks` -- mogan benchmarks
+=====================================================
+
+Load generators measuring mogan services in a single process, against
+in-memory stand-ins of the services they depend on. Run them with
+``tox -e benchmark -- <benchmark> [options]``, e.g.
+``tox -e benchmark -- scheduler --nodes 10000``.
+
+.. automodule:: mogan.tests.benchmarks
+   :platform: Unix
+"""
+import eventlet
+
+from mogan import objects
+
+eventlet.monkey_patch(os=False)
+objects.register_all()
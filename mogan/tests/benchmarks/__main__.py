@@ -0,0 +1,37 @@
+# Copyright 2017 Huawei Technologies Co.,LTD.
+# All Rights Reserved.
+#
+#    Licensed under the Apache License, Version 2.0 (the "License"); you may
+#    not use this file except in compliance with the License. You may obtain
+#    a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#    WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#    License for the specific language governing permissions and limitations
+#    under the License.
+
+"""Run a benchmark: python -m mogan.tests.benchmarks <benchmark> [options]"""
+
+import sys
+
+from oslo_utils import importutils
+
+BENCHMARKS = ('boot', 'scheduler', 'validation')
+
+
+def main(argv=None):
+    argv = sys.argv[1:] if argv is None else argv
+    if not argv or argv[0] not in BENCHMARKS:
+        print('usage: python -m mogan.tests.benchmarks {%s} [options]' %
+              ','.join(BENCHMARKS))
+        return 2
+    benchmark = importutils.import_module(
+        'mogan.tests.benchmarks.%s' % argv[0])
+    return benchmark.main(argv[1:])
+
+
+if __name__ == '__main__':
+    sys.exit(main())
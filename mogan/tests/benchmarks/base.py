@@ -0,0 +1,159 @@
+# Copyright 2017 Huawei Technologies Co.,LTD.
+# All Rights Reserved.
+#
+#    Licensed under the Apache License, Version 2.0 (the "License"); you may
+#    not use this file except in compliance with the License. You may obtain
+#    a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#    WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#    License for the specific language governing permissions and limitations
+#    under the License.
+
+"""Common helpers of the benchmarks."""
+
+import argparse
+import json
+import os
+import shutil
+import tempfile
+import time
+
+import eventlet
+from oslo_config import cfg
+from oslo_db.sqlalchemy import enginefacade
+
+from mogan.common import config as mogan_config
+from mogan.db.sqlalchemy import models
+
+CONF = cfg.CONF
+
+
+def get_parser(description):
+    parser = argparse.ArgumentParser(description=description)
+    parser.add_argument('--requests', type=int, default=1000,
+                        help='Number of requests to send.')
+    parser.add_argument('--concurrency', type=int, default=10,
+                        help='Number of requests sent at the same time.')
+    parser.add_argument('--seed', type=int, default=0,
+                        help='Seed of the random generator, for repeatable '
+                             'runs.')
+    parser.add_argument('--json', action='store_true',
+                        help='Print the results as JSON.')
+    return parser
+
+
+def setup():
+    """Configure mogan and create its database in a temporary directory.
+
+    A file is used instead of an in-memory database, which each green
+    thread's connection would see as a different empty database.
+
+    :returns: a function removing the database.
+    """
+    path = tempfile.mkdtemp(prefix='mogan-benchmark-')
+    CONF.set_override('glance_api_servers', 'fake-glance', 'glance')
+    mogan_config.parse_args([''], default_config_files=[])
+    CONF.set_override('connection',
+                      'sqlite:///' + os.path.join(path, 'mogan.sqlite'),
+                      'database')
+    CONF.set_override('sqlite_synchronous', False, 'database')
+    models.Base.metadata.create_all(enginefacade.writer.get_engine())
+    return lambda: shutil.rmtree(path, ignore_errors=True)
+
+
+def percentile(values, percent):
+    """Return the percentile of sorted values, by the nearest rank."""
+    if not values:
+        return 0.0
+    index = max(int(round(percent / 100.0 * len(values))) - 1, 0)
+    return values[min(index, len(values) - 1)]
+
+
+def summarize(durations):
+    """Return the p50, p99 and max of durations, in seconds."""
+    durations = sorted(durations)
+    return {'p50': percentile(durations, 50),
+            'p99': percentile(durations, 99),
+            'max': durations[-1] if durations else 0.0}
+
+
+class Recorder(object):
+    """Record the latencies and failures of the requests of a run."""
+
+    def __init__(self):
+        self.latencies = []
+        self.failures = {}
+        self.started_at = None
+        self.duration = None
+
+    def run(self, func, items, concurrency):
+        """Call func for each item, concurrency calls at a time."""
+        def _call(item):
+            start = time.time()
+            try:
+                func(item)
+            except Exception as e:
+                name = type(e).__name__
+                self.failures[name] = self.failures.get(name, 0) + 1
+                return
+            self.latencies.append(time.time() - start)
+
+        pool = eventlet.GreenPool(size=concurrency)
+        self.started_at = time.time()
+        for item in items:
+            pool.spawn_n(_call, item)
+        pool.waitall()
+        self.duration = time.time() - self.started_at
+
+    def results(self, **extra):
+        latencies = sorted(self.latencies)
+        count = len(latencies) + sum(self.failures.values())
+        results = {
+            'requests': count,
+            'failures': self.failures,
+            'duration': self.duration,
+            'throughput': count / self.duration if self.duration else 0.0,
+            'latency_p50': percentile(latencies, 50),
+            'latency_p99': percentile(latencies, 99),
+            'latency_max': latencies[-1] if latencies else 0.0,
+        }
+        results.update(extra)
+        return results
+
+
+def report(results, as_json=False):
+    if as_json:
+        print(json.dumps(results, indent=4, sort_keys=True))
+        return
+    print('Requests:     %d in %.2fs' % (results['requests'],
+                                         results['duration']))
+    print('Throughput:   %.1f requests/s' % results['throughput'])
+    print('Latency:      p50 %.1fms, p99 %.1fms, max %.1fms' % (
+          results['latency_p50'] * 1000, results['latency_p99'] * 1000,
+          results['latency_max'] * 1000))
+    for name, count in sorted(results['failures'].items()):
+        print('Failures:     %d %s' % (count, name))
+    for key in sorted(set(results) - set(_REPORTED)):
+        label = key.replace('_', ' ').capitalize() + ':'
+        value = results[key]
+        if isinstance(value, dict) and 'p50' not in value:
+            print(label)
+            for name, item in sorted(value.items()):
+                print('  %-24s %s' % (name + ':', _format(item)))
+        else:
+            print('%-13s %s' % (label, _format(value)))
+
+
+def _format(value):
+    if isinstance(value, dict) and 'p50' in value:
+        return 'p50 %.1fms, p99 %.1fms, max %.1fms' % (
+            value['p50'] * 1000, value['p99'] * 1000, value['max'] * 1000)
+    return value
+
+
+_REPORTED = ('requests', 'duration', 'throughput', 'latency_p50',
+             'latency_p99', 'latency_max', 'failures')
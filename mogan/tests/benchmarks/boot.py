@@ -0,0 +1,268 @@
+# Copyright 2017 Huawei Technologies Co.,LTD.
+# All Rights Reserved.
+#
+#    Licensed under the Apache License, Version 2.0 (the "License"); you may
+#    not use this file except in compliance with the License. You may obtain
+#    a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#    WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#    License for the specific language governing permissions and limitations
+#    under the License.
+
+"""Benchmark of the boot of servers, from the API to active servers.
+
+Servers are created through the engine API, which casts them to an engine
+over a fake messaging transport. The engine calls a scheduler over the same
+transport, then runs the create server flow of each server. Ironic,
+Neutron, Glance and placement are replaced by in-memory stand-ins, each
+request to them taking a configurable time. A request is complete once
+all its servers are active, or failed.
+"""
+
+import collections
+import sys
+import time
+import uuid
+
+import eventlet
+from eventlet import event
+from oslo_config import cfg
+from oslo_context import context
+import oslo_messaging as messaging
+
+from mogan.common import constants
+from mogan.common import rpc
+from mogan.engine import api as engine_api
+from mogan.engine import manager as engine_manager
+from mogan import objects
+from mogan.objects import base as objects_base
+from mogan.scheduler import manager as scheduler_manager
+from mogan.tests.benchmarks import base
+from mogan.tests.benchmarks import fakes
+
+CONF = cfg.CONF
+
+PROJECT_ID = 'c18e8a1a870d4c08a0b51ced6e0b6459'
+USER_ID = 'cdbf77d47f1d4d04ad9b7ff62b672467'
+RESOURCE_CLASS = 'CUSTOM_BAREMETAL'
+
+
+class BootTimeout(Exception):
+    pass
+
+
+class Boots(object):
+    """Track the servers being built, until they are active or failed."""
+
+    def __init__(self):
+        self._done = collections.defaultdict(event.Event)
+
+    def finish(self, server_uuid, error=None):
+        self._done[server_uuid].send(error)
+
+    def wait(self, server_uuid):
+        error = self._done[server_uuid].wait()
+        del self._done[server_uuid]
+        if error is not None:
+            raise error
+
+    def watch(self, engine):
+        """Finish the servers of the engine once built or failed."""
+        schedule_and_create_servers = engine.schedule_and_create_servers
+        create_server = engine._create_server
+
+        def _schedule_and_create_servers(context, servers, *args, **kwargs):
+            try:
+                schedule_and_create_servers(context, servers, *args,
+                                            **kwargs)
+            except Exception as e:
+                for server in servers:
+                    self.finish(server.uuid, e)
+                raise
+
+        def _create_server(context, server, *args, **kwargs):
+            try:
+                create_server(context, server, *args, **kwargs)
+            except Exception as e:
+                self.finish(server.uuid, e)
+                raise
+            self.finish(server.uuid)
+
+        engine.schedule_and_create_servers = _schedule_and_create_servers
+        engine._create_server = _create_server
+
+
+def time_tasks(engine, durations):
+    """Collect the durations of the tasks of the flows run by the engine.
+
+    The engine reports the timings of each flow once it is done, they are
+    kept keyed by task class.
+    """
+    report_flow_timings = engine._report_flow_timings
+
+    def _report_flow_timings(context, server, flow, duration, timings):
+        for timing in timings:
+            if timing['action'] == 'execute':
+                durations[timing['task']].append(timing['duration'])
+        report_flow_timings(context, server, flow, duration, timings)
+
+    engine._report_flow_timings = _report_flow_timings
+
+
+def start_service(manager, topic):
+    target = messaging.Target(topic=topic, server=CONF.host)
+    server = rpc.get_server(target, [manager],
+                            objects_base.MoganObjectSerializer())
+    server.start()
+    manager.init_host()
+    return server
+
+
+def create_flavor(ctxt):
+    flavor = objects.Flavor(
+        ctxt, name='baremetal', description='benchmark', is_public=True,
+        disabled=False, resources={RESOURCE_CLASS: 1}, resource_traits={},
+        resource_aggregates={})
+    flavor.create()
+    # The flavor is sent in the request spec. Unlike the real transports,
+    # the fake one doesn't turn its timestamps into strings.
+    flavor.created_at = flavor.updated_at = None
+    return flavor
+
+
+def create_fleet(args, ironic, placement):
+    inventory = {'total': 1, 'reserved': 0, 'min_unit': 1, 'max_unit': 1,
+                 'step_size': 1, 'allocation_ratio': 1.0}
+    for i in range(args.nodes):
+        node_uuid = str(uuid.uuid4())
+        ironic.add_node(node_uuid, 'node-%d' % i, RESOURCE_CLASS,
+                        ports=args.networks)
+        placement.set_inventory_for_provider(
+            node_uuid, 'node-%d' % i, {RESOURCE_CLASS: inventory},
+            RESOURCE_CLASS)
+
+
+def get_parser():
+    parser = base.get_parser('Benchmark the boot of servers.')
+    parser.set_defaults(requests=100)
+    parser.add_argument('--nodes', type=int,
+                        help='Number of nodes, enough for all the servers by '
+                             'default.')
+    parser.add_argument('--servers-per-request', type=int, default=1,
+                        help='Number of servers of each request.')
+    parser.add_argument('--networks', type=int, default=1,
+                        help='Number of networks of each server.')
+    parser.add_argument('--config-drive', default='drive',
+                        choices=['drive', 'documents', 'none'],
+                        help='How the metadata is given to the servers: '
+                             'in a config drive, which requires '
+                             'genisoimage, as documents served by '
+                             'mogan-metadata, or not at all.')
+    parser.add_argument('--deploy-time', type=float, default=1.0,
+                        help='Seconds Ironic takes to deploy a node.')
+    parser.add_argument('--ironic-latency', type=float, default=0.0,
+                        help='Seconds each Ironic request takes.')
+    parser.add_argument('--neutron-latency', type=float, default=0.0,
+                        help='Seconds each Neutron request takes.')
+    parser.add_argument('--glance-latency', type=float, default=0.0,
+                        help='Seconds each Glance request takes.')
+    parser.add_argument('--placement-latency', type=float, default=0.0,
+                        help='Seconds each placement request takes.')
+    parser.add_argument('--timeout', type=float, default=600.0,
+                        help='Seconds after which a boot is failed.')
+    return parser
+
+
+def main(argv=None):
+    args = get_parser().parse_args(argv)
+    if args.nodes is None:
+        args.nodes = args.requests * args.servers_per_request
+    cleanup = base.setup()
+    CONF.set_override('transport_url', 'fake:/')
+    CONF.set_override('servers_hard_limit',
+                      args.requests * args.servers_per_request, 'quota')
+    CONF.set_override('deploy_expected_duration', int(args.deploy_time),
+                      'ironic')
+    CONF.set_override('enabled', args.config_drive == 'drive',
+                      'configdrive')
+    CONF.set_override('store_documents', args.config_drive == 'documents',
+                      'metadata')
+    rpc.init(CONF)
+    servers = []
+    try:
+        ctxt = context.RequestContext(user_id=USER_ID, project_id=PROJECT_ID,
+                                      auth_token='benchmark')
+        ironic = fakes.FakeIronic(args.ironic_latency, args.deploy_time)
+        neutron = fakes.FakeNeutron(args.neutron_latency)
+        glance = fakes.FakeGlance(args.glance_latency)
+        placement = fakes.FakePlacement(args.placement_latency)
+        image_uuid = str(uuid.uuid4())
+        glance.add_image(image_uuid, 'benchmark')
+        network_uuids = [str(uuid.uuid4()) for i in range(args.networks)]
+        flavor = create_flavor(context.get_admin_context())
+        create_fleet(args, ironic, placement)
+        placement.requests = 0
+
+        scheduler = scheduler_manager.SchedulerManager(
+            constants.SCHEDULER_TOPIC, host=CONF.host)
+        scheduler.driver.reportclient = placement
+        servers.append(start_service(scheduler, constants.SCHEDULER_TOPIC))
+
+        engine = engine_manager.EngineManager(CONF.host,
+                                              constants.ENGINE_TOPIC)
+        engine.driver.ironicclient = ironic
+        engine.network_api = neutron
+        engine.scheduler_client.reportclient = placement
+        boots = Boots()
+        boots.watch(engine)
+        durations = collections.defaultdict(list)
+        time_tasks(engine, durations)
+        servers.append(start_service(engine, constants.ENGINE_TOPIC))
+
+        api = engine_api.API(image_api=glance)
+        api.network_api = neutron
+        # Create the quotas of the project up front, as the first requests
+        # of a project would race to create them.
+        api.quota.get_quota_limit_and_usage(ctxt, api.quota.resources,
+                                            PROJECT_ID)
+        api_durations = []
+
+        def _boot(index):
+            start = time.time()
+            created = api.create(
+                ctxt, flavor, image_uuid, name='server-%d' % index,
+                requested_networks=[{'net_id': network_uuid}
+                                    for network_uuid in network_uuids],
+                min_count=args.servers_per_request,
+                max_count=args.servers_per_request, scheduler_hints={})
+            api_durations.append(time.time() - start)
+            with eventlet.Timeout(args.timeout, BootTimeout):
+                for server in created:
+                    boots.wait(server.uuid)
+
+        recorder = base.Recorder()
+        recorder.run(_boot, range(args.requests), args.concurrency)
+        tasks = {task: base.summarize(task_durations)
+                 for task, task_durations in durations.items()}
+        results = recorder.results(
+            nodes=args.nodes, servers=args.requests * args.servers_per_request,
+            api=base.summarize(api_durations), tasks=tasks,
+            ironic_requests=ironic.requests,
+            neutron_requests=neutron.requests,
+            glance_requests=glance.requests,
+            placement_requests=placement.requests)
+        base.report(results, as_json=args.json)
+    finally:
+        for server in servers:
+            server.stop()
+            server.wait()
+        rpc.cleanup()
+        cleanup()
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,337 @@
+# Copyright 2017 Huawei Technologies Co.,LTD.
+# All Rights Reserved.
+#
+#    Licensed under the Apache License, Version 2.0 (the "License"); you may
+#    not use this file except in compliance with the License. You may obtain
+#    a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#    WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#    License for the specific language governing permissions and limitations
+#    under the License.
+
+"""In-memory stand-ins of the services mogan depends on."""
+
+import collections
+import time
+import uuid
+
+import eventlet
+from ironicclient import exc as ironic_exc
+
+from mogan.baremetal.ironic import ironic_states
+from mogan.common import exception
+
+
+class FakePlacement(object):
+    """In-memory stand-in of the placement service.
+
+    It has the report client interface the scheduler and engine use. A
+    claim exceeding the capacity left on a provider is refused and counted
+    as a conflict, like placement refuses it on a generation conflict.
+
+    :param latency: seconds each request takes, to account for the HTTP
+                    round trip to placement.
+    """
+
+    def __init__(self, latency=0):
+        self.latency = latency
+        self._providers = collections.OrderedDict()
+        # Providers, keyed by resource class and aggregate UUID
+        self._by_class = collections.defaultdict(list)
+        self._by_aggregate = collections.defaultdict(set)
+        self._allocations = {}
+        self.requests = 0
+        self.claims = 0
+        self.conflicts = 0
+
+    def _request(self):
+        self.requests += 1
+        # Always yield, as a request to placement would
+        eventlet.sleep(self.latency)
+
+    def set_inventory_for_provider(self, rp_uuid, rp_name, inv_data,
+                                   resource_class):
+        self._request()
+        rp = self._providers.get(rp_uuid)
+        if rp is None:
+            rp = {'uuid': rp_uuid, 'name': rp_name, 'generation': 0,
+                  'capacity': {}, 'used': collections.Counter()}
+            self._providers[rp_uuid] = rp
+        for rc, inv in inv_data.items():
+            if rc not in rp['capacity']:
+                self._by_class[rc].append(rp)
+            rp['capacity'][rc] = ((inv['total'] - inv['reserved']) *
+                                  inv['allocation_ratio'])
+        rp['generation'] += 1
+
+    def set_inventory_for_providers(self, providers):
+        for provider in providers:
+            self.set_inventory_for_provider(*provider)
+
+    def set_provider_aggregates(self, rp_uuid, aggregate_uuids):
+        for aggregate_uuid in aggregate_uuids:
+            self._by_aggregate[aggregate_uuid].add(rp_uuid)
+
+    def _fits(self, rp, resources):
+        return all(rp['used'][rc] + amount <= rp['capacity'].get(rc, 0)
+                   for rc, amount in resources.items())
+
+    def get_filtered_resource_providers(self, filters):
+        self._request()
+        resources = filters.get('resources')
+        member_of = filters.get('member_of')
+        if member_of:
+            uuids = set()
+            for aggregate_uuid in member_of[len('in:'):].split(','):
+                uuids |= self._by_aggregate[aggregate_uuid]
+            rps = [self._providers[uuid] for uuid in uuids]
+        elif resources:
+            rps = self._by_class[next(iter(resources))]
+        else:
+            rps = self._providers.values()
+        if resources:
+            rps = [rp for rp in rps if self._fits(rp, resources)]
+        return [{'uuid': rp['uuid'], 'name': rp['name'],
+                 'generation': rp['generation']} for rp in rps]
+
+    def put_allocations(self, rp_uuid, consumer_uuid, alloc_data, project_id,
+                        user_id):
+        self._request()
+        self.claims += 1
+        self._remove_allocation(consumer_uuid)
+        rp = self._providers[rp_uuid]
+        if not self._fits(rp, alloc_data):
+            self.conflicts += 1
+            return False
+        rp['used'].update(alloc_data)
+        rp['generation'] += 1
+        self._allocations[consumer_uuid] = (rp, alloc_data)
+        return True
+
+    def delete_allocation_for_server(self, uuid):
+        self._request()
+        self._remove_allocation(uuid)
+
+    def _remove_allocation(self, uuid):
+        allocation = self._allocations.pop(uuid, None)
+        if allocation is not None:
+            rp, resources = allocation
+            rp['used'].subtract(resources)
+            rp['generation'] += 1
+
+
+class _Resource(object):
+    """A resource returned by a client, with its fields as attributes."""
+
+    def __init__(self, **fields):
+        self.__dict__.update(fields)
+
+
+class FakeIronic(object):
+    """In-memory stand-in of Ironic.
+
+    It has the IronicClientWrapper interface the Ironic driver uses. A
+    deployed node becomes active deploy_time seconds after its deploy is
+    requested.
+
+    :param latency: seconds each request takes.
+    :param deploy_time: seconds a deploy takes.
+    """
+
+    def __init__(self, latency=0, deploy_time=0):
+        self.latency = latency
+        self.deploy_time = deploy_time
+        self._nodes = {}
+        self._by_instance = {}
+        self.requests = 0
+
+    def add_node(self, node_uuid, name, resource_class, ports=1):
+        self._nodes[node_uuid] = {
+            'uuid': node_uuid, 'name': name, 'driver': 'fake',
+            'resource_class': resource_class,
+            'provision_state': ironic_states.AVAILABLE,
+            'target_provision_state': None, 'last_error': None,
+            'power_state': ironic_states.POWER_OFF,
+            'target_power_state': None, 'maintenance': False,
+            'instance_uuid': None, 'instance_info': {}, 'vifs': [],
+            'deployed_at': None,
+            'ports': [{'uuid': str(uuid.uuid4()), 'node_uuid': node_uuid,
+                       'address': '52:54:00:%02x:%02x:%02x' % (
+                           (len(self._nodes) >> 8) & 0xff,
+                           len(self._nodes) & 0xff, i),
+                       'portgroup_uuid': None, 'extra': {},
+                       'pxe_enabled': True} for i in range(ports)]}
+
+    def call(self, method, *args, **kwargs):
+        self.requests += 1
+        # Always yield, as a request to Ironic would
+        eventlet.sleep(self.latency)
+        return getattr(self, '_' + method.replace('.', '_'))(*args, **kwargs)
+
+    def _get(self, node_uuid):
+        try:
+            node = self._nodes[node_uuid]
+        except KeyError:
+            raise ironic_exc.NotFound()
+        if (node['provision_state'] == ironic_states.DEPLOYING and
+                time.time() >= node['deployed_at']):
+            node.update(provision_state=ironic_states.ACTIVE,
+                        target_provision_state=None,
+                        power_state=ironic_states.POWER_ON)
+        return node
+
+    @staticmethod
+    def _node(node, fields=None):
+        return _Resource(**{key: value for key, value in node.items()
+                            if fields is None or key in fields})
+
+    def _node_get(self, node_uuid, fields=None):
+        return self._node(self._get(node_uuid), fields)
+
+    def _node_get_by_instance_uuid(self, instance_uuid, fields=None):
+        try:
+            node_uuid = self._by_instance[instance_uuid]
+        except KeyError:
+            raise ironic_exc.NotFound()
+        return self._node_get(node_uuid, fields)
+
+    def _node_update(self, node_uuid, patch, retry_on_conflict=True):
+        node = self._get(node_uuid)
+        for change in patch:
+            path = change['path'].strip('/').split('/')
+            if path == ['instance_uuid']:
+                if change['op'] == 'add':
+                    if node['instance_uuid'] not in (None,
+                                                     change['value']):
+                        raise ironic_exc.Conflict()
+                    node['instance_uuid'] = change['value']
+                    self._by_instance[change['value']] = node_uuid
+                else:
+                    self._by_instance.pop(node['instance_uuid'], None)
+                    node['instance_uuid'] = None
+            elif path[0] == 'instance_info':
+                if change['op'] == 'add':
+                    node['instance_info'][path[1]] = change['value']
+                else:
+                    node['instance_info'] = {}
+        return self._node(node)
+
+    def _node_validate(self, node_uuid):
+        self._get(node_uuid)
+        return _Resource(deploy={'result': True}, power={'result': True})
+
+    def _node_set_provision_state(self, node_uuid, state, configdrive=None):
+        node = self._get(node_uuid)
+        if state == ironic_states.ACTIVE:
+            node.update(provision_state=ironic_states.DEPLOYING,
+                        target_provision_state=ironic_states.ACTIVE,
+                        deployed_at=time.time() + self.deploy_time)
+        elif state == ironic_states.DELETED:
+            node.update(provision_state=ironic_states.AVAILABLE,
+                        target_provision_state=None,
+                        power_state=ironic_states.POWER_OFF)
+
+    def _node_list_ports(self, node_uuid, detail=False):
+        return [_Resource(**port) for port in self._get(node_uuid)['ports']]
+
+    def _portgroup_list(self, node=None, **kwargs):
+        return []
+
+    def _node_vif_attach(self, node_uuid, vif_id):
+        self._get(node_uuid)['vifs'].append(vif_id)
+
+    def _node_vif_detach(self, node_uuid, vif_id):
+        vifs = self._get(node_uuid)['vifs']
+        if vif_id not in vifs:
+            raise ironic_exc.BadRequest()
+        vifs.remove(vif_id)
+
+
+class FakeNeutron(object):
+    """In-memory stand-in of Neutron.
+
+    It has the mogan.network.API interface the engine uses to build the
+    networks of the servers.
+
+    :param latency: seconds each request takes.
+    """
+
+    def __init__(self, latency=0):
+        self.latency = latency
+        self._ports = {}
+        self.requests = 0
+
+    def _request(self):
+        self.requests += 1
+        eventlet.sleep(self.latency)
+
+    def validate_networks(self, context, requested_networks, num_servers):
+        self._request()
+        return num_servers
+
+    def create_port(self, context, network_uuid, server_uuid):
+        self._request()
+        index = len(self._ports)
+        port = {'id': str(uuid.uuid4()), 'network_id': network_uuid,
+                'device_id': server_uuid,
+                'mac_address': 'fa:16:3e:%02x:%02x:%02x' % (
+                    (index >> 16) & 0xff, (index >> 8) & 0xff, index & 0xff),
+                'fixed_ips': [{'subnet_id': network_uuid,
+                               'ip_address': '10.%d.%d.%d' % (
+                                   (index >> 16) & 0xff, (index >> 8) & 0xff,
+                                   index & 0xff)}]}
+        self._ports[port['id']] = port
+        return dict(port)
+
+    def show_port(self, context, port_uuid):
+        self._request()
+        try:
+            return dict(self._ports[port_uuid])
+        except KeyError:
+            raise exception.PortNotFound(port_id=port_uuid)
+
+    def check_port_availability(self, port):
+        if port['device_id']:
+            raise exception.PortInUse(port_id=port['id'])
+
+    def bind_port(self, context, port, server):
+        self._request()
+        self._ports[port]['device_id'] = server.uuid
+
+    def unbind_port(self, context, port):
+        self._request()
+        self._ports[port['id']]['device_id'] = ''
+
+    def delete_port(self, context, port_id, server_uuid):
+        self._request()
+        self._ports.pop(port_id, None)
+
+
+class FakeGlance(object):
+    """In-memory stand-in of Glance, with the mogan.image.API interface.
+
+    :param latency: seconds each request takes.
+    """
+
+    def __init__(self, latency=0):
+        self.latency = latency
+        self._images = {}
+        self.requests = 0
+
+    def add_image(self, image_uuid, name):
+        self._images[image_uuid] = {
+            'id': image_uuid, 'name': name, 'status': 'active',
+            'disk_format': 'qcow2', 'container_format': 'bare',
+            'size': 1024 ** 3, 'min_disk': 0, 'properties': {}}
+
+    def get(self, context, image_id):
+        self.requests += 1
+        eventlet.sleep(self.latency)
+        try:
+            return dict(self._images[image_id])
+        except KeyError:
+            raise exception.ImageNotFound(image_id=image_id)
@@ -0,0 +1,185 @@
+# Copyright 2017 Huawei Technologies Co.,LTD.
+# All Rights Reserved.
+#
+#    Licensed under the Apache License, Version 2.0 (the "License"); you may
+#    not use this file except in compliance with the License. You may obtain
+#    a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#    WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#    License for the specific language governing permissions and limitations
+#    under the License.
+
+"""Benchmark of the scheduler against a synthetic fleet of nodes.
+
+The nodes are spread over availability zones and affinity zones, each
+backed by an aggregate, and registered in an in-memory placement. Requests
+for servers of random flavors, availability zones and server group
+policies are sent to one or more schedulers, which race for the nodes as
+separate scheduler services would.
+"""
+
+import random
+import sys
+import uuid
+
+from oslo_context import context
+
+from mogan.common import states
+from mogan.db import api as db_api
+from mogan.scheduler import manager
+from mogan.tests.benchmarks import base
+from mogan.tests.benchmarks import fakes
+
+PROJECT_ID = 'c18e8a1a870d4c08a0b51ced6e0b6459'
+USER_ID = 'cdbf77d47f1d4d04ad9b7ff62b672467'
+
+
+def _uuid(rng):
+    return str(uuid.UUID(int=rng.getrandbits(128), version=4))
+
+
+def create_fleet(ctxt, placement, args, rng):
+    """Create the nodes, aggregates and zones of the fleet.
+
+    Nodes are grouped in contiguous affinity zones, like racks, and the
+    affinity zones are spread over the availability zones.
+
+    :returns: the list of resource classes and availability zones.
+    """
+    dbapi = db_api.get_instance()
+    resource_classes = ['CUSTOM_BAREMETAL_%d' % i
+                        for i in range(args.resource_classes)]
+    azs = ['az-%d' % i for i in range(args.azs)]
+    az_aggregates = []
+    for az in azs:
+        az_aggregates.append(dbapi.aggregate_create(ctxt, {
+            'uuid': _uuid(rng), 'name': az,
+            'metadata': {'availability_zone': az}}).uuid)
+    affz_aggregates = []
+    for i in range(args.affinity_zones):
+        affz = 'affz-%d' % i
+        affz_aggregates.append(dbapi.aggregate_create(ctxt, {
+            'uuid': _uuid(rng), 'name': affz,
+            'metadata': {'affinity_zone': affz}}).uuid)
+
+    for i in range(args.nodes):
+        rp_uuid = _uuid(rng)
+        resource_class = resource_classes[i % len(resource_classes)]
+        inventory = {'total': 1, 'reserved': 0, 'min_unit': 1,
+                     'max_unit': 1, 'step_size': 1, 'allocation_ratio': 1.0}
+        placement.set_inventory_for_provider(
+            rp_uuid, 'node-%d' % i, {resource_class: inventory},
+            resource_class)
+        affz = i * args.affinity_zones // args.nodes
+        placement.set_provider_aggregates(
+            rp_uuid, [affz_aggregates[affz],
+                      az_aggregates[affz % len(azs)]])
+    return resource_classes, azs
+
+
+def create_requests(ctxt, args, rng, resource_classes, azs):
+    """Create the servers and request specs of the requests."""
+    dbapi = db_api.get_instance()
+    requests = []
+    for i in range(args.requests):
+        server_ids = []
+        for j in range(args.servers_per_request):
+            server = dbapi.server_create(ctxt, {
+                'uuid': _uuid(rng), 'name': 'server-%d-%d' % (i, j),
+                'project_id': PROJECT_ID, 'user_id': USER_ID,
+                'status': states.BUILDING})
+            server_ids.append(server.uuid)
+        hints = {}
+        if rng.random() < args.group_ratio:
+            policy = rng.choice(['affinity', 'anti-affinity'])
+            group = dbapi.server_group_create(
+                ctxt, {'name': 'group-%d' % i, 'project_id': PROJECT_ID,
+                       'user_id': USER_ID}, policies=[policy])
+            hints['group'] = group.uuid
+        az = None
+        if rng.random() < args.az_ratio:
+            az = rng.choice(azs)
+        request_spec = {
+            'flavor': {'resources': {rng.choice(resource_classes): 1},
+                       'resource_aggregates': {}},
+            'availability_zone': az,
+            'scheduler_hints': hints,
+            'num_servers': len(server_ids),
+            'server_ids': server_ids,
+        }
+        requests.append(request_spec)
+    return requests
+
+
+def get_parser():
+    parser = base.get_parser('Benchmark the scheduler.')
+    parser.add_argument('--nodes', type=int, default=1000,
+                        help='Number of nodes of the fleet.')
+    parser.add_argument('--resource-classes', type=int, default=3,
+                        help='Number of node resource classes, one per '
+                             'flavor.')
+    parser.add_argument('--azs', type=int, default=3,
+                        help='Number of availability zones.')
+    parser.add_argument('--affinity-zones', type=int, default=30,
+                        help='Number of affinity zones.')
+    parser.add_argument('--servers-per-request', type=int, default=1,
+                        help='Number of servers of each request.')
+    parser.add_argument('--az-ratio', type=float, default=0.5,
+                        help='Ratio of requests for an availability zone.')
+    parser.add_argument('--group-ratio', type=float, default=0.1,
+                        help='Ratio of requests with an affinity or '
+                             'anti-affinity server group.')
+    parser.add_argument('--schedulers', type=int, default=1,
+                        help='Number of schedulers sharing the placement.')
+    parser.add_argument('--placement-latency', type=float, default=0.0,
+                        help='Seconds each placement request takes.')
+    return parser
+
+
+def main(argv=None):
+    args = get_parser().parse_args(argv)
+    cleanup = base.setup()
+    try:
+        rng = random.Random(args.seed)
+        ctxt = context.get_admin_context()
+        placement = fakes.FakePlacement()
+        resource_classes, azs = create_fleet(ctxt, placement, args, rng)
+        requests = create_requests(ctxt, args, rng, resource_classes, azs)
+
+        schedulers = []
+        for i in range(args.schedulers):
+            scheduler = manager.SchedulerManager('mogan-scheduler',
+                                                 host='scheduler-%d' % i)
+            scheduler.init_host()
+            scheduler.driver.reportclient = placement
+            schedulers.append(scheduler)
+        placement.latency = args.placement_latency
+        placement.requests = 0
+
+        def _select_destinations(request):
+            index, request_spec = request
+            scheduler = schedulers[index % len(schedulers)]
+            filter_properties = {'retry': {'num_attempts': 1, 'nodes': []}}
+            scheduler.select_destinations(ctxt, request_spec,
+                                          filter_properties)
+
+        recorder = base.Recorder()
+        recorder.run(_select_destinations, enumerate(requests),
+                     args.concurrency)
+        results = recorder.results(
+            nodes=args.nodes, schedulers=args.schedulers,
+            claims=placement.claims, claim_conflicts=placement.conflicts,
+            claim_conflict_rate=(float(placement.conflicts) / placement.claims
+                                 if placement.claims else 0.0),
+            placement_requests=placement.requests)
+        base.report(results, as_json=args.json)
+    finally:
+        cleanup()
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,162 @@
+# Copyright 2017 Huawei Technologies Co.,LTD.
+# All Rights Reserved.
+#
+#    Licensed under the Apache License, Version 2.0 (the "License"); you may
+#    not use this file except in compliance with the License. You may obtain
+#    a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#    WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#    License for the specific language governing permissions and limitations
+#    under the License.
+
+"""Benchmark of the validation of the API request bodies.
+
+Representative bodies of each schema of the API are validated with the
+compiled validators cached, as the API does, then with a validator
+compiled for each request, to measure what the cache saves.
+"""
+
+import base64
+import sys
+import time
+import uuid
+
+from mogan.api.controllers.v1.schemas import aggregate
+from mogan.api.controllers.v1.schemas import flavor
+from mogan.api.controllers.v1.schemas import flavor_access
+from mogan.api.controllers.v1.schemas import floating_ips
+from mogan.api.controllers.v1.schemas import interfaces
+from mogan.api.controllers.v1.schemas import keypairs
+from mogan.api.controllers.v1.schemas import manageable_servers
+from mogan.api.controllers.v1.schemas import remote_consoles
+from mogan.api.controllers.v1.schemas import server_groups
+from mogan.api.controllers.v1.schemas import servers
+from mogan.api import validation
+from mogan.tests.benchmarks import base
+
+
+def _uuid():
+    return str(uuid.uuid4())
+
+
+def get_bodies():
+    """Return the schemas of the API and representative bodies of each."""
+    user_data = base64.b64encode(b'#!/bin/sh\necho hello\n').decode()
+    server_uuids = [_uuid() for i in range(50)]
+    return {
+        'create_server': (servers.create_server, {
+            'server': {
+                'name': 'web-1',
+                'description': 'Web server',
+                'availability_zone': 'az-1',
+                'image_uuid': _uuid(),
+                'flavor_uuid': _uuid(),
+                'networks': [{'net_id': _uuid()}, {'port_id': _uuid()}],
+                'user_data': user_data,
+                'personality': [{'path': '/etc/motd',
+                                 'contents': user_data}],
+                'key_name': 'key-1',
+                'min_count': 1,
+                'max_count': 2,
+                'metadata': {'role': 'web', 'tier': 'frontend'},
+                'partitions': {'root_gb': 100, 'ephemeral_gb': 0,
+                               'swap_mb': 4096},
+            },
+            'scheduler_hints': {'group': _uuid()},
+        }),
+        'set_power_states': (servers.set_power_states, {
+            'servers': server_uuids, 'target': 'reboot'}),
+        'delete_servers': (servers.delete_servers, {
+            'servers': server_uuids}),
+        'create_aggregate': (aggregate.create_aggregate, {
+            'name': 'rack-1', 'metadata': {'availability_zone': 'az-1'}}),
+        'add_aggregate_node': (aggregate.add_aggregate_node, {
+            'node': 'node-1'}),
+        'create_flavor': (flavor.create_flavor, {
+            'name': 'gold', 'description': 'Gold baremetal',
+            'resources': {'CUSTOM_GOLD': 1},
+            'resource_aggregates': {'pool': 'gold'},
+            'is_public': True, 'disabled': False}),
+        'add_tenant_access': (flavor_access.add_tenant_access, {
+            'tenant_id': _uuid()}),
+        'add_floating_ip': (floating_ips.add_floating_ip, {
+            'address': '172.24.4.10', 'fixed_address': '10.0.0.5'}),
+        'attach_interface': (interfaces.attach_interface, {
+            'net_id': _uuid()}),
+        'create_keypair': (keypairs.create_keypair, {
+            'name': 'key-1', 'type': 'ssh'}),
+        'manage_server': (manageable_servers.manage_server, {
+            'name': 'managed-1', 'description': 'Managed server',
+            'node_uuid': _uuid(), 'metadata': {'role': 'db'}}),
+        'create_console': (remote_consoles.create_console, {
+            'protocol': 'serial', 'type': 'shellinabox'}),
+        'create_server_group': (server_groups.create_server_group, {
+            'name': 'group-1', 'policies': ['anti-affinity']}),
+    }
+
+
+def run(bodies, requests, cached):
+    """Validate each body requests times.
+
+    :returns: the durations of the validations, per schema name.
+    """
+    durations = {}
+    for name, (schema, body) in sorted(bodies.items()):
+        durations[name] = []
+        for i in range(requests):
+            if not cached:
+                validation._VALIDATORS.clear()
+            start = time.time()
+            validation.check_schema(body, schema)
+            durations[name].append(time.time() - start)
+    return durations
+
+
+def get_parser():
+    parser = base.get_parser('Benchmark the validation of the API request '
+                             'bodies, with and without the validator cache.')
+    parser.set_defaults(requests=10000)
+    return parser
+
+
+def main(argv=None):
+    args = get_parser().parse_args(argv)
+    bodies = get_bodies()
+    saved_validators = dict(validation._VALIDATORS)
+    try:
+        started_at = time.time()
+        uncached = run(bodies, args.requests, cached=False)
+        cached = run(bodies, args.requests, cached=True)
+        duration = time.time() - started_at
+    finally:
+        validation._VALIDATORS.clear()
+        validation._VALIDATORS.update(saved_validators)
+
+    latencies = sorted(d for durations in cached.values() for d in durations)
+    count = len(latencies) * 2
+    results = {
+        'requests': count,
+        'failures': {},
+        'duration': duration,
+        'throughput': count / duration if duration else 0.0,
+        'latency_p50': base.percentile(latencies, 50),
+        'latency_p99': base.percentile(latencies, 99),
+        'latency_max': latencies[-1] if latencies else 0.0,
+        'cached': dict((name, base.summarize(durations))
+                       for name, durations in cached.items()),
+        'uncached': dict((name, base.summarize(durations))
+                         for name, durations in uncached.items()),
+        'cache_speedup': dict(
+            (name, round(sum(uncached[name]) / sum(cached[name]), 1)
+             if sum(cached[name]) else 0.0)
+            for name in cached),
+    }
+    base.report(results, as_json=args.json)
+
+
+if __name__ == '__main__':
+    sys.exit(main())
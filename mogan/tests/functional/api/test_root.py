@@ -13,6 +13,10 @@
 #    License for the specific language governing permissions and limitations
 #    under the License.
 
+import mock
+from oslo_config import cfg
+
+from mogan.common import metrics
 from mogan.tests.functional import api
 
 
@@ -25,3 +29,34 @@ class TestRoot(api.BaseApiTest):
 
         self.assertEqual('OpenStack Mogan API', response['name'])
         self.assertTrue(response['description'])
+
+
+class TestMetrics(api.BaseApiTest):
+
+    def setUp(self):
+        super(TestMetrics, self).setUp()
+        self.registry = metrics.Registry()
+        patcher = mock.patch.object(metrics, 'get_registry',
+                                    return_value=self.registry)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def test_request_metrics(self):
+        self.get_json('/')
+        self.assertEqual(1, self.registry.get_counter(
+            'api_requests', route='RootController.get', method='GET',
+            status=200))
+
+    def test_metrics_endpoint(self):
+        cfg.CONF.set_override('enable_api_endpoint', True, 'metrics')
+        self.app = self._make_app()
+        self.get_json('/')
+        response = self.app.get('/metrics')
+        self.assertEqual('text/plain', response.content_type)
+        self.assertIn('mogan_api_requests{method="GET",'
+                      'route="RootController.get",status="200"} 1',
+                      response.text)
+
+    def test_metrics_endpoint_disabled(self):
+        response = self.app.get('/metrics', expect_errors=True)
+        self.assertEqual(401, response.status_int)
@@ -19,6 +19,8 @@ from oslo_config import cfg
 from oslo_context import context
 
 from mogan.api import hooks
+from mogan.common import metrics
+from mogan.common import policy
 from mogan.tests import base
 
 
@@ -108,6 +110,16 @@ class TestContextHook(base.TestCase):
             is_admin=True,
             roles=headers['X-Roles'].split(','))
 
+    @mock.patch.object(policy, 'check')
+    @mock.patch.object(context, 'RequestContext')
+    def test_context_hook_is_admin_without_token(self, mock_ctx, mock_check):
+        reqstate = FakeRequestState(headers=fake_headers(admin=True))
+        context_hook = hooks.ContextHook(None)
+        context_hook.before(reqstate)
+        creds = mock_check.call_args[0][2]
+        self.assertNotIn('auth_token', creds)
+        self.assertEqual(['_member_', 'admin'], creds['roles'])
+
     @mock.patch.object(context, 'RequestContext')
     def test_context_hook_public_api(self, mock_ctx):
         headers = fake_headers(admin=True)
@@ -167,3 +179,53 @@ class TestPublicUrlHook(base.TestCase):
         trusted_call_hook = hooks.PublicUrlHook()
         trusted_call_hook.before(reqstate)
         self.assertEqual('http://foo', reqstate.request.public_url)
+
+
+class FakeController(object):
+
+    def get_all(self):
+        pass
+
+
+@mock.patch('time.time', side_effect=[10.0, 10.5])
+class TestMetricsHook(base.TestCase):
+
+    def setUp(self):
+        super(TestMetricsHook, self).setUp()
+        self.registry = metrics.Registry()
+        patcher = mock.patch.object(metrics, 'get_registry',
+                                    return_value=self.registry)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.reqstate = FakeRequestState(headers=fake_headers())
+        self.reqstate.request.method = 'GET'
+        self.reqstate.response.status_int = 200
+        self.reqstate.controller = FakeController().get_all
+
+    def test_after(self, mock_time):
+        metrics_hook = hooks.MetricsHook()
+        metrics_hook.on_route(self.reqstate)
+        metrics.record_external_call('db', 0.1)
+        metrics.record_external_call('db', 0.2)
+        metrics_hook.after(self.reqstate)
+        self.assertIsNone(metrics.get_external_calls())
+        labels = {'route': 'FakeController.get_all', 'method': 'GET'}
+        self.assertEqual((1, 0.5), self.registry.get_histogram(
+            'api_request_duration_seconds', **labels))
+        self.assertEqual(1, self.registry.get_counter(
+            'api_requests', status=200, **labels))
+        self.assertEqual(2, self.registry.get_counter(
+            'api_request_external_calls', service='db', **labels))
+        count, duration = self.registry.get_histogram(
+            'api_request_external_call_duration_seconds', service='db',
+            **labels)
+        self.assertEqual(1, count)
+        self.assertAlmostEqual(0.3, duration)
+
+    def test_after_unknown_route(self, mock_time):
+        self.reqstate.controller = None
+        metrics_hook = hooks.MetricsHook()
+        metrics_hook.on_route(self.reqstate)
+        metrics_hook.after(self.reqstate)
+        self.assertEqual(1, self.registry.get_counter(
+            'api_requests', route='unknown', method='GET', status=200))
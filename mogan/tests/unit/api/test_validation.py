@@ -0,0 +1,51 @@
+#
+#    Licensed under the Apache License, Version 2.0 (the "License"); you may
+#    not use this file except in compliance with the License. You may obtain
+#    a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#    WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#    License for the specific language governing permissions and limitations
+#    under the License.
+
+"""Tests for the request body validation."""
+
+import jsonschema
+import mock
+
+from mogan.api import validation
+from mogan.common import exception
+from mogan.tests import base
+
+
+class TestCheckSchema(base.TestCase):
+
+    def setUp(self):
+        super(TestCheckSchema, self).setUp()
+        self.schema = {
+            'type': 'object',
+            'properties': {
+                'name': {'type': 'string', 'minLength': 1},
+            },
+            'required': ['name'],
+        }
+
+    def test_check_schema(self):
+        validation.check_schema({'name': 'foo'}, self.schema)
+
+    def test_check_schema_invalid(self):
+        self.assertRaises(exception.InvalidParameterValue,
+                          validation.check_schema, {'name': ''}, self.schema)
+
+    @mock.patch.object(jsonschema, 'Draft4Validator',
+                       wraps=jsonschema.Draft4Validator)
+    def test_check_schema_validator_reused(self, mock_validator):
+        for i in range(3):
+            validation.check_schema({'name': 'foo'}, self.schema)
+        self.assertRaises(exception.InvalidParameterValue,
+                          validation.check_schema, {}, self.schema)
+        mock_validator.assert_called_once_with(self.schema,
+                                               format_checker=mock.ANY)
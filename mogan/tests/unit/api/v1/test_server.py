@@ -185,6 +185,55 @@ class TestServerAuthorization(v1_test.APITestV1):
         headers = self.gen_headers(self.context)
         self.post_json('/servers', body, headers=headers, status=403)
 
+    @mock.patch('mogan.engine.api.API.power_all')
+    def test_server_power_all(self, mock_power_all):
+        evil_server = utils.create_test_server(
+            name="T2", uuid=uuidutils.generate_uuid(),
+            project_id=self.evil_project)
+        missing = uuidutils.generate_uuid()
+        mock_power_all.return_value = {}
+        self.context.tenant = self.server1.project_id
+        headers = self.gen_headers(self.context, roles="no-admin")
+        body = {'servers': [self.server1.uuid, evil_server.uuid, missing],
+                'target': 'reboot'}
+        resp = self.put_json('/servers/power', body, headers=headers,
+                             status=http_client.ACCEPTED)
+
+        results = resp.json['servers']
+        self.assertEqual([self.server1.uuid, evil_server.uuid, missing],
+                         [r['uuid'] for r in results])
+        self.assertEqual([True, False, False],
+                         [r['accepted'] for r in results])
+        self.assertIn('could not be found', results[1]['error'])
+        servers = mock_power_all.call_args[0][1]
+        self.assertEqual([self.server1.uuid], [s.uuid for s in servers])
+        self.assertEqual('reboot', mock_power_all.call_args[0][2])
+
+    def test_server_power_all_invalid_target(self):
+        self.context.tenant = self.server1.project_id
+        headers = self.gen_headers(self.context, roles="no-admin")
+        body = {'servers': [self.server1.uuid], 'target': 'explode'}
+        self.put_json('/servers/power', body, headers=headers,
+                      status=http_client.BAD_REQUEST)
+
+    @mock.patch('mogan.engine.api.API.delete_all')
+    def test_server_batch_delete(self, mock_delete_all):
+        evil_server = utils.create_test_server(
+            name="T2", uuid=uuidutils.generate_uuid(),
+            project_id=self.evil_project)
+        mock_delete_all.return_value = {}
+        self.context.tenant = self.server1.project_id
+        headers = self.gen_headers(self.context, roles="no-admin")
+        body = {'servers': [self.server1.uuid, evil_server.uuid]}
+        resp = self.post_json('/servers/batch_delete', body, headers=headers,
+                              status=http_client.ACCEPTED)
+
+        results = resp.json['servers']
+        self.assertEqual([True, False], [r['accepted'] for r in results])
+        self.assertIn('could not be found', results[1]['error'])
+        servers = mock_delete_all.call_args[0][1]
+        self.assertEqual([self.server1.uuid], [s.uuid for s in servers])
+
 
 class TestPatch(v1_test.APITestV1):
 
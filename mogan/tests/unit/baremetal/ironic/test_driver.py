@@ -0,0 +1,101 @@
+# Licensed under the Apache License, Version 2.0 (the "License"); you may
+# not use this file except in compliance with the License. You may obtain
+# a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+# WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+# License for the specific language governing permissions and limitations
+# under the License.
+
+from ironicclient import exc as ironic_exc
+import mock
+
+from mogan.baremetal.ironic import driver
+from mogan.common import exception
+from mogan.tests import base
+
+
+def _node(uuid, resource_class='gold'):
+    return mock.Mock(uuid=uuid, resource_class=resource_class,
+                     power_state='power off', provision_state='active',
+                     instance_info={})
+
+
+def _port(uuid, node_uuid, vif=None):
+    return mock.Mock(uuid=uuid, node_uuid=node_uuid, address=uuid + '-mac',
+                     extra={}, internal_info={'tenant_vif_port_id': vif})
+
+
+class IronicDriverTestCase(base.TestCase):
+
+    def setUp(self):
+        super(IronicDriverTestCase, self).setUp()
+        self.driver = driver.IronicDriver()
+        self.mock_call = mock.patch.object(
+            self.driver.ironicclient, 'call', autospec=True).start()
+        self.addCleanup(mock.patch.stopall)
+
+    def _set_ironic(self, nodes, ports, portgroups):
+        resources = {'node.list': nodes, 'port.list': ports,
+                     'portgroup.list': portgroups}
+        self.mock_call.side_effect = (
+            lambda method, *args, **kwargs: resources[method])
+
+    def test_group_by_node(self):
+        ports = [_port('port-1', 'node-1'), _port('port-2', 'node-2'),
+                 _port('port-3', 'node-1'), _port('port-4', 'unknown')]
+        grouped = self.driver._group_by_node(ports, {'node-1', 'node-2',
+                                                     'node-3'})
+        self.assertEqual({'node-1': ['port-1', 'port-3'],
+                          'node-2': ['port-2']},
+                         dict((node, [p['uuid'] for p in node_ports])
+                              for node, node_ports in grouped.items()))
+        self.assertEqual([], grouped.get('node-3', []))
+
+    def test_get_manageable_nodes(self):
+        nodes = [_node('node-1'), _node('node-2'), _node('node-3'),
+                 _node('node-4', resource_class=None)]
+        ports = [_port('port-1', 'node-1', vif='vif-1'),
+                 _port('port-2', 'node-2'), _port('port-3', 'node-1'),
+                 _port('port-4', 'node-4')]
+        portgroups = [_port('pg-1', 'node-2', vif='vif-2')]
+        self._set_ironic(nodes, ports, portgroups)
+
+        resources = self.driver._get_manageable_nodes()
+
+        self.assertEqual(['node-1', 'node-2', 'node-3'], sorted(resources))
+        self.assertEqual(
+            [{'uuid': 'port-1', 'address': 'port-1-mac',
+              'neutron_port_id': 'vif-1'},
+             {'uuid': 'port-3', 'address': 'port-3-mac',
+              'neutron_port_id': None}],
+            resources['node-1']['ports'])
+        self.assertEqual([], resources['node-1']['portgroups'])
+        self.assertEqual(['port-2'],
+                         [p['uuid'] for p in resources['node-2']['ports']])
+        self.assertEqual(
+            [{'uuid': 'pg-1', 'address': 'pg-1-mac',
+              'neutron_port_id': 'vif-2'}],
+            resources['node-2']['portgroups'])
+        # Nodes without ports nor portgroups
+        self.assertEqual([], resources['node-3']['ports'])
+        self.assertEqual([], resources['node-3']['portgroups'])
+
+    @mock.patch.object(driver.IronicDriver, '_remove_server_info_from_node')
+    @mock.patch.object(driver.IronicDriver, '_validate_server_and_node')
+    def test_destroy_servers_node_errors(self, validate_mock, remove_mock):
+        servers = [mock.Mock(uuid=uuid, nics=[])
+                   for uuid in ('server-1', 'server-2', 'server-3')]
+        node = _node('node-3')
+        node.provision_state = 'available'
+        failure = ironic_exc.ConnectionRefused()
+        validate_mock.side_effect = [
+            exception.ServerNotFound(server='server-1'), failure, node]
+
+        errors = self.driver.destroy_servers(self.context, servers)
+
+        self.assertEqual({'server-2': failure}, errors)
+        remove_mock.assert_called_once_with(node, servers[2])
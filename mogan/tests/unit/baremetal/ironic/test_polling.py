@@ -0,0 +1,108 @@
+# Licensed under the Apache License, Version 2.0 (the "License"); you may
+# not use this file except in compliance with the License. You may obtain
+# a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+# WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+# License for the specific language governing permissions and limitations
+# under the License.
+
+import mock
+from oslo_service import loopingcall
+
+from mogan.baremetal.ironic import polling
+from mogan.tests import base
+
+
+class TestPollingPolicy(base.TestCase):
+
+    def setUp(self):
+        super(TestPollingPolicy, self).setUp()
+        self.config(polling_min_interval=1.0, polling_max_interval=30.0,
+                    polling_backoff_factor=2.0, polling_jitter=0.0,
+                    deploy_expected_duration=600, group='ironic')
+        self.policy = polling.PollingPolicy('deploy')
+
+    def _node(self, driver='ipmi', resource_class='gold'):
+        return mock.Mock(uuid='node-uuid', driver=driver,
+                         resource_class=resource_class)
+
+    def test_next_interval_backs_off_from_start(self):
+        self.assertEqual(
+            [1.0, 2.0, 4.0, 8.0],
+            [self.policy.next_interval(i, 600, i, 0) for i in range(4)])
+
+    def test_next_interval_halves_remaining_time(self):
+        self.assertEqual(20.0, self.policy.next_interval(0, 40, 5, 0))
+        self.assertEqual(10.0, self.policy.next_interval(20, 40, 5, 0))
+        self.assertEqual(5.0, self.policy.next_interval(30, 40, 5, 0))
+
+    def test_next_interval_backs_off_after_expected_time(self):
+        self.assertEqual(
+            [1.0, 2.0, 4.0, 8.0],
+            [self.policy.next_interval(40 + i, 40, 5, i) for i in range(4)])
+
+    def test_next_interval_clamped(self):
+        # Far from the expected time, the interval is capped.
+        self.assertEqual(30.0, self.policy.next_interval(100, 600, 10, 0))
+        # Close to it, the interval doesn't go below the minimum.
+        self.assertEqual(1.0, self.policy.next_interval(39.5, 40, 5, 0))
+        # Nor does the backoff go past the maximum.
+        self.assertEqual(30.0, self.policy.next_interval(100, 40, 5, 10))
+
+    def test_next_interval_jitter(self):
+        self.config(polling_jitter=0.5, group='ironic')
+        with mock.patch.object(polling.random, 'uniform',
+                               return_value=1.5) as mock_uniform:
+            self.assertEqual(15.0, self.policy.next_interval(0, 20, 5, 0))
+        mock_uniform.assert_called_once_with(0.5, 1.5)
+
+    def test_expected_duration_default(self):
+        self.assertEqual(600, self.policy.expected_duration())
+        self.assertEqual(600, self.policy.expected_duration(self._node()))
+        self.assertEqual(
+            10, polling.PollingPolicy('power').expected_duration())
+
+    def test_record(self):
+        node = self._node()
+        self.policy.record(node, 300)
+        # 0.3 * 300 + 0.7 * 600
+        self.assertAlmostEqual(510.0, self.policy.expected_duration(node))
+        self.policy.record(node, 510)
+        self.assertAlmostEqual(510.0, self.policy.expected_duration(node))
+
+    def test_record_per_driver_and_resource_class(self):
+        node = self._node()
+        self.policy.record(node, 300)
+        self.assertEqual(
+            600, self.policy.expected_duration(self._node(driver='redfish')))
+        self.assertEqual(
+            600,
+            self.policy.expected_duration(self._node(resource_class='iron')))
+        self.assertAlmostEqual(
+            510.0, self.policy.expected_duration(self._node()))
+
+    def _wait(self, polls, **kwargs):
+        self.config(polling_min_interval=0.1, polling_max_interval=0.1,
+                    deploy_expected_duration=0, group='ironic')
+        func = mock.Mock(side_effect=[None] * (polls - 1) +
+                         [loopingcall.LoopingCallDone(True)])
+        result = self.policy.wait(func, 'arg', key='value', **kwargs)
+        self.assertEqual(polls, func.call_count)
+        func.assert_called_with('arg', key='value')
+        return result
+
+    @mock.patch.object(polling.PollingPolicy, 'record')
+    def test_wait(self, mock_record):
+        self.assertTrue(self._wait(3))
+        self.assertFalse(mock_record.called)
+
+    @mock.patch.object(polling.PollingPolicy, 'record')
+    def test_wait_learns_from_node(self, mock_record):
+        node = self._node()
+        self.assertTrue(self._wait(2, node=node))
+        mock_record.assert_called_once_with(node, mock.ANY)
+        self.assertGreaterEqual(mock_record.call_args[0][1], 0.1)
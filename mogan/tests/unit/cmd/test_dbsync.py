@@ -14,8 +14,16 @@
 #    License for the specific language governing permissions and limitations
 #    under the License.
 
+import fixtures
+import mock
+from oslo_utils import uuidutils
+
+from mogan.cmd import dbsync
+from mogan.conf import CONF
+from mogan.db import api as dbapi
 from mogan.db import migration
 from mogan.tests.unit.db import base
+from mogan.tests.unit.db import utils
 
 
 class DbSyncTestCase(base.DbTestCase):
@@ -24,3 +32,20 @@ class DbSyncTestCase(base.DbTestCase):
         migration.upgrade('head')
         v = migration.version()
         self.assertTrue(v)
+
+    def test_archive_until_complete(self):
+        self.config(soft_delete_servers=True, group='database')
+        uuids = [utils.create_test_server(uuid=uuidutils.generate_uuid(),
+                                          name=str(i)).uuid
+                 for i in range(5)]
+        dbapi.get_instance().servers_destroy(self.context, uuids)
+        command = mock.Mock(max_rows=2, until_complete=True, sleep=0)
+        self.useFixture(fixtures.MockPatchObject(CONF, 'command', command,
+                                                 create=True))
+
+        with mock.patch.object(dbsync, 'time') as time_mock:
+            dbsync.DBCommand().archive()
+
+        self.assertEqual(2, time_mock.sleep.call_count)
+        self.assertEqual(
+            0, dbapi.get_instance().servers_archive_deleted(self.context, 2))
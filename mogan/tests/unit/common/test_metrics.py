@@ -0,0 +1,121 @@
+# Licensed under the Apache License, Version 2.0 (the "License"); you may
+# not use this file except in compliance with the License. You may obtain
+# a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+# WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+# License for the specific language governing permissions and limitations
+# under the License.
+
+import mock
+
+from mogan.common import metrics
+from mogan.tests import base
+
+
+class TestRegistry(base.TestCase):
+
+    def setUp(self):
+        super(TestRegistry, self).setUp()
+        self.registry = metrics.Registry()
+
+    def test_increment(self):
+        self.registry.increment('calls', flow='create')
+        self.registry.increment('calls', 2, flow='create')
+        self.registry.increment('calls', flow='delete')
+        self.assertEqual(3, self.registry.get_counter('calls', flow='create'))
+        self.assertEqual(1, self.registry.get_counter('calls', flow='delete'))
+        self.assertEqual(0, self.registry.get_counter('calls'))
+
+    def test_observe(self):
+        self.registry.observe('duration_seconds', 0.5, task='a')
+        self.registry.observe('duration_seconds', 1.5, task='a')
+        self.assertEqual((2, 2.0),
+                         self.registry.get_histogram('duration_seconds',
+                                                     task='a'))
+        self.assertEqual((0, 0.0),
+                         self.registry.get_histogram('duration_seconds',
+                                                     task='b'))
+
+    @mock.patch('time.time', side_effect=[10.0, 12.5])
+    def test_timer_on_failure(self, mock_time):
+        def _fail():
+            with self.registry.timer('duration_seconds'):
+                raise ValueError()
+
+        self.assertRaises(ValueError, _fail)
+        self.assertEqual((1, 2.5),
+                         self.registry.get_histogram('duration_seconds'))
+
+    def test_render(self):
+        self.registry.increment('calls', flow='create')
+        self.registry.observe('duration_seconds', 0.02, task='a"b')
+        lines = self.registry.render().splitlines()
+        self.assertIn('# TYPE mogan_calls counter', lines)
+        self.assertIn('mogan_calls{flow="create"} 1', lines)
+        self.assertIn('# TYPE mogan_duration_seconds histogram', lines)
+        self.assertIn(
+            'mogan_duration_seconds_bucket{task="a\\"b",le="0.01"} 0', lines)
+        self.assertIn(
+            'mogan_duration_seconds_bucket{task="a\\"b",le="0.025"} 1', lines)
+        self.assertIn(
+            'mogan_duration_seconds_bucket{task="a\\"b",le="+Inf"} 1', lines)
+        self.assertIn('mogan_duration_seconds_count{task="a\\"b"} 1', lines)
+
+    def test_statsd(self):
+        statsd = mock.Mock(spec=metrics.StatsdClient)
+        registry = metrics.Registry(statsd)
+        registry.increment('calls', flow='create')
+        registry.observe('duration_seconds', 0.25)
+        statsd.send.assert_has_calls([
+            mock.call('calls', {'flow': 'create'}, 1, 'c'),
+            mock.call('duration_seconds', {}, '250.000', 'ms')])
+
+
+class TestExternalCalls(base.TestCase):
+
+    def setUp(self):
+        super(TestExternalCalls, self).setUp()
+        self.registry = metrics.Registry()
+        patcher = mock.patch.object(metrics, 'get_registry',
+                                    return_value=self.registry)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def test_count_external_calls(self):
+        metrics.record_external_call('ironic')
+        with metrics.count_external_calls() as calls:
+            metrics.record_external_call('ironic')
+            metrics.record_external_call('placement')
+            with metrics.count_external_calls(calls):
+                metrics.record_external_call('placement')
+        metrics.record_external_call('ironic')
+        self.assertEqual({'ironic': 1, 'placement': 2}, calls.counts)
+        self.assertIsNone(metrics.get_external_calls())
+        self.assertEqual(3, self.registry.get_counter('external_calls',
+                                                      service='ironic'))
+
+    @mock.patch('time.time', side_effect=[10.0, 10.5])
+    def test_time_external_call(self, mock_time):
+        with metrics.count_external_calls() as calls:
+            with metrics.time_external_call('db'):
+                pass
+        self.assertEqual({'db': 1}, calls.counts)
+        self.assertEqual({'db': 0.5}, calls.durations)
+        self.assertEqual((1, 0.5), self.registry.get_histogram(
+            'external_call_duration_seconds', service='db'))
+
+
+class TestStatsdClient(base.TestCase):
+
+    @mock.patch('socket.socket')
+    def test_send(self, mock_socket):
+        client = metrics.StatsdClient('127.0.0.1', 8125, 'mogan')
+        client.send('task_duration_seconds', {'task': 'a.b', 'flow': 'c'},
+                    '1.000', 'ms')
+        mock_socket.return_value.sendto.assert_called_once_with(
+            b'mogan.task_duration_seconds.c.a_b:1.000|ms',
+            ('127.0.0.1', 8125))
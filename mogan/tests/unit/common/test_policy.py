@@ -12,7 +12,9 @@
 
 import mock
 from oslo_context import context
+from oslo_policy import policy as oslo_policy
 
+from mogan.common import exception
 from mogan.common import policy
 from mogan.tests import base
 from mogan.tests.unit.objects import utils
@@ -96,3 +98,48 @@ class TestAuthorizeWsgi(base.TestCase):
         self.assertEqual('Access was denied to the following resource: '
                          'mogan:server:set_lock_state',
                          data['faultstring'])
+
+
+class TestCachingEnforcer(base.TestCase):
+    def setUp(self):
+        super(TestCachingEnforcer, self).setUp()
+        self.enforcer = policy.get_enforcer()
+        self.creds = {'project_id': 'fake-project', 'user_id': 'fake-user',
+                      'roles': ['member'], 'is_admin': False}
+        self.target = {'project_id': 'fake-project', 'user_id': 'fake-user'}
+
+    @mock.patch('oslo_policy._checks._check')
+    def test_enforce_cached(self, mock_check):
+        mock_check.return_value = True
+        for i in range(3):
+            self.assertTrue(policy.check('mogan:server:get', self.target,
+                                         self.creds))
+        self.assertEqual(1, mock_check.call_count)
+
+        other_target = {'project_id': 'other-project', 'user_id': 'fake-user'}
+        policy.check('mogan:server:get', other_target, self.creds)
+        self.assertEqual(2, mock_check.call_count)
+
+    @mock.patch('oslo_policy._checks._check')
+    def test_enforce_cached_across_tokens(self, mock_check):
+        mock_check.return_value = True
+        for token in ('token-1', 'token-2'):
+            creds = dict(self.creds, auth_token=token)
+            self.assertTrue(policy.check('mogan:server:get', self.target,
+                                         creds))
+        self.assertEqual(1, mock_check.call_count)
+
+    def test_enforce_cached_raises(self):
+        other_target = {'project_id': 'other-project', 'user_id': 'fake-user'}
+        for i in range(2):
+            self.assertRaises(exception.HTTPForbidden, policy.authorize,
+                              'mogan:server:get', other_target, self.creds)
+
+    def test_set_rules_drops_decisions(self):
+        self.assertTrue(policy.check('mogan:server:get', self.target,
+                                     self.creds))
+        self.enforcer.set_rules(
+            oslo_policy.Rules.from_dict({'mogan:server:get': '!'}),
+            overwrite=False)
+        self.assertFalse(policy.check('mogan:server:get', self.target,
+                                      self.creds))
@@ -94,3 +94,16 @@ class TestWSGIService(base.TestCase):
                                             host='0.0.0.0',
                                             port=6688,
                                             use_ssl=True)
+
+    @mock.patch.object(service.wsgi, 'Server')
+    def test_wsgi_service_with_group(self, wsgi_server):
+        self.config(metadata_workers=4, group='metadata')
+        application = mock.Mock()
+        srv = service.WSGIService('mogan_metadata', application=application,
+                                  group='metadata')
+        self.assertEqual(4, srv.workers)
+        wsgi_server.assert_called_once_with(CONF, 'mogan_metadata',
+                                            application,
+                                            host='0.0.0.0',
+                                            port=8775,
+                                            use_ssl=False)
@@ -0,0 +1,92 @@
+# Licensed under the Apache License, Version 2.0 (the "License"); you may
+# not use this file except in compliance with the License. You may obtain
+# a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+# WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+# License for the specific language governing permissions and limitations
+# under the License.
+
+import datetime
+
+import fixtures
+import mock
+from oslo_utils import timeutils
+
+from mogan.common import metrics
+from mogan.common import states
+from mogan.common import utils
+from mogan.tests import base
+
+
+@mock.patch.object(utils, 'generate_key_pair')
+class TestKeyPairPool(base.TestCase):
+
+    def test_get_without_pool(self, mock_generate):
+        mock_generate.return_value = ('private', 'public', 'fingerprint')
+        pool = utils.KeyPairPool(0)
+        with mock.patch.object(utils, 'spawn_n') as mock_spawn:
+            self.assertEqual(('private', 'public', 'fingerprint'),
+                             pool.get())
+            self.assertFalse(mock_spawn.called)
+        mock_generate.assert_called_once_with(2048)
+
+    def test_get_refills(self, mock_generate):
+        mock_generate.side_effect = [(str(i), str(i), str(i))
+                                     for i in range(4)]
+        pool = utils.KeyPairPool(2)
+        with mock.patch.object(utils, 'spawn_n') as mock_spawn:
+            self.assertEqual(('0', '0', '0'), pool.get())
+            self.assertEqual(1, mock_spawn.call_count)
+            # Refill the pool as the background green thread would.
+            mock_spawn.call_args[0][0](*mock_spawn.call_args[0][1:])
+            self.assertEqual(('1', '1', '1'), pool.get())
+            self.assertEqual(('2', '2', '2'), pool.get())
+        self.assertEqual(3, mock_generate.call_count)
+
+    def test_get_not_shared_with_forked_processes(self, mock_generate):
+        mock_generate.side_effect = [(str(i), str(i), str(i))
+                                     for i in range(4)]
+        pool = utils.KeyPairPool(1)
+        with mock.patch.object(utils, 'spawn_n') as mock_spawn:
+            pool.get()
+            mock_spawn.call_args[0][0](*mock_spawn.call_args[0][1:])
+            with mock.patch('os.getpid', return_value=-1):
+                self.assertEqual(('2', '2', '2'), pool.get())
+
+
+class TestProcessEvent(base.TestCase):
+
+    def setUp(self):
+        super(TestProcessEvent, self).setUp()
+        self.registry = metrics.Registry()
+        self.useFixture(fixtures.MockPatchObject(
+            metrics, 'get_registry', return_value=self.registry))
+        self.server = mock.Mock(uuid='fake-uuid',
+                                created_at=datetime.datetime(2017, 1, 1),
+                                updated_at=datetime.datetime(2017, 1, 1, 0,
+                                                             0, 30))
+        self.server.obj_attr_is_set.return_value = True
+
+    @mock.patch.object(timeutils, 'utcnow',
+                       return_value=datetime.datetime(2017, 1, 1, 0, 1))
+    def test_records_status_duration(self, mock_utcnow):
+        fsm = states.machine.copy()
+        fsm.initialize(states.BUILDING)
+        utils.process_event(fsm, self.server, event='done')
+        self.assertEqual(states.ACTIVE, self.server.status)
+        self.assertEqual(mock_utcnow.return_value, self.server.updated_at)
+        self.server.save.assert_called_once_with(
+            expected_status=states.BUILDING)
+        self.assertEqual((1, 60.0), self.registry.get_histogram(
+            'server_status_duration_seconds', status=states.BUILDING))
+
+    def test_stable_status_not_recorded(self):
+        fsm = states.machine.copy()
+        fsm.initialize(states.ACTIVE)
+        utils.process_event(fsm, self.server, event='stop')
+        self.assertEqual((0, 0.0), self.registry.get_histogram(
+            'server_status_duration_seconds', status=states.ACTIVE))
@@ -20,6 +20,7 @@ from oslo_config import cfg
 from oslo_db.sqlalchemy import enginefacade
 
 from mogan.db import api as dbapi
+from mogan.db.sqlalchemy import api as sqlalchemy_api
 from mogan.db.sqlalchemy import migration
 from mogan.db.sqlalchemy import models
 from mogan.tests import base
@@ -56,6 +57,7 @@ class Database(fixtures.Fixture):
         conn = self.engine.connect()
         conn.connection.executescript(self._DB)
         self.addCleanup(self.engine.dispose)
+        self.addCleanup(sqlalchemy_api._flavor_cache_clear)
 
     def post_migrations(self):
         """Any addition steps that are needed outside of the migrations."""
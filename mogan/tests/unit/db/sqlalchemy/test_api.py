@@ -12,8 +12,15 @@
 
 import inspect
 
+from oslo_db import exception as db_exc
+from oslo_db.sqlalchemy import enginefacade
+from sqlalchemy.dialects import sqlite
+
+from mogan.common import metrics
 from mogan.db.sqlalchemy import api as sqlalchemy_api
+from mogan.db.sqlalchemy import models
 from mogan.tests import base as test_base
+from mogan.tests.unit.db import base as db_base
 
 
 class TestDBWriteMethodsRetryOnDeadlock(test_base.TestCase):
@@ -30,3 +37,45 @@ class TestDBWriteMethodsRetryOnDeadlock(test_base.TestCase):
                     'oslo_db\'s retry_on_deadlock decorator not '
                     'applied to method mogan.db.sqlalchemy.api.Connection.%s '
                     'doing database write' % name)
+
+
+class TestShadowModels(test_base.TestCase):
+
+    def test_shadow_columns(self):
+        # Archiving copies the columns of the shadow tables, they must have
+        # all the columns of the archived tables.
+        dialect = sqlite.dialect()
+        for model, shadow_model in (
+                (models.Server, models.ShadowServer),
+                (models.ServerNic, models.ShadowServerNic),
+                (models.ServerFault, models.ShadowServerFault)):
+            columns = model.__table__.columns
+            shadow_columns = shadow_model.__table__.columns
+            self.assertEqual(sorted(c.name for c in columns),
+                             sorted(c.name for c in shadow_columns))
+            for column in columns:
+                shadow_type = shadow_columns[column.name].type
+                self.assertEqual(column.type.compile(dialect),
+                                 shadow_type.compile(dialect), column.name)
+                if hasattr(column.type, 'enums'):
+                    self.assertEqual(sorted(column.type.enums),
+                                     sorted(shadow_type.enums))
+
+
+class TestQueryListeners(db_base.DbTestCase):
+
+    def test_queries_recorded(self):
+        with metrics.count_external_calls() as calls:
+            self.dbapi.server_get_all(self.context, project_only=False)
+        self.assertIn('db', calls.counts)
+
+    def test_failed_query(self):
+        engine = enginefacade.get_legacy_facade().get_engine()
+        with engine.connect() as conn:
+            with metrics.count_external_calls() as calls:
+                self.assertRaises(db_exc.DBError, conn.execute,
+                                  'SELECT * FROM missing')
+                conn.execute('SELECT 1')
+            self.assertEqual({'db': 1}, calls.counts)
+            self.assertNotIn(sqlalchemy_api._QUERY_STARTED_AT_KEY,
+                             conn.connection.info)
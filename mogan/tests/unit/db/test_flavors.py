@@ -15,10 +15,13 @@
 
 """Tests for manipulating Flavors via the DB API"""
 
+import mock
+from oslo_context import context
 from oslo_utils import uuidutils
 import six
 
 from mogan.common import exception
+from mogan.db.sqlalchemy import api as sqlalchemy_api
 from mogan.tests.unit.db import base
 from mogan.tests.unit.db import utils
 
@@ -73,3 +76,50 @@ class DbFlavorTestCase(base.DbTestCase):
                           self.dbapi.flavor_destroy,
                           self.context,
                           uuidutils.generate_uuid())
+
+    def test_get_flavor_cached(self):
+        flavor = self.dbapi.flavor_get(self.context, self.flavor['uuid'])
+        with mock.patch.object(sqlalchemy_api.Connection,
+                               '_flavor_get') as mock_get:
+            self.assertEqual(flavor, self.dbapi.flavor_get(
+                self.context, self.flavor['uuid']))
+            self.assertFalse(mock_get.called)
+
+    def test_get_flavor_cached_per_project(self):
+        flavor = utils.create_test_flavor(uuid=uuidutils.generate_uuid(),
+                                          name='private', is_public=False)
+        self.dbapi.flavor_access_add(self.context, flavor['uuid'],
+                                     'project-a')
+        ctxt_a = context.RequestContext(tenant='project-a')
+        ctxt_b = context.RequestContext(tenant='project-b')
+        self.dbapi.flavor_get(ctxt_a, flavor['uuid'])
+        self.assertRaises(exception.FlavorNotFound,
+                          self.dbapi.flavor_get, ctxt_b, flavor['uuid'])
+
+    def test_get_flavor_cache_dropped_on_access_remove(self):
+        flavor = utils.create_test_flavor(uuid=uuidutils.generate_uuid(),
+                                          name='private', is_public=False)
+        self.dbapi.flavor_access_add(self.context, flavor['uuid'],
+                                     'project-a')
+        ctxt_a = context.RequestContext(tenant='project-a')
+        self.dbapi.flavor_get(ctxt_a, flavor['uuid'])
+        self.dbapi.flavor_access_remove(self.context, flavor['id'],
+                                        'project-a')
+        self.assertRaises(exception.FlavorNotFound,
+                          self.dbapi.flavor_get, ctxt_a, flavor['uuid'])
+
+    def test_get_flavor_cache_dropped_on_update(self):
+        self.dbapi.flavor_get(self.context, self.flavor['uuid'])
+        self.dbapi.flavor_update(self.context, self.flavor['uuid'],
+                                 {'description': 'updated'})
+        flavor = self.dbapi.flavor_get(self.context, self.flavor['uuid'])
+        self.assertEqual('updated', flavor['description'])
+
+    def test_get_flavor_cache_disabled(self):
+        self.config(flavor_cache_expiration=0, group='database')
+        self.dbapi.flavor_get(self.context, self.flavor['uuid'])
+        with mock.patch.object(sqlalchemy_api.Connection,
+                               '_flavor_get') as mock_get:
+            self.dbapi.flavor_get(self.context, self.flavor['uuid'])
+            mock_get.assert_called_once_with(self.context,
+                                             self.flavor['uuid'])
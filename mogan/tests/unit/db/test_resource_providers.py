@@ -0,0 +1,194 @@
+# Copyright 2017 Huawei Technologies Co.,LTD.
+# All Rights Reserved.
+#
+#    Licensed under the Apache License, Version 2.0 (the "License"); you may
+#    not use this file except in compliance with the License. You may obtain
+#    a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#    WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#    License for the specific language governing permissions and limitations
+#    under the License.
+
+"""Tests for manipulating Resource Providers via the DB API"""
+
+import mock
+from oslo_utils import uuidutils
+
+from mogan.common import exception
+from mogan.db.sqlalchemy import api as sqlalchemy_api
+from mogan.tests.unit.db import base
+
+RC = 'CUSTOM_GOLD'
+
+
+def _inventory(total=1, **kw):
+    inventory = {'total': total,
+                 'reserved': 0,
+                 'min_unit': 1,
+                 'max_unit': total,
+                 'step_size': 1,
+                 'allocation_ratio': 1.0}
+    inventory.update(kw)
+    return {RC: inventory}
+
+
+class DbResourceProviderTestCase(base.DbTestCase):
+
+    def setUp(self):
+        super(DbResourceProviderTestCase, self).setUp()
+        self.rp_uuid = uuidutils.generate_uuid()
+        self.rp = self.dbapi.resource_provider_set_inventory(
+            self.context, self.rp_uuid, 'node-1', _inventory())
+
+    def _filter(self, resources=None, member_of=None):
+        return [rp.uuid for rp in self.dbapi.resource_provider_get_all(
+            self.context, resources=resources, member_of=member_of)]
+
+    def test_set_inventory_creates_provider(self):
+        rp = self.dbapi.resource_provider_get(self.context, self.rp_uuid)
+        self.assertEqual('node-1', rp.name)
+        self.assertEqual(1, rp.generation)
+
+    def test_set_inventory_unchanged(self):
+        rp = self.dbapi.resource_provider_set_inventory(
+            self.context, self.rp_uuid, 'node-1', _inventory())
+        self.assertEqual(1, rp.generation)
+        rp = self.dbapi.resource_provider_set_inventory(
+            self.context, self.rp_uuid, 'node-1', _inventory(reserved=1))
+        self.assertEqual(2, rp.generation)
+
+    def test_set_inventory_in_use(self):
+        self.dbapi.allocations_put(self.context, self.rp_uuid, 'server-1',
+                                   {RC: 1})
+        self.assertRaises(exception.InventoryInUse,
+                          self.dbapi.resource_provider_set_inventory,
+                          self.context, self.rp_uuid, 'node-1', {})
+
+    def test_get_all_by_resources(self):
+        self.assertEqual([self.rp_uuid], self._filter({RC: 1}))
+        self.assertEqual([], self._filter({RC: 2}))
+        self.assertEqual([], self._filter({'CUSTOM_SILVER': 1}))
+        self.dbapi.allocations_put(self.context, self.rp_uuid, 'server-1',
+                                   {RC: 1})
+        self.assertEqual([], self._filter({RC: 1}))
+        self.dbapi.allocations_delete(self.context, 'server-1')
+        self.assertEqual([self.rp_uuid], self._filter({RC: 1}))
+
+    def test_get_all_by_aggregates(self):
+        agg_uuid = uuidutils.generate_uuid()
+        self.assertEqual([], self._filter(member_of=[agg_uuid]))
+        self.dbapi.resource_provider_aggregates_set(
+            self.context, self.rp_uuid, [agg_uuid])
+        self.assertEqual([self.rp_uuid], self._filter(member_of=[agg_uuid]))
+        self.assertEqual(
+            [agg_uuid], self.dbapi.resource_provider_aggregates_get(
+                self.context, self.rp_uuid))
+        self.dbapi.resource_provider_aggregate_remove(self.context, agg_uuid)
+        self.assertEqual([], self._filter(member_of=[agg_uuid]))
+
+    def test_aggregates_update(self):
+        agg_1, agg_2 = (uuidutils.generate_uuid() for i in range(2))
+        self.dbapi.resource_provider_aggregates_update(
+            self.context, self.rp_uuid, added=[agg_1, agg_2])
+        self.dbapi.resource_provider_aggregates_update(
+            self.context, self.rp_uuid, added=[agg_1], removed=[agg_2])
+        self.assertEqual([agg_1], self.dbapi.resource_provider_aggregates_get(
+            self.context, self.rp_uuid))
+        rp = self.dbapi.resource_provider_get(self.context, self.rp_uuid)
+        self.assertEqual(3, rp.generation)
+
+        # Removing an aggregate the provider isn't in is a no-op.
+        self.dbapi.resource_provider_aggregates_update(
+            self.context, self.rp_uuid, removed=[agg_2])
+        rp = self.dbapi.resource_provider_get(self.context, self.rp_uuid)
+        self.assertEqual(3, rp.generation)
+
+    def test_aggregates_update_concurrent(self):
+        agg_uuid = uuidutils.generate_uuid()
+        conflict = exception.ResourceProviderConcurrentUpdate(
+            resource_provider=self.rp_uuid)
+        with mock.patch.object(
+                sqlalchemy_api, '_resource_provider_increment_generation',
+                side_effect=[conflict, None]) as mock_increment:
+            self.dbapi.resource_provider_aggregates_update(
+                self.context, self.rp_uuid, added=[agg_uuid])
+        # The update conflicting with a concurrent one is retried.
+        self.assertEqual(2, mock_increment.call_count)
+        self.assertEqual([agg_uuid],
+                         self.dbapi.resource_provider_aggregates_get(
+                             self.context, self.rp_uuid))
+
+    def test_allocations_put(self):
+        self.dbapi.allocations_put(self.context, self.rp_uuid, 'server-1',
+                                   {RC: 1}, 'project', 'user')
+        allocations = self.dbapi.allocations_get_by_resource_provider(
+            self.context, self.rp_uuid)
+        self.assertEqual([('server-1', RC, 1, 'project')],
+                         [(a.consumer_id, a.resource_class, a.used,
+                           a.project_id) for a in allocations])
+        rp = self.dbapi.resource_provider_get(self.context, self.rp_uuid)
+        self.assertEqual(2, rp.generation)
+
+    def test_allocations_put_insufficient(self):
+        self.dbapi.allocations_put(self.context, self.rp_uuid, 'server-1',
+                                   {RC: 1})
+        self.assertRaises(exception.InsufficientResources,
+                          self.dbapi.allocations_put,
+                          self.context, self.rp_uuid, 'server-2', {RC: 1})
+        # The allocations of a consumer are replaced, not added to
+        self.dbapi.allocations_put(self.context, self.rp_uuid, 'server-1',
+                                   {RC: 1})
+
+    def test_allocations_put_step_size(self):
+        self.dbapi.resource_provider_set_inventory(
+            self.context, self.rp_uuid, 'node-1',
+            _inventory(total=4, step_size=2))
+        self.assertEqual([], self._filter({RC: 3}))
+        self.assertRaises(exception.InsufficientResources,
+                          self.dbapi.allocations_put,
+                          self.context, self.rp_uuid, 'server-1', {RC: 3})
+        self.dbapi.allocations_put(self.context, self.rp_uuid, 'server-1',
+                                   {RC: 2})
+
+    def test_allocations_put_concurrent_update_retried(self):
+        increment = sqlalchemy_api._resource_provider_increment_generation
+        calls = []
+
+        def _increment(context, rp):
+            calls.append(rp.generation)
+            if len(calls) == 1:
+                raise exception.ResourceProviderConcurrentUpdate(
+                    resource_provider=rp.uuid)
+            increment(context, rp)
+
+        with mock.patch.object(sqlalchemy_api,
+                               '_resource_provider_increment_generation',
+                               side_effect=_increment):
+            self.dbapi.allocations_put(self.context, self.rp_uuid,
+                                       'server-1', {RC: 1})
+        self.assertEqual([1, 1], calls)
+        rp = self.dbapi.resource_provider_get(self.context, self.rp_uuid)
+        self.assertEqual(2, rp.generation)
+        allocations = self.dbapi.allocations_get_by_resource_provider(
+            self.context, self.rp_uuid)
+        self.assertEqual(['server-1'], [a.consumer_id for a in allocations])
+
+    def test_allocations_put_provider_not_found(self):
+        self.assertRaises(exception.ResourceProviderNotFound,
+                          self.dbapi.allocations_put,
+                          self.context, uuidutils.generate_uuid(),
+                          'server-1', {RC: 1})
+
+    def test_destroy(self):
+        self.dbapi.allocations_put(self.context, self.rp_uuid, 'server-1',
+                                   {RC: 1})
+        self.dbapi.resource_provider_destroy(self.context, self.rp_uuid)
+        self.assertRaises(exception.ResourceProviderNotFound,
+                          self.dbapi.resource_provider_get,
+                          self.context, self.rp_uuid)
+        self.assertEqual(0, self.dbapi.allocations_delete(self.context,
+                                                          'server-1'))
@@ -15,6 +15,8 @@
 
 """Tests for manipulating Server Faults via the DB API"""
 
+import datetime
+
 from oslo_utils import uuidutils
 
 from mogan.tests.unit.db import base
@@ -90,3 +92,53 @@ class DbServerFaultTestCase(base.DbTestCase):
             self.ctxt,
             [server.uuid])
         self.assertEqual(0, len(faults[server.uuid]))
+
+    def test_server_fault_prune(self):
+        uuids = [uuidutils.generate_uuid(), uuidutils.generate_uuid()]
+        for uuid in uuids:
+            utils.create_test_server(self.ctxt, uuid=uuid)
+        for code in range(400, 405):
+            utils.create_test_server_fault(self.ctxt, server_uuid=uuids[0],
+                                           code=code)
+        utils.create_test_server_fault(self.ctxt, server_uuid=uuids[1])
+
+        count = self.dbapi.server_fault_prune(self.ctxt, 2, 100)
+
+        self.assertEqual(3, count)
+        faults = self.dbapi.server_fault_get_by_server_uuids(self.ctxt,
+                                                             uuids)
+        self.assertEqual([404, 403], [f['code'] for f in faults[uuids[0]]])
+        self.assertEqual(1, len(faults[uuids[1]]))
+        self.assertEqual(0, self.dbapi.server_fault_prune(self.ctxt, 2, 100))
+
+    def test_server_fault_prune_max_rows(self):
+        uuids = [uuidutils.generate_uuid(), uuidutils.generate_uuid()]
+        for uuid in uuids:
+            utils.create_test_server(self.ctxt, uuid=uuid)
+            for code in range(400, 404):
+                utils.create_test_server_fault(self.ctxt, server_uuid=uuid,
+                                               code=code)
+
+        self.assertEqual(3, self.dbapi.server_fault_prune(self.ctxt, 1, 3))
+        self.assertEqual(3, self.dbapi.server_fault_prune(self.ctxt, 1, 3))
+        self.assertEqual(0, self.dbapi.server_fault_prune(self.ctxt, 1, 3))
+
+        faults = self.dbapi.server_fault_get_by_server_uuids(self.ctxt,
+                                                             uuids)
+        for uuid in uuids:
+            self.assertEqual([403], [f['code'] for f in faults[uuid]])
+
+    def test_server_fault_prune_by_creation_time(self):
+        uuid = uuidutils.generate_uuid()
+        utils.create_test_server(self.ctxt, uuid=uuid)
+        # The latest faults are the ones created last, whatever their ids
+        for code, minute in ((400, 3), (401, 1), (402, 2), (403, 0)):
+            utils.create_test_server_fault(
+                self.ctxt, server_uuid=uuid, code=code,
+                create_at=datetime.datetime(2017, 1, 1, 0, minute))
+
+        self.assertEqual(2, self.dbapi.server_fault_prune(self.ctxt, 2, 100))
+
+        faults = self.dbapi.server_fault_get_by_server_uuids(self.ctxt,
+                                                             [uuid])
+        self.assertEqual([400, 402], [f['code'] for f in faults[uuid]])
@@ -0,0 +1,161 @@
+# Copyright 2017 Huawei Technologies Co.,LTD.
+# All Rights Reserved.
+#
+#    Licensed under the Apache License, Version 2.0 (the "License"); you may
+#    not use this file except in compliance with the License. You may obtain
+#    a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#    WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#    License for the specific language governing permissions and limitations
+#    under the License.
+
+"""Tests for manipulating Server Metadata Documents via the DB API"""
+
+from oslo_utils import uuidutils
+
+from mogan.common import exception
+from mogan.tests.unit.db import base
+from mogan.tests.unit.db import utils
+
+NETWORK_ID = 'bf942f63-c284-4eb8-925b-c2fa1a89ed33'
+
+
+def _addresses(*addresses):
+    return [{'network_id': NETWORK_ID, 'address': address}
+            for address in addresses]
+
+
+class DbServerMetadataDocumentsTestCase(base.DbTestCase):
+
+    def setUp(self):
+        super(DbServerMetadataDocumentsTestCase, self).setUp()
+        self.server = utils.create_test_server()
+        self.documents = {'openstack/latest/meta_data.json': 'e30='}
+
+    def test_set_and_get(self):
+        self.dbapi.server_metadata_documents_set(
+            self.context, self.server.uuid, self.documents,
+            _addresses('10.0.0.2'))
+        res = self.dbapi.server_metadata_documents_get(self.context,
+                                                       self.server.uuid)
+        self.assertEqual(self.documents, res.documents)
+
+    def test_get_not_found(self):
+        self.assertRaises(exception.ServerMetadataNotFound,
+                          self.dbapi.server_metadata_documents_get,
+                          self.context, self.server.uuid)
+
+    def test_get_by_address(self):
+        self.dbapi.server_metadata_documents_set(
+            self.context, self.server.uuid, self.documents,
+            _addresses('10.0.0.2', '10.0.1.2'))
+        for address in ('10.0.0.2', '10.0.1.2'):
+            res = self.dbapi.server_metadata_documents_get_by_address(
+                self.context, address)
+            self.assertEqual(self.server.uuid, res.server_uuid)
+        self.assertRaises(exception.ServerMetadataNotFound,
+                          self.dbapi.server_metadata_documents_get_by_address,
+                          self.context, '10.0.0.3')
+
+    def test_set_replaces(self):
+        self.dbapi.server_metadata_documents_set(
+            self.context, self.server.uuid, {}, _addresses('10.0.0.2'))
+        self.dbapi.server_metadata_documents_set(
+            self.context, self.server.uuid, self.documents,
+            _addresses('10.0.0.3'))
+        res = self.dbapi.server_metadata_documents_get_by_address(
+            self.context, '10.0.0.3')
+        self.assertEqual(self.documents, res.documents)
+        self.assertRaises(exception.ServerMetadataNotFound,
+                          self.dbapi.server_metadata_documents_get_by_address,
+                          self.context, '10.0.0.2')
+
+    def test_set_reused_address(self):
+        other = utils.create_test_server(uuid=uuidutils.generate_uuid(),
+                                         name='other')
+        self.dbapi.server_metadata_documents_set(
+            self.context, self.server.uuid, {}, _addresses('10.0.0.2'))
+        self.dbapi.server_metadata_documents_set(
+            self.context, other.uuid, self.documents, _addresses('10.0.0.2'))
+        res = self.dbapi.server_metadata_documents_get_by_address(
+            self.context, '10.0.0.2')
+        self.assertEqual(other.uuid, res.server_uuid)
+
+    def test_addresses_add_and_remove(self):
+        other = utils.create_test_server(uuid=uuidutils.generate_uuid(),
+                                         name='other')
+        self.dbapi.server_metadata_documents_set(
+            self.context, self.server.uuid, self.documents,
+            _addresses('10.0.0.2'))
+        self.dbapi.server_metadata_documents_set(
+            self.context, other.uuid, {}, [])
+        # Removing the address of another server is a no-op.
+        self.dbapi.server_metadata_addresses_remove(
+            self.context, other.uuid, _addresses('10.0.0.2'))
+        res = self.dbapi.server_metadata_documents_get_by_address(
+            self.context, '10.0.0.2')
+        self.assertEqual(self.server.uuid, res.server_uuid)
+
+        self.dbapi.server_metadata_addresses_remove(
+            self.context, self.server.uuid, _addresses('10.0.0.2'))
+        self.assertRaises(exception.ServerMetadataNotFound,
+                          self.dbapi.server_metadata_documents_get_by_address,
+                          self.context, '10.0.0.2')
+
+        self.dbapi.server_metadata_addresses_add(
+            self.context, other.uuid, _addresses('10.0.0.2', '10.0.0.3'))
+        for address in ('10.0.0.2', '10.0.0.3'):
+            res = self.dbapi.server_metadata_documents_get_by_address(
+                self.context, address)
+            self.assertEqual(other.uuid, res.server_uuid)
+
+    def test_addresses_add_reused_address(self):
+        other = utils.create_test_server(uuid=uuidutils.generate_uuid(),
+                                         name='other')
+        self.dbapi.server_metadata_documents_set(
+            self.context, self.server.uuid, self.documents,
+            _addresses('10.0.0.2'))
+        self.dbapi.server_metadata_documents_set(
+            self.context, other.uuid, {}, [])
+        self.dbapi.server_metadata_addresses_add(
+            self.context, other.uuid, _addresses('10.0.0.2'))
+        res = self.dbapi.server_metadata_documents_get_by_address(
+            self.context, '10.0.0.2')
+        self.assertEqual(other.uuid, res.server_uuid)
+
+    def test_deleted_with_server(self):
+        self.dbapi.server_metadata_documents_set(
+            self.context, self.server.uuid, self.documents,
+            _addresses('10.0.0.2'))
+        self.dbapi.server_destroy(self.context, self.server.uuid)
+        self.assertRaises(exception.ServerMetadataNotFound,
+                          self.dbapi.server_metadata_documents_get,
+                          self.context, self.server.uuid)
+        self.assertRaises(exception.ServerMetadataNotFound,
+                          self.dbapi.server_metadata_documents_get_by_address,
+                          self.context, '10.0.0.2')
+
+    def test_same_address_on_networks(self):
+        other = utils.create_test_server(uuid=uuidutils.generate_uuid(),
+                                         name='other')
+        other_address = {'network_id': uuidutils.generate_uuid(),
+                         'address': '10.0.0.2'}
+        self.dbapi.server_metadata_documents_set(
+            self.context, self.server.uuid, self.documents,
+            _addresses('10.0.0.2'))
+        self.dbapi.server_metadata_documents_set(
+            self.context, other.uuid, {}, [other_address])
+        # The address of the other network doesn't replace the first one.
+        self.assertRaises(exception.AmbiguousServerMetadataAddress,
+                          self.dbapi.server_metadata_documents_get_by_address,
+                          self.context, '10.0.0.2')
+
+        self.dbapi.server_metadata_addresses_remove(
+            self.context, other.uuid, [other_address])
+        res = self.dbapi.server_metadata_documents_get_by_address(
+            self.context, '10.0.0.2')
+        self.assertEqual(self.server.uuid, res.server_uuid)
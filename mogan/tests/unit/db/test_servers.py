@@ -15,10 +15,14 @@
 
 """Tests for manipulating Servers via the DB API"""
 
+from oslo_db.sqlalchemy import enginefacade
 from oslo_utils import uuidutils
 import six
 
 from mogan.common import exception
+from mogan.common import states
+from mogan.db.sqlalchemy import api as sqlalchemy_api
+from mogan.db.sqlalchemy import models
 from mogan.tests.unit.db import base
 from mogan.tests.unit.db import utils
 
@@ -117,6 +121,85 @@ class DbServerTestCase(base.DbTestCase):
         uuids_project_2 = [r.uuid for r in servers_project_2]
         six.assertCountEqual(self, uuids_project_2, res_uuids)
 
+    def test_server_get_all_flavor_name(self):
+        flavor = utils.create_test_flavor(name='small')
+        server = utils.create_test_server(flavor_uuid=flavor.uuid)
+        utils.create_test_server(uuid=uuidutils.generate_uuid(), name='2')
+        for i in range(2):
+            res = self.dbapi.server_get_all(
+                self.context, project_only=False,
+                filters={'flavor_name': 'small'})
+            self.assertEqual([server.uuid], [r.uuid for r in res])
+
+        res = self.dbapi.server_get_all(self.context, project_only=False,
+                                        filters={'flavor_name': 'unknown'})
+        self.assertEqual([], list(res))
+
+    def test_server_get_all_name_prefix(self):
+        utils.create_test_server(uuid=uuidutils.generate_uuid(),
+                                 name='web-1')
+        utils.create_test_server(uuid=uuidutils.generate_uuid(),
+                                 name='db-web')
+        res = self.dbapi.server_get_all(self.context, project_only=False,
+                                        filters={"name": "web"})
+        self.assertEqual(['web-1'], [r.name for r in res])
+
+    def test_server_get_all_name_prefix_wildcards(self):
+        for name in ('a_b-1', 'axb-1', 'a%b-1', 'ab-1'):
+            utils.create_test_server(uuid=uuidutils.generate_uuid(),
+                                     name=name)
+        for prefix, expected in (('a_b', ['a_b-1']), ('a%b', ['a%b-1'])):
+            res = self.dbapi.server_get_all(self.context, project_only=False,
+                                            filters={"name": prefix})
+            self.assertEqual(expected, [r.name for r in res])
+
+    def test_server_get_all_with_list_filters(self):
+        uuids = []
+        for i, status in enumerate((states.ACTIVE, states.STOPPED,
+                                    states.BUILDING)):
+            server = utils.create_test_server(
+                uuid=uuidutils.generate_uuid(),
+                node_uuid=uuidutils.generate_uuid(),
+                name=str(i), status=status)
+            uuids.append(server.uuid)
+
+        res = self.dbapi.server_get_all(
+            self.context, project_only=False,
+            filters={"status": [states.ACTIVE, states.STOPPED]})
+        six.assertCountEqual(self, uuids[:2], [r.uuid for r in res])
+
+        node_uuids = [r.node_uuid for r in res]
+        res = self.dbapi.server_get_all(
+            self.context, project_only=False,
+            filters={"node_uuid": node_uuids})
+        six.assertCountEqual(self, uuids[:2], [r.uuid for r in res])
+
+    def _get_query_plan(self, filters, project_only=False):
+        query = sqlalchemy_api.model_query(self.context, models.Server,
+                                           project_only=project_only)
+        query = self.dbapi._add_servers_filters(self.context, query,
+                                                filters)
+        engine = enginefacade.get_legacy_facade().get_engine()
+        statement = query.statement.compile(
+            dialect=engine.dialect, compile_kwargs={'literal_binds': True})
+        rows = engine.execute('EXPLAIN QUERY PLAN %s' % statement)
+        return ' '.join(str(row[-1]) for row in rows)
+
+    def test_server_filters_use_indexes(self):
+        plan = self._get_query_plan(
+            {'node_uuid': 'f978ef48-d4af-4dad-beec-e6174309bc71'})
+        self.assertIn('servers_node_uuid_idx', plan)
+
+        self.context.tenant = 'project_1'
+        plan = self._get_query_plan({'status': states.ACTIVE},
+                                    project_only=True)
+        self.assertIn('servers_project_id_status_idx', plan)
+
+        plan = self._get_query_plan(
+            {'flavor_uuid': '28708dff-283c-449e-9bfa-a48c93480c86'},
+            project_only=True)
+        self.assertIn('servers_flavor_uuid_project_id_idx', plan)
+
     def test_server_destroy(self):
         server = utils.create_test_server()
         self.dbapi.server_destroy(self.context, server.uuid)
@@ -131,6 +214,105 @@ class DbServerTestCase(base.DbTestCase):
                           self.context,
                           '12345678-9999-0000-aaaa-123456789012')
 
+    def test_servers_destroy(self):
+        servers = [utils.create_test_server(uuid=uuidutils.generate_uuid(),
+                                            name=str(i))
+                   for i in range(3)]
+        uuids = [s.uuid for s in servers]
+        for uuid in uuids:
+            utils.create_test_server_fault(server_uuid=uuid)
+        utils.create_test_server_group(members=uuids[:2])
+
+        self.dbapi.servers_destroy(self.context, uuids[:2])
+
+        res = self.dbapi.server_get_all(self.context, project_only=False)
+        self.assertEqual([uuids[2]], [r.uuid for r in res])
+        faults = self.dbapi.server_fault_get_by_server_uuids(self.context,
+                                                             uuids)
+        self.assertEqual([0, 0, 1], [len(faults[u]) for u in uuids])
+        for uuid in uuids[:2]:
+            self.assertEqual(
+                [], self.dbapi.server_nics_get_by_server_uuid(self.context,
+                                                              uuid))
+        groups = self.dbapi.server_group_get_all(self.context)
+        self.assertEqual([], groups[0].members)
+
+    def test_servers_destroy_not_exist(self):
+        server = utils.create_test_server()
+        missing = '12345678-9999-0000-aaaa-123456789012'
+        self.assertRaisesRegex(exception.ServerNotFound, missing,
+                               self.dbapi.servers_destroy,
+                               self.context, [server.uuid, missing])
+        # Nothing is deleted if any of the servers does not exist.
+        self.dbapi.server_get(self.context, server.uuid)
+
+    def test_servers_destroy_soft_delete(self):
+        self.config(soft_delete_servers=True, group='database')
+        uuids = [uuidutils.generate_uuid() for i in range(2)]
+        for i, uuid in enumerate(uuids):
+            nics = [{'server_uuid': uuid,
+                     'port_id': uuidutils.generate_uuid(),
+                     'mac_address': '52:54:00:6a:b7:c%d' % i}]
+            utils.create_test_server(uuid=uuid, name=str(i), nics=nics)
+        utils.create_test_server_fault(server_uuid=uuids[0])
+
+        self.dbapi.servers_destroy(self.context, [uuids[0]])
+
+        res = self.dbapi.server_get_all(self.context, project_only=False)
+        self.assertEqual([uuids[1]], [r.uuid for r in res])
+        self.assertRaises(exception.ServerNotFound,
+                          self.dbapi.server_get, self.context, uuids[0])
+        self.assertRaises(exception.ServerNotFound,
+                          self.dbapi.servers_destroy, self.context,
+                          [uuids[0]])
+        deleted = sqlalchemy_api.model_query(
+            self.context, models.Server, deleted=True).one()
+        self.assertEqual(uuids[0], deleted.uuid)
+        self.assertEqual(deleted.id, deleted.deleted)
+        self.assertIsNotNone(deleted.deleted_at)
+        # The faults are kept until the server is archived, the nics are
+        # moved to the shadow table right away.
+        faults = self.dbapi.server_fault_get_by_server_uuids(self.context,
+                                                             uuids)
+        self.assertEqual(1, len(faults[uuids[0]]))
+        self.assertEqual(
+            [], self.dbapi.server_nics_get_by_server_uuid(self.context,
+                                                          uuids[0]))
+        shadow_nics = sqlalchemy_api.model_query(
+            self.context, models.ShadowServerNic).all()
+        self.assertEqual([uuids[0]], [n.server_uuid for n in shadow_nics])
+
+    def test_servers_archive_deleted(self):
+        self.config(soft_delete_servers=True, group='database')
+        uuids = [utils.create_test_server(uuid=uuidutils.generate_uuid(),
+                                          name=str(i)).uuid
+                 for i in range(4)]
+        for uuid in uuids:
+            utils.create_test_server_fault(server_uuid=uuid)
+        self.dbapi.servers_destroy(self.context, uuids[:3])
+
+        self.assertEqual(
+            2, self.dbapi.servers_archive_deleted(self.context, 2))
+        self.assertEqual(
+            1, self.dbapi.servers_archive_deleted(self.context, 2))
+        self.assertEqual(
+            0, self.dbapi.servers_archive_deleted(self.context, 2))
+
+        self.assertEqual([uuids[3]], [r.uuid for r in
+                                      sqlalchemy_api.model_query(
+                                          self.context, models.Server)])
+        shadow_servers = sqlalchemy_api.model_query(
+            self.context, models.ShadowServer).all()
+        self.assertEqual(sorted(uuids[:3]),
+                         sorted(s.uuid for s in shadow_servers))
+        faults = self.dbapi.server_fault_get_by_server_uuids(self.context,
+                                                             uuids)
+        self.assertEqual([0, 0, 0, 1], [len(faults[u]) for u in uuids])
+        shadow_faults = sqlalchemy_api.model_query(
+            self.context, models.ShadowServerFault).all()
+        self.assertEqual(sorted(uuids[:3]),
+                         sorted(f.server_uuid for f in shadow_faults))
+
     def test_server_update(self):
         server = utils.create_test_server()
         old_extra = server.extra
@@ -142,6 +324,89 @@ class DbServerTestCase(base.DbTestCase):
                                        {'extra': new_extra})
         self.assertEqual(new_extra, res.extra)
 
+    def test_server_update_values(self):
+        server = utils.create_test_server()
+        self.dbapi.server_update_values(self.context, server.uuid,
+                                        {'status': states.STOPPED,
+                                         'extra': {'foo': 'bar'}})
+        res = self.dbapi.server_get(self.context, server.uuid)
+        self.assertEqual(states.STOPPED, res.status)
+        self.assertEqual({'foo': 'bar'}, res.extra)
+        self.assertIsNotNone(res.updated_at)
+
+    def test_server_update_values_expected_status(self):
+        server = utils.create_test_server(status=states.ACTIVE)
+        self.dbapi.server_update_values(
+            self.context, server.uuid, {'status': states.POWERING_OFF},
+            expected_status=[states.ACTIVE, states.STOPPED])
+        self.assertRaisesRegex(
+            exception.UnexpectedServerStatus, states.POWERING_OFF,
+            self.dbapi.server_update_values, self.context, server.uuid,
+            {'status': states.POWERING_ON}, expected_status=states.STOPPED)
+        res = self.dbapi.server_get(self.context, server.uuid)
+        self.assertEqual(states.POWERING_OFF, res.status)
+
+    def test_server_update_values_expected_power_state(self):
+        server = utils.create_test_server(power_state=states.POWER_ON)
+        self.assertRaisesRegex(
+            exception.UnexpectedServerPowerState, states.POWER_ON,
+            self.dbapi.server_update_values, self.context, server.uuid,
+            {'power_state': states.POWER_ON},
+            expected_status=states.ACTIVE,
+            expected_power_state=states.POWER_OFF)
+        self.dbapi.server_update_values(
+            self.context, server.uuid, {'power_state': states.POWER_OFF},
+            expected_status=states.ACTIVE,
+            expected_power_state=states.POWER_ON)
+        res = self.dbapi.server_get(self.context, server.uuid)
+        self.assertEqual(states.POWER_OFF, res.power_state)
+
+    def test_servers_update_values(self):
+        servers = [utils.create_test_server(uuid=uuidutils.generate_uuid(),
+                                            name=str(i))
+                   for i in range(3)]
+        self.dbapi.servers_update_values(
+            self.context,
+            {servers[0].uuid: {'node_uuid': 'node-0', 'node': 'name-0'},
+             servers[1].uuid: {'node_uuid': 'node-1', 'node': 'name-1'},
+             servers[2].uuid: {'status': states.ERROR}})
+        res = [self.dbapi.server_get(self.context, s.uuid) for s in servers]
+        self.assertEqual(['node-0', 'node-1'],
+                         [r.node_uuid for r in res[:2]])
+        self.assertEqual(['name-0', 'name-1'], [r.node for r in res[:2]])
+        self.assertEqual(states.ERROR, res[2].status)
+
+    def test_servers_set_engine_host(self):
+        servers = [utils.create_test_server(uuid=uuidutils.generate_uuid(),
+                                            name=str(i),
+                                            status=states.DELETING)
+                   for i in range(3)]
+        self.dbapi.servers_set_engine_host(
+            self.context, [s.uuid for s in servers[:2]], 'engine-1')
+        res = self.dbapi.server_get_all(
+            self.context, project_only=False,
+            filters={'status': [states.DELETING],
+                     'engine_host': 'engine-1'})
+        six.assertCountEqual(self, [s.uuid for s in servers[:2]],
+                             [r.uuid for r in res])
+
+    def test_servers_update_values_not_exist(self):
+        server = utils.create_test_server()
+        missing = uuidutils.generate_uuid()
+        self.assertRaisesRegex(exception.ServerNotFound, missing,
+                               self.dbapi.servers_update_values,
+                               self.context,
+                               {server.uuid: {'node': 'name'},
+                                missing: {'node': 'name'}})
+        res = self.dbapi.server_get(self.context, server.uuid)
+        self.assertNotEqual('name', res.node)
+
+    def test_server_update_values_not_exist(self):
+        self.assertRaises(exception.ServerNotFound,
+                          self.dbapi.server_update_values, self.context,
+                          '12345678-9999-0000-aaaa-123456789012',
+                          {'status': states.ACTIVE})
+
     def test_server_update_with_invalid_parameter_value(self):
         server = utils.create_test_server()
         self.assertRaises(exception.InvalidParameterValue,
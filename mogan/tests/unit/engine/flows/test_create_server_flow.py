@@ -16,8 +16,13 @@
 
 import mock
 from oslo_context import context
+from taskflow import engines
+from taskflow.patterns import linear_flow
+from taskflow import task as flow_task
 
 from mogan.baremetal.ironic import IronicDriver
+from mogan.common import flow_utils
+from mogan.common import metrics
 from mogan.engine.flows import create_server
 from mogan.engine import manager
 from mogan import objects
@@ -58,3 +63,55 @@ class CreateServerFlowTestCase(base.TestCase):
         task.execute(self.ctxt, server_obj, {'value': 'configdrive'}, None)
         mock_spawn.assert_called_once_with(
             self.ctxt, server_obj, 'configdrive', None)
+
+    @mock.patch.object(objects.ServerMetadataDocuments, 'save')
+    @mock.patch.object(create_server.GenerateConfigDriveTask,
+                       '_generate_configdrive')
+    def test_generate_configdrive_task_store_documents(
+            self, mock_generate, mock_save):
+        self.config(store_documents=True, group='metadata')
+        self.config(enabled=False, group='configdrive')
+        task = create_server.GenerateConfigDriveTask()
+        server_obj = obj_utils.get_test_server(self.ctxt)
+        configdrive = {}
+
+        task.execute(self.ctxt, server_obj, None, None, None, configdrive)
+        mock_save.assert_called_once_with()
+        self.assertFalse(mock_generate.called)
+        self.assertEqual({}, configdrive)
+
+
+class _SucceedTask(flow_task.Task):
+
+    def execute(self):
+        pass
+
+
+class _FailTask(flow_task.Task):
+
+    def execute(self):
+        raise ValueError()
+
+
+class TimingListenerTestCase(base.TestCase):
+
+    @mock.patch.object(metrics, 'get_registry')
+    def test_timings(self, mock_registry):
+        registry = mock_registry.return_value = metrics.Registry()
+        flow = linear_flow.Flow('test_flow')
+        flow.add(_SucceedTask(), _FailTask())
+        flow_engine = engines.load(flow)
+
+        with flow_utils.TimingListener(flow_engine) as timer:
+            self.assertRaises(ValueError, flow_engine.run)
+
+        self.assertEqual(
+            [('_SucceedTask', 'execute', 'success'),
+             ('_FailTask', 'execute', 'failure'),
+             ('_FailTask', 'revert', 'success'),
+             ('_SucceedTask', 'revert', 'success')],
+            [(t['task'], t['action'], t['outcome']) for t in timer.timings])
+        count, duration = registry.get_histogram(
+            'task_duration_seconds', flow='test_flow', task='_FailTask',
+            action='execute', outcome='failure')
+        self.assertEqual(1, count)
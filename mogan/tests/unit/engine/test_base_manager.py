@@ -15,7 +15,12 @@
 import eventlet
 import mock
 from oslo_config import cfg
+from oslo_context import context
+from oslo_service import periodic_task
 
+from mogan.common import metrics
+from mogan.engine import base_manager
+from mogan.tests import base as tests_base
 from mogan.tests.unit.db import base as tests_db_base
 from mogan.tests.unit.engine import mgr_utils
 
@@ -34,3 +39,78 @@ class StartStopTestCase(mgr_utils.ServiceSetUpMixin, tests_db_base.DbTestCase):
         self._start_service()
         self.service.del_host()
         self.assertTrue(wait_mock.called)
+
+
+class _PeriodicManager(base_manager.BaseEngineManager):
+
+    @periodic_task.periodic_task(spacing=10)
+    def _sync(self, context):
+        metrics.record_external_call('ironic')
+        return 3
+
+    @periodic_task.periodic_task(spacing=10)
+    def _fail(self, context):
+        raise ValueError()
+
+
+@mock.patch.object(base_manager, 'time')
+class PeriodicTaskStatsTestCase(tests_base.TestCase):
+
+    def setUp(self):
+        super(PeriodicTaskStatsTestCase, self).setUp()
+        self.registry = metrics.Registry()
+        patcher = mock.patch.object(metrics, 'get_registry',
+                                    return_value=self.registry)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.manager = _PeriodicManager('test-host', 'test-topic')
+        self.context = context.get_admin_context()
+        self.task = dict(self.manager._periodic_tasks)['_sync']
+        self.stats = self.manager.periodic_task_stats['_sync']
+
+    def test_run(self, mock_time):
+        mock_time.time.side_effect = [100.0, 102.0]
+        self.assertEqual(3, self.task(self.manager, self.context))
+        self.assertEqual(1, self.stats.runs)
+        self.assertEqual(2.0, self.stats.last_duration)
+        self.assertEqual(3, self.stats.last_items)
+        self.assertEqual({'ironic': 1}, self.stats.last_external_calls)
+        self.assertEqual(0, self.stats.overruns)
+        self.assertEqual((1, 2.0), self.registry.get_histogram(
+            'periodic_task_duration_seconds', task='_sync'))
+        self.assertEqual(3, self.registry.get_counter(
+            'periodic_task_items', task='_sync'))
+        self.assertEqual(1, self.registry.get_counter(
+            'periodic_task_external_calls', task='_sync', service='ironic'))
+
+    def test_overrun(self, mock_time):
+        mock_time.time.side_effect = [100.0, 115.0]
+        self.task(self.manager, self.context)
+        self.assertEqual(1, self.stats.overruns)
+        self.assertEqual(1, self.registry.get_counter(
+            'periodic_task_overruns', task='_sync'))
+
+    def test_skipped_runs(self, mock_time):
+        mock_time.time.side_effect = [100.0, 101.0, 135.0, 136.0]
+        self.task(self.manager, self.context)
+        self.task(self.manager, self.context)
+        self.assertEqual(2, self.stats.runs)
+        self.assertEqual(2, self.stats.skipped_runs)
+        self.assertEqual(2, self.registry.get_counter(
+            'periodic_task_skipped_runs', task='_sync'))
+
+    def test_failure(self, mock_time):
+        mock_time.time.side_effect = [100.0, 101.0]
+        task = dict(self.manager._periodic_tasks)['_fail']
+        self.assertRaises(ValueError, task, self.manager, self.context)
+        stats = self.manager.periodic_task_stats['_fail']
+        self.assertEqual(1, stats.failures)
+        self.assertEqual(1.0, stats.last_duration)
+        self.assertIsNone(stats.last_items)
+
+    def test_report(self, mock_time):
+        mock_time.time.side_effect = [100.0, 102.0]
+        self.task(self.manager, self.context)
+        report = base_manager.PeriodicTaskReportGenerator(self.manager)()
+        self.assertEqual(3, report['_sync']['last_items'])
+        self.assertIn('last_duration = 2.0', report.to_text())
@@ -0,0 +1,64 @@
+#    Licensed under the Apache License, Version 2.0 (the "License"); you may
+#    not use this file except in compliance with the License. You may obtain
+#    a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#    WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#    License for the specific language governing permissions and limitations
+#    under the License.
+
+"""Test class for the config drive builder."""
+
+import os
+
+import fixtures
+import mock
+
+from mogan.common import utils
+from mogan.engine import configdrive
+from mogan.tests import base
+
+
+class ConfigDriveBuilderTestCase(base.TestCase):
+
+    def setUp(self):
+        super(ConfigDriveBuilderTestCase, self).setUp()
+        self.tmpdir = self.useFixture(fixtures.TempDir()).path
+        self.builder = configdrive.ConfigDriveBuilder()
+
+    def _inode(self, path):
+        return os.stat(os.path.join(self.tmpdir, path)).st_ino
+
+    def test_write_md_files_links_duplicates(self):
+        self.builder.mdfiles = [
+            ('openstack/2012-08-10/meta_data.json', b'{"uuid": "fake"}'),
+            ('openstack/latest/meta_data.json', u'{"uuid": "fake"}'),
+            ('openstack/latest/user_data', b'#!/bin/sh')]
+
+        self.builder._write_md_files(self.tmpdir)
+
+        self.assertEqual(self._inode('openstack/2012-08-10/meta_data.json'),
+                         self._inode('openstack/latest/meta_data.json'))
+        self.assertNotEqual(self._inode('openstack/latest/meta_data.json'),
+                            self._inode('openstack/latest/user_data'))
+        with open(os.path.join(self.tmpdir,
+                               'openstack/latest/meta_data.json'), 'rb') as f:
+            self.assertEqual(b'{"uuid": "fake"}', f.read())
+
+    def test_add_file_without_written(self):
+        self.builder._add_file(self.tmpdir, 'a/data', b'data')
+        self.builder._add_file(self.tmpdir, 'b/data', b'data')
+
+        self.assertNotEqual(self._inode('a/data'), self._inode('b/data'))
+
+    @mock.patch.object(utils, 'execute')
+    def test_make_iso9660_caches_inodes(self, mock_execute):
+        self.builder._make_iso9660('/fake/disk.config', self.tmpdir)
+
+        args = mock_execute.call_args[0]
+        # The hard linked files are stored once in the image.
+        self.assertIn('-cache-inodes', args)
+        self.assertEqual(self.tmpdir, args[-1])
@@ -17,6 +17,7 @@
 
 import mock
 from oslo_context import context
+from oslo_utils import uuidutils
 
 from mogan.common import exception
 from mogan.common import states
@@ -290,6 +291,37 @@ class ComputeAPIUnitTest(base.DbTestCase):
                           self.context, fake_server_obj, 'reboot')
         mock_powered.assert_not_called()
 
+    @mock.patch.object(engine_rpcapi.EngineAPI, 'set_power_states')
+    def test_power_all(self, mock_powered):
+        servers = [self._create_fake_server_obj(db_utils.get_test_server(
+            id=i, uuid=uuidutils.generate_uuid(), name=str(i),
+            user_id=self.user_id, project_id=self.project_id, **kw))
+            for i, kw in enumerate(({},
+                                    {'locked': True, 'locked_by': 'owner'},
+                                    {'status': states.ERROR}))]
+        errors = self.engine_api.power_all(self.context, servers, 'reboot')
+
+        self.assertEqual([servers[1].uuid, servers[2].uuid],
+                         sorted(errors, key=[s.uuid for s in servers].index))
+        self.assertIn('locked', errors[servers[1].uuid])
+        mock_powered.assert_called_once_with(self.context, [servers[0]],
+                                             'reboot')
+        self.assertEqual(states.REBOOTING, servers[0].status)
+
+    @mock.patch.object(engine_rpcapi.EngineAPI, 'delete_servers')
+    def test_delete_all(self, mock_deleted):
+        servers = [self._create_fake_server_obj(db_utils.get_test_server(
+            id=i, uuid=uuidutils.generate_uuid(), name=str(i),
+            user_id=self.user_id, project_id=self.project_id, **kw))
+            for i, kw in enumerate(({},
+                                    {'locked': True, 'locked_by': 'owner'}))]
+        errors = self.engine_api.delete_all(self.context, servers)
+
+        self.assertEqual([servers[1].uuid], list(errors))
+        self.assertIn('locked', errors[servers[1].uuid])
+        mock_deleted.assert_called_once_with(self.context, [servers[0]])
+        self.assertEqual(states.DELETING, servers[0].status)
+
     @mock.patch('mogan.engine.api.API._delete_server')
     def test_delete_locked_server_with_admin(self, mock_deleted):
         fake_server = db_utils.get_test_server(
@@ -25,11 +25,14 @@ from mogan.baremetal.ironic import IronicDriver
 from mogan.common import exception
 from mogan.common import ironic
 from mogan.common import states
+from mogan.engine.flows import create_server
 from mogan.engine import manager
 from mogan.network import api as network_api
 from mogan.notifications import base as notifications
+from mogan import objects
 from mogan.objects import fields
 from mogan.objects import server
+from mogan.objects import server_fault
 from mogan.scheduler.client.report import SchedulerReportClient as report_api
 from mogan.tests.unit.db import base as tests_db_base
 from mogan.tests.unit.engine import mgr_utils
@@ -58,6 +61,64 @@ class ManageServerTestCase(mgr_utils.ServiceSetUpMixin,
         delete_port_mock.assert_called_once_with(
             self.context, server_port_id, server.uuid)
 
+    def test_init_host_fails_lost_operations(self):
+        lost = obj_utils.create_test_server(
+            self.context, status=states.REBOOTING)
+        other_engine = obj_utils.create_test_server(
+            self.context, id=2, uuid=uuidutils.generate_uuid(), name='2',
+            status=states.REBOOTING)
+        active = obj_utils.create_test_server(
+            self.context, id=3, uuid=uuidutils.generate_uuid(), name='3',
+            status=states.ACTIVE)
+        server.Server.set_engine_host(self.context, [lost, active],
+                                      self.hostname)
+        server.Server.set_engine_host(self.context, [other_engine],
+                                      'other-host')
+
+        self._start_service()
+        self._stop_service()
+
+        for db_server, status in ((lost, states.ERROR),
+                                  (other_engine, states.REBOOTING),
+                                  (active, states.ACTIVE)):
+            db_server.refresh()
+            self.assertEqual(status, db_server.status)
+        faults = self.dbapi.server_fault_get_by_server_uuids(
+            self.context, [lost.uuid])
+        self.assertIn('interrupted by an engine restart',
+                      faults[lost.uuid][0]['message'])
+
+    @mock.patch.object(server.Server, 'set_engine_host')
+    @mock.patch.object(manager.EngineManager, '_delete_server')
+    def test_delete_server_sets_engine_host(self, delete_server_mock,
+                                            set_host_mock):
+        server_obj = obj_utils.create_test_server(
+            self.context, status=states.DELETING)
+        self._start_service()
+
+        self.service.delete_server(self.context, server=server_obj)
+        self._stop_service()
+
+        self.assertEqual(
+            [mock.call(self.context, [server_obj], self.hostname),
+             mock.call(self.context, [server_obj], None)],
+            set_host_mock.call_args_list)
+
+    @mock.patch.object(IronicDriver, 'set_power_states')
+    def test_set_power_states_clears_engine_host(self, set_power_mock):
+        server_obj = obj_utils.create_test_server(
+            self.context, status=states.POWERING_OFF)
+        set_power_mock.side_effect = Exception('boom')
+        self._start_service()
+
+        self.service.set_power_states(self.context, [server_obj], 'off')
+        self._stop_service()
+
+        # The next operation of the server may still be in the message
+        # queue on restart, it must not be set to error.
+        self.assertEqual([], objects.Server.list(
+            self.context, filters={'engine_host': self.hostname}))
+
     @mock.patch.object(IronicDriver, 'destroy')
     @mock.patch.object(manager.EngineManager, 'destroy_networks')
     def _test__delete_server(self, destroy_networks_mock,
@@ -108,6 +169,32 @@ class ManageServerTestCase(mgr_utils.ServiceSetUpMixin,
 
         delete_server_mock.assert_not_called()
 
+    @mock.patch.object(manager.EngineManager, '_rollback_servers_quota')
+    @mock.patch.object(network_api.API, 'delete_ports')
+    @mock.patch.object(IronicDriver, 'destroy_servers')
+    def test_delete_servers(self, destroy_mock, delete_ports_mock,
+                            rollback_quota_mock):
+        servers = [obj_utils.create_test_server(
+            self.context, id=i, uuid=uuidutils.generate_uuid(), name=str(i),
+            status=states.DELETING) for i in range(2)]
+        destroy_mock.return_value = {
+            servers[1].uuid: exception.NodeNotFound(node='fake')}
+        delete_ports_mock.return_value = {}
+        self._start_service()
+
+        self.service.delete_servers(self.context, servers)
+        self._stop_service()
+
+        destroy_mock.assert_called_once_with(self.context, servers)
+        delete_ports_mock.assert_called_once_with(
+            self.context, [nic.port_id for nic in servers[0].nics])
+        self.assertRaises(exception.ServerNotFound,
+                          servers[0].get, self.context, servers[0].uuid)
+        server = servers[1].get(self.context, servers[1].uuid)
+        self.assertEqual(states.ERROR, server.status)
+        self.assertIn('fake', server.fault.message)
+        rollback_quota_mock.assert_called_once_with(self.context, 1)
+
     @mock.patch.object(IronicDriver, 'get_power_state')
     @mock.patch.object(IronicDriver, 'set_power_state')
     def test_change_server_power_state(
@@ -128,6 +215,26 @@ class ManageServerTestCase(mgr_utils.ServiceSetUpMixin,
                                                ironic_states.POWER_ON)
         get_power_mock.assert_called_once_with(self.context, server.uuid)
 
+    @mock.patch.object(IronicDriver, 'get_power_state')
+    @mock.patch.object(IronicDriver, 'set_power_state')
+    def test_change_server_power_state_queued(
+            self, set_power_mock, get_power_mock):
+        server = obj_utils.create_test_server(
+            self.context, status=states.POWERING_ON)
+        get_power_mock.return_value = states.POWER_ON
+        self._start_service()
+
+        self.service.set_power_state(self.context, server,
+                                     ironic_states.POWER_ON)
+        # The RPC handler returns before the operation runs.
+        set_power_mock.assert_not_called()
+        self._stop_service()
+
+        set_power_mock.assert_called_once_with(self.context,
+                                               server,
+                                               ironic_states.POWER_ON)
+        self.assertEqual(states.ACTIVE, server.status)
+
     @mock.patch.object(notifications, 'notify_about_server_action')
     @mock.patch.object(IronicDriver, 'get_power_state')
     @mock.patch.object(IronicDriver, 'set_power_state')
@@ -140,10 +247,8 @@ class ManageServerTestCase(mgr_utils.ServiceSetUpMixin,
         set_power_mock.side_effect = exception
 
         self._start_service()
-        self.assertRaises(ironic_exc.NotFound,
-                          self.service.set_power_state,
-                          self.context,
-                          server, 'reboot')
+        self.service.set_power_state(self.context, server, 'reboot')
+        self._stop_service()
         set_power_mock.assert_called_once_with(self.context, server, 'reboot')
         get_power_mock.assert_called_once_with(self.context, server.uuid)
         notify_mock.assert_called_once_with(
@@ -151,7 +256,6 @@ class ManageServerTestCase(mgr_utils.ServiceSetUpMixin,
             action=fields.NotificationAction.REBOOT,
             phase=fields.NotificationPhase.ERROR, exception=exception)
         self.assertEqual(server.status, states.ERROR)
-        self._stop_service()
 
     @mock.patch.object(notifications, 'notify_about_server_action')
     @mock.patch.object(IronicDriver, 'get_power_state')
@@ -165,8 +269,8 @@ class ManageServerTestCase(mgr_utils.ServiceSetUpMixin,
         set_power_mock.side_effect = exception
 
         self._start_service()
-        self.assertRaises(ironic_exc.NotFound, self.service.set_power_state,
-                          self.context, server, 'off')
+        self.service.set_power_state(self.context, server, 'off')
+        self._stop_service()
         set_power_mock.assert_called_once_with(self.context, server, 'off')
         get_power_mock.assert_called_once_with(self.context, server.uuid)
         notify_mock.assert_called_once_with(
@@ -174,8 +278,138 @@ class ManageServerTestCase(mgr_utils.ServiceSetUpMixin,
             action=fields.NotificationAction.POWER_OFF,
             phase=fields.NotificationPhase.ERROR, exception=exception)
         self.assertEqual(server.status, states.ACTIVE)
+
+    @mock.patch.object(IronicDriver, 'get_power_states')
+    @mock.patch.object(IronicDriver, 'set_power_states')
+    def test_set_power_states(self, set_power_mock, get_power_mock):
+        servers = [obj_utils.create_test_server(
+            self.context, id=i, uuid=uuidutils.generate_uuid(), name=str(i),
+            status=states.POWERING_OFF) for i in range(2)]
+        set_power_mock.return_value = {
+            servers[1].uuid: exception.NodeNotFound(node='fake')}
+        get_power_mock.return_value = {servers[0].uuid: states.POWER_OFF,
+                                       servers[1].uuid: states.POWER_ON}
+        self._start_service()
+
+        self.service.set_power_states(self.context, servers, 'off')
+        self._stop_service()
+
+        set_power_mock.assert_called_once_with(self.context, servers, 'off')
+        server = servers[0].get(self.context, servers[0].uuid)
+        self.assertEqual(states.STOPPED, server.status)
+        self.assertEqual(states.POWER_OFF, server.power_state)
+        server = servers[1].get(self.context, servers[1].uuid)
+        self.assertEqual(states.ACTIVE, server.status)
+        self.assertEqual(states.POWER_ON, server.power_state)
+        self.assertIn('fake', server.fault.message)
+
+    @mock.patch.object(IronicDriver, 'get_power_states')
+    @mock.patch.object(IronicDriver, 'set_power_states')
+    def test_set_power_states_get_power_states_fails(self, set_power_mock,
+                                                     get_power_mock):
+        servers = [obj_utils.create_test_server(
+            self.context, id=i, uuid=uuidutils.generate_uuid(), name=str(i),
+            status=states.POWERING_OFF) for i in range(2)]
+        set_power_mock.return_value = {
+            servers[1].uuid: exception.NodeNotFound(node='fake')}
+        get_power_mock.side_effect = ironic_exc.ConnectionRefused()
+        self._start_service()
+
+        self.service.set_power_states(self.context, servers, 'off')
+        self._stop_service()
+
+        server = servers[0].get(self.context, servers[0].uuid)
+        self.assertEqual(states.STOPPED, server.status)
+        self.assertEqual(states.NOSTATE, server.power_state)
+        server = servers[1].get(self.context, servers[1].uuid)
+        self.assertEqual(states.ACTIVE, server.status)
+        self.assertIn('fake', server.fault.message)
+
+    def test__sync_server_power_state(self):
+        server = obj_utils.create_test_server(self.context)
+        self._start_service()
+
+        self.service._sync_server_power_state(self.context, server,
+                                              states.POWER_OFF)
+        self._stop_service()
+
+        server = server.get(self.context, server.uuid)
+        self.assertEqual(states.POWER_OFF, server.power_state)
+
+    def test__sync_server_power_state_status_changed(self):
+        server = obj_utils.create_test_server(self.context)
+        # Another worker starts powering off the server after it was
+        # listed by the periodic task.
+        self.dbapi.server_update_values(self.context, server.uuid,
+                                        {'status': states.POWERING_OFF})
+        self._start_service()
+
+        self.service._sync_server_power_state(self.context, server,
+                                              states.POWER_OFF)
+        self._stop_service()
+
+        server = server.get(self.context, server.uuid)
+        self.assertEqual(states.POWERING_OFF, server.status)
+        self.assertEqual(states.POWER_ON, server.power_state)
+
+    @mock.patch.object(manager.EngineManager, '_report_flow_timings')
+    @mock.patch.object(manager.EngineManager, '_rollback_servers_quota')
+    @mock.patch.object(create_server, 'get_flow')
+    def test__create_server_flow_failure_reports_timings(
+            self, get_flow_mock, rollback_mock, report_mock):
+        server_obj = obj_utils.create_test_server(
+            self.context, status=states.BUILDING)
+        get_flow_mock.return_value.run.side_effect = ValueError()
+        self._start_service()
+
+        self.assertRaises(ValueError, self.service._create_server,
+                          self.context, server_obj, [], None, None, None,
+                          None)
+        self._stop_service()
+
+        report_mock.assert_called_once_with(self.context, server_obj,
+                                            'create', mock.ANY, [])
+        server_obj.refresh()
+        self.assertEqual(states.ERROR, server_obj.status)
+
+    @mock.patch.object(notifications, 'notify_about_server_timing')
+    def test__report_flow_timings_failure(self, notify_mock):
+        server_obj = obj_utils.create_test_server(self.context)
+        notify_mock.side_effect = Exception('boom')
+        self._start_service()
+
+        # The failure to report the timings doesn't fail the flow.
+        self.service._report_flow_timings(
+            self.context, server_obj, 'create', 1.0,
+            [{'task': 'BuildNetworkTask', 'action': 'execute',
+              'outcome': 'success', 'duration': 1.0}])
+        self._stop_service()
+        self.assertTrue(notify_mock.called)
+
+    @mock.patch.object(server_fault.ServerFault, 'prune')
+    def test__prune_server_faults(self, prune_mock):
+        CONF.set_override('max_faults_per_server', 5, 'engine')
+        CONF.set_override('prune_server_faults_max_rows', 10, 'engine')
+        prune_mock.side_effect = [10, 10, 3]
+        self._start_service()
+
+        self.assertEqual(23, self.service._prune_server_faults(self.context))
+        self._stop_service()
+
+        self.assertEqual([mock.call(self.context, 5, 10)] * 3,
+                         prune_mock.call_args_list)
+
+    @mock.patch.object(server.Server, 'archive_deleted')
+    def test__archive_deleted_servers(self, archive_mock):
+        CONF.set_override('archive_max_rows', 100, 'database')
+        archive_mock.return_value = 100
+        self._start_service()
+
+        self.service._archive_deleted_servers(self.context)
         self._stop_service()
 
+        archive_mock.assert_called_once_with(self.context, 100)
+
     @mock.patch.object(ironic.IronicClientWrapper, 'call')
     def test_get_serial_console(self, mock_ironic_call):
         fake_node = mock.MagicMock()
@@ -200,6 +434,38 @@ class ManageServerTestCase(mgr_utils.ServiceSetUpMixin,
         self.assertEqual('localhost', console['host'])
         self.assertIn('token', console)
 
+    @mock.patch.object(IronicDriver, 'get_node_inventory')
+    @mock.patch.object(IronicDriver, 'is_node_consumable')
+    @mock.patch.object(IronicDriver, 'get_available_nodes')
+    def test__update_available_resources(self, get_nodes_mock,
+                                         consumable_mock, inventory_mock):
+        nodes = [mock.Mock(uuid='node-%d' % i, resource_class='gold')
+                 for i in range(3)]
+        for node in nodes:
+            node.name = None
+        get_nodes_mock.return_value = nodes
+        consumable_mock.side_effect = [True, False, True]
+        inventory_mock.return_value = {'total': 1}
+        obj_utils.create_test_server(self.context, node_uuid='used-rp')
+        self._start_service()
+        scheduler_client = self.service.scheduler_client = mock.Mock()
+        reportclient = scheduler_client.reportclient
+        reportclient.get_filtered_resource_providers.return_value = [
+            {'uuid': 'node-0'}, {'uuid': 'used-rp'}, {'uuid': 'orphan-rp'}]
+
+        self.assertEqual(
+            3, self.service._update_available_resources(self.context))
+        self._stop_service()
+
+        # The placement requests of all the nodes are sent in batches.
+        reportclient.delete_resource_providers.assert_called_once_with(
+            ['orphan-rp'])
+        reportclient.delete_allocations_for_resource_providers.\
+            assert_called_once_with(['node-0', 'node-2'])
+        scheduler_client.set_inventory_for_providers.assert_called_once_with(
+            [('node-%d' % i, 'node-%d' % i, {'CUSTOM_GOLD': {'total': 1}},
+              'CUSTOM_GOLD') for i in range(3)])
+
     @mock.patch.object(network_api.API, 'delete_port')
     @mock.patch.object(IronicDriver, 'unplug_vif')
     def test_detach_interface(self, unplug_vif_mock, delete_port_mock):
@@ -215,6 +481,64 @@ class ManageServerTestCase(mgr_utils.ServiceSetUpMixin,
         delete_port_mock.assert_called_once_with(self.context, port_id,
                                                  server.uuid)
 
+    @mock.patch.object(objects.ServerMetadataDocuments, 'remove_addresses')
+    @mock.patch.object(network_api.API, 'delete_port')
+    @mock.patch.object(IronicDriver, 'unplug_vif')
+    def test_detach_interface_without_documents(self, unplug_vif_mock,
+                                                delete_port_mock,
+                                                remove_addresses_mock):
+        server = obj_utils.create_test_server(
+            self.context, status=states.ACTIVE)
+        self._start_service()
+        self.service.detach_interface(self.context, server,
+                                      server.nics[0].port_id)
+        self._stop_service()
+        self.assertFalse(remove_addresses_mock.called)
+
+    @mock.patch.object(network_api.API, 'delete_port')
+    @mock.patch.object(IronicDriver, 'unplug_vif')
+    @mock.patch.object(IronicDriver, 'plug_vif')
+    @mock.patch.object(network_api.API, 'bind_port')
+    @mock.patch.object(network_api.API, 'check_port_availability')
+    @mock.patch.object(network_api.API, 'show_port')
+    def test_detach_interface_reused_address(self, show_port_mock,
+                                             check_port_mock, bind_port_mock,
+                                             plug_vif_mock, unplug_vif_mock,
+                                             delete_port_mock):
+        self.config(store_documents=True, group='metadata')
+        old_server = obj_utils.create_test_server(
+            self.context, status=states.ACTIVE)
+        network_id = old_server.nics[0].network_id
+        objects.ServerMetadataDocuments(
+            self.context, server_uuid=old_server.uuid, documents={},
+            addresses=[{'network_id': network_id,
+                        'address': '11.1.0.11'}]).save()
+        new_server = obj_utils.create_test_server(
+            self.context, id=2, uuid=uuidutils.generate_uuid(), name='new',
+            status=states.ACTIVE, nics=[])
+        objects.ServerMetadataDocuments(
+            self.context, server_uuid=new_server.uuid, documents={},
+            addresses=[]).save()
+        port_id = uuidutils.generate_uuid()
+        show_port_mock.return_value = {
+            'id': port_id, 'network_id': network_id,
+            'mac_address': '52:54:00:6a:b7:cd',
+            'fixed_ips': [{'ip_address': '11.1.0.11'}]}
+        self._start_service()
+
+        self.service.detach_interface(self.context, old_server,
+                                      old_server.nics[0].port_id)
+        self.assertRaises(exception.ServerMetadataNotFound,
+                          objects.ServerMetadataDocuments.get_by_address,
+                          self.context, '11.1.0.11')
+
+        self.service.attach_interface(self.context, new_server, None,
+                                      port_id)
+        self._stop_service()
+        documents = objects.ServerMetadataDocuments.get_by_address(
+            self.context, '11.1.0.11')
+        self.assertEqual(new_server.uuid, documents.server_uuid)
+
     def test_wrap_server_fault(self):
         server = {"uuid": uuidutils.generate_uuid()}
 
@@ -0,0 +1,52 @@
+#    Licensed under the Apache License, Version 2.0 (the "License"); you may
+#    not use this file except in compliance with the License. You may obtain
+#    a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#    WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#    License for the specific language governing permissions and limitations
+#    under the License.
+
+"""Test class for the server metadata."""
+
+import mock
+from oslo_serialization import jsonutils
+
+from mogan.engine import metadata
+from mogan.tests import base
+
+
+class ServerMetadataTestCase(base.TestCase):
+
+    def _server_md(self, uuid, name):
+        server = mock.Mock(uuid=uuid, availability_zone='az-1')
+        server.name = name
+        return metadata.ServerMetadata(server)
+
+    def _md_json(self, server_md):
+        return [data for (path, data) in server_md.metadata_for_config_drive()
+                if path.endswith(metadata.MD_JSON_NAME)]
+
+    def test_metadata_json_shared_across_versions(self):
+        documents = self._md_json(self._server_md('uuid-1', 'server-1'))
+
+        self.assertEqual(len(metadata.OPENSTACK_VERSIONS) + 1,
+                         len(documents))
+        for document in documents[1:]:
+            self.assertIs(documents[0], document)
+        self.assertEqual('uuid-1', jsonutils.loads(documents[0])['uuid'])
+
+    def test_metadata_json_per_server(self):
+        server_md_1 = self._server_md('uuid-1', 'server-1')
+        server_md_2 = self._server_md('uuid-2', 'server-2')
+
+        document_1 = self._md_json(server_md_1)[0]
+        document_2 = self._md_json(server_md_2)[0]
+
+        self.assertEqual('server-1', jsonutils.loads(document_1)['name'])
+        self.assertEqual('server-2', jsonutils.loads(document_2)['name'])
+        self.assertIs(document_1, server_md_1.lookup(
+            '/openstack/latest/meta_data.json'))
@@ -120,6 +120,12 @@ class RPCAPITestCase(base.DbTestCase):
                           version='1.0',
                           server=self.fake_server_obj)
 
+    def test_delete_servers(self):
+        self._test_rpcapi('delete_servers',
+                          'cast',
+                          version='1.0',
+                          servers=[self.fake_server_obj])
+
     def test_set_power_state(self):
         self._test_rpcapi('set_power_state',
                           'cast',
@@ -127,6 +133,13 @@ class RPCAPITestCase(base.DbTestCase):
                           server=self.fake_server_obj,
                           state='power on')
 
+    def test_set_power_states(self):
+        self._test_rpcapi('set_power_states',
+                          'cast',
+                          version='1.0',
+                          servers=[self.fake_server_obj],
+                          state='reboot')
+
     def test_rebuild_server(self):
         self._test_rpcapi('rebuild_server',
                           'cast',
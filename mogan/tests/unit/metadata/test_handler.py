@@ -0,0 +1,179 @@
+# Copyright 2017 Huawei Technologies Co.,LTD.
+# All Rights Reserved.
+#
+#    Licensed under the Apache License, Version 2.0 (the "License"); you may
+#    not use this file except in compliance with the License. You may obtain
+#    a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#    WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#    License for the specific language governing permissions and limitations
+#    under the License.
+"""
+Tests For the metadata request handler
+"""
+import hashlib
+import hmac
+
+import mock
+from oslo_serialization import jsonutils
+from oslo_utils import uuidutils
+import webob
+
+from mogan.engine import metadata
+from mogan.metadata import handler
+from mogan import objects
+from mogan.tests.unit.db import base
+from mogan.tests.unit.db import utils
+
+NETWORK_ID = 'bf942f63-c284-4eb8-925b-c2fa1a89ed33'
+
+
+class MetadataRequestHandlerTestCase(base.DbTestCase):
+
+    def setUp(self):
+        super(MetadataRequestHandlerTestCase, self).setUp()
+        self.server = utils.create_test_server()
+        server_md = metadata.ServerMetadata(self.server, user_data='Zm9v')
+        objects.ServerMetadataDocuments(
+            self.context, server_uuid=self.server.uuid,
+            documents=server_md.metadata_documents(),
+            addresses=[{'network_id': NETWORK_ID,
+                        'address': '10.0.0.2'}]).save()
+        self.handler = handler.MetadataRequestHandler()
+
+    def _request(self, path, remote_addr='10.0.0.2', headers=None):
+        req = webob.Request.blank(path, remote_addr=remote_addr,
+                                  headers=headers)
+        return req.get_response(self.handler)
+
+    def test_get_meta_data(self):
+        res = self._request('/openstack/latest/meta_data.json')
+        self.assertEqual(200, res.status_int)
+        self.assertEqual('application/json', res.content_type)
+        self.assertEqual(self.server.uuid, jsonutils.loads(res.body)['uuid'])
+
+    def test_get_user_data(self):
+        res = self._request('/latest/user_data')
+        self.assertEqual(200, res.status_int)
+        self.assertEqual(b'foo', res.body)
+
+    def test_get_versions(self):
+        res = self._request('/')
+        self.assertEqual(200, res.status_int)
+        self.assertEqual(metadata.get_versions(), res.text.split('\n'))
+
+    def test_get_unknown_path(self):
+        res = self._request('/openstack/latest/vendor_data.json')
+        self.assertEqual(404, res.status_int)
+
+    def test_get_unknown_address(self):
+        res = self._request('/openstack/latest/meta_data.json',
+                            remote_addr='10.0.0.3')
+        self.assertEqual(404, res.status_int)
+
+    def test_get_reused_address(self):
+        self.config(cache_expiration=0, group='metadata')
+        objects.ServerMetadataDocuments.remove_addresses(
+            self.context, self.server.uuid,
+            [{'network_id': NETWORK_ID, 'address': '10.0.0.2'}])
+        res = self._request('/latest/user_data')
+        self.assertEqual(404, res.status_int)
+
+        other = utils.create_test_server(uuid=uuidutils.generate_uuid(),
+                                         name='other')
+        other_md = metadata.ServerMetadata(other, user_data='YmFy')
+        objects.ServerMetadataDocuments(
+            self.context, server_uuid=other.uuid,
+            documents=other_md.metadata_documents(), addresses=[]).save()
+        objects.ServerMetadataDocuments.add_addresses(
+            self.context, other.uuid,
+            [{'network_id': NETWORK_ID, 'address': '10.0.0.2'}])
+        res = self._request('/latest/user_data')
+        self.assertEqual(200, res.status_int)
+        self.assertEqual(b'bar', res.body)
+
+    def test_get_address_on_networks(self):
+        other = utils.create_test_server(uuid=uuidutils.generate_uuid(),
+                                         name='other')
+        objects.ServerMetadataDocuments(
+            self.context, server_uuid=other.uuid, documents={},
+            addresses=[{'network_id': uuidutils.generate_uuid(),
+                        'address': '10.0.0.2'}]).save()
+        res = self._request('/latest/user_data')
+        self.assertEqual(404, res.status_int)
+
+    def _proxy_headers(self, server_uuid, secret='secret'):
+        signature = hmac.new(secret.encode('utf-8'),
+                             server_uuid.encode('utf-8'),
+                             hashlib.sha256).hexdigest()
+        return {'X-Forwarded-For': '10.0.0.2',
+                'X-Instance-ID': server_uuid,
+                'X-Instance-ID-Signature': signature}
+
+    def test_get_proxied(self):
+        self.config(service_metadata_proxy=True,
+                    metadata_proxy_shared_secret='secret', group='metadata')
+        other = utils.create_test_server(uuid=uuidutils.generate_uuid(),
+                                         name='other')
+        other_md = metadata.ServerMetadata(other, user_data='YmFy')
+        # The same address on another network.
+        objects.ServerMetadataDocuments(
+            self.context, server_uuid=other.uuid,
+            documents=other_md.metadata_documents(),
+            addresses=[{'network_id': uuidutils.generate_uuid(),
+                        'address': '10.0.0.2'}]).save()
+        for server, user_data in ((self.server, b'foo'), (other, b'bar')):
+            res = self._request('/latest/user_data', remote_addr='10.0.1.1',
+                                headers=self._proxy_headers(server.uuid))
+            self.assertEqual(200, res.status_int)
+            self.assertEqual(user_data, res.body)
+
+    def test_get_proxied_bad_signature(self):
+        self.config(service_metadata_proxy=True,
+                    metadata_proxy_shared_secret='secret', group='metadata')
+        res = self._request(
+            '/latest/user_data', remote_addr='10.0.1.1',
+            headers=self._proxy_headers(self.server.uuid, secret='wrong'))
+        self.assertEqual(403, res.status_int)
+
+    def test_get_proxied_no_server_id(self):
+        self.config(service_metadata_proxy=True, group='metadata')
+        res = self._request('/latest/user_data', remote_addr='10.0.1.1',
+                            headers={'X-Forwarded-For': '10.0.0.2'})
+        self.assertEqual(400, res.status_int)
+
+    def test_get_forwarded_for(self):
+        self.config(use_forwarded_for=True, group='metadata')
+        res = self._request('/openstack/latest/meta_data.json',
+                            remote_addr='192.168.0.1',
+                            headers={'X-Forwarded-For': '10.0.0.2'})
+        self.assertEqual(200, res.status_int)
+
+    @mock.patch.object(objects.ServerMetadataDocuments, 'get_by_server_uuid')
+    @mock.patch.object(objects.ServerMetadataDocuments, 'get_by_address')
+    def test_get_cached(self, mock_get_by_address, mock_get_by_server_uuid):
+        mock_get_by_address.return_value = objects.ServerMetadataDocuments(
+            self.context, server_uuid=self.server.uuid,
+            documents={'openstack/latest/user_data': 'Zm9v'})
+        for i in range(2):
+            res = self._request('/openstack/latest/user_data')
+            self.assertEqual(b'foo', res.body)
+        mock_get_by_address.assert_called_once_with(mock.ANY, '10.0.0.2')
+        self.assertFalse(mock_get_by_server_uuid.called)
+
+    @mock.patch.object(objects.ServerMetadataDocuments, 'get_by_address')
+    def test_get_not_cached(self, mock_get_by_address):
+        self.config(cache_expiration=0, group='metadata')
+        mock_get_by_address.return_value = objects.ServerMetadataDocuments(
+            self.context, server_uuid=self.server.uuid,
+            documents={'openstack/latest/user_data': 'Zm9v'})
+        with mock.patch.object(objects.ServerMetadataDocuments,
+                               'get_by_server_uuid') as mock_get:
+            mock_get.return_value = mock_get_by_address.return_value
+            for i in range(2):
+                self._request('/openstack/latest/user_data')
+        self.assertEqual(2, mock_get_by_address.call_count)
@@ -232,7 +232,10 @@ notification_object_data = {
     'ServerActionNotification': '1.0-20087e599436bd9db62ae1fb5e2dfef2',
     'ExceptionPayload': '1.0-7c31986d8d78bed910c324965c431e18',
     'ExceptionNotification': '1.0-20087e599436bd9db62ae1fb5e2dfef2',
-    'EventType': '1.0-93493dd78bdfed806fca70c91d85cbb4',
+    'ServerTimingPayload': '1.0-9b555681b6e98b519477ccb64d7a8383',
+    'ServerTimingNotification': '1.0-20087e599436bd9db62ae1fb5e2dfef2',
+    'TaskTimingPayload': '1.0-574acc50e804f13c8f4ee0db983a5a0f',
+    'EventType': '1.1-2716d0caf5aa75f79bee50f62c38d30f',
     'NotificationPublisher': '1.0-4b0b0d662b21eeed0b23617f3f11794b'
 }
 
@@ -333,3 +336,21 @@ class TestServerActionNotification(test_base.TestCase):
                          payload['description'])
         self.assertEqual(fake_server_values['power_state'],
                          payload['power_state'])
+
+    @mock.patch('mogan.notifications.objects.server.'
+                'ServerTimingNotification._emit')
+    def test_send_server_timing(self, mock_emit):
+        server = server_obj.Server(**db_utils.get_test_server())
+        timings = [{'task': 'BuildNetworkTask', 'action': 'execute',
+                    'outcome': 'success', 'duration': 1.5}]
+        notification_base.notify_about_server_timing(
+            mock.MagicMock(), server, 'test-host', 'create', 2.0, timings)
+        self.assertEqual('server.timing',
+                         mock_emit.call_args_list[0][1]['event_type'])
+        payload = mock_emit.call_args_list[0][1]['payload'][
+            'mogan_object.data']
+        self.assertEqual(server.uuid, payload['uuid'])
+        self.assertEqual('create', payload['flow'])
+        self.assertEqual(2.0, payload['duration'])
+        task = payload['tasks'][0]['mogan_object.data']
+        self.assertEqual(timings[0], task)
@@ -385,6 +385,7 @@ expected_object_fingerprints = {
     'Server': '1.0-6b13b984cd3656a977456a12d3d1c167',
     'ServerFault': '1.0-74349ff701259e4834b4e9dc2dac1b12',
     'ServerFaultList': '1.0-43e8aad0258652921f929934e9e048fd',
+    'ServerMetadataDocuments': '1.0-45f94326ccc505e7d60d18c0bf49f6d8',
     'Flavor': '1.0-9f7166aa387d89ec40cd699019d0c9a9',
     'MyObj': '1.1-aad62eedc5a5cc8bcaf2982c285e753f',
     'ServerNic': '1.0-fb405af29a68a9a60a495962a11579cc',
@@ -15,6 +15,8 @@ import copy
 import mock
 from oslo_context import context
 
+from mogan.common import exception
+from mogan.common import states
 from mogan import objects
 from mogan.tests.unit.db import base
 from mogan.tests.unit.db import utils
@@ -77,11 +79,10 @@ class TestServerObject(base.DbTestCase):
 
     def test_save(self):
         uuid = self.fake_server['uuid']
-        with mock.patch.object(self.dbapi, 'server_update',
+        with mock.patch.object(self.dbapi, 'server_update_values',
                                autospec=True) as mock_server_update:
             with mock.patch.object(self.dbapi, 'server_nic_update_or_create',
                                    autospec=True) as mock_server_nic_update:
-                mock_server_update.return_value = self.fake_server
                 server_nics = self.fake_server['nics']
                 port_id = server_nics[0]['port_id']
                 server = objects.Server(self.context, **self.fake_server)
@@ -89,12 +90,61 @@ class TestServerObject(base.DbTestCase):
                 updates.pop('nics', None)
                 server.save(self.context)
                 mock_server_update.assert_called_once_with(
-                    self.context, uuid, updates)
+                    self.context, uuid, updates, expected_status=None,
+                    expected_power_state=None)
                 expected_called_nic = copy.deepcopy(server_nics[0])
                 expected_called_nic.update(server_uuid=uuid)
                 mock_server_nic_update.assert_called_once_with(
                     self.context, port_id, expected_called_nic)
 
+    def test_save_no_changes(self):
+        server = objects.Server(self.context, **self.fake_server)
+        server.obj_reset_changes()
+        with mock.patch.object(self.dbapi, 'server_update_values',
+                               autospec=True) as mock_server_update:
+            server.save(self.context)
+            self.assertFalse(mock_server_update.called)
+
+    def test_save_all(self):
+        server = objects.Server(self.context, **self.fake_server)
+        server.obj_reset_changes()
+        server.node = 'node-name'
+        with mock.patch.object(self.dbapi, 'servers_update_values',
+                               autospec=True) as mock_servers_update:
+            objects.Server.save_all(self.context, [server])
+            mock_servers_update.assert_called_once_with(
+                self.context, {server.uuid: {'node': 'node-name'}})
+        self.assertNotIn('node', server.obj_get_changes())
+
+    def test_save_expected_status(self):
+        db_server = utils.create_test_server(context=self.ctxt)
+        server = objects.Server.get(self.context, db_server.uuid)
+        server.status = states.DELETING
+        self.assertRaises(exception.UnexpectedServerStatus, server.save,
+                          self.context, expected_status=states.BUILDING)
+        server.save(self.context, expected_status=[states.ACTIVE,
+                                                   states.STOPPED])
+        self.assertEqual(states.DELETING,
+                         objects.Server.get(self.context,
+                                            db_server.uuid).status)
+
+    def test_save_unexpected_status_skips_nics(self):
+        db_server = utils.create_test_server(context=self.ctxt)
+        for status_change in (True, False):
+            server = objects.Server.get(self.context, db_server.uuid)
+            if status_change:
+                server.status = states.DELETING
+            server.nics = objects.ServerNics(self.context, objects=[
+                objects.ServerNic(self.context, port_id='new-port',
+                                  mac_address='52:54:00:6a:b7:cd',
+                                  server_uuid=db_server.uuid)])
+            with mock.patch.object(self.dbapi, 'server_nic_update_or_create',
+                                   autospec=True) as mock_nic_update:
+                self.assertRaises(exception.UnexpectedServerStatus,
+                                  server.save, self.context,
+                                  expected_status=states.BUILDING)
+                self.assertFalse(mock_nic_update.called)
+
     def test_save_after_refresh(self):
         db_server = utils.create_test_server(context=self.ctxt)
         server = objects.Server.get(self.context, db_server.uuid)
@@ -0,0 +1,104 @@
+# Licensed under the Apache License, Version 2.0 (the "License"); you may
+# not use this file except in compliance with the License. You may obtain
+# a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+# WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+# License for the specific language governing permissions and limitations
+# under the License.
+
+from oslo_utils import uuidutils
+
+from mogan.common import exception
+from mogan.scheduler.client import db_report
+from mogan.tests.unit.db import base
+
+RC = 'CUSTOM_GOLD'
+
+
+def _inventory(total=1):
+    return {RC: {'total': total, 'reserved': 0, 'min_unit': 1,
+                 'max_unit': total, 'step_size': 1, 'allocation_ratio': 1.0}}
+
+
+class DBReportClientTestCase(base.DbTestCase):
+
+    def setUp(self):
+        super(DBReportClientTestCase, self).setUp()
+        self.client = db_report.DBReportClient()
+        self.rp_uuids = [uuidutils.generate_uuid() for i in range(2)]
+        for i, rp_uuid in enumerate(self.rp_uuids):
+            self.client.set_inventory_for_provider(
+                rp_uuid, 'node-%d' % i, _inventory(), RC)
+
+    def _filter(self, **filters):
+        return sorted(rp['uuid'] for rp in
+                      self.client.get_filtered_resource_providers(filters))
+
+    def test_get_filtered_resource_providers_member_of(self):
+        agg_1, agg_2 = (uuidutils.generate_uuid() for i in range(2))
+        self.client.update_aggregate_node(agg_1, 'node-0', 'add')
+        self.client.update_aggregate_node(agg_2, 'node-1', 'add')
+
+        self.assertEqual([self.rp_uuids[0]], self._filter(member_of=agg_1))
+        self.assertEqual([self.rp_uuids[0]],
+                         self._filter(member_of='in:%s' % agg_1))
+        self.assertEqual(sorted(self.rp_uuids),
+                         self._filter(member_of='in:%s,%s' % (agg_1, agg_2)))
+        self.assertEqual(
+            [], self._filter(member_of='in:%s' % uuidutils.generate_uuid()))
+
+    def test_put_allocations(self):
+        self.assertTrue(self.client.put_allocations(
+            self.rp_uuids[0], 'server-1', {RC: 1}, 'project', 'user'))
+        self.assertEqual(
+            {'server-1': {'resources': {RC: 1}}},
+            self.client.get_allocations_for_resource_provider(
+                self.rp_uuids[0]))
+
+    def test_put_allocations_insufficient(self):
+        self.client.put_allocations(self.rp_uuids[0], 'server-1', {RC: 1},
+                                    'project', 'user')
+        self.assertFalse(self.client.put_allocations(
+            self.rp_uuids[0], 'server-2', {RC: 1}, 'project', 'user'))
+
+    def test_put_allocations_provider_not_found(self):
+        self.assertFalse(self.client.put_allocations(
+            uuidutils.generate_uuid(), 'server-1', {RC: 1}, 'project',
+            'user'))
+
+    def test_update_aggregate_node(self):
+        agg_1, agg_2 = (uuidutils.generate_uuid() for i in range(2))
+        self.client.update_aggregate_node(agg_1, 'node-0', 'add')
+        self.client.update_aggregate_node(agg_2, 'node-0', 'add')
+        # Adding twice is a no-op.
+        self.client.update_aggregate_node(agg_1, 'node-0', 'add')
+        self.assertEqual(
+            sorted([agg_1, agg_2]),
+            sorted(self.client.get_aggregates_from_node('node-0')[
+                'aggregates']))
+        self.assertEqual({'nodes': ['node-0']},
+                         self.client.get_nodes_from_aggregate(agg_1))
+
+        self.client.update_aggregate_node(agg_1, 'node-0', 'remove')
+        self.client.update_aggregate_node(agg_1, 'node-1', 'remove')
+        self.assertEqual({'aggregates': [agg_2]},
+                         self.client.get_aggregates_from_node('node-0'))
+        self.assertEqual({'aggregates': []},
+                         self.client.get_aggregates_from_node('node-1'))
+
+    def test_update_aggregate_node_not_found(self):
+        self.assertRaises(exception.NodeNotFound,
+                          self.client.update_aggregate_node,
+                          uuidutils.generate_uuid(), 'node-2', 'add')
+
+    def test_remove_aggregate(self):
+        agg_uuid = uuidutils.generate_uuid()
+        for node in ('node-0', 'node-1'):
+            self.client.update_aggregate_node(agg_uuid, node, 'add')
+        self.client.remove_aggregate(agg_uuid)
+        self.assertEqual({'nodes': []},
+                         self.client.get_nodes_from_aggregate(agg_uuid))
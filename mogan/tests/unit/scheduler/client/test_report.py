@@ -0,0 +1,232 @@
+# Licensed under the Apache License, Version 2.0 (the "License"); you may
+# not use this file except in compliance with the License. You may obtain
+# a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+# WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+# License for the specific language governing permissions and limitations
+# under the License.
+
+import eventlet
+import mock
+
+from mogan.common import exception
+from mogan.scheduler.client import report
+from mogan.tests import base
+
+
+def _response(status_code, data=None, headers=None):
+    resp = mock.Mock(status_code=status_code, headers=headers or {},
+                     text='')
+    resp.json.return_value = data
+    resp.__bool__ = resp.__nonzero__ = lambda self: status_code < 400
+    return resp
+
+
+def _root(max_version):
+    return _response(200, {'versions': [{'id': 'v1.0',
+                                         'max_version': max_version}]})
+
+
+class SchedulerReportClientTestCase(base.TestCase):
+
+    def setUp(self):
+        super(SchedulerReportClientTestCase, self).setUp()
+        for name in ('load_auth_from_conf_options',
+                     'load_session_from_conf_options'):
+            patcher = mock.patch.object(report.keystone, name)
+            self.addCleanup(patcher.stop)
+            patcher.start()
+
+    def _get_client(self, *responses):
+        with mock.patch.object(report.SchedulerReportClient,
+                               '_discover_max_version', return_value=None):
+            client = report.SchedulerReportClient()
+        client._client.request.side_effect = list(responses)
+        return client
+
+    def _sent_headers(self, client, index=-1):
+        return client._client.request.call_args_list[index][1].get('headers')
+
+    def test_headers_fresh_dict(self):
+        client = self._get_client()
+        headers = client._headers('1.4')
+        headers['X-Openstack-Request-Id'] = 'req-1'
+        self.assertEqual({'OpenStack-API-Version': 'placement 1.4'},
+                         client._headers('1.4'))
+        self.assertIsNot(client._headers('1.4'), client._headers('1.4'))
+
+    def test_request_headers(self):
+        client = self._get_client(_response(200), _response(200))
+        client.get('/resource_providers', version='1.4',
+                   headers={'If-None-Match': '"etag"'})
+        self.assertEqual({'OpenStack-API-Version': 'placement 1.4',
+                          'If-None-Match': '"etag"'},
+                         self._sent_headers(client))
+        client.get('/resource_providers')
+        self.assertIsNone(self._sent_headers(client))
+
+    def test_discover_max_version(self):
+        client = self._get_client(_root('1.10'))
+        self.assertEqual((1, 10), client._discover_max_version())
+        client._max_version = (1, 10)
+        self.assertTrue(client._version_supported('1.8'))
+        self.assertFalse(client._version_supported('1.11'))
+
+    def test_discover_max_version_unversioned(self):
+        client = self._get_client(_response(200, {'versions': [{}]}))
+        self.assertEqual((1, 0), client._discover_max_version())
+
+    @mock.patch.object(report.time, 'time')
+    def test_discover_max_version_retried(self, mock_time):
+        mock_time.return_value = 100
+        client = self._get_client(_response(503), _root('1.4'))
+        self.assertIsNone(client._discover_max_version())
+        # Every version is assumed to be supported until the discovery
+        # succeeds, which is not retried before the retry interval.
+        self.assertTrue(client._version_supported('1.8'))
+        self.assertEqual(1, client._client.request.call_count)
+
+        mock_time.return_value = 100 + report._DISCOVERY_RETRY_INTERVAL
+        self.assertFalse(client._version_supported('1.8'))
+        self.assertEqual((1, 4), client._max_version)
+        self.assertEqual(2, client._client.request.call_count)
+
+    @mock.patch.object(report.SchedulerReportClient,
+                       '_get_or_create_resource_class',
+                       return_value='CUSTOM_GOLD')
+    def test_ensure_resource_class_fallback(self, mock_get_or_create):
+        client = self._get_client(_response(406))
+        client._max_version = (1, 10)
+        self.assertEqual('CUSTOM_GOLD',
+                         client._ensure_resource_class('CUSTOM_GOLD'))
+        self.assertEqual('placement 1.7', self._sent_headers(client)[
+            'OpenStack-API-Version'])
+        # The 406 is remembered, 1.7 is not tried again.
+        self.assertEqual('CUSTOM_GOLD',
+                         client._ensure_resource_class('CUSTOM_GOLD'))
+        self.assertEqual(1, client._client.request.call_count)
+        self.assertEqual(2, mock_get_or_create.call_count)
+
+    def test_cached_get(self):
+        url = '/resource_providers/rp-1/aggregates'
+        data = {'aggregates': ['agg-1']}
+        client = self._get_client(
+            _response(200, data, headers={'ETag': '"etag-1"'}),
+            _response(304))
+        self.assertEqual(data, client._cached_get(url, version='1.1')[1])
+        self.assertNotIn('If-None-Match', self._sent_headers(client))
+
+        resp, cached = client._cached_get(url, version='1.1')
+        self.assertEqual(304, resp.status_code)
+        self.assertEqual(data, cached)
+        self.assertEqual({'OpenStack-API-Version': 'placement 1.1',
+                          'If-None-Match': '"etag-1"'},
+                         self._sent_headers(client))
+
+    def test_cached_get_error_drops_cache(self):
+        url = '/resource_providers/rp-1'
+        client = self._get_client(
+            _response(200, {'uuid': 'rp-1'}, headers={'ETag': '"etag-1"'}),
+            _response(404), _response(200, {'uuid': 'rp-1'}))
+        client._cached_get(url)
+        self.assertIsNone(client._cached_get(url)[1])
+        self.assertNotIn(url, client._get_cache)
+        client._cached_get(url)
+        self.assertIsNone(self._sent_headers(client))
+
+    def test_invalidate_provider_cache(self):
+        client = self._get_client()
+        urls = ['/resource_providers/rp-1',
+                '/resource_providers/rp-1/aggregates',
+                '/resource_providers/rp-1/inventories',
+                '/resource_providers/rp-10',
+                '/resource_providers/rp-2/aggregates']
+        client._get_cache = dict((url, ('"etag"', {})) for url in urls)
+        client._invalidate_provider_cache('rp-1')
+        self.assertEqual(sorted(urls[3:]), sorted(client._get_cache))
+
+    def test_map_results_ordered(self):
+        client = self._get_client()
+
+        def _func(item):
+            # The first items complete last.
+            eventlet.sleep(0.01 * (3 - item))
+            return item * 2
+
+        self.assertEqual([0, 2, 4, 6], client._map(_func, range(4)))
+
+    def test_map_bounded(self):
+        self.config(max_concurrent_requests=2, group='placement')
+        client = self._get_client()
+        running = {'now': 0, 'max': 0}
+
+        def _func(item):
+            running['now'] += 1
+            running['max'] = max(running['max'], running['now'])
+            eventlet.sleep(0.01)
+            running['now'] -= 1
+
+        client._map(_func, range(6))
+        self.assertEqual(2, running['max'])
+
+    def test_map_failure_runs_all(self):
+        client = self._get_client()
+        done = []
+
+        def _func(item):
+            if item == 1:
+                raise exception.InventoryInUse(resource_classes='gold',
+                                               resource_provider='rp-1')
+            eventlet.sleep(0.01)
+            done.append(item)
+
+        self.assertRaises(exception.InventoryInUse, client._map, _func,
+                          range(4))
+        self.assertEqual([0, 2, 3], sorted(done))
+
+    @mock.patch.object(report.SchedulerReportClient, '_update_inventory')
+    @mock.patch.object(report.SchedulerReportClient,
+                       '_ensure_resource_provider')
+    @mock.patch.object(report.SchedulerReportClient,
+                       '_ensure_resource_class')
+    def test_set_inventory_for_providers(self, mock_ensure_class,
+                                         mock_ensure_rp, mock_update):
+        client = self._get_client()
+        inventories = [{'CUSTOM_GOLD': {'total': i}} for i in range(3)]
+        client.set_inventory_for_providers(
+            [('rp-0', 'node-0', inventories[0], 'CUSTOM_GOLD'),
+             ('rp-1', 'node-1', inventories[1], 'CUSTOM_GOLD'),
+             ('rp-2', 'node-2', inventories[2], 'CUSTOM_SILVER')])
+
+        # Each resource class is ensured once for all the providers.
+        self.assertEqual(
+            ['CUSTOM_GOLD', 'CUSTOM_SILVER'],
+            sorted(c[0][0] for c in mock_ensure_class.call_args_list))
+        mock_ensure_rp.assert_has_calls(
+            [mock.call('rp-%d' % i, 'node-%d' % i) for i in range(3)],
+            any_order=True)
+        mock_update.assert_has_calls(
+            [mock.call('rp-%d' % i, inventories[i]) for i in range(3)],
+            any_order=True)
+
+    @mock.patch.object(report.SchedulerReportClient,
+                       'delete_allocations_for_resource_provider')
+    def test_delete_allocations_for_resource_providers(self, mock_delete):
+        client = self._get_client()
+        client.delete_allocations_for_resource_providers(['rp-1', 'rp-2'])
+        mock_delete.assert_has_calls([mock.call('rp-1'), mock.call('rp-2')],
+                                     any_order=True)
+        self.assertEqual(2, mock_delete.call_count)
+
+    @mock.patch.object(report.SchedulerReportClient,
+                       'delete_resource_provider')
+    def test_delete_resource_providers(self, mock_delete):
+        client = self._get_client()
+        client.delete_resource_providers(['rp-1', 'rp-2'])
+        mock_delete.assert_has_calls([mock.call('rp-1'), mock.call('rp-2')],
+                                     any_order=True)
+        self.assertEqual(2, mock_delete.call_count)
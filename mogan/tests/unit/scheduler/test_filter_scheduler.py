@@ -0,0 +1,117 @@
+# Licensed under the Apache License, Version 2.0 (the "License"); you may
+# not use this file except in compliance with the License. You may obtain
+# a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+# WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+# License for the specific language governing permissions and limitations
+# under the License.
+
+import mock
+from oslo_utils import uuidutils
+
+from mogan.scheduler import client
+from mogan.scheduler import filter_scheduler
+from mogan.tests.unit.db import base
+
+
+class FakeReportClient(object):
+    """Placement with nodes of one resource class each, in aggregates."""
+
+    def __init__(self):
+        # Resource class and aggregate uuids, keyed by node uuid
+        self.nodes = {}
+        self.consumed = set()
+
+    def add_node(self, name, resource_class, aggregates, consumed=False):
+        self.nodes[name] = (resource_class, set(agg.uuid
+                                                for agg in aggregates))
+        if consumed:
+            self.consumed.add(name)
+
+    def get_filtered_resource_providers(self, filters):
+        if 'member_of' in filters:
+            agg_uuids = set(filters['member_of'][len('in:'):].split(','))
+            return [{'uuid': name}
+                    for name, (rc, aggs) in sorted(self.nodes.items())
+                    if aggs & agg_uuids]
+        resources = filters['resources']
+        return [{'uuid': name}
+                for name, (rc, aggs) in sorted(self.nodes.items())
+                if rc in resources and name not in self.consumed]
+
+
+class FilterSchedulerTestCase(base.DbTestCase):
+
+    def setUp(self):
+        super(FilterSchedulerTestCase, self).setUp()
+        with mock.patch.object(client, 'SchedulerClient'):
+            self.scheduler = filter_scheduler.FilterScheduler()
+        self.placement = FakeReportClient()
+        self.scheduler.reportclient = self.placement
+
+        self.az1 = self._create_aggregate('az1', availability_zone='az1')
+        self.az2 = self._create_aggregate('az2', availability_zone='az2')
+        self.fast = self._create_aggregate('fast', pool='fast')
+        self.placement.add_node('node-1', 'CUSTOM_GOLD',
+                                [self.az1, self.fast])
+        self.placement.add_node('node-2', 'CUSTOM_SILVER', [self.az1])
+        self.placement.add_node('node-3', 'CUSTOM_GOLD', [self.az1],
+                                consumed=True)
+        self.placement.add_node('node-4', 'CUSTOM_GOLD', [self.az1])
+        self.placement.add_node('node-5', 'CUSTOM_GOLD',
+                                [self.az2, self.fast])
+
+    def _create_aggregate(self, name, **metadata):
+        return self.dbapi.aggregate_create(self.context, {
+            'uuid': uuidutils.generate_uuid(), 'name': name,
+            'metadata': metadata})
+
+    def _request_spec(self, availability_zone=None, **resource_aggregates):
+        return {'flavor': {'resources': {'gold': 1},
+                           'resource_aggregates': resource_aggregates},
+                'availability_zone': availability_zone}
+
+    def test_get_filtered_nodes(self):
+        nodes = self.scheduler._get_filtered_nodes(
+            self.context, self._request_spec())
+        self.assertEqual(['node-1', 'node-4', 'node-5'], sorted(nodes))
+
+    def test_get_filtered_nodes_availability_zone(self):
+        # node-2 lacks the resource class and node-3 is consumed.
+        nodes = self.scheduler._get_filtered_nodes(
+            self.context, self._request_spec(availability_zone='az1'))
+        self.assertEqual(['node-1', 'node-4'], sorted(nodes))
+
+    def test_get_filtered_nodes_resource_aggregates(self):
+        nodes = self.scheduler._get_filtered_nodes(
+            self.context, self._request_spec(pool='fast'))
+        self.assertEqual(['node-1', 'node-5'], sorted(nodes))
+
+    def test_get_filtered_nodes_resource_aggregates_and_az(self):
+        nodes = self.scheduler._get_filtered_nodes(
+            self.context,
+            self._request_spec(availability_zone='az2', pool='fast'))
+        self.assertEqual(['node-5'], nodes)
+
+    def test_get_filtered_nodes_unknown_aggregate(self):
+        nodes = self.scheduler._get_filtered_nodes(
+            self.context,
+            self._request_spec(availability_zone='az1', pool='slow'))
+        self.assertEqual([], nodes)
+
+    def test_get_res_aggregates_filters(self):
+        filters = self.scheduler._get_res_aggregates_filters(
+            self.context,
+            self._request_spec(availability_zone='az1', pool='fast'))
+        self.assertEqual([[self.fast.uuid], [self.az1.uuid]],
+                         [[agg.uuid for agg in aggs] for aggs in filters])
+
+    def test_get_res_aggregates_filters_none(self):
+        self.assertEqual([], self.scheduler._get_res_aggregates_filters(
+            self.context, self._request_spec()))
+        self.assertIsNone(self.scheduler._get_res_aggregates_filters(
+            self.context, self._request_spec(availability_zone='az3')))